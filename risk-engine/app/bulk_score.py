@@ -0,0 +1,431 @@
+"""
+Score archived NeoWs dumps offline, on every core.
+
+    python -m app.bulk_score dumps/*.json.gz --out scores/2026-10.npz --workers auto
+
+Inputs are any files app.engine.sources accepts (JSON list, /analyze
+body, NeoWs feed/browse or lookup responses, NDJSON, optionally
+gzipped).  They are streamed, never loaded whole: the parent process
+cuts the record stream into chunks of ``--chunk-size`` records and a
+process pool parses and scores them through the columnar batch
+pipeline, with at most two chunks per worker in flight.
+
+The dump is treated as one batch, so it is read twice: a first pass
+counts close approaches per asteroid (approach_count, as /analyze would
+report it) and the number of records; the second pass scores.
+
+Each chunk is written to ``<out>.parts/part-NNNNNN.npz`` as it finishes.
+An interrupted run continues with ``--resume``: finished parts are kept
+and their chunks skipped.  At the end the parts are concatenated column
+by column into ``<out>`` (.npz, or .parquet with pyarrow installed) and
+batch statistics go to ``<out>.stats.json``.
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import sys
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, wait
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+import numpy as np
+from pydantic import ValidationError
+
+from app.config import settings
+from app.engine.batch import compute_batch, extract_inputs, resolve_as_of, result_columns
+from app.engine.learned import LearnedModel, load_learned_model
+from app.engine.scoring import ScoringModel
+from app.engine.sources import iter_neo_texts
+from app.engine.summary import BatchSummary
+from app.models import NeoObject, TimeWindow
+from app.serve import resolve_workers
+from app.services.scoring_registry import ScoringModelRegistry
+
+logger = logging.getLogger("risk-engine.bulk-score")
+
+STATE_VERSION = 1
+
+
+# ── Worker processes ─────────────────────────────────────────
+_worker: dict[str, Any] = {}
+
+
+def _init_worker(
+    counts: dict[str, int],
+    as_of: Optional[np.ndarray],
+    models: list[ScoringModel],
+    learned: Optional[LearnedModel],
+) -> None:
+    # Forked: arguments are inherited, not pickled
+    _worker.update(counts=counts, as_of=as_of, models=models, learned=learned)
+
+
+def _count_chunk(texts: list[str]) -> tuple[int, dict[str, int]]:
+    """Close approaches per asteroid in one chunk (pass 1)."""
+    counts: dict[str, int] = {}
+    for text in texts:
+        try:
+            record = json.loads(text)
+            aid = record["neo_reference_id"]
+        except (ValueError, KeyError, TypeError):
+            continue  # reported as invalid in pass 2
+        counts[aid] = counts.get(aid, 0) + len(record.get("close_approach_data") or [])
+    return len(texts), counts
+
+
+def _score_chunk(first_seq: int, texts: list[str], path: Path) -> BatchSummary:
+    """
+    Parse, score and write one chunk (pass 2): the columns to ``path``
+    (.npz), then its statistics next to it (.json), which marks the part
+    as finished.
+    """
+    neos, positions, invalid = [], [], 0
+    for i, text in enumerate(texts):
+        try:
+            neos.append(NeoObject.model_validate_json(text))
+            positions.append(i)
+        except ValidationError:
+            invalid += 1
+
+    inputs = extract_inputs(neos, _worker["counts"])
+    outputs = compute_batch(inputs, _worker["as_of"], _worker["models"], _worker["learned"])
+    columns = result_columns(inputs, outputs)
+    seq = first_seq + np.array(positions, dtype=np.int64)[inputs.source_index]
+
+    tmp = path.with_name(f".{path.name}.tmp")
+    with tmp.open("wb") as fh:
+        np.savez(fh, **columns)
+    os.replace(tmp, path)
+
+    summary = BatchSummary.of_part(columns, seq)
+    summary.records, summary.invalid = len(texts), invalid
+    summary.skipped = len(neos) - len(inputs)
+    _write_json(path.with_suffix(".json"), summary.to_dict())
+    return summary
+
+
+def _chunks(paths: list[str], size: int) -> Iterator[list[str]]:
+    records = (text for path in paths for text in iter_neo_texts(path))
+    while chunk := list(islice(records, size)):
+        yield chunk
+
+
+def _run_bounded(
+    pool: Executor,
+    fn: Callable,
+    tasks: Iterable[tuple],
+    on_result: Callable[[Any], None],
+    max_pending: int,
+) -> None:
+    """
+    Submit ``tasks`` with at most ``max_pending`` in flight, so input is
+    read only as fast as the pool consumes it.
+    """
+    pending: set = set()
+    for args in tasks:
+        pending.add(pool.submit(fn, *args))
+        if len(pending) >= max_pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for f in done:
+                on_result(f.result())
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for f in done:
+            on_result(f.result())
+
+
+class _Progress:
+    """Periodic objects/sec log lines."""
+
+    def __init__(self, label: str, total: Optional[int], interval_s: float = 5.0):
+        self.label = label
+        self.total = total
+        self.interval_s = interval_s
+        self.done = 0
+        self.start = self.last = time.perf_counter()
+
+    def add(self, n: int) -> None:
+        self.done += n
+        now = time.perf_counter()
+        if now - self.last >= self.interval_s:
+            self.last = now
+            self.log()
+
+    def rate(self) -> float:
+        elapsed = time.perf_counter() - self.start
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def log(self) -> None:
+        rate = self.rate()
+        if self.total:
+            eta = (self.total - self.done) / rate if rate else float("inf")
+            logger.info(
+                "%s: %d/%d objects (%.1f%%), %.0f objects/s, ETA %.0fs",
+                self.label, self.done, self.total, 100 * self.done / self.total, rate, eta,
+            )
+        else:
+            logger.info("%s: %d objects, %.0f objects/s", self.label, self.done, rate)
+
+
+# ── Output ───────────────────────────────────────────────────
+def _npy_header(part: Path, name: str) -> tuple[tuple[int, ...], np.dtype]:
+    """Shape and dtype of one column of a part file, without reading its data."""
+    with zipfile.ZipFile(part) as zf, zf.open(f"{name}.npy") as fh:
+        version = np.lib.format.read_magic(fh)
+        read = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+        shape, _, dtype = read(fh)
+    return shape, dtype
+
+
+def _write_npz(parts: list[Path], out: Path) -> None:
+    """Concatenate part files column by column; one part column in memory at a time."""
+    with np.load(parts[0]) as first:
+        names = list(first.files)
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_STORED, allowZip64=True) as zf:
+        for name in names:
+            headers = [_npy_header(part, name) for part in parts]
+            # String columns are as wide as their longest value in any part
+            dtype = np.result_type(*(dtype for _, dtype in headers))
+            header = {
+                "descr": np.lib.format.dtype_to_descr(dtype),
+                "fortran_order": False,
+                "shape": (sum(shape[0] for shape, _ in headers),),
+            }
+            with zf.open(f"{name}.npy", "w", force_zip64=True) as fh:
+                np.lib.format.write_array_header_2_0(fh, header)
+                for part in parts:
+                    with np.load(part) as data:
+                        fh.write(np.ascontiguousarray(data[name], dtype=dtype).tobytes())
+
+
+def _write_parquet(parts: list[Path], out: Path) -> None:
+    """One Parquet row group per part."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for part in parts:
+            with np.load(part) as data:
+                table = pa.table({name: data[name] for name in data.files})
+            if writer is None:
+                writer = pq.ParquetWriter(out, table.schema)
+            writer.write_table(table.cast(writer.schema))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+# ── Run state (resume) ───────────────────────────────────────
+def _input_signature(paths: list[str]) -> list[dict]:
+    signature = []
+    for p in paths:
+        stat = Path(p).stat()
+        signature.append({"path": str(Path(p).resolve()), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns})
+    return signature
+
+
+def _write_json(path: Path, data: Any) -> None:
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps(data, indent=2))
+    os.replace(tmp, path)
+
+
+def _finish(
+    out: Path,
+    parts: list[Path],
+    summary: BatchSummary,
+    report: dict,
+    models: list[ScoringModel],
+) -> None:
+    """Assemble the output file and write the statistics file."""
+    tmp = out.with_name(f".{out.name}.tmp")
+    if out.suffix == ".parquet":
+        _write_parquet(parts, tmp)
+    else:
+        _write_npz(parts, tmp)
+    os.replace(tmp, out)
+
+    stats = {
+        **report,
+        "records": summary.records,
+        "assessed": summary.count,
+        "skipped_no_approach": summary.skipped,
+        "invalid": summary.invalid,
+        "statistics": summary.statistics().model_dump(),
+        "model_statistics": {
+            name: s.model_dump() for name, s in summary.model_statistics(models).items()
+        } or None,
+    }
+    _write_json(out.with_name(f"{out.name}.stats.json"), stats)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("inputs", nargs="+", help="NeoWs dump files (.json, .ndjson/.jsonl, optionally .gz)")
+    parser.add_argument("--out", required=True, help="output file: .npz or .parquet")
+    parser.add_argument("--workers", default="auto", help="worker processes, or 'auto' for one per available core")
+    parser.add_argument("--chunk-size", type=int, default=10_000, help="records per part")
+    parser.add_argument("--resume", action="store_true", help="continue an interrupted run")
+    parser.add_argument("--keep-parts", action="store_true", help="keep <out>.parts/ after assembling")
+    parser.add_argument("--scoring-models", default="", help="comma-separated registry models to score as well")
+    parser.add_argument("--scoring-models-dir", default=settings.scoring_models_dir)
+    parser.add_argument("--learned-model", default=settings.learned_model_path, help="learned model file")
+    parser.add_argument(
+        "--as-of", type=datetime.fromisoformat, help="approach time windows as of this time (default: fixed window)"
+    )
+    parser.add_argument("--approach-window", action="store_true", help="approach time windows as of now")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)-8s | %(message)s")
+    start = time.perf_counter()
+
+    out = Path(args.out)
+    if out.suffix not in (".npz", ".parquet"):
+        parser.error("--out must end in .npz or .parquet")
+    if out.suffix == ".parquet":
+        try:
+            import pyarrow.parquet  # noqa: F401
+        except ImportError:
+            parser.error("Parquet output needs pyarrow (pip install pyarrow); use .npz otherwise")
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be ≥ 1")
+    try:
+        workers = resolve_workers(args.workers)
+    except ValueError as exc:
+        parser.error(f"--workers: {exc}")
+
+    names = [n.strip() for n in args.scoring_models.split(",") if n.strip()]
+    try:
+        models = ScoringModelRegistry(args.scoring_models_dir, float("inf")).resolve(names)
+    except ValueError as exc:
+        parser.error(str(exc))
+    learned = load_learned_model(args.learned_model) if args.learned_model else None
+
+    # ── Run state ────────────────────────────────────────
+    parts_dir = out.with_name(f"{out.name}.parts")
+    state_path = parts_dir / "state.json"
+    config = {
+        "version": STATE_VERSION,
+        "inputs": _input_signature(args.inputs),
+        "chunk_size": args.chunk_size,
+        "scoring_models": {m.name: m.version for m in models},
+        "learned_model": learned.version if learned else None,
+        "as_of": args.as_of.isoformat() if args.as_of else ("now" if args.approach_window else None),
+    }
+    if parts_dir.exists():
+        if not args.resume:
+            parser.error(f"{parts_dir} exists; pass --resume to continue that run, or remove it")
+        state = json.loads(state_path.read_text())
+        if state["config"] != config:
+            parser.error(f"{parts_dir} belongs to a run with different inputs or options")
+        logger.info("Resuming the run in %s", parts_dir)
+    else:
+        parts_dir.mkdir(parents=True)
+        time_window = TimeWindow.APPROACH if config["as_of"] else TimeWindow.FIXED
+        resolved = resolve_as_of(time_window, [args.as_of] if args.as_of else None)
+        # "now" is fixed by the first run, so resumed parts use the same windows
+        state = {"config": config, "as_of": None if resolved is None else str(resolved[0])}
+        _write_json(state_path, state)
+    as_of = None if state["as_of"] is None else np.array([state["as_of"]], dtype="datetime64[ms]")
+
+    ctx = multiprocessing.get_context("fork")
+    max_pending = 2 * workers
+    logger.info("%d workers, %d records per part", workers, args.chunk_size)
+
+    # ── Pass 1: approach counts ──────────────────────────
+    counts_path = parts_dir / "counts.json"
+    if counts_path.exists():
+        counted = json.loads(counts_path.read_text())
+    else:
+        counts: dict[str, int] = {}
+        counting = _Progress("Counting", None)
+
+        def add_counts(result: tuple[int, dict[str, int]]) -> None:
+            records, chunk_counts = result
+            for aid, c in chunk_counts.items():
+                counts[aid] = counts.get(aid, 0) + c
+            counting.add(records)
+
+        with ProcessPoolExecutor(workers, mp_context=ctx) as pool:
+            _run_bounded(
+                pool,
+                _count_chunk,
+                ((chunk,) for chunk in _chunks(args.inputs, args.chunk_size)),
+                add_counts,
+                max_pending,
+            )
+        counted = {"records": counting.done, "approach_counts": counts}
+        _write_json(counts_path, counted)
+        logger.info("Counted %d records of %d asteroids", counting.done, len(counts))
+
+    # ── Pass 2: scoring ──────────────────────────────────
+    summary = BatchSummary()
+    scoring = _Progress("Scoring", counted["records"])
+    parts: list[Path] = []
+
+    def tasks() -> Iterator[tuple]:
+        for index, chunk in enumerate(_chunks(args.inputs, args.chunk_size)):
+            path = parts_dir / f"part-{index:06d}.npz"
+            parts.append(path)
+            done = path.with_suffix(".json")
+            if done.exists():  # finished by an earlier run
+                summary.merge(BatchSummary.from_dict(json.loads(done.read_text())))
+                scoring.total -= len(chunk)
+                continue
+            yield index * args.chunk_size, chunk, path
+
+    def add_part(part: BatchSummary) -> None:
+        summary.merge(part)
+        scoring.add(part.records)
+
+    with ProcessPoolExecutor(
+        workers,
+        mp_context=ctx,
+        initializer=_init_worker,
+        initargs=(counted["approach_counts"], as_of, models, learned),
+    ) as pool:
+        _run_bounded(pool, _score_chunk, tasks(), add_part, max_pending)
+    scoring.log()
+
+    if not parts:
+        logger.error("No records found in the input")
+        return 1
+    if summary.invalid:
+        logger.warning("%d records were not valid NeoWs objects and were skipped", summary.invalid)
+
+    elapsed = time.perf_counter() - start
+    _finish(
+        out,
+        parts,
+        summary,
+        {
+            "inputs": args.inputs,
+            "scoring_models": config["scoring_models"],
+            "learned_model": config["learned_model"],
+            "as_of": state["as_of"],
+            "elapsed_s": round(elapsed, 2),
+            "scored_this_run": scoring.done,
+            "objects_per_s": round(scoring.rate(), 1),
+        },
+        models,
+    )
+    if not args.keep_parts:
+        shutil.rmtree(parts_dir)
+    logger.info(
+        "Scored %d objects in %.1fs (%.0f objects/s; %d in total) → %s",
+        scoring.done, elapsed, scoring.rate(), summary.records, out,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 
 
@@ -5,6 +7,85 @@ class Settings(BaseSettings):
     risk_engine_port: int = 8000
     risk_engine_host: str = "0.0.0.0"
     log_level: str = "info"
+    # Share of per-object log calls that are emitted, and the log queue's
+    # capacity (records beyond it are dropped rather than block a caller)
+    log_sample_rate: float = 0.01
+    log_queue_size: int = 10_000
+    # Tracing: where finished spans go, an OTLP/JSON file or an OTLP/HTTP
+    # collector URL (unset ⇒ tracing off), spans per export batch, the
+    # longest a span waits for export, and how many may be buffered
+    trace_export: Optional[str] = None
+    trace_batch_size: int = 512
+    trace_flush_s: float = 2.0
+    trace_queue_size: int = 20_000
+    # Worker processes for app.serve: a number or "auto" (one per available core)
+    risk_engine_workers: str = "1"
+
+    # Incremental re-analysis: how many result handles to keep, and for how long
+    result_cache_size: int = 8
+    result_cache_ttl_s: float = 3600.0
+    # Directory shared by all workers (tmpfs); unset ⇒ in-process cache
+    result_cache_dir: Optional[str] = None
+    # Key for the HMAC that signs the files in result_cache_dir (app.serve
+    # sets a fresh one per run); unset ⇒ a random key per process
+    result_cache_key: Optional[str] = None
+
+    # Warm start: result cache snapshot written on shutdown and reloaded at
+    # startup (unset ⇒ not kept), and the size of the synthetic warm-up batch
+    # run before /ready reports ready (0 ⇒ no warm-up)
+    cache_snapshot_path: Optional[str] = None
+    warm_up_objects: int = 0
+
+    # Scoring-model registry: JSON model files, re-scanned every N seconds
+    scoring_models_dir: str = "scoring_models"
+    scoring_models_reload_s: float = 5.0
+
+    # Learned risk model file (python -m app.train_model); unset ⇒ disabled
+    learned_model_path: Optional[str] = None
+
+    # Admission control (per worker): objects in flight, queued objects per
+    # lane, and the longest a request may wait before a 503
+    admission_max_objects: int = 50_000
+    admission_single_reserve: int = 200
+    admission_queue_single: int = 500
+    admission_queue_sentry: int = 50_000
+    admission_queue_batch: int = 200_000
+    admission_max_wait_s: float = 15.0
+
+    # Background analysis jobs: SQLite store, concurrent jobs per worker,
+    # directory file sources must live in (unset ⇒ inline batches only),
+    # queue poll interval, heartbeat age after which a running job is
+    # requeued, and how long finished jobs are kept
+    jobs_db_path: str = "data/jobs.sqlite3"
+    jobs_max_concurrent: int = 2
+    jobs_input_dir: Optional[str] = None
+    jobs_poll_s: float = 1.0
+    jobs_stale_after_s: float = 60.0
+    jobs_retention_s: float = 7 * 24 * 3600.0
+
+    # Load monitor: event-loop lag sampling interval, and the limits past which
+    # /ready reports the worker saturated (smoothed loop lag, calls waiting for
+    # a threadpool thread, objects waiting for admission)
+    load_sample_interval_s: float = 0.5
+    ready_max_loop_lag_ms: float = 250.0
+    ready_max_executor_queue: int = 16
+    ready_max_queued_objects: int = 50_000
+
+    # Sharded /analyze (coordinator mode): peer engine base URLs, comma-separated
+    # (unset ⇒ off), the smallest batch that is split, tries per shard before
+    # it runs here, how long a failed peer is skipped, and the HTTP timeout
+    shard_peers: Optional[str] = None
+    shard_min_objects: int = 5_000
+    shard_attempts: int = 2
+    shard_peer_cooldown_s: float = 10.0
+    shard_timeout_s: float = 120.0
+
+    # Socket.IO message queue so emits reach clients connected to other workers
+    socketio_redis_url: Optional[str] = None
+    # Watch registry shared by all workers (SQLite on tmpfs; unset ⇒ in-process),
+    # and how often each worker picks up other workers' watches and alerts
+    watch_db_path: Optional[str] = None
+    watch_poll_s: float = 0.5
 
     class Config:
         env_file = ".env"
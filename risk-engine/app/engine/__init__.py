@@ -5,10 +5,18 @@
  Modular architecture for production-level risk assessment:
  - constants: Physical constants, known events, size data
  - physics: Mass estimation, kinetic energy, impact probability
+ - effects: Airburst, crater & blast-radius estimates (array stage)
+ - labels: Vectorized energy & size comparison labels
  - scales: Torino & Palermo hazard scale computation
  - scoring: Multi-factor weighted risk scoring
  - assessment: Single & Sentry-enhanced asteroid assessment
+ - batch: Columnar (array) pipeline for whole batches
+ - ingest: Lean /analyze body decoding straight into batch arrays
+ - sentry: Batch Sentry-enhanced assessment
  - analysis: Batch analysis with statistical aggregation
+ - summary: Batch statistics that merge across parts
+ - shards: Sharded batches — per-shard results and the merge
+ - timeline: Pre-binned close-approach timeline & histograms
 ═══════════════════════════════════════════════════════════════
 """
 
@@ -3,54 +3,311 @@ Batch analysis with NumPy-vectorized statistical aggregation.
 """
 
 import numpy as np
-from typing import Optional
+from typing import Callable, Optional, Sequence
 
 from app.models import (
+    ExtendedStatistics,
+    Histogram,
+    LabelMode,
+    ModelStatistics,
     NeoObject,
     RiskAssessment,
     RiskStatistics,
     RiskAnalysisResponse,
     AsteroidSummary,
 )
-from app.engine.assessment import assess_single
+from app.engine.batch import (
+    BatchInputs,
+    BatchOutputs,
+    compute_batch,
+    build_assessments,
+)
+from app.engine.cancellation import CHUNK_SIZE, DEADLINE_EXCEEDED, Cancelled, CancelToken
+from app.engine.learned import LearnedModel
+from app.engine.numeric import round_exact
+from app.engine.projection import FieldProjection
+from app.engine.scoring import RISK_LEVELS, ScoringModel
+from app.tracing import span
 
+# Called with the inputs and outputs of every chunk that goes through
+# compute_batch (e.g. the watch registry's observer)
+BatchObserver = Callable[[BatchInputs, BatchOutputs], None]
 
-def analyze_batch(
-    asteroids: list[NeoObject], date_range: Optional[dict] = None
-) -> RiskAnalysisResponse:
+
+class StatisticsColumns:
     """
-    Perform batch risk analysis using NumPy vectorization for statistics.
+    BatchObserver keeping, by position in the input list, what
+    summarize_batch reads of each computed object: its statistics_matrix
+    row and the extra models' scores, straight from the batch arrays.
+    ``then`` is called next with the same chunk (e.g. a watch observer).
     """
-    # Count approaches per asteroid
-    approach_counts: dict[str, int] = {}
+
+    def __init__(
+        self, size: int, models: Sequence[ScoringModel], then: Optional[BatchObserver] = None
+    ):
+        self.names = [m.name for m in models]
+        self.matrix = np.full((size, _COLUMNS), np.nan)
+        self.scores = np.full((len(self.names), size), np.nan)
+        self.then = then
+
+    def __call__(self, inputs: BatchInputs, outputs: BatchOutputs) -> None:
+        self.matrix[inputs.source_index] = statistics_rows(inputs, outputs)
+        for k, name in enumerate(self.names):
+            self.scores[k, inputs.source_index] = outputs.model_scores[name]
+        if self.then is not None:
+            self.then(inputs, outputs)
+
+    def columns(
+        self, results: Sequence[Optional[RiskAssessment]]
+    ) -> tuple[np.ndarray, dict[str, np.ndarray]]:
+        """
+        Matrix and model scores aligned with the assessments in
+        ``results`` (Nones left out); reused assessments, never computed
+        here, supply their own.
+        """
+        kept = [i for i, a in enumerate(results) if a is not None]
+        matrix = self.matrix[kept]
+        scores = self.scores[:, kept]
+        reused = np.flatnonzero(np.isnan(matrix[:, _SCORE])).tolist()
+        if reused:
+            carried = [results[kept[j]] for j in reused]
+            matrix[reused] = statistics_matrix(carried)
+            for k, name in enumerate(self.names):
+                scores[k, reused] = [a.model_scores[name] for a in carried]
+        return matrix, dict(zip(self.names, scores))
+
+
+def format_as_of(as_of: Optional[np.ndarray]) -> Optional[list[str]]:
+    """ISO-8601 (UTC) strings for the as_of times echoed in responses."""
+    if as_of is None:
+        return None
+    return [f"{t}Z" for t in np.datetime_as_string(as_of, unit="s")]
+
+
+def approach_counts(asteroids: list[NeoObject]) -> dict[str, int]:
+    """Count close approaches per asteroid across the whole batch."""
+    counts: dict[str, int] = {}
     for ast in asteroids:
         aid = ast.neo_reference_id
-        approach_counts[aid] = approach_counts.get(aid, 0) + len(
-            ast.close_approach_data
-        )
+        counts[aid] = counts.get(aid, 0) + len(ast.close_approach_data)
+    return counts
 
-    # Assess each asteroid
-    assessments: list[RiskAssessment] = []
-    for ast in asteroids:
-        result = assess_single(ast, approach_counts.get(ast.neo_reference_id, 1))
-        if result:
-            assessments.append(result)
 
-    # Sort by risk score descending
-    assessments.sort(key=lambda a: a.risk_score, reverse=True)
+def assess_inputs(
+    inputs: BatchInputs,
+    size: int,
+    labels: Optional[LabelMode] = LabelMode.TEXT,
+    *,
+    reuse: Optional[dict[int, RiskAssessment]] = None,
+    as_of: Optional[np.ndarray] = None,
+    models: Sequence[ScoringModel] = (),
+    learned: Optional[LearnedModel] = None,
+    cancel: Optional[CancelToken] = None,
+    observe: Optional[BatchObserver] = None,
+    effects: bool = False,
+) -> list[Optional[RiskAssessment]]:
+    """
+    Assess a batch of ``size`` objects unpacked into ``inputs`` (see
+    batch.extract_inputs), returning results aligned with the original
+    input list, which ``inputs.source_index`` refers to.
+
+    ``reuse`` maps input positions to assessments carried over from a
+    previous result; only the remaining rows go through the columnar
+    pipeline (batch.py).  ``labels=None`` skips the label stage entirely;
+    ``as_of`` switches the scales to per-object approach windows and
+    ``models`` adds per-model scores (model_scores / model_risk_levels),
+    ``learned`` the learned-model score; ``effects`` adds the
+    impact-effect fields.
+
+    With ``cancel``, rows are processed in chunks of CHUNK_SIZE and the
+    token is checked before each; Cancelled carries the results so far.
+    ``observe`` sees each chunk's inputs and outputs as they are
+    computed; reused objects are not passed to it.
+    """
+    reuse = reuse or {}
+    results: list[Optional[RiskAssessment]] = [None] * size
+    for i, a in reuse.items():
+        results[i] = a
+
+    pending = np.flatnonzero(
+        ~np.isin(inputs.source_index, np.fromiter(reuse, np.int64, len(reuse)))
+    )
+    step = CHUNK_SIZE if cancel is not None else max(len(pending), 1)
+    for start in range(0, len(pending), step):
+        if cancel is not None:
+            cancel.check(results)
+        chunk = inputs.take(pending[start:start + step])
+        with span("engine.compute_batch", rows=len(chunk)):
+            outputs = compute_batch(chunk, as_of, models, learned, effects=effects)
+        if observe is not None:
+            observe(chunk, outputs)
+        with span("engine.build_assessments", rows=len(chunk)):
+            fresh = build_assessments(chunk, outputs, labels=labels)
+        for i, a in zip(chunk.source_index.tolist(), fresh):
+            results[i] = a
+    return results
+
+
+def summarize_batch(
+    assessments: list[RiskAssessment],
+    date_range: Optional[dict] = None,
+    projection: Optional[FieldProjection] = None,
+    models: Sequence[ScoringModel] = (),
+    *,
+    extended: bool = False,
+    columns: Optional[tuple[np.ndarray, dict[str, np.ndarray]]] = None,
+) -> RiskAnalysisResponse:
+    """
+    Sort assessments by score and aggregate batch statistics.
+
+    The statistics are computed from one numeric matrix of the batch;
+    ``extended`` adds quantiles, histograms and correlations.
+    ``columns`` are that matrix and the ``models``' score columns,
+    aligned with ``assessments`` (StatisticsColumns); without them,
+    for callers that only have the assessments, both are read from the
+    assessments.
+    """
+    if columns is not None:
+        matrix, model_scores = columns
+    else:
+        matrix = statistics_matrix(assessments)
+        model_scores = {
+            m.name: np.array([a.model_scores[m.name] for a in assessments], dtype=float)
+            for m in models
+        }
+    # Stable, like sorted(..., reverse=True): equal scores keep their order
+    order = np.argsort(-matrix[:, _SCORE], kind="stable")
+    assessments = [assessments[i] for i in order.tolist()]
+    matrix = matrix[order]
+    model_scores = {name: scores[order] for name, scores in model_scores.items()}
 
     # ── Compute Statistics with NumPy ────────────────────
-    statistics = _compute_statistics(assessments)
+    statistics = (
+        _compute_statistics(assessments, matrix)
+        if projection is None or projection.needs_statistics
+        else None
+    )
 
     return RiskAnalysisResponse(
         total_analyzed=len(assessments),
         date_range=date_range,
         statistics=statistics,
+        extended_statistics=extended_statistics(matrix) if extended else None,
+        model_statistics=_model_statistics(matrix, models, model_scores) if models else None,
         assessments=assessments,
     )
 
 
-def _compute_statistics(assessments: list[RiskAssessment]) -> RiskStatistics:
+def assess_until_deadline(
+    inputs: BatchInputs,
+    size: int,
+    labels: Optional[LabelMode] = LabelMode.TEXT,
+    *,
+    best_effort: bool = False,
+    **options,
+) -> tuple[list[Optional[RiskAssessment]], bool]:
+    """
+    assess_inputs, returning the results and whether they are partial.
+
+    With ``best_effort`` a passed deadline returns the results completed
+    so far (partial); other cancellations raise Cancelled as usual.
+    """
+    try:
+        return assess_inputs(inputs, size, labels, **options), False
+    except Cancelled as exc:
+        if not (best_effort and is_deadline(exc)):
+            raise
+        return exc.partial, True
+
+
+def is_deadline(exc: Cancelled) -> bool:
+    return exc.reason == DEADLINE_EXCEEDED
+
+
+def mark_partial(response: RiskAnalysisResponse, requested: int) -> None:
+    """Flag a best-effort response cut short by its deadline."""
+    response.partial = True
+    response.message = (
+        f"Deadline reached; partial result ({response.total_analyzed} of {requested} objects)"
+    )
+
+
+def _model_statistics(
+    matrix: np.ndarray, models: Sequence[ScoringModel], model_scores: dict[str, np.ndarray]
+) -> dict[str, ModelStatistics]:
+    """Per-model level counts and scores, plus level changes vs the default."""
+    default_levels = matrix[:, _LEVEL].astype(np.int64)
+    stats = {}
+    for m in models:
+        scores = model_scores[m.name]
+        levels = m.level_codes(scores)
+        counts = np.bincount(levels, minlength=len(RISK_LEVELS))
+        stats[m.name] = ModelStatistics(
+            version=m.version,
+            by_risk_level={lvl.value: int(c) for lvl, c in zip(RISK_LEVELS, counts)},
+            average_risk_score=round(float(np.mean(scores)), 2) if len(scores) else 0,
+            max_risk_score=round(float(np.max(scores)), 2) if len(scores) else 0,
+            level_changes=int(np.count_nonzero(levels != default_levels)),
+        )
+    return stats
+
+
+# Columns of the statistics matrix
+_SCORE, _DISTANCE, _DIAMETER, _VELOCITY_KM_H, _VELOCITY_KM_S, _ENERGY, _HAZARDOUS, _LEVEL = range(8)
+_COLUMNS = 8
+_LEVEL_CODES = {lvl: code for code, lvl in enumerate(RISK_LEVELS)}
+
+# Fixed histogram edges, so histograms of different batches line up
+DIAMETER_EDGES_KM = np.logspace(-3, 2, 11)
+VELOCITY_EDGES_KM_S = np.arange(0.0, 75.0, 5.0)
+QUANTILES = (50, 90, 99)
+
+
+def statistics_rows(inputs: BatchInputs, outputs: BatchOutputs) -> np.ndarray:
+    """
+    statistics_matrix rows of a computed chunk, from its arrays (rounded
+    as in build_assessments).
+    """
+    return np.column_stack([
+        outputs.risk_score,
+        round_exact(inputs.miss_distance_km, 2),
+        round_exact(inputs.diameter_max_km, 6),
+        round_exact(inputs.velocity_km_h, 2),
+        round_exact(inputs.velocity_km_s, 4),
+        round_exact(outputs.kinetic_energy_mt, 6),
+        inputs.hazardous,
+        outputs.risk_level_code,
+    ]).astype(float)
+
+
+def statistics_matrix(assessments: Sequence[RiskAssessment]) -> np.ndarray:
+    """
+    The numeric fields the statistics read, one row per assessment,
+    gathered in a single pass over the assessments.  Computed batches
+    take them from their arrays instead (StatisticsColumns).
+    """
+    codes = _LEVEL_CODES
+    return np.array(
+        [
+            (
+                a.risk_score,
+                a.miss_distance_km,
+                a.estimated_diameter_km,
+                a.velocity_km_h,
+                a.velocity_km_s,
+                a.kinetic_energy_mt,
+                a.hazardous,
+                codes[a.risk_level],
+            )
+            for a in assessments
+        ],
+        dtype=float,
+    ).reshape(-1, _COLUMNS)
+
+
+def _compute_statistics(
+    assessments: list[RiskAssessment], matrix: np.ndarray
+) -> RiskStatistics:
     """Aggregate statistics using NumPy for vectorized computation."""
     if not assessments:
         return RiskStatistics(
@@ -64,17 +321,16 @@ def _compute_statistics(assessments: list[RiskAssessment]) -> RiskStatistics:
             total_kinetic_energy_mt=0,
         )
 
-    # Vectorize key metrics
-    scores = np.array([a.risk_score for a in assessments])
-    distances = np.array([a.miss_distance_km for a in assessments])
-    diameters = np.array([a.estimated_diameter_km for a in assessments])
-    velocities = np.array([a.velocity_km_h for a in assessments])
-    energies = np.array([a.kinetic_energy_mt for a in assessments])
+    # Column views of the matrix
+    scores = matrix[:, _SCORE]
+    distances = matrix[:, _DISTANCE]
+    diameters = matrix[:, _DIAMETER]
+    velocities = matrix[:, _VELOCITY_KM_H]
+    energies = matrix[:, _ENERGY]
 
     # Risk level distribution
-    level_counts = {"LOW": 0, "MEDIUM": 0, "HIGH": 0, "CRITICAL": 0}
-    for a in assessments:
-        level_counts[a.risk_level.value] += 1
+    counts = np.bincount(matrix[:, _LEVEL].astype(np.int64), minlength=len(RISK_LEVELS))
+    level_counts = {lvl.value: int(c) for lvl, c in zip(RISK_LEVELS, counts)}
 
     # Find extremes
     closest_idx = int(np.argmin(distances))
@@ -84,7 +340,7 @@ def _compute_statistics(assessments: list[RiskAssessment]) -> RiskStatistics:
 
     return RiskStatistics(
         total_analyzed=len(assessments),
-        hazardous_count=sum(1 for a in assessments if a.hazardous),
+        hazardous_count=int(np.count_nonzero(matrix[:, _HAZARDOUS])),
         by_risk_level=level_counts,
         average_risk_score=round(float(np.mean(scores)), 2),
         median_risk_score=round(float(np.median(scores)), 2),
@@ -113,3 +369,42 @@ def _compute_statistics(assessments: list[RiskAssessment]) -> RiskStatistics:
             value=round(float(energies[energy_idx]), 6),
         ),
     )
+
+
+def _histogram(values: np.ndarray, edges: np.ndarray) -> Histogram:
+    # Clipped into the end bins rather than dropped
+    counts, _ = np.histogram(np.clip(values, edges[0], edges[-1]), bins=edges)
+    return Histogram(edges=[round(float(e), 6) for e in edges], counts=counts.tolist())
+
+
+def _ranks(values: np.ndarray) -> np.ndarray:
+    """1-based ranks, ties sharing their average rank."""
+    _, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+    ends = np.cumsum(counts)
+    return (ends - (counts - 1) / 2)[inverse]
+
+
+def _correlation(x: np.ndarray, y: np.ndarray) -> Optional[float]:
+    """Pearson r, or None when either side is constant (or fewer than two rows)."""
+    if len(x) < 2 or np.ptp(x) == 0 or np.ptp(y) == 0:
+        return None
+    return round(float(np.corrcoef(x, y)[0, 1]), 4)
+
+
+def extended_statistics(matrix: np.ndarray) -> ExtendedStatistics:
+    """Quantiles, histograms and correlations from a statistics_matrix."""
+    keys = [f"p{q}" for q in QUANTILES]
+    if len(matrix):
+        quantiles = np.percentile(matrix[:, [_SCORE, _ENERGY]], QUANTILES, axis=0)
+    else:
+        quantiles = np.zeros((len(QUANTILES), 2))
+    scores = matrix[:, _SCORE]
+    distances = matrix[:, _DISTANCE]
+    return ExtendedStatistics(
+        score_quantiles={k: round(float(v), 2) for k, v in zip(keys, quantiles[:, 0])},
+        energy_quantiles_mt={k: round(float(v), 6) for k, v in zip(keys, quantiles[:, 1])},
+        diameter_histogram_km=_histogram(matrix[:, _DIAMETER], DIAMETER_EDGES_KM),
+        velocity_histogram_km_s=_histogram(matrix[:, _VELOCITY_KM_S], VELOCITY_EDGES_KM_S),
+        score_distance_pearson=_correlation(scores, distances),
+        score_distance_spearman=_correlation(_ranks(scores), _ranks(distances)),
+    )
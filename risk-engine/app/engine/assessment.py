@@ -8,6 +8,7 @@ import math
 import logging
 from typing import Optional
 
+from app.logs import per_object
 from app.models import (
     NeoObject,
     RiskAssessment,
@@ -22,6 +23,8 @@ from app.engine.physics import (
     size_comparison,
     estimate_impact_probability,
 )
+from app.engine.labels import energy_category, size_category
+from app.engine.virtual_impactors import vi_summary
 from app.engine.scales import compute_torino_scale, compute_palermo_scale
 from app.engine.scoring import compute_score_breakdown, get_risk_level
 
@@ -48,9 +51,7 @@ def _safe_int(value: Optional[str]) -> Optional[int]:
         return None
 
 
-def assess_single(
-    asteroid: NeoObject, all_approaches: int = 1
-) -> Optional[RiskAssessment]:
+def assess_single(asteroid: NeoObject, all_approaches: int = 1) -> Optional[RiskAssessment]:
     """Perform full risk assessment on a single asteroid."""
     if not asteroid.close_approach_data:
         return None
@@ -81,11 +82,11 @@ def assess_single(
         semi_major_axis_au = _safe_float(od.semi_major_axis)
         inclination_deg = _safe_float(od.inclination)
 
-        logger.debug(
-            f"Orbital data for {asteroid.name}: "
-            f"MOID={moid_au} AU, uncertainty={orbit_uncertainty}, "
-            f"e={eccentricity}, a={semi_major_axis_au} AU"
-        )
+        if logger.isEnabledFor(logging.DEBUG) and per_object():
+            logger.debug(
+                "Orbital data for %s: MOID=%s AU, uncertainty=%s, e=%s, a=%s AU",
+                asteroid.name, moid_au, orbit_uncertainty, eccentricity, semi_major_axis_au,
+            )
 
     # ── Physics Computations ─────────────────────────────
     mass_kg = estimate_mass(diam_avg)
@@ -125,6 +126,8 @@ def assess_single(
 
     risk_level = get_risk_level(total_score)
 
+    energy_code, energy_mult = energy_category(ke_mt)
+
     return RiskAssessment(
         asteroid_id=asteroid.neo_reference_id,
         name=asteroid.name,
@@ -143,10 +146,13 @@ def assess_single(
         torino_scale=torino,
         palermo_scale=palermo,
         impact_probability=impact_prob,
-        impact_energy_comparison=energy_comparison(ke_mt),
-        relative_size=size_comparison(diam_max),
         approach_count=all_approaches,
         score_breakdown=breakdown,
+        impact_energy_comparison=energy_comparison(ke_mt),
+        relative_size=size_comparison(diam_max),
+        energy_comparison_code=energy_code,
+        energy_comparison_multiplier=energy_mult,
+        size_comparison_code=size_category(diam_max),
     )
 
 
@@ -219,6 +225,9 @@ def assess_with_sentry(
         impact_probability=real_ip,
         impact_energy_comparison=base.impact_energy_comparison,
         relative_size=base.relative_size,
+        energy_comparison_code=base.energy_comparison_code,
+        energy_comparison_multiplier=base.energy_comparison_multiplier,
+        size_comparison_code=base.size_comparison_code,
         approach_count=base.approach_count,
         score_breakdown=base.score_breakdown,
         # Sentry-specific fields
@@ -230,13 +239,15 @@ def assess_with_sentry(
         real_torino_max=real_torino,
         real_impact_energy_mt=real_energy,
         total_virtual_impactors=sentry_data.total_virtual_impactors,
+        virtual_impactor_summary=vi_summary(sentry_data),
         data_source="CNEOS Sentry + NASA NeoWs",
     )
 
-    logger.info(
-        f"Sentry-enhanced assessment for {base.name}: "
-        f"base_score={base_score} → adjusted={adjusted_score} "
-        f"(real IP={real_ip:.2e}, Palermo={real_palermo_cum})"
-    )
+    if logger.isEnabledFor(logging.INFO) and per_object():
+        logger.info(
+            "Sentry-enhanced assessment for %s: base_score=%s → adjusted=%s "
+            "(real IP=%.2e, Palermo=%s)",
+            base.name, base_score, adjusted_score, real_ip, real_palermo_cum,
+        )
 
     return enhanced
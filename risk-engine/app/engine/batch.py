@@ -0,0 +1,471 @@
+"""
+Columnar batch pipeline.
+
+NeoObjects are unpacked once into typed NumPy arrays (BatchInputs); the
+physics, scale and scoring stages then run as array operations over the
+whole batch (BatchOutputs).  Results match assess_single object for
+object; assessments are only materialised at the end.
+"""
+
+from dataclasses import dataclass, fields as dataclass_fields
+from datetime import datetime, timezone
+from itertools import repeat
+from typing import Optional, Sequence
+
+import numpy as np
+
+from app.models import LabelMode, NeoObject, RiskAssessment, ScoreBreakdown, TimeWindow
+from app.engine.assessment import _safe_float, _safe_int
+from app.engine.constants import MT_JOULES
+from app.engine.effects import ImpactEffects, impact_effects_array
+from app.engine.numeric import optional_list, round_exact
+from app.engine.physics import (
+    estimate_mass_array,
+    kinetic_energy_joules_array,
+    estimate_impact_probability_array,
+)
+from app.engine.scales import (
+    DEFAULT_WINDOW_YEARS,
+    compute_torino_scale_array,
+    compute_palermo_scale_array,
+    window_years,
+)
+from app.engine.scoring import (
+    DEFAULT_MODEL,
+    SCORE_FACTORS,
+    RISK_LEVELS,
+    ScoringModel,
+    score_features,
+    total_scores,
+)
+from app.engine.learned import LearnedModel, feature_matrix
+from app.engine.labels import (
+    energy_categories,
+    size_categories,
+    energy_labels,
+    size_labels,
+)
+
+
+@dataclass
+class BatchInputs:
+    """Engine inputs for n objects that have close-approach data."""
+
+    asteroid_ids: list[str]
+    names: list[str]
+    approach_dates: list[str]
+    approach_epoch: np.ndarray  # datetime64[ms], NaT when unparseable
+    hazardous: np.ndarray  # bool
+    diameter_min_km: np.ndarray
+    diameter_max_km: np.ndarray
+    miss_distance_km: np.ndarray
+    miss_distance_lunar: np.ndarray
+    velocity_km_s: np.ndarray
+    velocity_km_h: np.ndarray
+    moid_au: np.ndarray  # NaN when unknown
+    orbit_uncertainty: np.ndarray  # NaN when unknown
+    approach_count: np.ndarray  # int
+    source_index: np.ndarray  # position in the original input list
+
+    def __len__(self) -> int:
+        return len(self.asteroid_ids)
+
+    def take(self, rows: np.ndarray) -> "BatchInputs":
+        """The given rows (integer positions) as a new BatchInputs."""
+        picked = {}
+        for f in dataclass_fields(self):
+            column = getattr(self, f.name)
+            if isinstance(column, np.ndarray):
+                picked[f.name] = column[rows]
+            else:
+                picked[f.name] = [column[i] for i in rows.tolist()]
+        return BatchInputs(**picked)
+
+
+@dataclass
+class BatchOutputs:
+    """Per-object physics, scale and scoring results as arrays."""
+
+    mass_kg: np.ndarray
+    kinetic_energy_joules: np.ndarray
+    kinetic_energy_mt: np.ndarray
+    impact_probability: np.ndarray
+    torino_scale: np.ndarray
+    palermo_scale: np.ndarray
+    score_points: np.ndarray  # (n, 6) in SCORE_FACTORS order
+    risk_score: np.ndarray
+    risk_level_code: np.ndarray
+    time_window_years: Optional[np.ndarray] = None  # per-object ΔT (approach windows)
+    palermo_by_as_of: Optional[np.ndarray] = None  # (k, n) when several as_of times
+    torino_by_as_of: Optional[np.ndarray] = None  # (k, n)
+    model_scores: Optional[dict[str, np.ndarray]] = None  # extra scoring models
+    model_level_codes: Optional[dict[str, np.ndarray]] = None
+    learned_score: Optional[np.ndarray] = None  # learned model, 0-100
+    impact_effects: Optional[ImpactEffects] = None  # airburst / crater / blast
+
+
+def resolve_as_of(
+    time_window: TimeWindow, as_of: Optional[list[datetime]] = None
+) -> Optional[np.ndarray]:
+    """
+    Reference times for approach windows as datetime64[ms].
+
+    Returns None for the fixed window.  Given as_of times imply approach
+    windows; approach windows without as_of use the start of the current
+    UTC day, which stays put between calls, so repeated requests score
+    alike and reuse each other's results (incremental.analyze_inputs).
+    Aware datetimes are converted to UTC.
+    """
+    if not as_of:
+        if time_window == TimeWindow.FIXED:
+            return None
+        today = datetime.now(timezone.utc).replace(tzinfo=None).date()
+        return np.array([today], dtype="datetime64[D]").astype("datetime64[ms]")
+    return np.array(
+        [
+            (t.astimezone(timezone.utc).replace(tzinfo=None) if t.tzinfo else t)
+            for t in as_of
+        ],
+        dtype="datetime64[ms]",
+    )
+
+
+def _approach_epochs(epoch_ms: list[Optional[int]], dates: list[str]) -> np.ndarray:
+    """
+    Close-approach epochs as datetime64[ms].
+
+    Uses epoch_date_close_approach (ms since 1970) when present, otherwise
+    the ISO close_approach_date.  Dates are parsed in one vectorized call;
+    only if that fails is the batch re-parsed element-wise (bad → NaT).
+    """
+    try:
+        days = np.array(dates, dtype="datetime64[D]")
+    except ValueError:
+        days = np.array(
+            [_parse_day(d) for d in dates], dtype="datetime64[D]"
+        )
+    epochs = np.array(
+        [-(2**63) if e is None else e for e in epoch_ms], dtype=np.int64
+    ).view("datetime64[ms]")  # INT64_MIN is NaT
+    return np.where(np.isnat(epochs), days.astype("datetime64[ms]"), epochs)
+
+
+def _parse_day(value: str) -> np.datetime64:
+    try:
+        return np.datetime64(value, "D")
+    except ValueError:
+        return np.datetime64("NaT", "D")
+
+
+def extract_inputs(
+    asteroids: list[NeoObject],
+    approach_counts: Optional[dict[str, int]] = None,
+) -> BatchInputs:
+    """Unpack NeoObjects into arrays; objects without approaches are skipped."""
+    ids, names, dates, epochs = [], [], [], []
+    hazardous, dmin, dmax = [], [], []
+    miss_km, miss_ld, vel_s, vel_h = [], [], [], []
+    moid, ou, counts, index = [], [], [], []
+    nan = float("nan")
+
+    for i, ast in enumerate(asteroids):
+        if not ast.close_approach_data:
+            continue
+        approach = ast.close_approach_data[0]
+        kms = ast.estimated_diameter.kilometers
+
+        ids.append(ast.neo_reference_id)
+        names.append(ast.name)
+        dates.append(approach.close_approach_date)
+        epochs.append(approach.epoch_date_close_approach)
+        hazardous.append(ast.is_potentially_hazardous_asteroid)
+        dmin.append(kms.estimated_diameter_min)
+        dmax.append(kms.estimated_diameter_max)
+        miss_km.append(float(approach.miss_distance.kilometers))
+        miss_ld.append(float(approach.miss_distance.lunar))
+        vel_s.append(float(approach.relative_velocity.kilometers_per_second))
+        vel_h.append(float(approach.relative_velocity.kilometers_per_hour))
+
+        od = ast.orbital_data
+        m = _safe_float(od.minimum_orbit_intersection) if od else None
+        u = _safe_int(od.orbit_uncertainty) if od else None
+        moid.append(nan if m is None else m)
+        ou.append(nan if u is None else float(u))
+
+        counts.append(
+            approach_counts.get(ast.neo_reference_id, 1) if approach_counts else 1
+        )
+        index.append(i)
+
+    return BatchInputs(
+        asteroid_ids=ids,
+        names=names,
+        approach_dates=dates,
+        approach_epoch=_approach_epochs(epochs, dates),
+        hazardous=np.array(hazardous, dtype=bool),
+        diameter_min_km=np.array(dmin, dtype=float),
+        diameter_max_km=np.array(dmax, dtype=float),
+        miss_distance_km=np.array(miss_km, dtype=float),
+        miss_distance_lunar=np.array(miss_ld, dtype=float),
+        velocity_km_s=np.array(vel_s, dtype=float),
+        velocity_km_h=np.array(vel_h, dtype=float),
+        moid_au=np.array(moid, dtype=float),
+        orbit_uncertainty=np.array(ou, dtype=float),
+        approach_count=np.array(counts, dtype=np.int64),
+        source_index=np.array(index, dtype=np.int64),
+    )
+
+
+def compute_batch(
+    inputs: BatchInputs,
+    as_of: Optional[np.ndarray] = None,
+    models: Sequence[ScoringModel] = (),
+    learned: Optional[LearnedModel] = None,
+    *,
+    effects: bool = False,
+) -> BatchOutputs:
+    """
+    Run physics → scales → scoring over the whole batch.
+
+    Without ``as_of`` the scales use the fixed DEFAULT_WINDOW_YEARS window.
+    With ``as_of`` (datetime64, k ≥ 1 reference times) each object's ΔT
+    is the time from as_of to its close approach; the first as_of drives
+    the assessment fields, and with k > 1 the scales are also returned
+    for every as_of as (k, n) grids.  ``effects`` adds the impact-effects
+    stage (effects.py).
+    """
+    diam_avg = (inputs.diameter_max_km + inputs.diameter_min_km) / 2
+
+    # ── Physics ──────────────────────────────────────────
+    mass_kg = estimate_mass_array(diam_avg)
+    ke_joules = kinetic_energy_joules_array(mass_kg, inputs.velocity_km_s)
+    ke_mt = ke_joules / MT_JOULES
+    impact_prob = estimate_impact_probability_array(
+        inputs.miss_distance_km,
+        inputs.velocity_km_s,
+        inputs.moid_au,
+        inputs.orbit_uncertainty,
+    )
+
+    # ── Scales ───────────────────────────────────────────
+    windows = None
+    if as_of is None:
+        time_years = DEFAULT_WINDOW_YEARS
+    else:
+        windows = window_years(inputs.approach_epoch, as_of)
+        time_years = windows
+    torino_grid = compute_torino_scale_array(impact_prob, ke_mt, time_years=time_years)
+    palermo_grid = compute_palermo_scale_array(impact_prob, ke_mt, time_years)
+    if windows is None:
+        torino, palermo = torino_grid, palermo_grid
+    else:
+        torino, palermo = torino_grid[0], palermo_grid[0]
+
+    # ── Scoring ──────────────────────────────────────────
+    features = score_features(
+        inputs.hazardous,
+        inputs.diameter_max_km,
+        inputs.miss_distance_km,
+        inputs.velocity_km_s,
+        ke_mt,
+        inputs.orbit_uncertainty,
+        inputs.moid_au,
+    )
+    points = DEFAULT_MODEL.points(features)
+    scores = total_scores(points)
+
+    model_scores = model_levels = None
+    if models:
+        model_scores, model_levels = {}, {}
+        for m in models:
+            model_scores[m.name] = total_scores(m.points(features))
+            model_levels[m.name] = m.level_codes(model_scores[m.name])
+
+    outputs = BatchOutputs(
+        mass_kg=mass_kg,
+        kinetic_energy_joules=ke_joules,
+        kinetic_energy_mt=ke_mt,
+        impact_probability=impact_prob,
+        torino_scale=torino,
+        palermo_scale=palermo,
+        score_points=points,
+        risk_score=scores,
+        risk_level_code=DEFAULT_MODEL.level_codes(scores),
+        time_window_years=None if windows is None else windows[0],
+        palermo_by_as_of=palermo_grid if windows is not None and len(windows) > 1 else None,
+        torino_by_as_of=torino_grid if windows is not None and len(windows) > 1 else None,
+        model_scores=model_scores,
+        model_level_codes=model_levels,
+    )
+    if learned is not None:
+        outputs.learned_score = learned.predict_scores(feature_matrix(inputs, outputs))
+    if effects:
+        outputs.impact_effects = impact_effects_array(diam_avg, inputs.velocity_km_s)
+    return outputs
+
+
+def build_assessments(
+    inputs: BatchInputs,
+    outputs: BatchOutputs,
+    *,
+    labels: Optional[LabelMode] = LabelMode.TEXT,
+    model: type[RiskAssessment] = RiskAssessment,
+    extra: Optional[dict[str, list]] = None,
+) -> list[RiskAssessment]:
+    """
+    Materialise assessment objects from batch arrays.
+
+    ``labels`` selects text + codes (TEXT), codes only (CODES) or no
+    label fields at all (None).  ``model`` may be a RiskAssessment
+    subclass; ``extra`` supplies
+    per-object values (aligned with ``inputs``) that override or add to
+    the computed fields.
+    """
+    n = len(inputs)
+    if n == 0:
+        return []
+
+    if labels is None:
+        energy_codes = size_codes = np.full(n, None, dtype=object)
+        energy_mults = energy_codes
+    else:
+        energy_codes, energy_mults = energy_categories(outputs.kinetic_energy_mt)
+        size_codes = size_categories(inputs.diameter_max_km)
+    if labels == LabelMode.TEXT:
+        energy_texts = energy_labels(energy_codes, energy_mults)
+        size_texts = size_labels(size_codes, inputs.diameter_max_km)
+    else:
+        energy_texts = size_texts = [None] * n
+
+    extra = dict(extra or {})
+    if outputs.time_window_years is not None:
+        extra.setdefault("time_window_years", round_exact(outputs.time_window_years, 4).tolist())
+    if outputs.palermo_by_as_of is not None:
+        extra.setdefault("palermo_by_as_of", outputs.palermo_by_as_of.T.tolist())
+        extra.setdefault("torino_by_as_of", outputs.torino_by_as_of.T.tolist())
+    if outputs.learned_score is not None:
+        extra.setdefault("learned_score", outputs.learned_score.tolist())
+    if outputs.impact_effects is not None:
+        for name, values in outputs.impact_effects.rounded().items():
+            extra.setdefault(name, optional_list(values))
+    if outputs.model_scores:
+        names = list(outputs.model_scores)
+        score_rows = zip(*(outputs.model_scores[m].tolist() for m in names))
+        level_rows = zip(*(outputs.model_level_codes[m].tolist() for m in names))
+        extra.setdefault("model_scores", [dict(zip(names, row)) for row in score_rows])
+        extra.setdefault(
+            "model_risk_levels",
+            [{m: RISK_LEVELS[c] for m, c in zip(names, row)} for row in level_rows],
+        )
+    extra_names = list(extra)
+    extra_rows = zip(*extra.values()) if extra else repeat(())
+
+    columns = zip(
+        inputs.asteroid_ids,
+        inputs.names,
+        inputs.approach_dates,
+        inputs.hazardous.tolist(),
+        inputs.diameter_max_km.tolist(),
+        inputs.miss_distance_km.tolist(),
+        inputs.miss_distance_lunar.tolist(),
+        inputs.velocity_km_s.tolist(),
+        inputs.velocity_km_h.tolist(),
+        inputs.approach_count.tolist(),
+        outputs.mass_kg.tolist(),
+        outputs.kinetic_energy_joules.tolist(),
+        outputs.kinetic_energy_mt.tolist(),
+        outputs.impact_probability.tolist(),
+        outputs.torino_scale.tolist(),
+        outputs.palermo_scale.tolist(),
+        outputs.risk_score.tolist(),
+        outputs.risk_level_code.tolist(),
+        energy_codes.tolist(),
+        energy_mults.tolist(),
+        size_codes.tolist(),
+        energy_texts,
+        size_texts,
+        outputs.score_points.tolist(),
+        extra_rows,
+    )
+
+    assessments = []
+    for (
+        aid, name, date, haz, dmax, miss_km, miss_ld, vel_s, vel_h, count,
+        mass, ke_j, ke_mt, ip, torino, palermo, score, level,
+        e_code, e_mult, s_code, e_text, s_text, pts, extra_row,
+    ) in columns:
+        fields = dict(
+            asteroid_id=aid,
+            name=name,
+            risk_level=RISK_LEVELS[level],
+            risk_score=score,
+            hazardous=haz,
+            estimated_diameter_km=round(dmax, 6),
+            miss_distance_km=round(miss_km, 2),
+            miss_distance_lunar=round(miss_ld, 4),
+            velocity_km_s=round(vel_s, 4),
+            velocity_km_h=round(vel_h, 2),
+            closest_approach_date=date,
+            kinetic_energy_mt=round(ke_mt, 6),
+            kinetic_energy_joules=ke_j,
+            estimated_mass_kg=round(mass, 2),
+            torino_scale=torino,
+            palermo_scale=palermo,
+            impact_probability=ip,
+            impact_energy_comparison=e_text,
+            relative_size=s_text,
+            energy_comparison_code=e_code,
+            energy_comparison_multiplier=e_mult,
+            size_comparison_code=s_code,
+            approach_count=count,
+            score_breakdown=ScoreBreakdown(**dict(zip(SCORE_FACTORS, pts))),
+        )
+        fields.update(zip(extra_names, extra_row))
+        assessments.append(model(**fields))
+    return assessments
+
+
+def result_columns(inputs: BatchInputs, outputs: BatchOutputs) -> dict[str, np.ndarray]:
+    """
+    Assessment fields as typed arrays, rounded as in build_assessments.
+
+    For columnar files (app.bulk_score): descriptive labels are given
+    as codes only, score-breakdown and per-model fields as dotted
+    ``score_breakdown.<factor>`` / ``model_scores.<name>`` columns.
+    """
+    energy_codes, energy_mults = energy_categories(outputs.kinetic_energy_mt)
+    columns: dict[str, np.ndarray] = {
+        "asteroid_id": np.array(inputs.asteroid_ids, dtype=str),
+        "name": np.array(inputs.names, dtype=str),
+        "risk_level": np.array([lvl.value for lvl in RISK_LEVELS])[outputs.risk_level_code],
+        "risk_score": outputs.risk_score,
+        "hazardous": inputs.hazardous,
+        "estimated_diameter_km": round_exact(inputs.diameter_max_km, 6),
+        "miss_distance_km": round_exact(inputs.miss_distance_km, 2),
+        "miss_distance_lunar": round_exact(inputs.miss_distance_lunar, 4),
+        "velocity_km_s": round_exact(inputs.velocity_km_s, 4),
+        "velocity_km_h": round_exact(inputs.velocity_km_h, 2),
+        "closest_approach_date": np.array(inputs.approach_dates, dtype=str),
+        "kinetic_energy_mt": round_exact(outputs.kinetic_energy_mt, 6),
+        "kinetic_energy_joules": outputs.kinetic_energy_joules,
+        "estimated_mass_kg": round_exact(outputs.mass_kg, 2),
+        "torino_scale": outputs.torino_scale,
+        "palermo_scale": outputs.palermo_scale,
+        "impact_probability": outputs.impact_probability,
+        "energy_comparison_code": energy_codes,
+        "energy_comparison_multiplier": energy_mults,
+        "size_comparison_code": size_categories(inputs.diameter_max_km),
+        "approach_count": inputs.approach_count,
+    }
+    for j, factor in enumerate(SCORE_FACTORS):
+        columns[f"score_breakdown.{factor}"] = outputs.score_points[:, j]
+    if outputs.time_window_years is not None:
+        columns["time_window_years"] = round_exact(outputs.time_window_years, 4)
+    for name, scores in (outputs.model_scores or {}).items():
+        columns[f"model_scores.{name}"] = scores
+        columns[f"model_risk_levels.{name}"] = (
+            np.array([lvl.value for lvl in RISK_LEVELS])[outputs.model_level_codes[name]]
+        )
+    if outputs.learned_score is not None:
+        columns["learned_score"] = outputs.learned_score
+    return columns
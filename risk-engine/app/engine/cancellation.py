@@ -0,0 +1,55 @@
+"""
+Cooperative cancellation for long-running batch work.
+
+A CancelToken carries a deadline and can be cancelled from another
+thread (e.g. when the HTTP client disconnects).  The batch pipeline
+calls ``check()`` between chunks; once the token is cancelled or past
+its deadline, ``check()`` raises Cancelled, carrying whatever results
+were complete at that point.
+"""
+
+import time
+from typing import Any, Optional
+
+DEADLINE_EXCEEDED = "deadline_exceeded"
+CLIENT_DISCONNECTED = "client_disconnected"
+
+# Objects per pipeline chunk; cancellation is checked between chunks
+CHUNK_SIZE = 2_000
+
+
+class Cancelled(Exception):
+    """Work stopped early; ``partial`` holds the results computed so far."""
+
+    def __init__(self, reason: str, partial: Any = None):
+        super().__init__(reason)
+        self.reason = reason
+        self.partial = partial
+
+
+class CancelToken:
+    """Deadline plus an explicit cancel flag, checked cooperatively."""
+
+    def __init__(self, timeout_s: Optional[float] = None):
+        self.deadline = time.monotonic() + timeout_s if timeout_s is not None else None
+        self._reason: Optional[str] = None
+
+    def cancel(self, reason: str = CLIENT_DISCONNECTED) -> None:
+        if self._reason is None:
+            self._reason = reason
+
+    @property
+    def reason(self) -> Optional[str]:
+        if self._reason is None and self.deadline is not None and time.monotonic() >= self.deadline:
+            self._reason = DEADLINE_EXCEEDED
+        return self._reason
+
+    def remaining(self) -> Optional[float]:
+        """Seconds until the deadline (None without one)."""
+        return None if self.deadline is None else max(0.0, self.deadline - time.monotonic())
+
+    def check(self, partial: Any = None) -> None:
+        """Raise Cancelled if the token was cancelled or its deadline passed."""
+        reason = self.reason
+        if reason is not None:
+            raise Cancelled(reason, partial)
@@ -19,6 +19,7 @@ V_ESCAPE_M_S = (
     (2 * const.G * const.M_earth / const.R_earth) ** 0.5
 ).to(u.m / u.s).value
 V_ESCAPE_KM_S = V_ESCAPE_M_S / 1000  # ~11.186 km/s
+GRAVITY_M_S2 = const.g0.to(u.m / u.s**2).value  # 9.80665 m/s²
 
 # ── Asteroid Density Estimates ─────────────────────────────────
 LUNAR_DISTANCE_KM = 384_400  # avg Earth-Moon distance in km
@@ -32,6 +33,18 @@ TNT_JOULES = 4.184e9  # 1 ton TNT in Joules
 MT_JOULES = 4.184e15  # 1 megaton TNT in Joules
 KT_JOULES = 4.184e12  # 1 kiloton TNT in Joules
 
+# ── Atmospheric Entry & Impact Effects ────────────────────────
+# Collins, Melosh & Marcus (2005), Earth Impact Effects Program
+ATMOSPHERE_SCALE_HEIGHT_M = 8_000
+SURFACE_AIR_DENSITY_KG_M3 = 1.0  # ρ₀ of the breakup fits
+DRAG_COEFFICIENT = 2.0
+PANCAKE_FACTOR = 7.0  # L/L₀ at which a fragment cloud counts as burst
+TARGET_DENSITY_KG_M3 = 2_500  # crystalline / sedimentary rock
+IMPACT_ANGLE_DEG = 45.0  # most probable entry angle
+SIMPLE_COMPLEX_CRATER_KM = 3.2  # final diameter of the simple→complex transition
+LUMINOUS_EFFICIENCY = 3e-3  # fraction of the energy radiated as heat
+PSI_PA = 6_894.757
+
 # ── Default Albedo for H→D Conversion ─────────────────────────
 # p_v varies by spectral type: S~0.20, C~0.06, M~0.10
 # Use 0.14 as a default (IAU convention for unknown type)
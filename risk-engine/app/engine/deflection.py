@@ -0,0 +1,248 @@
+"""
+Deflection what-if scenarios: objects × (delta-v, lead time, direction).
+
+Linearized along-track model: an impulse Δv applied a lead time t
+before the close approach displaces the object at the encounter by
+
+    d ≈ κ · Δv · t
+
+with κ = 3 along-track (the period change makes the timing error grow
+as 3Δv·t) and κ = 1 cross-track.  The displacement is taken
+perpendicular to the current miss vector (the conservative case), so the
+deflected miss distance and MOID are √(x² + d²).  Unknown MOIDs stay
+unknown and such objects use the geometric (miss-distance) probability.
+A lead time longer than the time left until an object's close approach
+(from the first as_of, or now) cannot be flown: those scenarios are not
+reported (null in the cube) and do not count for the minimum delta-v.
+
+For each chunk of objects the rows of every (object, scenario) pair,
+plus the undeflected baseline, are built as one BatchInputs and go
+through compute_batch together: impact probability, Torino / Palermo and
+the score over the whole grid in one array computation.
+"""
+
+from datetime import datetime, timezone
+from typing import Optional, Sequence
+
+import numpy as np
+
+from app.models import (
+    DeflectionBaseline,
+    DeflectionDirection,
+    DeflectionField,
+    DeflectionResponse,
+)
+from app.engine.analysis import format_as_of
+from app.engine.batch import BatchInputs, BatchOutputs, compute_batch
+from app.engine.cancellation import CancelToken
+from app.engine.constants import AU_KM, LUNAR_DISTANCE_KM
+from app.engine.scoring import RISK_LEVELS
+
+DIRECTION_GAIN = {
+    DeflectionDirection.ALONG_TRACK: 3.0,
+    DeflectionDirection.CROSS_TRACK: 1.0,
+}
+MAX_SCENARIOS = 10_000  # per object
+MAX_CELLS = 1_000_000  # objects × scenarios per request
+ROWS_PER_PASS = 250_000  # (object, scenario) rows per compute_batch call
+
+_SECONDS_PER_DAY = 86_400.0
+_MS_PER_DAY = 86_400_000.0
+
+
+def scenario_count(
+    delta_v_mm_s: Sequence[float],
+    lead_time_days: Sequence[float],
+    directions: Sequence[DeflectionDirection],
+    objects: int = 1,
+) -> int:
+    """
+    Scenarios per object; raises ValueError above MAX_SCENARIOS, or when
+    ``objects`` × scenarios is above MAX_CELLS.
+    """
+    count = len(delta_v_mm_s) * len(lead_time_days) * len(directions)
+    if count > MAX_SCENARIOS:
+        raise ValueError(
+            f"{count} scenarios per object (at most {MAX_SCENARIOS}); use a coarser grid"
+        )
+    if objects * count > MAX_CELLS:
+        raise ValueError(
+            f"{objects} objects × {count} scenarios (at most {MAX_CELLS}); "
+            "split the objects or use a coarser grid"
+        )
+    return count
+
+
+def displacement_km(
+    delta_v_mm_s: Sequence[float],
+    lead_time_days: Sequence[float],
+    directions: Sequence[DeflectionDirection],
+) -> np.ndarray:
+    """Encounter displacement per scenario, shaped (direction, lead time, delta-v)."""
+    gain = np.array([DIRECTION_GAIN[d] for d in directions])
+    lead_s = np.asarray(lead_time_days, dtype=float) * _SECONDS_PER_DAY
+    dv_km_s = np.asarray(delta_v_mm_s, dtype=float) * 1e-6
+    return gain[:, None, None] * lead_s[None, :, None] * dv_km_s[None, None, :]
+
+
+def _reachable(
+    approach_epoch: np.ndarray, reference: np.datetime64, lead_time_days: np.ndarray
+) -> np.ndarray:
+    """(object, lead time): True where the lead time fits before the approach (or it is unknown)."""
+    epoch = approach_epoch.astype("datetime64[ms]")
+    days = (epoch - reference).astype(np.float64) / _MS_PER_DAY
+    return np.isnat(epoch)[:, None] | (lead_time_days[None, :] <= days[:, None])
+
+
+def _deflected(inputs: BatchInputs, shifts_km: np.ndarray) -> BatchInputs:
+    """
+    Rows per object: ``len(shifts_km)`` copies with the miss distance and
+    MOID moved by each shift (object-major, so outputs reshape to
+    (objects, shifts)).
+    """
+    n, k = len(inputs), len(shifts_km)
+    grid = inputs.take(np.repeat(np.arange(n), k))
+    d = np.tile(shifts_km, n)
+    grid.miss_distance_km = np.hypot(grid.miss_distance_km, d)
+    grid.miss_distance_lunar = grid.miss_distance_km / LUNAR_DISTANCE_KM
+    grid.moid_au = np.hypot(grid.moid_au, d / AU_KM)  # NaN stays NaN
+    return grid
+
+
+def _field_values(
+    field: DeflectionField, grid: BatchInputs, outputs: BatchOutputs
+) -> np.ndarray:
+    if field == DeflectionField.MISS_DISTANCE_KM:
+        return np.round(grid.miss_distance_km, 2)
+    if field == DeflectionField.MOID_AU:
+        return np.round(grid.moid_au, 8)
+    if field == DeflectionField.IMPACT_PROBABILITY:
+        return outputs.impact_probability
+    if field == DeflectionField.TORINO_SCALE:
+        return outputs.torino_scale
+    if field == DeflectionField.PALERMO_SCALE:
+        return outputs.palermo_scale
+    if field == DeflectionField.RISK_SCORE:
+        return outputs.risk_score
+    return outputs.risk_level_code
+
+
+def _smallest_delta_v(hit: np.ndarray, delta_v: np.ndarray) -> list:
+    """First (smallest) delta-v along the last axis where ``hit``; None if none."""
+    first = np.argmax(hit, axis=-1)
+    return np.where(hit.any(axis=-1), delta_v[first], None).tolist()
+
+
+def _nullable(values: np.ndarray) -> np.ndarray:
+    return np.where(np.isnan(values), None, values) if values.dtype.kind == "f" else values
+
+
+def deflection_scenarios(
+    inputs: BatchInputs,
+    delta_v_mm_s: Sequence[float],
+    lead_time_days: Sequence[float],
+    directions: Sequence[DeflectionDirection] = (DeflectionDirection.ALONG_TRACK,),
+    fields: Sequence[DeflectionField] = tuple(DeflectionField),
+    *,
+    as_of: Optional[np.ndarray] = None,
+    cancel: Optional[CancelToken] = None,
+) -> DeflectionResponse:
+    """
+    Evaluate every scenario of the grid for every object.
+
+    The axes should be ascending (DeflectionRequest sorts them) so that
+    the minimum delta-v summaries pick the smallest value.  Raises
+    ValueError when the grid is over MAX_SCENARIOS or MAX_CELLS.
+    """
+    scenarios = scenario_count(delta_v_mm_s, lead_time_days, directions, len(inputs))
+    shifts = displacement_km(delta_v_mm_s, lead_time_days, directions)
+    if as_of is not None:
+        reference = as_of[0].astype("datetime64[ms]")
+    else:
+        reference = np.datetime64(datetime.now(timezone.utc).replace(tzinfo=None), "ms")
+    lead = np.asarray(lead_time_days, dtype=float)
+    shape = shifts.shape
+    # Baseline (no deflection) first, then the grid
+    row_shifts = np.concatenate([[0.0], shifts.ravel()])
+    per_pass = max(1, ROWS_PER_PASS // len(row_shifts))
+    dv = np.asarray(delta_v_mm_s, dtype=float)
+
+    baselines: list[DeflectionBaseline] = []
+    cube: dict[str, list] = {f.value: [] for f in fields}
+    torino_zero: list = []
+    level_drop: list = []
+    for start in range(0, len(inputs), per_pass):
+        if cancel is not None:
+            cancel.check(baselines)
+        chunk = inputs.take(np.arange(start, min(start + per_pass, len(inputs))))
+        n = len(chunk)
+        grid = _deflected(chunk, row_shifts)
+        outputs = compute_batch(grid, as_of)
+
+        reachable = np.broadcast_to(
+            _reachable(chunk.approach_epoch, reference, lead)[:, None, :, None], (n, *shape)
+        )
+        unreachable = not reachable.all()
+
+        def table(values: np.ndarray) -> np.ndarray:
+            return values.reshape(n, len(row_shifts))
+
+        for f in fields:
+            values = table(_field_values(f, grid, outputs))[:, 1:].reshape(n, *shape)
+            if f == DeflectionField.RISK_LEVEL:
+                values = np.array([level.value for level in RISK_LEVELS])[values]
+            values = _nullable(values)
+            if unreachable:
+                values = np.where(reachable, values, None)
+            cube[f.value].extend(values.tolist())
+
+        torino = table(outputs.torino_scale)
+        levels = table(outputs.risk_level_code)
+        torino_zero.extend(
+            _smallest_delta_v((torino[:, 1:].reshape(n, *shape) == 0) & reachable, dv)
+        )
+        level_drop.extend(_smallest_delta_v(
+            (levels[:, 1:].reshape(n, *shape) < levels[:, :1, None, None]) & reachable, dv
+        ))
+
+        moid = table(grid.moid_au)[:, 0]
+        columns = zip(
+            chunk.asteroid_ids,
+            chunk.names,
+            np.round(chunk.miss_distance_km, 2).tolist(),
+            _nullable(np.round(moid, 8)).tolist(),
+            table(outputs.impact_probability)[:, 0].tolist(),
+            torino[:, 0].tolist(),
+            table(outputs.palermo_scale)[:, 0].tolist(),
+            table(outputs.risk_score)[:, 0].tolist(),
+            levels[:, 0].tolist(),
+        )
+        baselines.extend(
+            DeflectionBaseline(
+                asteroid_id=aid,
+                name=name,
+                miss_distance_km=miss,
+                moid_au=m,
+                impact_probability=ip,
+                torino_scale=t,
+                palermo_scale=p,
+                risk_score=score,
+                risk_level=RISK_LEVELS[level],
+            )
+            for aid, name, miss, m, ip, t, p, score, level in columns
+        )
+
+    return DeflectionResponse(
+        total_analyzed=len(baselines),
+        total_scenarios=scenarios,
+        as_of=format_as_of(as_of),
+        axes={
+            "direction": [d.value for d in directions],
+            "lead_time_days": list(lead_time_days),
+            "delta_v_mm_s": list(delta_v_mm_s),
+        },
+        baselines=baselines,
+        cube=cube,
+        min_delta_v_torino_zero=torino_zero,
+        min_delta_v_level_drop=level_drop,
+    )
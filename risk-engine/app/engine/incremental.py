@@ -0,0 +1,253 @@
+"""
+Incremental re-analysis against a previous batch result.
+
+Each input object is fingerprinted (the engine inputs unpacked from its
+NeoWs payload, including the batch-wide approach count).  Objects whose fingerprint appeared in the
+previous result reuse that assessment; only new or changed objects go
+through the assessment pipeline.  The outcome can be returned in full or
+as a diff: added, removed, and objects whose score or level changed.
+"""
+
+import hashlib
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+
+from app.models import (
+    AnalysisDiff,
+    AssessmentChange,
+    LabelMode,
+    ResultMode,
+    RiskAnalysisResponse,
+    RiskAssessment,
+)
+from app.engine.analysis import (
+    BatchObserver,
+    StatisticsColumns,
+    assess_until_deadline,
+    format_as_of,
+    mark_partial,
+    summarize_batch,
+)
+from app.engine.batch import BatchInputs
+from app.engine.cancellation import CHUNK_SIZE, CancelToken
+from app.engine.learned import LearnedModel
+from app.engine.projection import FieldProjection
+from app.engine.scoring import ScoringModel
+from app.tracing import span
+
+
+@dataclass
+class ResultSnapshot:
+    """What is kept of a batch result so a later batch can build on it."""
+
+    label_mode: Optional[LabelMode]  # None ⇒ labels were not computed
+    as_of: Optional[tuple[str, ...]]  # None ⇒ fixed scale window
+    models: tuple[tuple[str, str], ...]  # (name, version) of extra scoring models
+    learned: Optional[str]  # learned-model version, None ⇒ not scored
+    by_fingerprint: dict[str, RiskAssessment]
+    by_id: dict[str, RiskAssessment]  # highest-scoring assessment per asteroid
+    effects: bool = False  # impact-effect fields computed (False in older stored snapshots)
+
+
+def fingerprints(inputs: BatchInputs) -> list[str]:
+    """Stable digest, per row, of everything that can influence its assessment."""
+    columns = (
+        inputs.asteroid_ids,
+        inputs.names,
+        inputs.approach_dates,
+        inputs.approach_epoch.view(np.int64).tolist(),
+        inputs.hazardous.tolist(),
+        inputs.diameter_min_km.tolist(),
+        inputs.diameter_max_km.tolist(),
+        inputs.miss_distance_km.tolist(),
+        inputs.miss_distance_lunar.tolist(),
+        inputs.velocity_km_s.tolist(),
+        inputs.velocity_km_h.tolist(),
+        inputs.moid_au.tolist(),
+        inputs.orbit_uncertainty.tolist(),
+        inputs.approach_count.tolist(),
+    )
+    return [
+        hashlib.blake2b(repr(row).encode(), digest_size=16).hexdigest()
+        for row in zip(*columns)
+    ]
+
+
+def _best_by_id(assessments: list[RiskAssessment]) -> dict[str, RiskAssessment]:
+    best: dict[str, RiskAssessment] = {}
+    for a in assessments:
+        prev = best.get(a.asteroid_id)
+        if prev is None or a.risk_score > prev.risk_score:
+            best[a.asteroid_id] = a
+    return best
+
+
+def _diff(
+    base_handle: str,
+    previous: ResultSnapshot,
+    current: dict[str, RiskAssessment],
+    recomputed: int,
+) -> AnalysisDiff:
+    added: list[RiskAssessment] = []
+    changed: list[AssessmentChange] = []
+    unchanged = 0
+
+    for aid, a in current.items():
+        prev = previous.by_id.get(aid)
+        if prev is None:
+            added.append(a)
+        elif prev.risk_score != a.risk_score or prev.risk_level != a.risk_level:
+            changed.append(
+                AssessmentChange(
+                    asteroid_id=aid,
+                    name=a.name,
+                    previous_score=prev.risk_score,
+                    risk_score=a.risk_score,
+                    previous_level=prev.risk_level,
+                    risk_level=a.risk_level,
+                )
+            )
+        else:
+            unchanged += 1
+
+    removed = [aid for aid in previous.by_id if aid not in current]
+    added.sort(key=lambda a: a.risk_score, reverse=True)
+
+    return AnalysisDiff(
+        base_handle=base_handle,
+        added=added,
+        removed=removed,
+        changed=changed,
+        unchanged_count=unchanged,
+        recomputed_count=recomputed,
+    )
+
+
+def analyze_inputs(
+    inputs: BatchInputs,
+    size: int,
+    date_range: Optional[dict] = None,
+    labels: LabelMode = LabelMode.TEXT,
+    projection: Optional[FieldProjection] = None,
+    *,
+    previous: Optional[ResultSnapshot] = None,
+    previous_handle: Optional[str] = None,
+    result_mode: ResultMode = ResultMode.FULL,
+    as_of: Optional[np.ndarray] = None,
+    models: Sequence[ScoringModel] = (),
+    learned: Optional[LearnedModel] = None,
+    cancel: Optional[CancelToken] = None,
+    best_effort: bool = False,
+    observe: Optional[BatchObserver] = None,
+    extended: bool = False,
+    effects: bool = False,
+) -> tuple[RiskAnalysisResponse, Optional[ResultSnapshot]]:
+    """
+    Batch analysis that reuses unchanged assessments from ``previous``.
+
+    ``inputs`` are the unpacked objects of a batch of ``size`` (objects
+    without close approaches have no row).  Returns the response
+    (without a handle; the caller stores the snapshot and assigns one)
+    and the snapshot for the new result.
+
+    ``cancel`` stops the work between chunks (raising Cancelled).  With
+    ``best_effort`` a passed deadline returns the completed subset,
+    marked partial, and no snapshot: a partial result is not a base
+    for later diffs.
+
+    ``observe`` sees the inputs and outputs of every recomputed chunk.
+    ``effects`` adds the impact-effect fields (also computed when a
+    projection names one of them, and skipped when it names none).
+    ``extended`` adds the extended statistics; result_mode "summary"
+    returns the statistics without the assessments (the snapshot, and
+    so the handle, still covers them).
+    """
+    label_mode = labels if projection is None or projection.needs_labels else None
+    if projection is not None and not projection.needs_learned:
+        learned = None
+    if projection is not None:
+        effects = projection.needs_effects
+    learned_key = learned.version if learned is not None else None
+
+    row_fingerprints: list[str] = []
+    with span("engine.fingerprint", rows=len(inputs)):
+        for start in range(0, len(inputs), CHUNK_SIZE):
+            if cancel is not None and cancel.reason is not None:
+                break  # assess_until_deadline stops (or raises) at its first check
+            rows = np.arange(start, min(start + CHUNK_SIZE, len(inputs)))
+            row_fingerprints.extend(fingerprints(inputs.take(rows)))
+    positions = inputs.source_index.tolist()
+
+    as_of_key = tuple(format_as_of(as_of)) if as_of is not None else None
+    models_key = tuple((m.name, m.version) for m in models)
+
+    # Reuse only when the earlier run used the same labels, scale windows,
+    # model versions and effects stage
+    reuse: dict[int, RiskAssessment] = {}
+    if (
+        previous is not None
+        and previous.label_mode == label_mode
+        and previous.as_of == as_of_key
+        and previous.models == models_key
+        and previous.learned == learned_key
+        and previous.effects == effects
+    ):
+        for i, fp in zip(positions, row_fingerprints):
+            hit = previous.by_fingerprint.get(fp)
+            if hit is not None:
+                reuse[i] = hit
+
+    columns = StatisticsColumns(size, models, then=observe)
+    results, partial = assess_until_deadline(
+        inputs,
+        size,
+        label_mode,
+        best_effort=best_effort,
+        reuse=reuse,
+        as_of=as_of,
+        models=models,
+        learned=learned,
+        cancel=cancel,
+        observe=columns,
+        effects=effects,
+    )
+    assessments = [a for a in results if a]
+
+    with span("engine.summarize", assessments=len(assessments), partial=partial):
+        response = summarize_batch(
+            assessments, date_range, projection, models, extended=extended,
+            columns=columns.columns(results),
+        )
+    if result_mode == ResultMode.SUMMARY:
+        response.assessments = []
+        response.message = "Risk analysis summary completed"
+    response.as_of = list(as_of_key) if as_of_key is not None else None
+    response.learned_model = learned_key
+    if partial:
+        mark_partial(response, size)
+        return response, None
+
+    snapshot = ResultSnapshot(
+        label_mode=label_mode,
+        as_of=as_of_key,
+        models=models_key,
+        learned=learned_key,
+        effects=effects,
+        by_fingerprint={fp: results[i] for i, fp in zip(positions, row_fingerprints)},
+        by_id=_best_by_id(assessments),
+    )
+    if previous is None:
+        if previous_handle is not None:
+            response.message = "Previous result handle not found; returned full result"
+        return response, snapshot
+
+    recomputed = size - len(reuse)
+    if result_mode == ResultMode.DIFF:
+        with span("engine.diff", recomputed=recomputed):
+            response.diff = _diff(previous_handle or "", previous, snapshot.by_id, recomputed)
+        response.assessments = []
+        response.message = "Risk analysis diff completed"
+
+    return response, snapshot
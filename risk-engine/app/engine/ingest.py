@@ -0,0 +1,229 @@
+"""
+Lean decoding of /analyze request bodies.
+
+The decoded JSON is unpacked straight into BatchInputs.  Only the fields
+the engine reads are looked at: reference id, name, hazardous flag,
+kilometre diameters, the first close approach's date, epoch, km/s, km/h,
+km and lunar distances, MOID and orbit uncertainty, plus the number of
+approaches.  The rest of each NeoWs object (metre diameters, miles / mph
+strings, most orbital elements, further approaches) is skipped instead
+of being validated into the model tree.
+
+Used fields are accepted only in their plain JSON form: strings for the
+NeoWs numeric strings, numbers for diameters, true / false for the flag.
+Anything else (a missing field, a number sent as a string, a list where
+an object belongs) sends the whole body through RiskAnalysisRequest
+validation, which either accepts it with Pydantic's coercions or raises
+the usual validation errors.
+"""
+
+import json
+import re
+from typing import Any, Optional
+
+import numpy as np
+from pydantic import ValidationError
+
+from app.models import RiskAnalysisRequest
+from app.engine.analysis import approach_counts
+from app.engine.assessment import _safe_float, _safe_int
+from app.engine.batch import BatchInputs, _approach_epochs, extract_inputs
+
+_NUMBER = (int, float)
+
+
+def extract_records(records: list[Any]) -> Optional[BatchInputs]:
+    """
+    BatchInputs from NeoObject dicts, or None when a used field is not in
+    its plain JSON form (the caller then validates the full models).
+    """
+    ids, names, dates, epochs = [], [], [], []
+    hazardous, dmin, dmax = [], [], []
+    miss_km, miss_ld, vel_s, vel_h = [], [], [], []
+    moid, ou, index = [], [], []
+    counts: dict[str, int] = {}
+    nan = float("nan")
+
+    for i, record in enumerate(records):
+        try:
+            aid = record["neo_reference_id"]
+            name = record["name"]
+            flag = record["is_potentially_hazardous_asteroid"]
+            kms = record["estimated_diameter"]["kilometers"]
+            low, high = kms["estimated_diameter_min"], kms["estimated_diameter_max"]
+            approaches = record["close_approach_data"]
+            orbital = record.get("orbital_data")
+        except (KeyError, TypeError, AttributeError):
+            return None
+        if not (
+            type(aid) is str
+            and type(name) is str
+            and type(flag) is bool
+            and type(low) in _NUMBER
+            and type(high) in _NUMBER
+            and type(approaches) is list
+        ):
+            return None
+        counts[aid] = counts.get(aid, 0) + len(approaches)
+        if not approaches:
+            continue
+
+        try:
+            approach = approaches[0]
+            date = approach["close_approach_date"]
+            epoch = approach.get("epoch_date_close_approach")
+            velocity, miss = approach["relative_velocity"], approach["miss_distance"]
+            speeds = velocity["kilometers_per_second"], velocity["kilometers_per_hour"]
+            distances = miss["kilometers"], miss["lunar"]
+        except (KeyError, TypeError, AttributeError):
+            return None
+        if not (
+            type(date) is str
+            and (epoch is None or type(epoch) is int)
+            and all(type(v) is str for v in speeds + distances)
+        ):
+            return None
+
+        if orbital is None:
+            m = u = None
+        elif type(orbital) is dict:
+            m = orbital.get("minimum_orbit_intersection")
+            u = orbital.get("orbit_uncertainty")
+            if not (m is None or type(m) is str) or not (u is None or type(u) is str):
+                return None
+            m, u = _safe_float(m), _safe_int(u)
+        else:
+            return None
+
+        ids.append(aid)
+        names.append(name)
+        dates.append(date)
+        epochs.append(epoch)
+        hazardous.append(flag)
+        dmin.append(low)
+        dmax.append(high)
+        vel_s.append(speeds[0])
+        vel_h.append(speeds[1])
+        miss_km.append(distances[0])
+        miss_ld.append(distances[1])
+        moid.append(nan if m is None else m)
+        ou.append(nan if u is None else float(u))
+        index.append(i)
+
+    def floats(values: list[str]) -> np.ndarray:
+        return np.fromiter(map(float, values), dtype=float, count=len(values))
+
+    return BatchInputs(
+        asteroid_ids=ids,
+        names=names,
+        approach_dates=dates,
+        approach_epoch=_approach_epochs(epochs, dates),
+        hazardous=np.array(hazardous, dtype=bool),
+        diameter_min_km=np.array(dmin, dtype=float),
+        diameter_max_km=np.array(dmax, dtype=float),
+        miss_distance_km=floats(miss_km),
+        miss_distance_lunar=floats(miss_ld),
+        velocity_km_s=floats(vel_s),
+        velocity_km_h=floats(vel_h),
+        moid_au=np.array(moid, dtype=float),
+        orbit_uncertainty=np.array(ou, dtype=float),
+        approach_count=np.array([counts[a] for a in ids], dtype=np.int64),
+        source_index=np.array(index, dtype=np.int64),
+    )
+
+
+def decode_analyze_request(document: Any) -> tuple[RiskAnalysisRequest, BatchInputs, int]:
+    """
+    Options, engine inputs and object count of a decoded /analyze body.
+
+    The returned request carries the options only (``asteroids`` is
+    empty).  Raises ValidationError as validating the whole body as a
+    RiskAnalysisRequest would.
+    """
+    if isinstance(document, dict) and type(document.get("asteroids")) is list:
+        records = document["asteroids"]
+        try:
+            options = RiskAnalysisRequest.model_validate({**document, "asteroids": []})
+        except ValidationError:
+            options = None
+        inputs = extract_records(records) if options is not None else None
+        if inputs is not None:
+            return options, inputs, len(records)
+
+    request = RiskAnalysisRequest.model_validate(document)
+    asteroids, request.asteroids = request.asteroids, []
+    return request, extract_inputs(asteroids, approach_counts(asteroids)), len(asteroids)
+
+
+def decode_analyze_body(body: bytes) -> tuple[RiskAnalysisRequest, BatchInputs, int]:
+    """decode_analyze_request for raw JSON; raises JSONDecodeError on bad JSON."""
+    return decode_analyze_request(json.loads(body))
+
+
+# ── Record Spans (sharded /analyze) ──────────────────────────
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+
+
+def scan_analyze_body(body: bytes) -> tuple[dict, list[Any], str, list[tuple[int, int]]]:
+    """
+    Decode an /analyze body, also locating each asteroid's JSON text.
+
+    Returns the options (every top-level key but ``asteroids``), the
+    decoded asteroid records, the body text and each record's
+    ``(start, end)`` offsets in it, so shards of the batch can be sent on
+    as slices of the original text instead of being encoded again.
+    Raises ValueError (JSONDecodeError for invalid JSON) when the body
+    is not an object with one ``asteroids`` list; callers then take the
+    decode_analyze_body path, which reports the usual errors.
+    """
+    text = body.decode("utf-8")
+    ws = _WHITESPACE.match
+    decode = _DECODER.raw_decode
+    options: dict[str, Any] = {}
+    records: Optional[list[Any]] = None
+    spans: list[tuple[int, int]] = []
+    try:
+        pos = ws(text, 0).end()
+        if text[pos] != "{":
+            raise ValueError("body is not a JSON object")
+        pos = ws(text, pos + 1).end()
+        while text[pos] != "}":
+            key, pos = decode(text, pos)
+            pos = ws(text, pos).end()
+            if not isinstance(key, str) or text[pos] != ":":
+                raise ValueError("malformed object")
+            pos = ws(text, pos + 1).end()
+            if key == "asteroids" and text[pos] == "[" and records is None:
+                records = []
+                pos = ws(text, pos + 1).end()
+                while text[pos] != "]":
+                    record, end = decode(text, pos)
+                    records.append(record)
+                    spans.append((pos, end))
+                    pos = ws(text, end).end()
+                    if text[pos] == ",":
+                        pos = ws(text, pos + 1).end()
+                        if text[pos] == "]":
+                            raise ValueError("trailing comma")
+                    elif text[pos] != "]":
+                        raise ValueError("malformed asteroids list")
+                pos += 1
+            elif key == "asteroids" or key in options:
+                raise ValueError("duplicate or non-list asteroids")
+            else:
+                options[key], pos = decode(text, pos)
+            pos = ws(text, pos).end()
+            if text[pos] == ",":
+                pos = ws(text, pos + 1).end()
+                if text[pos] == "}":
+                    raise ValueError("trailing comma")
+            elif text[pos] != "}":
+                raise ValueError("malformed object")
+        if ws(text, pos + 1).end() != len(text):
+            raise ValueError("trailing data")
+    except IndexError:
+        raise ValueError("truncated body") from None
+    if records is None:
+        raise ValueError("no asteroids list")
+    return options, records, text, spans
@@ -0,0 +1,162 @@
+"""
+Descriptive label stage: energy and size comparisons.
+
+The known-event energies and size thresholds from constants.py are
+precomputed once into sorted NumPy arrays, so a whole batch is
+categorised with a single searchsorted call per field.  Each object
+gets a compact category code plus a multiplier; formatted strings are
+memoized per (category, rounded multiplier) and shared between objects.
+
+Codes:
+  energy: index into EVENT_NAMES, or ENERGY_NEGLIGIBLE (-1) for E ≤ 0
+  size:   index into SIZE_DESCRIPTIONS, or SIZE_MASSIVE (len) above 10 km
+"""
+
+import bisect
+import math
+from functools import lru_cache
+
+import numpy as np
+
+from app.engine.constants import KNOWN_EVENTS, SIZE_COMPARISONS
+
+# ── Precomputed Tables ───────────────────────────────────────
+_events_sorted = sorted(KNOWN_EVENTS.items(), key=lambda kv: kv[1])
+EVENT_NAMES: tuple[str, ...] = tuple(name for name, _ in _events_sorted)
+EVENT_ENERGIES_MT = np.array([mt for _, mt in _events_sorted], dtype=float)
+_EVENT_ENERGIES_LIST = EVENT_ENERGIES_MT.tolist()
+
+# Nearest event in log space ⇔ searchsorted over log-midpoints
+_event_log = np.log10(EVENT_ENERGIES_MT)
+_EVENT_LOG_EDGES = (_event_log[:-1] + _event_log[1:]) / 2
+_EVENT_LOG_EDGES_LIST = _EVENT_LOG_EDGES.tolist()
+
+SIZE_DESCRIPTIONS: tuple[str, ...] = tuple(desc for _, desc in SIZE_COMPARISONS)
+SIZE_THRESHOLDS_KM = np.array([t for t, _ in SIZE_COMPARISONS], dtype=float)
+_SIZE_THRESHOLDS_LIST = SIZE_THRESHOLDS_KM.tolist()
+
+ENERGY_NEGLIGIBLE = -1
+SIZE_MASSIVE = len(SIZE_DESCRIPTIONS)
+
+# Display precision for the multiplier: <0.01 → 4dp, <1 → 2dp, <100 → 1dp
+_MULT_BREAKS = np.array([0.01, 1.0, 100.0])
+_MULT_DECIMALS = np.array([4, 2, 1, 0], dtype=np.int64)
+_MULT_BREAKS_LIST = _MULT_BREAKS.tolist()
+
+
+# ── Memoized Formatters ──────────────────────────────────────
+@lru_cache(maxsize=8192)
+def _energy_text(code: int, decimals: int, quantized: int) -> str:
+    if code == ENERGY_NEGLIGIBLE:
+        return "negligible"
+    mult = quantized / 10**decimals
+    return f"~{mult:.{decimals}f}× {EVENT_NAMES[code]}"
+
+
+@lru_cache(maxsize=8192)
+def _size_text(code: int, quantized: int) -> str:
+    # quantized is the diameter in decimetres (massive: in 0.1 km)
+    if code == SIZE_MASSIVE:
+        return f"~{quantized / 10:.1f} km across (massive)"
+    return f"~size of {SIZE_DESCRIPTIONS[code]} ({quantized / 10:.1f}m)"
+
+
+def _decimals_for(mult: float) -> int:
+    return int(_MULT_DECIMALS[bisect.bisect_right(_MULT_BREAKS_LIST, mult)])
+
+
+# ── Scalar Path ──────────────────────────────────────────────
+def energy_category(energy_mt: float) -> tuple[int, float]:
+    """Return (event code, multiplier) for one energy value."""
+    if energy_mt <= 0:
+        return ENERGY_NEGLIGIBLE, 0.0
+    code = bisect.bisect_left(_EVENT_LOG_EDGES_LIST, math.log10(energy_mt))
+    return code, energy_mt / _EVENT_ENERGIES_LIST[code]
+
+
+def size_category(diameter_km: float) -> int:
+    """Return the size code for one diameter."""
+    return bisect.bisect_left(_SIZE_THRESHOLDS_LIST, diameter_km)
+
+
+def energy_text(energy_mt: float) -> str:
+    code, mult = energy_category(energy_mt)
+    if code == ENERGY_NEGLIGIBLE:
+        return _energy_text(code, 0, 0)
+    decimals = _decimals_for(mult)
+    return _energy_text(code, decimals, round(mult * 10**decimals))
+
+
+def size_text(diameter_km: float) -> str:
+    code = size_category(diameter_km)
+    scale = 10 if code == SIZE_MASSIVE else 10_000
+    return _size_text(code, round(diameter_km * scale))
+
+
+# ── Batch Path ───────────────────────────────────────────────
+def energy_categories(energy_mt: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized energy categorisation.
+
+    Returns (codes int8, multipliers float64).  Multipliers are 0 where
+    the code is ENERGY_NEGLIGIBLE.
+    """
+    energy_mt = np.asarray(energy_mt, dtype=float)
+    positive = energy_mt > 0
+    log_e = np.log10(np.where(positive, energy_mt, 1.0))
+    codes = np.searchsorted(_EVENT_LOG_EDGES, log_e, side="left")
+    mults = np.where(positive, energy_mt / EVENT_ENERGIES_MT[codes], 0.0)
+    codes = np.where(positive, codes, ENERGY_NEGLIGIBLE).astype(np.int8)
+    return codes, mults
+
+
+def size_categories(diameter_km: np.ndarray) -> np.ndarray:
+    """Vectorized size categorisation (int8 codes)."""
+    diameter_km = np.asarray(diameter_km, dtype=float)
+    return np.searchsorted(SIZE_THRESHOLDS_KM, diameter_km, side="left").astype(np.int8)
+
+
+def _fan_out(keys: np.ndarray, render) -> list[str]:
+    """Format each distinct key row once, then broadcast back to the batch."""
+    if len(keys) == 0:
+        return []
+    uniq, inverse = np.unique(keys, axis=0, return_inverse=True)
+    table = np.array([render(*row) for row in uniq.tolist()], dtype=object)
+    return table[inverse.reshape(-1)].tolist()
+
+
+def energy_labels(codes: np.ndarray, mults: np.ndarray) -> list[str]:
+    """Formatted energy comparisons for a batch of (code, multiplier)."""
+    decimals = _MULT_DECIMALS[np.searchsorted(_MULT_BREAKS, mults, side="right")]
+    decimals = np.where(codes == ENERGY_NEGLIGIBLE, 0, decimals)
+    quantized = np.rint(mults * 10.0**decimals).astype(np.int64)
+    keys = np.stack([codes.astype(np.int64), decimals, quantized], axis=1)
+    return _fan_out(keys, _energy_text)
+
+
+def size_labels(codes: np.ndarray, diameter_km: np.ndarray) -> list[str]:
+    """Formatted size comparisons for a batch of (code, diameter)."""
+    scale = np.where(codes == SIZE_MASSIVE, 10.0, 10_000.0)
+    quantized = np.rint(np.asarray(diameter_km, dtype=float) * scale).astype(np.int64)
+    keys = np.stack([codes.astype(np.int64), quantized], axis=1)
+    return _fan_out(keys, _size_text)
+
+
+def label_tables() -> dict:
+    """Code → description tables for clients that localise labels."""
+    return {
+        "energy": {
+            "negligible_code": ENERGY_NEGLIGIBLE,
+            "events": [
+                {"code": i, "name": name, "energy_mt": float(mt)}
+                for i, (name, mt) in enumerate(zip(EVENT_NAMES, EVENT_ENERGIES_MT))
+            ],
+        },
+        "size": {
+            "massive_code": SIZE_MASSIVE,
+            "classes": [
+                {"code": i, "description": desc, "max_diameter_km": float(t)}
+                for i, (desc, t) in enumerate(zip(SIZE_DESCRIPTIONS, SIZE_THRESHOLDS_KM))
+            ],
+        },
+    }
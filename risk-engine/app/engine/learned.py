@@ -0,0 +1,117 @@
+"""
+Learned risk model (scikit-learn).
+
+A gradient-boosted classifier trained offline (app.train_model) on
+historical assessments, labelled by Sentry outcomes: whether the object
+ended up on the Sentry impact-monitoring list.  Its probability for the
+positive class, × 100, is reported as ``learned_score`` next to the
+rule-based risk score.
+
+The model file is an uncompressed joblib pickle, so it can be loaded
+with ``mmap_mode="r"``: the tree arrays stay in the page cache and are
+shared by every worker process.  Inference is one predict_proba call
+over the batch feature matrix.
+"""
+
+import hashlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import joblib
+import numpy as np
+
+from app.engine.numeric import round_exact
+
+if TYPE_CHECKING:
+    from app.engine.batch import BatchInputs, BatchOutputs
+
+# Column order of the feature matrix; stored with the model and checked on load
+FEATURE_NAMES: tuple[str, ...] = (
+    "hazardous",
+    "log10_diameter_km",
+    "log10_miss_distance_lunar",
+    "velocity_km_s",
+    "log10_kinetic_energy_mt",
+    "log10_impact_probability",
+    "moid_au",  # NaN when unknown
+    "orbit_uncertainty",  # NaN when unknown
+    "approach_count",
+)
+
+_LOG_FLOOR = 1e-30
+
+
+@dataclass
+class LearnedModel:
+    """A fitted classifier plus what is needed to use and identify it."""
+
+    estimator: Any  # fitted scikit-learn classifier with predict_proba
+    feature_names: tuple[str, ...] = FEATURE_NAMES
+    version: str = ""
+    metadata: dict = field(default_factory=dict)  # training set size, metrics, …
+
+    def predict_scores(self, features: np.ndarray) -> np.ndarray:
+        """Positive-class probability × 100 (1 dp) for an (n, k) feature matrix."""
+        if len(features) == 0:
+            return np.empty(0)
+        proba = self.estimator.predict_proba(features)[:, 1]
+        return round_exact(proba * 100, 1)
+
+
+def _log10(values: np.ndarray) -> np.ndarray:
+    return np.log10(np.maximum(values, _LOG_FLOOR))
+
+
+def feature_matrix(inputs: "BatchInputs", outputs: "BatchOutputs") -> np.ndarray:
+    """(n, len(FEATURE_NAMES)) features from batch inputs and outputs."""
+    return np.column_stack([
+        inputs.hazardous.astype(float),
+        _log10(inputs.diameter_max_km),
+        _log10(inputs.miss_distance_lunar),
+        inputs.velocity_km_s,
+        _log10(outputs.kinetic_energy_mt),
+        _log10(outputs.impact_probability),
+        inputs.moid_au,
+        inputs.orbit_uncertainty,
+        inputs.approach_count.astype(float),
+    ])
+
+
+def save_learned_model(model: LearnedModel, path: str | Path) -> None:
+    """Write an uncompressed joblib file (compression would prevent mmap)."""
+    joblib.dump(
+        {
+            "estimator": model.estimator,
+            "feature_names": list(model.feature_names),
+            "metadata": model.metadata,
+        },
+        path,
+    )
+
+
+def load_learned_model(path: str | Path) -> LearnedModel:
+    """
+    Load a model file with its arrays memory-mapped read-only.
+
+    Raises ValueError if the file was trained on different features.
+    """
+    path = Path(path)
+    payload = joblib.load(path, mmap_mode="r")
+    names = tuple(payload.get("feature_names", ()))
+    if names != FEATURE_NAMES:
+        raise ValueError(
+            f"{path.name} was trained on features {list(names)}, expected {list(FEATURE_NAMES)}"
+        )
+
+    h = hashlib.blake2b(digest_size=6)
+    with path.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            h.update(chunk)
+
+    return LearnedModel(
+        estimator=payload["estimator"],
+        feature_names=names,
+        version=h.hexdigest(),
+        metadata=payload.get("metadata", {}),
+    )
@@ -0,0 +1,28 @@
+"""Helpers shared by the batch (array) code paths."""
+
+import numpy as np
+
+
+def round_exact(values: np.ndarray, ndigits: int) -> np.ndarray:
+    """
+    Round like Python's built-in ``round``.
+
+    ``np.round`` scales, rounds half-to-even and rescales, which disagrees
+    with ``round`` on values such as 35.85 (stored as 35.8500…01).  Scores
+    are sums of 2-dp points, so such ties are common; values close to a
+    tie go through ``round`` so batch results match the scalar path.
+    """
+    values = np.asarray(values, dtype=float)
+    scaled = values * 10.0**ndigits
+    result = np.round(values, ndigits)
+
+    near_tie = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) < 1e-6
+    if near_tie.any():
+        idx = np.nonzero(near_tie)
+        result[idx] = [round(v, ndigits) for v in values[idx].tolist()]
+    return result
+
+
+def optional_list(values: np.ndarray) -> list:
+    """Values as a list, NaN as None."""
+    return np.where(np.isnan(values), None, values).tolist()
@@ -15,9 +15,8 @@ from app.engine.constants import (
     V_ESCAPE_M_S,
     AU_KM,
     DEFAULT_ALBEDO,
-    KNOWN_EVENTS,
-    SIZE_COMPARISONS,
 )
+from app.engine.labels import energy_text, size_text
 
 
 # ── Diameter from Absolute Magnitude ─────────────────────────
@@ -128,37 +127,75 @@ def estimate_impact_probability(
     return max(1e-15, min(1.0, prob))
 
 
+# ── Batch (array) Variants ───────────────────────────────
+# Same formulas as the scalar functions above, evaluated over whole
+# batches.  Optional inputs use NaN for "not available".
+def estimate_mass_array(
+    diameter_km: np.ndarray, density: float = AVG_DENSITY_KG_M3
+) -> np.ndarray:
+    radius_m = (diameter_km * 1000) / 2
+    volume_m3 = (4 / 3) * np.pi * radius_m**3
+    return volume_m3 * density
+
+
+def kinetic_energy_joules_array(
+    mass_kg: np.ndarray, velocity_km_s: np.ndarray
+) -> np.ndarray:
+    v_m_s = velocity_km_s * 1000
+    return 0.5 * mass_kg * v_m_s**2
+
+
+def estimate_impact_probability_array(
+    miss_distance_km: np.ndarray,
+    velocity_km_s: np.ndarray,
+    moid_au: np.ndarray,
+    orbit_uncertainty: np.ndarray,
+) -> np.ndarray:
+    """Vectorized estimate_impact_probability (MOID and geometric paths)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        focusing = np.where(
+            velocity_km_s > 0, 1 + (V_ESCAPE_KM_S / velocity_km_s) ** 2, 1.0
+        )
+    r_eff_km = EARTH_RADIUS_KM * np.sqrt(focusing)
+
+    # ── MOID-based calculation (preferred) ───────────────
+    moid_km = moid_au * AU_KM
+    moid_prob = np.select(
+        [
+            moid_km <= r_eff_km,
+            moid_km < 0.002 * AU_KM,
+            moid_km < 0.05 * AU_KM,
+        ],
+        [
+            0.5,
+            np.exp(-0.5 * ((moid_km - r_eff_km) / (r_eff_km * 10)) ** 2),
+            1e-6 * np.exp(-moid_km / (0.01 * AU_KM)),
+        ],
+        1e-12,
+    )
+    has_ou = ~np.isnan(orbit_uncertainty)
+    moid_prob = np.where(
+        has_ou, moid_prob * (1.0 + 0.5 * np.where(has_ou, orbit_uncertainty, 0)), moid_prob
+    )
+
+    # ── Geometric cross-section fallback ─────────────────
+    sigma = r_eff_km * 5
+    geo_prob = np.where(
+        miss_distance_km <= r_eff_km,
+        1.0,
+        np.exp(-0.5 * (miss_distance_km / sigma) ** 2),
+    )
+
+    use_moid = moid_au >= 0  # False for NaN
+    return np.clip(np.where(use_moid, moid_prob, geo_prob), 1e-15, 1.0)
+
+
 # ── Comparisons ──────────────────────────────────────────────
 def energy_comparison(energy_mt: float) -> str:
-    """Compare kinetic energy to known events."""
-    if energy_mt <= 0:
-        return "negligible"
-
-    closest_name = ""
-    closest_ratio = float("inf")
-    closest_mult = 1.0
-
-    for name, event_mt in KNOWN_EVENTS.items():
-        ratio = energy_mt / event_mt
-        log_diff = abs(math.log10(max(ratio, 1e-30)))
-        if log_diff < closest_ratio:
-            closest_ratio = log_diff
-            closest_name = name
-            closest_mult = ratio
-
-    if closest_mult < 0.01:
-        return f"~{closest_mult:.4f}× {closest_name}"
-    elif closest_mult < 1:
-        return f"~{closest_mult:.2f}× {closest_name}"
-    elif closest_mult < 100:
-        return f"~{closest_mult:.1f}× {closest_name}"
-    else:
-        return f"~{closest_mult:.0f}× {closest_name}"
+    """Compare kinetic energy to known events (see labels.py)."""
+    return energy_text(energy_mt)
 
 
 def size_comparison(diameter_km: float) -> str:
-    """Human-friendly size comparison."""
-    for threshold, description in SIZE_COMPARISONS:
-        if diameter_km <= threshold:
-            return f"~size of {description} ({diameter_km*1000:.1f}m)"
-    return f"~{diameter_km:.1f} km across (massive)"
+    """Human-friendly size comparison (see labels.py)."""
+    return size_text(diameter_km)
@@ -0,0 +1,202 @@
+"""
+Field projection and columnar encoding for batch analysis responses.
+
+A projection is parsed from a comma-separated ``fields`` list such as
+``asteroid_id,risk_score,score_breakdown.diameter_points,statistics.max_risk_score``.
+Unlisted fields are dropped; stages whose outputs are all dropped (the
+label stage, learned-model inference, impact effects, statistics) are
+skipped by analyze_inputs altogether, and a projection naming an
+impact-effect field runs that stage even without ``impact_effects``.
+
+Columnar output returns one array per field instead of one object per
+assessment, so field names are written once per response.
+"""
+
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Optional
+
+from app.models import (
+    RiskAnalysisResponse,
+    RiskAssessment,
+    RiskStatistics,
+    ScoreBreakdown,
+)
+from app.engine.effects import EFFECT_FIELDS
+
+ASSESSMENT_FIELDS: tuple[str, ...] = tuple(
+    f for f in RiskAssessment.model_fields if f != "score_breakdown"
+)
+BREAKDOWN_FIELDS: tuple[str, ...] = tuple(ScoreBreakdown.model_fields)
+STATISTICS_FIELDS: tuple[str, ...] = tuple(RiskStatistics.model_fields)
+
+LABEL_FIELDS = frozenset({
+    "impact_energy_comparison",
+    "relative_size",
+    "energy_comparison_code",
+    "energy_comparison_multiplier",
+    "size_comparison_code",
+})
+IMPACT_EFFECT_FIELDS = frozenset(EFFECT_FIELDS)
+
+
+class ResponseFormat(str, Enum):
+    RECORDS = "records"
+    COLUMNAR = "columnar"
+
+
+@dataclass(frozen=True)
+class FieldProjection:
+    """Selected assessment, score-breakdown and statistics fields."""
+
+    assessment: tuple[str, ...] = ASSESSMENT_FIELDS
+    breakdown: tuple[str, ...] = BREAKDOWN_FIELDS
+    statistics: tuple[str, ...] = STATISTICS_FIELDS
+
+    @classmethod
+    def parse(cls, fields: Optional[str]) -> "FieldProjection":
+        """
+        Parse a ``fields=`` parameter.  ``None`` selects everything.
+
+        Raises ValueError listing any unknown field names.
+        """
+        if fields is None:
+            return cls()
+
+        assessment: set[str] = set()
+        breakdown: set[str] = set()
+        statistics: set[str] = set()
+        unknown: list[str] = []
+
+        for raw in fields.split(","):
+            name = raw.strip()
+            if not name:
+                continue
+            head, _, sub = name.partition(".")
+            if head == "score_breakdown":
+                if not sub:
+                    breakdown.update(BREAKDOWN_FIELDS)
+                elif sub in BREAKDOWN_FIELDS:
+                    breakdown.add(sub)
+                else:
+                    unknown.append(name)
+            elif head == "statistics":
+                if not sub:
+                    statistics.update(STATISTICS_FIELDS)
+                elif sub in STATISTICS_FIELDS:
+                    statistics.add(sub)
+                else:
+                    unknown.append(name)
+            elif not sub and head in ASSESSMENT_FIELDS:
+                assessment.add(head)
+            else:
+                unknown.append(name)
+
+        if unknown:
+            raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+
+        # Keep model order so records and columns are stable
+        return cls(
+            assessment=tuple(f for f in ASSESSMENT_FIELDS if f in assessment),
+            breakdown=tuple(f for f in BREAKDOWN_FIELDS if f in breakdown),
+            statistics=tuple(f for f in STATISTICS_FIELDS if f in statistics),
+        )
+
+    @classmethod
+    def all_fields(cls, effects: bool = True) -> "FieldProjection":
+        """Every field; the impact-effect fields only with ``effects``."""
+        if effects:
+            return cls()
+        return cls(assessment=tuple(f for f in ASSESSMENT_FIELDS if f not in IMPACT_EFFECT_FIELDS))
+
+    @property
+    def needs_labels(self) -> bool:
+        return not LABEL_FIELDS.isdisjoint(self.assessment)
+
+    @property
+    def needs_learned(self) -> bool:
+        return "learned_score" in self.assessment
+
+    @property
+    def needs_effects(self) -> bool:
+        return not IMPACT_EFFECT_FIELDS.isdisjoint(self.assessment)
+
+    @property
+    def needs_statistics(self) -> bool:
+        return bool(self.statistics)
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    return value.value if isinstance(value, Enum) else value
+
+
+def _records(
+    assessments: list[RiskAssessment], projection: FieldProjection
+) -> list[dict]:
+    fields = projection.assessment
+    sub_fields = projection.breakdown
+    records = []
+    for a in assessments:
+        rec = {f: _plain(getattr(a, f)) for f in fields}
+        if sub_fields:
+            bd = a.score_breakdown
+            rec["score_breakdown"] = {f: getattr(bd, f) for f in sub_fields}
+        records.append(rec)
+    return records
+
+
+def _columns(
+    assessments: list[RiskAssessment], projection: FieldProjection
+) -> dict[str, Any]:
+    columns: dict[str, Any] = {
+        f: [_plain(getattr(a, f)) for a in assessments] for f in projection.assessment
+    }
+    if projection.breakdown:
+        breakdowns = [a.score_breakdown for a in assessments]
+        columns["score_breakdown"] = {
+            f: [getattr(bd, f) for bd in breakdowns] for f in projection.breakdown
+        }
+    return columns
+
+
+def project_response(
+    result: RiskAnalysisResponse,
+    projection: FieldProjection,
+    fmt: ResponseFormat = ResponseFormat.RECORDS,
+) -> dict:
+    """Build a plain-dict response containing only the projected fields."""
+    body: dict[str, Any] = {
+        "success": result.success,
+        "message": result.message,
+        "engine": result.engine,
+        "format": fmt.value,
+        "total_analyzed": result.total_analyzed,
+        "date_range": result.date_range,
+        "as_of": result.as_of,
+        "learned_model": result.learned_model,
+        "result_handle": result.result_handle,
+        # best_effort cut short: message says how many of the objects were done
+        "partial": result.partial,
+    }
+
+    if projection.needs_statistics and result.statistics is not None:
+        stats = result.statistics.model_dump(include=set(projection.statistics))
+        body["statistics"] = stats
+    if result.extended_statistics is not None:
+        body["extended_statistics"] = result.extended_statistics.model_dump()
+    if result.model_statistics is not None:
+        body["model_statistics"] = {
+            name: s.model_dump(mode="json") for name, s in result.model_statistics.items()
+        }
+
+    if fmt == ResponseFormat.COLUMNAR:
+        body["assessments"] = _columns(result.assessments, projection)
+    else:
+        body["assessments"] = _records(result.assessments, projection)
+
+    if result.diff is not None:
+        body["diff"] = result.diff.model_dump(mode="json")
+
+    return body
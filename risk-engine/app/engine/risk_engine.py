@@ -7,20 +7,34 @@
  - scales: Torino & Palermo computation
  - scoring: multi-factor weighted scoring
  - assessment: single & sentry-enhanced assessment
+ - sentry: batch sentry-enhanced assessment
  - analysis: batch analysis with statistics
+ - shards: one shard of a sharded batch, and the merge
+ - sensitivity: score sensitivity to perturbed inputs
+ - deflection: deflection what-if scenario grids
 ═══════════════════════════════════════════════════════════════
 """
 
-from typing import Optional
+from typing import Optional, Sequence
+
+import numpy as np
 
 from app.models import (
+    DeflectionDirection,
+    DeflectionField,
+    DeflectionResponse,
+    LabelMode,
     NeoObject,
+    ExplanationResponse,
+    ResultMode,
     RiskAssessment,
     RiskLevel,
     ScoreBreakdown,
     RiskAnalysisResponse,
     SentryData,
     SentryEnhancedAssessment,
+    SentryBatchResponse,
+    SensitivityFactor,
 )
 from app.engine.physics import (
     estimate_mass,
@@ -31,9 +45,18 @@ from app.engine.physics import (
     estimate_impact_probability,
 )
 from app.engine.scales import compute_torino_scale, compute_palermo_scale
-from app.engine.scoring import compute_score_breakdown, get_risk_level
+from app.engine.scoring import ScoringModel, compute_score_breakdown, get_risk_level
 from app.engine.assessment import assess_single, assess_with_sentry
-from app.engine.analysis import analyze_batch
+from app.engine.analysis import BatchObserver, approach_counts
+from app.engine.cancellation import CancelToken
+from app.engine.deflection import deflection_scenarios
+from app.engine.learned import LearnedModel
+from app.engine.batch import BatchInputs, extract_inputs
+from app.engine.incremental import ResultSnapshot, analyze_inputs
+from app.engine.projection import FieldProjection
+from app.engine.sensitivity import explain_inputs
+from app.engine.sentry import assess_sentry_batch, join_sentry_table
+from app.engine.shards import analyze_shard, merge_shards
 
 
 class RiskEngine:
@@ -71,11 +94,126 @@ class RiskEngine:
     ) -> Optional[SentryEnhancedAssessment]:
         return assess_with_sentry(asteroid, sentry_data)
 
+    @classmethod
+    def assess_sentry_batch(
+        cls,
+        pairs: list[tuple[NeoObject, SentryData]],
+        unmatched: Optional[list[str]] = None,
+    ) -> SentryBatchResponse:
+        return assess_sentry_batch(pairs, unmatched)
+
+    join_sentry_table = staticmethod(join_sentry_table)
+
     # ── Batch Analysis ───────────────────────────────────────
     @classmethod
     def analyze_batch(
         cls,
         asteroids: list[NeoObject],
         date_range: Optional[dict] = None,
+        labels: LabelMode = LabelMode.TEXT,
+        projection: Optional[FieldProjection] = None,
+        *,
+        as_of: Optional[np.ndarray] = None,
+        models: Sequence[ScoringModel] = (),
+        learned: Optional[LearnedModel] = None,
+        cancel: Optional[CancelToken] = None,
+        best_effort: bool = False,
+        extended: bool = False,
+        effects: bool = False,
     ) -> RiskAnalysisResponse:
-        return analyze_batch(asteroids, date_range)
+        """analyze_inputs for a list of NeoObjects, without a previous result."""
+        response, _ = analyze_inputs(
+            extract_inputs(asteroids, approach_counts(asteroids)),
+            len(asteroids),
+            date_range,
+            labels,
+            projection,
+            as_of=as_of,
+            models=models,
+            learned=learned,
+            cancel=cancel,
+            best_effort=best_effort,
+            extended=extended,
+            effects=effects,
+        )
+        return response
+
+    @classmethod
+    def analyze_inputs(
+        cls,
+        inputs: BatchInputs,
+        size: int,
+        date_range: Optional[dict] = None,
+        labels: LabelMode = LabelMode.TEXT,
+        projection: Optional[FieldProjection] = None,
+        *,
+        previous: Optional[ResultSnapshot] = None,
+        previous_handle: Optional[str] = None,
+        result_mode: ResultMode = ResultMode.FULL,
+        as_of: Optional[np.ndarray] = None,
+        models: Sequence[ScoringModel] = (),
+        learned: Optional[LearnedModel] = None,
+        cancel: Optional[CancelToken] = None,
+        best_effort: bool = False,
+        observe: Optional[BatchObserver] = None,
+        extended: bool = False,
+        effects: bool = False,
+    ) -> tuple[RiskAnalysisResponse, Optional[ResultSnapshot]]:
+        return analyze_inputs(
+            inputs,
+            size,
+            date_range,
+            labels,
+            projection,
+            previous=previous,
+            previous_handle=previous_handle,
+            result_mode=result_mode,
+            as_of=as_of,
+            models=models,
+            learned=learned,
+            cancel=cancel,
+            best_effort=best_effort,
+            observe=observe,
+            extended=extended,
+            effects=effects,
+        )
+
+    # ── Sharded Batches ──────────────────────────────────────
+    analyze_shard = staticmethod(analyze_shard)
+    merge_shards = staticmethod(merge_shards)
+
+    # ── Sensitivity ──────────────────────────────────────────
+    @classmethod
+    def explain_inputs(
+        cls,
+        inputs: BatchInputs,
+        factors: Sequence[SensitivityFactor] = tuple(SensitivityFactor),
+        multipliers: Sequence[float] = (0.5, 0.75, 0.9, 1.1, 1.25, 1.5, 2.0),
+        *,
+        as_of: Optional[np.ndarray] = None,
+        cancel: Optional[CancelToken] = None,
+    ) -> ExplanationResponse:
+        return explain_inputs(inputs, factors, multipliers, as_of=as_of, cancel=cancel)
+
+    # ── Deflection Scenarios ─────────────────────────────────
+    @classmethod
+    def deflection_scenarios(
+        cls,
+        inputs: BatchInputs,
+        delta_v_mm_s: Sequence[float],
+        lead_time_days: Sequence[float],
+        directions: Sequence[DeflectionDirection] = (DeflectionDirection.ALONG_TRACK,),
+        fields: Sequence[DeflectionField] = tuple(DeflectionField),
+        *,
+        as_of: Optional[np.ndarray] = None,
+        cancel: Optional[CancelToken] = None,
+    ) -> DeflectionResponse:
+        return deflection_scenarios(
+            inputs,
+            delta_v_mm_s,
+            lead_time_days,
+            directions,
+            fields,
+            as_of=as_of,
+            cancel=cancel,
+        )
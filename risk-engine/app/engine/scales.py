@@ -13,7 +13,10 @@ Reference:
 
 import math
 
+import numpy as np
+
 from app.engine.constants import MT_JOULES, KT_JOULES
+from app.engine.numeric import round_exact
 
 
 # ── Energy thresholds (Joules) for the Torino grid ─────────────
@@ -22,6 +25,10 @@ from app.engine.constants import MT_JOULES, KT_JOULES
 E1_MT = 1.0
 E2_MT = 1_000.0
 
+# Default ΔT when no per-object approach window is used
+DEFAULT_WINDOW_YEARS = 50.0
+YEAR_MS = 365.25 * 86_400_000
+
 # Background impact probability at a given energy (annualised):
 #   P_bg(E) ≈ 0.03 × E_MT^{-0.8}     (E in megatons)
 #
@@ -63,8 +70,10 @@ def compute_torino_scale(
     ║  5-7  ║ Threatening.                                     ║
     ║ 8-10  ║ Certain collisions.                              ║
     ╚═══════╩═══════════════════════════════════════════════════╝
+
+    A window of ΔT ≤ 0 (the approach is already past) is no hazard.
     """
-    if impact_prob <= 0 or kinetic_energy_mt <= 0:
+    if impact_prob <= 0 or kinetic_energy_mt <= 0 or time_years <= 0:
         return 0
 
     pi = impact_prob
@@ -129,3 +138,76 @@ def compute_palermo_scale(
     """
     val = _palermo(impact_prob, kinetic_energy_mt, time_years)
     return round(max(-10.0, min(10.0, val)), 3)
+
+
+# ── Batch (array) Variants ───────────────────────────────────
+def window_years(approach_epoch: np.ndarray, as_of: np.ndarray) -> np.ndarray:
+    """
+    Per-object ΔT in years for each reference time.
+
+    ``approach_epoch`` is datetime64 (n,), ``as_of`` datetime64 (k,);
+    returns (k, n).  Approaches already past give ΔT ≤ 0, which the
+    scales treat as no hazard (Palermo −10, Torino 0).  Unknown epochs
+    (NaT) fall back to DEFAULT_WINDOW_YEARS.
+    """
+    approach_ms = approach_epoch.astype("datetime64[ms]")
+    as_of_ms = np.asarray(as_of).astype("datetime64[ms]")
+    delta = (approach_ms[None, :] - as_of_ms[:, None]).astype(np.float64)
+    years = delta / YEAR_MS
+    return np.where(np.isnat(approach_ms)[None, :], DEFAULT_WINDOW_YEARS, years)
+
+
+def _palermo_array(
+    pi: np.ndarray, e_mt: np.ndarray, dt: np.ndarray | float
+) -> np.ndarray:
+    valid = (pi > 0) & (e_mt > 0) & (np.asarray(dt) > 0)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        f_bg = 0.03 * np.where(e_mt > 0, e_mt, 1.0) ** -0.8
+        raw = np.log10(pi / (f_bg * dt))
+    return np.where(valid & np.isfinite(raw), raw, -100.0)
+
+
+def compute_torino_scale_array(
+    impact_prob: np.ndarray,
+    kinetic_energy_mt: np.ndarray,
+    *,
+    time_years: np.ndarray | float = DEFAULT_WINDOW_YEARS,
+) -> np.ndarray:
+    """Vectorized compute_torino_scale (same decision logic, int array)."""
+    pi = impact_prob
+    e = kinetic_energy_mt
+    p = _palermo_array(pi, e, time_years)
+
+    # 0 → below E1, 1 → E1..E2, 2 → ≥ E2
+    energy_band = (e >= E1_MT).astype(np.int64) + (e >= E2_MT)
+
+    # Inputs may be (n,) with a (k, n) window grid — broadcast them all
+    pi, e, p, energy_band, dt = np.broadcast_arrays(pi, e, p, energy_band, time_years)
+    torino = np.select(
+        [
+            (pi <= 0) | (e <= 0) | (dt <= 0),
+            pi >= 0.99,
+            p < -2,
+            pi >= 0.01,
+            pi >= 1e-4,
+        ],
+        [
+            0,
+            8 + energy_band,
+            0,
+            5 + energy_band,
+            2 + energy_band,
+        ],
+        1,
+    )
+    return torino.astype(np.int64)
+
+
+def compute_palermo_scale_array(
+    impact_prob: np.ndarray,
+    kinetic_energy_mt: np.ndarray,
+    time_years: np.ndarray | float = DEFAULT_WINDOW_YEARS,
+) -> np.ndarray:
+    """Vectorized compute_palermo_scale (clamped to ±10, 3 dp)."""
+    val = _palermo_array(impact_prob, kinetic_energy_mt, time_years)
+    return round_exact(np.clip(val, -10.0, 10.0), 3)
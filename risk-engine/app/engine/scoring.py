@@ -4,12 +4,34 @@ Multi-factor weighted risk scoring system.
 Accepts real orbital uncertainty from NASA orbital_data when available.
 """
 
+import bisect
 import math
+from dataclasses import dataclass
+
 import numpy as np
 
 from app.engine.constants import LUNAR_DISTANCE_KM
+from app.engine.numeric import round_exact
 from app.models import ScoreBreakdown, RiskLevel
 
+# Column order of the score matrix returned by compute_score_matrix
+SCORE_FACTORS: tuple[str, ...] = (
+    "hazardous_points",
+    "diameter_points",
+    "miss_distance_points",
+    "velocity_points",
+    "kinetic_energy_points",
+    "orbital_uncertainty_points",
+)
+
+# Risk levels in code order (see ScoringModel.level_codes)
+RISK_LEVELS: tuple[RiskLevel, ...] = (
+    RiskLevel.LOW,
+    RiskLevel.MEDIUM,
+    RiskLevel.HIGH,
+    RiskLevel.CRITICAL,
+)
+
 
 def compute_score_breakdown(
     is_hazardous: bool,
@@ -22,7 +44,9 @@ def compute_score_breakdown(
     moid_au: float | None = None,
 ) -> ScoreBreakdown:
     """
-    Multi-factor risk scoring using NumPy.
+    Multi-factor risk scoring under DEFAULT_MODEL, in plain Python
+    (ScoringModel.scalar_points) with the same weights and bands as the
+    batch compute_score_matrix.
 
     Factor weights:
     - Hazardous flag:        15 pts (NASA classification)
@@ -42,80 +66,301 @@ def compute_score_breakdown(
         Minimum Orbit Intersection Distance in AU (from orbital_data).
         Used as a secondary signal for the distance score.
     """
-    # 1. Hazardous flag: 0 or 15
-    hazardous_pts = 15.0 if is_hazardous else 0.0
-
-    # 2. Diameter: log-scaled (1m = 0pts, 10km = 20pts)
-    diam_log = math.log10(max(diameter_km, 0.0001))
-    diam_pts = float(np.clip((diam_log + 3) / 4 * 20, 0, 20))
-
-    # 3. Miss distance: inverse relationship (closer = higher)
-    lunar_dist = miss_distance_km / LUNAR_DISTANCE_KM
-    if lunar_dist <= 0.5:
-        dist_pts = 25.0
-    elif lunar_dist <= 1:
-        dist_pts = 22.0
-    elif lunar_dist <= 3:
-        dist_pts = 18.0
-    elif lunar_dist <= 5:
-        dist_pts = 15.0
-    elif lunar_dist <= 10:
-        dist_pts = 12.0
-    elif lunar_dist <= 20:
-        dist_pts = 8.0
-    elif lunar_dist <= 50:
-        dist_pts = 4.0
-    else:
-        dist_pts = float(np.clip(4 * math.exp(-0.02 * (lunar_dist - 50)), 0, 4))
-
-    # Bonus: if MOID is very small, boost distance score
-    if moid_au is not None and moid_au < 0.05:
-        moid_bonus = (0.05 - moid_au) / 0.05 * 3  # up to 3 bonus pts
-        dist_pts = min(25.0, dist_pts + moid_bonus)
-
-    # 4. Velocity: normalized to typ. NEO speed (~15 km/s avg, up to 72 km/s)
-    vel_norm = velocity_km_s / 72.0
-    vel_pts = float(np.clip(vel_norm * 15, 0, 15))
-
-    # 5. Kinetic energy: log-scaled (covers huge range)
-    if kinetic_energy_mt > 0:
-        ke_log = math.log10(kinetic_energy_mt)
-        ke_pts = float(np.clip((ke_log + 6) / 11 * 15, 0, 15))
-    else:
-        ke_pts = 0.0
-
-    # 6. Orbital uncertainty: use real NASA value when available
-    if orbit_uncertainty is not None:
-        # NASA orbit condition code: 0 (best) → 9 (worst).
-        # Higher uncertainty → higher risk score (we know less).
-        orbit_pts = float(np.clip(orbit_uncertainty / 9 * 10, 0, 10))
-    else:
-        # Fallback: estimate from proximity
-        if lunar_dist < 1:
-            orbit_pts = 10.0
-        elif lunar_dist < 5:
-            orbit_pts = 7.0
-        elif lunar_dist < 20:
-            orbit_pts = 4.0
-        else:
-            orbit_pts = 1.0
-
-    return ScoreBreakdown(
-        hazardous_points=round(hazardous_pts, 2),
-        diameter_points=round(diam_pts, 2),
-        miss_distance_points=round(dist_pts, 2),
-        velocity_points=round(vel_pts, 2),
-        kinetic_energy_points=round(ke_pts, 2),
-        orbital_uncertainty_points=round(orbit_pts, 2),
+    points = DEFAULT_MODEL.scalar_points(
+        is_hazardous,
+        diameter_km,
+        miss_distance_km,
+        velocity_km_s,
+        kinetic_energy_mt,
+        orbit_uncertainty=orbit_uncertainty,
+        moid_au=moid_au,
     )
+    return ScoreBreakdown(**dict(zip(SCORE_FACTORS, points)))
 
 
 def get_risk_level(score: float) -> RiskLevel:
-    """Map numeric score to risk level category."""
-    if score >= 75:
-        return RiskLevel.CRITICAL
-    elif score >= 50:
-        return RiskLevel.HIGH
-    elif score >= 25:
-        return RiskLevel.MEDIUM
-    return RiskLevel.LOW
+    """Map numeric score to risk level category (DEFAULT_MODEL cutoffs)."""
+    return RISK_LEVELS[DEFAULT_MODEL.level_code(score)]
+
+
+# ── Scoring Models ───────────────────────────────────────────
+@dataclass(frozen=True)
+class ScoringModel:
+    """
+    Weights and bands of the 6-factor score.
+
+    The defaults (DEFAULT_MODEL) are the built-in score, used by
+    compute_score_breakdown and get_risk_level too; other models (see
+    app.services.scoring_registry) re-weight the same factors.
+    """
+
+    name: str = "default"
+    version: str = "builtin"
+    description: str = "Built-in 6-factor model (15/20/25/15/15/10)"
+
+    hazardous_points: float = 15.0
+    # Diameter: log10(km) from lo (0 pts) to hi (full points)
+    diameter_points: float = 20.0
+    diameter_log_range: tuple[float, float] = (-3.0, 1.0)
+    # Miss distance: lunar-distance ladder (≤ threshold → points), then an
+    # exponential tail from the last band; MOID bonus up to the factor cap
+    miss_distance_points: float = 25.0
+    ld_thresholds: tuple[float, ...] = (0.5, 1, 3, 5, 10, 20, 50)
+    ld_points: tuple[float, ...] = (25.0, 22.0, 18.0, 15.0, 12.0, 8.0, 4.0)
+    ld_tail_decay: float = 0.02
+    moid_bonus_au: float = 0.05
+    moid_bonus_points: float = 3.0
+    velocity_points: float = 15.0
+    velocity_max_km_s: float = 72.0
+    kinetic_energy_points: float = 15.0
+    kinetic_energy_log_range: tuple[float, float] = (-6.0, 5.0)
+    # Orbital uncertainty: condition code 0-9, else proximity fallback
+    orbital_uncertainty_points: float = 10.0
+    uncertainty_fallback_ld: tuple[float, ...] = (1, 5, 20)
+    uncertainty_fallback_points: tuple[float, ...] = (10.0, 7.0, 4.0, 1.0)
+    # Score cutoffs for MEDIUM / HIGH / CRITICAL
+    risk_level_cutoffs: tuple[float, float, float] = (25.0, 50.0, 75.0)
+
+    def __post_init__(self) -> None:
+        if len(self.ld_points) != len(self.ld_thresholds) or not self.ld_points:
+            raise ValueError("ld_points and ld_thresholds must have the same, non-zero length")
+        if len(self.uncertainty_fallback_points) != len(self.uncertainty_fallback_ld) + 1:
+            raise ValueError("uncertainty_fallback_points needs one more entry than uncertainty_fallback_ld")
+        if len(self.risk_level_cutoffs) != len(RISK_LEVELS) - 1:
+            raise ValueError(f"risk_level_cutoffs needs {len(RISK_LEVELS) - 1} values")
+        for name in ("ld_thresholds", "uncertainty_fallback_ld", "risk_level_cutoffs"):
+            values = getattr(self, name)
+            if any(b <= a for a, b in zip(values, values[1:])):
+                raise ValueError(f"{name} must be strictly increasing")
+        for name in ("diameter_log_range", "kinetic_energy_log_range"):
+            lo, hi = getattr(self, name)
+            if hi <= lo:
+                raise ValueError(f"{name} must be (low, high) with low < high")
+        if self.velocity_max_km_s <= 0 or self.moid_bonus_au <= 0:
+            raise ValueError("velocity_max_km_s and moid_bonus_au must be positive")
+
+    @classmethod
+    def from_config(cls, config: dict, *, version: str) -> "ScoringModel":
+        """Build a model from a config mapping; unset fields keep the defaults."""
+        fields = cls.__dataclass_fields__
+        unknown = set(config) - set(fields)
+        if unknown:
+            raise ValueError(f"Unknown scoring model field(s): {', '.join(sorted(unknown))}")
+        values = {}
+        for key, value in config.items():
+            default = fields[key].default
+            if isinstance(default, tuple):
+                values[key] = tuple(float(x) for x in value)
+            elif isinstance(default, float):
+                values[key] = float(value)
+            else:
+                values[key] = str(value)
+        values["version"] = version
+        return cls(**values)
+
+    def points(self, features: "ScoreFeatures") -> np.ndarray:
+        """(n, 6) points matrix in SCORE_FACTORS order, rounded to 2 dp."""
+        f = features
+        points = np.empty((len(f.lunar_dist), len(SCORE_FACTORS)))
+
+        # 1. Hazardous flag
+        points[:, 0] = np.where(f.is_hazardous, self.hazardous_points, 0.0)
+
+        # 2. Diameter (log-scaled)
+        lo, hi = self.diameter_log_range
+        w = self.diameter_points
+        points[:, 1] = np.clip((f.diameter_log - lo) / (hi - lo) * w, 0, w)
+
+        # 3. Miss distance ladder + exponential tail + MOID bonus
+        thresholds = np.asarray(self.ld_thresholds, dtype=float)
+        ladder = np.asarray(self.ld_points, dtype=float)
+        cap = self.miss_distance_points
+        band = np.searchsorted(thresholds, f.lunar_dist, side="left")
+        last = ladder[-1]
+        tail = np.clip(last * np.exp(-self.ld_tail_decay * (f.lunar_dist - thresholds[-1])), 0, last)
+        dist_pts = np.where(
+            band < len(ladder), ladder[np.minimum(band, len(ladder) - 1)], tail
+        )
+        has_bonus = f.moid_au < self.moid_bonus_au  # False for NaN
+        moid_bonus = np.where(
+            has_bonus,
+            (self.moid_bonus_au - f.moid_au) / self.moid_bonus_au * self.moid_bonus_points,
+            0.0,
+        )
+        points[:, 2] = np.where(has_bonus, np.minimum(cap, dist_pts + moid_bonus), dist_pts)
+
+        # 4. Velocity
+        w = self.velocity_points
+        points[:, 3] = np.clip(f.velocity_km_s / self.velocity_max_km_s * w, 0, w)
+
+        # 5. Kinetic energy (log-scaled)
+        lo, hi = self.kinetic_energy_log_range
+        w = self.kinetic_energy_points
+        points[:, 4] = np.where(
+            f.ke_positive, np.clip((f.ke_log - lo) / (hi - lo) * w, 0, w), 0.0
+        )
+
+        # 6. Orbital uncertainty (real value, else proximity fallback)
+        fallback = np.select(
+            [f.lunar_dist < t for t in self.uncertainty_fallback_ld],
+            self.uncertainty_fallback_points[:-1],
+            self.uncertainty_fallback_points[-1],
+        )
+        w = self.orbital_uncertainty_points
+        points[:, 5] = np.where(
+            f.has_uncertainty, np.clip(f.orbit_uncertainty / 9 * w, 0, w), fallback
+        )
+
+        return round_exact(points, 2)
+
+    def level_codes(self, scores: np.ndarray) -> np.ndarray:
+        """Risk-level indices into RISK_LEVELS under this model's cutoffs."""
+        return np.searchsorted(np.asarray(self.risk_level_cutoffs), scores, side="right")
+
+    # ── Scalar path: the same bands as points / level_codes, one object ──
+    def scalar_points(
+        self,
+        is_hazardous: bool,
+        diameter_km: float,
+        miss_distance_km: float,
+        velocity_km_s: float,
+        kinetic_energy_mt: float,
+        *,
+        orbit_uncertainty: float | None = None,
+        moid_au: float | None = None,
+    ) -> list[float]:
+        """One row of ``points``, in SCORE_FACTORS order, without NumPy."""
+        lunar_dist = miss_distance_km / LUNAR_DISTANCE_KM
+
+        hazardous_pts = self.hazardous_points if is_hazardous else 0.0
+
+        lo, hi = self.diameter_log_range
+        w = self.diameter_points
+        diam_log = math.log10(max(diameter_km, 0.0001))
+        diam_pts = _clip((diam_log - lo) / (hi - lo) * w, w)
+
+        band = bisect.bisect_left(self.ld_thresholds, lunar_dist)
+        if band < len(self.ld_points):
+            dist_pts = self.ld_points[band]
+        else:
+            last = self.ld_points[-1]
+            decay = math.exp(-self.ld_tail_decay * (lunar_dist - self.ld_thresholds[-1]))
+            dist_pts = _clip(last * decay, last)
+        if moid_au is not None and moid_au < self.moid_bonus_au:
+            moid_bonus = (self.moid_bonus_au - moid_au) / self.moid_bonus_au * self.moid_bonus_points
+            dist_pts = min(self.miss_distance_points, dist_pts + moid_bonus)
+
+        w = self.velocity_points
+        vel_pts = _clip(velocity_km_s / self.velocity_max_km_s * w, w)
+
+        if kinetic_energy_mt > 0:
+            lo, hi = self.kinetic_energy_log_range
+            w = self.kinetic_energy_points
+            ke_pts = _clip((math.log10(kinetic_energy_mt) - lo) / (hi - lo) * w, w)
+        else:
+            ke_pts = 0.0
+
+        if orbit_uncertainty is not None:
+            w = self.orbital_uncertainty_points
+            orbit_pts = _clip(orbit_uncertainty / 9 * w, w)
+        else:
+            fallback = bisect.bisect_right(self.uncertainty_fallback_ld, lunar_dist)
+            orbit_pts = self.uncertainty_fallback_points[fallback]
+
+        return [
+            round(float(p), 2)
+            for p in (hazardous_pts, diam_pts, dist_pts, vel_pts, ke_pts, orbit_pts)
+        ]
+
+    def level_code(self, score: float) -> int:
+        """``level_codes`` for one score."""
+        return bisect.bisect_right(self.risk_level_cutoffs, score)
+
+
+DEFAULT_MODEL = ScoringModel()
+
+
+def _clip(value: float, high: float) -> float:
+    return min(max(value, 0.0), high)
+
+
+@dataclass
+class ScoreFeatures:
+    """Model-independent scoring inputs, derived once per batch."""
+
+    is_hazardous: np.ndarray
+    diameter_log: np.ndarray
+    lunar_dist: np.ndarray
+    moid_au: np.ndarray  # NaN when unknown
+    velocity_km_s: np.ndarray
+    ke_positive: np.ndarray
+    ke_log: np.ndarray  # 0 where energy ≤ 0
+    has_uncertainty: np.ndarray
+    orbit_uncertainty: np.ndarray  # 0 where unknown
+
+
+# ── Batch (array) Variants ───────────────────────────────────
+def score_features(
+    is_hazardous: np.ndarray,
+    diameter_km: np.ndarray,
+    miss_distance_km: np.ndarray,
+    velocity_km_s: np.ndarray,
+    kinetic_energy_mt: np.ndarray,
+    orbit_uncertainty: np.ndarray,
+    moid_au: np.ndarray,
+) -> ScoreFeatures:
+    """Derive the scoring features shared by every model.  NaN = not available."""
+    positive = kinetic_energy_mt > 0
+    has_ou = ~np.isnan(orbit_uncertainty)
+    return ScoreFeatures(
+        is_hazardous=is_hazardous,
+        diameter_log=np.log10(np.maximum(diameter_km, 0.0001)),
+        lunar_dist=miss_distance_km / LUNAR_DISTANCE_KM,
+        moid_au=moid_au,
+        velocity_km_s=velocity_km_s,
+        ke_positive=positive,
+        ke_log=np.log10(np.where(positive, kinetic_energy_mt, 1.0)),
+        has_uncertainty=has_ou,
+        orbit_uncertainty=np.where(has_ou, orbit_uncertainty, 0.0),
+    )
+
+
+def compute_score_matrix(
+    is_hazardous: np.ndarray,
+    diameter_km: np.ndarray,
+    miss_distance_km: np.ndarray,
+    velocity_km_s: np.ndarray,
+    kinetic_energy_mt: np.ndarray,
+    orbit_uncertainty: np.ndarray,
+    moid_au: np.ndarray,
+    model: ScoringModel = DEFAULT_MODEL,
+) -> np.ndarray:
+    """
+    Vectorized compute_score_breakdown.
+
+    Returns an (n, 6) matrix of points in SCORE_FACTORS order, rounded
+    to 2 dp.  Optional inputs use NaN for "not available".
+    """
+    features = score_features(
+        is_hazardous,
+        diameter_km,
+        miss_distance_km,
+        velocity_km_s,
+        kinetic_energy_mt,
+        orbit_uncertainty,
+        moid_au,
+    )
+    return model.points(features)
+
+
+def total_scores(points: np.ndarray) -> np.ndarray:
+    """Sum a score matrix into 0-100 totals (1 dp), factor by factor."""
+    total = points[:, 0].copy()
+    for j in range(1, points.shape[1]):
+        total += points[:, j]
+    return round_exact(np.clip(total, 0, 100), 1)
+
+
+def risk_level_codes(scores: np.ndarray) -> np.ndarray:
+    """Vectorized get_risk_level → indices into RISK_LEVELS."""
+    return DEFAULT_MODEL.level_codes(scores)
@@ -0,0 +1,220 @@
+"""
+Score sensitivity: the scoring and scale pipeline on perturbed inputs.
+
+Each object's row is copied once per (factor, step): diameters, velocity,
+miss distance and MOID are scaled by the step's multiplier, the orbit
+uncertainty code is shifted by whole codes (clipped to 0-9).  All copies
+of a chunk of objects go through compute_batch together, objects ×
+perturbations rows in one pass, instead of re-assessing each object per
+perturbation.
+
+Unknown MOID or orbit uncertainty stays unknown when perturbed, so the
+score does not move and the factor's slope is None.
+"""
+
+from typing import Optional, Sequence
+
+import numpy as np
+
+from app.models import (
+    ExplanationResponse,
+    FactorSensitivity,
+    ScoreBreakdown,
+    ScoreExplanation,
+    SensitivityFactor,
+)
+from app.engine.analysis import format_as_of
+from app.engine.batch import BatchInputs, compute_batch
+from app.engine.cancellation import CHUNK_SIZE, CancelToken
+from app.engine.scoring import DEFAULT_MODEL, RISK_LEVELS, SCORE_FACTORS
+
+# Orbit condition code offsets (the code is 0-9, so multipliers make no sense)
+UNCERTAINTY_STEPS = (-3.0, -2.0, -1.0, 1.0, 2.0, 3.0)
+
+# BatchInputs columns moved together by each factor
+_COLUMNS = {
+    SensitivityFactor.DIAMETER: ("diameter_min_km", "diameter_max_km"),
+    SensitivityFactor.VELOCITY: ("velocity_km_s", "velocity_km_h"),
+    SensitivityFactor.MISS_DISTANCE: ("miss_distance_km", "miss_distance_lunar"),
+    SensitivityFactor.MOID: ("moid_au",),
+    SensitivityFactor.ORBIT_UNCERTAINTY: ("orbit_uncertainty",),
+}
+
+
+def factor_steps(
+    factors: Sequence[SensitivityFactor], multipliers: Sequence[float]
+) -> dict[SensitivityFactor, tuple[float, ...]]:
+    """The steps evaluated per factor, ascending."""
+    return {
+        f: UNCERTAINTY_STEPS if f == SensitivityFactor.ORBIT_UNCERTAINTY
+        else tuple(sorted(multipliers))
+        for f in factors
+    }
+
+
+def _perturbed(inputs: BatchInputs, steps: dict[SensitivityFactor, tuple[float, ...]]) -> BatchInputs:
+    """
+    Rows in blocks of len(inputs): the unchanged inputs, then one block
+    per (factor, step) in ``steps`` order.
+    """
+    n = len(inputs)
+    blocks = 1 + sum(len(s) for s in steps.values())
+    grid = inputs.take(np.tile(np.arange(n), blocks))
+    start = n
+    for factor, values in steps.items():
+        for value in values:
+            block = slice(start, start + n)
+            for name in _COLUMNS[factor]:
+                column = getattr(grid, name)
+                if factor == SensitivityFactor.ORBIT_UNCERTAINTY:
+                    column[block] = np.clip(column[block] + value, 0, 9)
+                else:
+                    column[block] *= value
+            start += n
+    return grid
+
+
+def _slopes(
+    base: np.ndarray, scores: np.ndarray, steps: np.ndarray, neutral: float, unit: float
+) -> np.ndarray:
+    """
+    Score change per ``unit`` of step around ``neutral``, from the nearest
+    step on each side (one-sided against the base score at the edges).
+    """
+    below, above = np.flatnonzero(steps < neutral), np.flatnonzero(steps > neutral)
+    lo_step, lo_score = (
+        (steps[below[-1]], scores[below[-1]]) if below.size else (neutral, base)
+    )
+    hi_step, hi_score = (
+        (steps[above[0]], scores[above[0]]) if above.size else (neutral, base)
+    )
+    return (hi_score - lo_score) / ((hi_step - lo_step) / unit)
+
+
+def _level_change_at(
+    base: np.ndarray, levels: np.ndarray, steps: np.ndarray, neutral: float, up: bool
+) -> np.ndarray:
+    """Per object, the step nearest ``neutral`` whose level is above (below) base; NaN if none."""
+    order = np.argsort(np.abs(np.log(steps)) if neutral == 1.0 else np.abs(steps), kind="stable")
+    changed = levels[order] > base if up else levels[order] < base
+    first = np.argmax(changed, axis=0)
+    return np.where(changed.any(axis=0), steps[order][first], np.nan)
+
+
+def _optional(values: np.ndarray) -> list[Optional[float]]:
+    """Values as a list, NaN as None."""
+    return np.where(np.isnan(values), None, values).tolist()
+
+
+def explain_chunk(
+    inputs: BatchInputs,
+    steps: dict[SensitivityFactor, tuple[float, ...]],
+    as_of: Optional[np.ndarray] = None,
+) -> list[ScoreExplanation]:
+    """Explanations for one chunk of objects (a single compute_batch pass)."""
+    n = len(inputs)
+    if n == 0:
+        return []
+    outputs = compute_batch(_perturbed(inputs, steps), as_of)
+    scores = outputs.risk_score.reshape(-1, n)
+    levels = outputs.risk_level_code.reshape(-1, n)
+    torino = outputs.torino_scale.reshape(-1, n)
+    base_score, base_level = scores[0], levels[0]
+
+    cutoffs = np.asarray(DEFAULT_MODEL.risk_level_cutoffs)
+    top = len(RISK_LEVELS) - 1
+    to_next = np.where(
+        base_level < top, cutoffs[np.minimum(base_level, top - 1)] - base_score, np.nan
+    )
+    above = base_score - np.where(base_level > 0, cutoffs[np.maximum(base_level - 1, 0)], 0.0)
+
+    per_factor = {}
+    start = 1
+    for factor, values in steps.items():
+        rows = slice(start, start + len(values))
+        start += len(values)
+        grid = np.asarray(values)
+        neutral, unit = (
+            (0.0, 1.0) if factor == SensitivityFactor.ORBIT_UNCERTAINTY else (1.0, 0.01)
+        )
+        slope = _slopes(base_score, scores[rows], grid, neutral, unit)
+        unknown = np.zeros(n, dtype=bool)
+        for name in _COLUMNS[factor]:
+            unknown |= np.isnan(getattr(inputs, name))
+        per_factor[factor.value] = (
+            scores[rows].T.tolist(),
+            torino[rows].T.tolist(),
+            _optional(np.where(unknown, np.nan, np.round(slope, 3))),
+            _optional(_level_change_at(base_level, levels[rows], grid, neutral, up=True)),
+            _optional(_level_change_at(base_level, levels[rows], grid, neutral, up=False)),
+        )
+
+    to_next = _optional(np.round(to_next, 1))
+    above = np.round(above, 1).tolist()
+    breakdowns = outputs.score_points[:n].tolist()
+    explanations = []
+    for i, (aid, name) in enumerate(zip(inputs.asteroid_ids, inputs.names)):
+        level = int(base_level[i])
+        explanations.append(
+            ScoreExplanation(
+                asteroid_id=aid,
+                name=name,
+                risk_score=float(base_score[i]),
+                risk_level=RISK_LEVELS[level],
+                torino_scale=int(torino[0, i]),
+                score_breakdown=ScoreBreakdown(**dict(zip(SCORE_FACTORS, breakdowns[i]))),
+                next_level=RISK_LEVELS[level + 1] if level < top else None,
+                points_to_next_level=to_next[i],
+                points_above_level=above[i],
+                # Built from arrays of the right types; skip re-validating
+                # n × factors small models
+                factors={
+                    f: FactorSensitivity.model_construct(
+                        scores=s[i],
+                        torino_scales=t[i],
+                        points_per_step=slope[i],
+                        raises_level_at=up[i],
+                        lowers_level_at=down[i],
+                    )
+                    for f, (s, t, slope, up, down) in per_factor.items()
+                },
+            )
+        )
+    return explanations
+
+
+def explain_inputs(
+    inputs: BatchInputs,
+    factors: Sequence[SensitivityFactor] = tuple(SensitivityFactor),
+    multipliers: Sequence[float] = (0.5, 0.75, 0.9, 1.1, 1.25, 1.5, 2.0),
+    *,
+    as_of: Optional[np.ndarray] = None,
+    cancel: Optional[CancelToken] = None,
+) -> ExplanationResponse:
+    """
+    Sensitivity of every object's score and Torino scale to its inputs.
+
+    Objects are processed CHUNK_SIZE at a time; with ``cancel`` the token
+    is checked before each chunk (Cancelled carries the explanations so
+    far).
+    """
+    steps = factor_steps(factors, multipliers)
+    explanations: list[ScoreExplanation] = []
+    for start in range(0, len(inputs), CHUNK_SIZE):
+        if cancel is not None:
+            cancel.check(explanations)
+        chunk = inputs.take(np.arange(start, min(start + CHUNK_SIZE, len(inputs))))
+        explanations.extend(explain_chunk(chunk, steps, as_of))
+    return ExplanationResponse(
+        total_analyzed=len(explanations),
+        as_of=format_as_of(as_of),
+        steps={f.value: list(values) for f, values in steps.items()},
+        explanations=explanations,
+    )
+
+
+def perturbations_per_object(
+    factors: Sequence[SensitivityFactor], multipliers: Sequence[float]
+) -> int:
+    """Pipeline rows evaluated per object, the unchanged one included."""
+    return 1 + sum(len(s) for s in factor_steps(factors, multipliers).values())
@@ -0,0 +1,168 @@
+"""
+Batch Sentry-enhanced assessment.
+
+Same adjustments as assess_with_sentry — log-probability ratio against
+the estimated probability and the Palermo bonus — computed as array
+operations over many (NeoObject, SentryData) pairs on top of the
+columnar batch pipeline.
+"""
+
+import logging
+import re
+from typing import Optional
+
+import numpy as np
+
+from app.models import (
+    AsteroidSummary,
+    NeoObject,
+    SentryBatchResponse,
+    SentryBatchStatistics,
+    SentryData,
+    SentryEnhancedAssessment,
+)
+from app.engine.batch import extract_inputs, compute_batch, build_assessments
+from app.engine.numeric import round_exact
+from app.engine.scoring import RISK_LEVELS, risk_level_codes
+from app.engine.virtual_impactors import vi_summary
+
+logger = logging.getLogger("risk-engine.sentry")
+
+_PARENS = re.compile(r"[()]")
+
+
+def _designation_key(value: str) -> str:
+    """Normalise '(2023 DW)' / ' 2023 dw ' → '2023 DW' for joining."""
+    return " ".join(_PARENS.sub(" ", value).split()).upper()
+
+
+def join_sentry_table(
+    asteroids: list[NeoObject], table: list[SentryData]
+) -> tuple[list[tuple[NeoObject, SentryData]], list[str]]:
+    """
+    Pair NeoObjects with Sentry rows by designation.
+
+    Falls back to the NeoWs name (e.g. '(2023 DW)') when the object has
+    no designation.  Returns the pairs and the ids left unmatched.
+    """
+    by_key = {_designation_key(row.designation): row for row in table}
+
+    pairs: list[tuple[NeoObject, SentryData]] = []
+    unmatched: list[str] = []
+    for ast in asteroids:
+        row = None
+        for candidate in (ast.designation, ast.name):
+            if candidate:
+                row = by_key.get(_designation_key(candidate))
+                if row is not None:
+                    break
+        if row is None:
+            unmatched.append(ast.neo_reference_id)
+        else:
+            pairs.append((ast, row))
+    return pairs, unmatched
+
+
+def _summary(
+    assessments: list[SentryEnhancedAssessment],
+    values: np.ndarray,
+    digits: Optional[int] = None,
+) -> Optional[AsteroidSummary]:
+    if len(values) == 0:
+        return None
+    idx = int(np.argmax(values))
+    value = float(values[idx])
+    return AsteroidSummary(
+        asteroid_id=assessments[idx].asteroid_id,
+        name=assessments[idx].name,
+        value=value if digits is None else round(value, digits),
+    )
+
+
+def assess_sentry_batch(
+    pairs: list[tuple[NeoObject, SentryData]],
+    unmatched: Optional[list[str]] = None,
+) -> SentryBatchResponse:
+    """Sentry-enhanced assessment of many objects in one vectorized pass."""
+    inputs = extract_inputs([ast for ast, _ in pairs])
+    outputs = compute_batch(inputs)
+
+    rows = [pairs[i][1] for i in inputs.source_index.tolist()]
+    kept = set(inputs.source_index.tolist())
+    skipped = [ast.neo_reference_id for i, (ast, _) in enumerate(pairs) if i not in kept]
+
+    real_ip = np.array([r.cumulative_impact_probability for r in rows], dtype=float)
+    palermo_cum = np.array([r.palermo_cumulative for r in rows], dtype=float)
+    total_vis = np.array([r.total_virtual_impactors for r in rows], dtype=np.int64)
+
+    # Probability factor: each order of magnitude moves the score by 5 points
+    est_ip = outputs.impact_probability
+    both = (est_ip > 0) & (real_ip > 0)
+    prob_ratio = np.log10(np.maximum(real_ip, 1e-15)) - np.log10(np.maximum(est_ip, 1e-15))
+    score_adjustment = np.where(both, prob_ratio * 5, 0.0)
+
+    # Palermo factor: > −2 merits monitoring, ≥ 0 serious concern
+    palermo_bonus = np.where(palermo_cum > -2, (palermo_cum + 2) * 3, 0.0)
+    palermo_bonus = palermo_bonus + np.where(palermo_cum >= 0, 10.0, 0.0)
+
+    base_score = outputs.risk_score
+    adjusted = round_exact(
+        np.clip(base_score + score_adjustment + palermo_bonus, 0, 100), 1
+    )
+    levels = risk_level_codes(adjusted)
+
+    ke_rounded = round_exact(outputs.kinetic_energy_mt, 6).tolist()
+    real_energy = [r.impact_energy_mt or ke for r, ke in zip(rows, ke_rounded)]
+
+    assessments = build_assessments(
+        inputs,
+        outputs,
+        model=SentryEnhancedAssessment,
+        extra={
+            "risk_score": adjusted.tolist(),
+            "risk_level": [RISK_LEVELS[i] for i in levels.tolist()],
+            "torino_scale": [r.torino_max for r in rows],
+            "palermo_scale": palermo_cum.tolist(),
+            "impact_probability": real_ip.tolist(),
+            "sentry_designation": [r.designation for r in rows],
+            "real_impact_probability": real_ip.tolist(),
+            "real_palermo_cumulative": palermo_cum.tolist(),
+            "real_palermo_max": [r.palermo_max for r in rows],
+            "real_torino_max": [r.torino_max for r in rows],
+            "real_impact_energy_mt": real_energy,
+            "total_virtual_impactors": total_vis.tolist(),
+            "virtual_impactor_summary": [vi_summary(r) for r in rows],
+        },
+    )
+
+    # ── Batch statistics ─────────────────────────────────
+    n = len(assessments)
+    level_counts = np.bincount(levels, minlength=len(RISK_LEVELS))
+    statistics = SentryBatchStatistics(
+        total_analyzed=n,
+        by_risk_level={lvl.value: int(c) for lvl, c in zip(RISK_LEVELS, level_counts)},
+        average_risk_score=round(float(np.mean(adjusted)), 2) if n else 0,
+        max_risk_score=round(float(np.max(adjusted)), 2) if n else 0,
+        average_score_adjustment=round(float(np.mean(adjusted - base_score)), 2) if n else 0,
+        expected_impacts=float(np.sum(real_ip)),
+        max_palermo_cumulative=round(float(np.max(palermo_cum)), 3) if n else -10.0,
+        total_virtual_impactors=int(np.sum(total_vis)),
+        highest_probability=_summary(assessments, real_ip),
+        highest_palermo=_summary(assessments, palermo_cum, 3),
+    )
+
+    order = np.argsort(-adjusted, kind="stable")
+    assessments = [assessments[i] for i in order.tolist()]
+
+    logger.info(
+        "Batch Sentry-enhanced assessment: %d objects (%d unmatched, %d skipped)",
+        n, len(unmatched or []), len(skipped),
+    )
+
+    return SentryBatchResponse(
+        total_analyzed=n,
+        statistics=statistics,
+        assessments=assessments,
+        unmatched=unmatched or [],
+        skipped=skipped,
+    )
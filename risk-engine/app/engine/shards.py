@@ -0,0 +1,200 @@
+"""
+Sharded /analyze: splitting a batch, the work of one shard, the merge.
+
+A coordinator splits a batch by a CRC-32 of each record's
+``neo_reference_id``, so every approach of an asteroid lands in the
+same shard and batch-wide approach counts do not change.  Each shard
+is assessed by analyze_shard, on a peer instance or locally, which
+returns a ShardResult:
+
+  • the assessments, each already encoded as its JSON object, sorted as
+    summarize_batch sorts them, with their scores and positions in the
+    shard;
+  • a BatchSummary of the shard, so the statistics merge without the
+    assessments being decoded again.
+
+merge_shards interleaves the assessments by (score, batch position), the
+order of an unsharded run, and wraps them in a RiskAnalysisResponse
+whose statistics come from the merged summaries.
+
+On the wire a ShardResult is one JSON header line followed by one line
+per assessment (compact JSON never contains a raw newline).
+"""
+
+import json
+import zlib
+from dataclasses import dataclass
+from typing import Any, Optional, Sequence
+
+import numpy as np
+
+from app.models import LabelMode, RiskAnalysisResponse
+from app.engine.analysis import BatchObserver, assess_until_deadline, mark_partial
+from app.engine.batch import BatchInputs
+from app.engine.cancellation import CancelToken
+from app.engine.learned import LearnedModel
+from app.engine.scoring import ScoringModel
+from app.engine.summary import BatchSummary
+
+SHARD_FORMAT = 1
+SHARD_MEDIA_TYPE = "application/x-ndjson"
+
+# Splices the assessments into the encoded response envelope
+_EMPTY_ASSESSMENTS = b'"assessments":[]'
+
+
+def shard_of(ids: Sequence[Any], shards: int) -> np.ndarray:
+    """Shard of each record, from a CRC-32 of its neo_reference_id."""
+    return np.fromiter(
+        (zlib.crc32(str(i).encode()) % shards for i in ids), dtype=np.int64, count=len(ids)
+    )
+
+
+def shard_body(text: str, spans: list[tuple[int, int]], rows: np.ndarray, options: dict) -> bytes:
+    """
+    /analyze body for the records at ``rows``, copied from the original
+    body ``text`` (see ingest.scan_analyze_body), with ``options``.
+    """
+    records = ",".join(text[spans[i][0]:spans[i][1]] for i in rows.tolist())
+    rest = json.dumps(options, separators=(",", ":"))[1:] if options else "}"
+    return f'{{"asteroids":[{records}]{"," if options else ""}{rest}'.encode()
+
+
+@dataclass
+class ShardResult:
+    """Assessments and statistics of one shard."""
+
+    requested: int  # objects sent to the shard
+    partial: bool
+    models: list[tuple[str, str]]  # (name, version) of the extra scoring models
+    learned_model: Optional[str]
+    positions: np.ndarray  # shard position of each assessment, in fragment order
+    scores: np.ndarray
+    summary: BatchSummary  # extremes numbered by shard position
+    fragments: list[bytes]  # one JSON object per assessment
+
+    def encode(self) -> bytes:
+        header = {
+            "format": SHARD_FORMAT,
+            "requested": self.requested,
+            "partial": self.partial,
+            "models": self.models,
+            "learned_model": self.learned_model,
+            "positions": self.positions.tolist(),
+            "scores": self.scores.tolist(),
+            "summary": self.summary.to_dict(),
+        }
+        return b"\n".join([json.dumps(header, separators=(",", ":")).encode(), *self.fragments])
+
+    @classmethod
+    def decode(cls, body: bytes) -> "ShardResult":
+        """Raises ValueError for a body that is not a ShardResult of this format."""
+        lines = body.split(b"\n")
+        header = json.loads(lines[0])
+        if header.get("format") != SHARD_FORMAT:
+            raise ValueError(f"unsupported shard format {header.get('format')!r}")
+        fragments = lines[1:]
+        if len(fragments) != len(header["positions"]):
+            raise ValueError("shard result is truncated")
+        return cls(
+            requested=header["requested"],
+            partial=header["partial"],
+            models=[tuple(m) for m in header["models"]],
+            learned_model=header["learned_model"],
+            positions=np.array(header["positions"], dtype=np.int64),
+            scores=np.array(header["scores"], dtype=float),
+            summary=BatchSummary.from_dict(header["summary"]),
+            fragments=fragments,
+        )
+
+
+def analyze_shard(
+    inputs: BatchInputs,
+    size: int,
+    labels: LabelMode = LabelMode.TEXT,
+    *,
+    as_of: Optional[np.ndarray] = None,
+    models: Sequence[ScoringModel] = (),
+    learned: Optional[LearnedModel] = None,
+    cancel: Optional[CancelToken] = None,
+    best_effort: bool = False,
+    observe: Optional[BatchObserver] = None,
+    effects: bool = False,
+) -> ShardResult:
+    """
+    Assess one shard of ``size`` objects (unpacked into ``inputs``).
+
+    ``cancel`` / ``best_effort`` behave as in analyze_inputs: with a
+    passed deadline and ``best_effort`` the assessments completed so far
+    are returned, marked partial.  ``effects`` adds the impact-effect
+    fields.
+    """
+    results, partial = assess_until_deadline(
+        inputs, size, labels, best_effort=best_effort, as_of=as_of, models=models,
+        learned=learned, cancel=cancel, observe=observe, effects=effects,
+    )
+
+    positions = [i for i, a in enumerate(results) if a]
+    scores = np.array([results[i].risk_score for i in positions], dtype=float)
+    # Stable, like summarize_batch: equal scores keep their input order
+    order = np.argsort(-scores, kind="stable")
+    positions = np.array(positions, dtype=np.int64)[order]
+    assessments = [results[i] for i in positions.tolist()]
+    return ShardResult(
+        requested=size,
+        partial=partial,
+        models=[(m.name, m.version) for m in models],
+        learned_model=learned.version if learned is not None else None,
+        positions=positions,
+        scores=scores[order],
+        summary=BatchSummary.of_assessments(assessments, positions),
+        fragments=[a.model_dump_json().encode() for a in assessments],
+    )
+
+
+def merge_shards(
+    parts: Sequence[tuple[ShardResult, np.ndarray]],
+    size: int,
+    *,
+    date_range: Optional[dict] = None,
+    as_of: Optional[list[str]] = None,
+    models: Sequence[ScoringModel] = (),
+    learned_model: Optional[str] = None,
+) -> bytes:
+    """
+    The encoded RiskAnalysisResponse for a batch of ``size`` objects
+    from its shard results, each with ``rows``: the batch position of
+    every shard position.
+    """
+    summary = BatchSummary()
+    scores, batch_positions, fragments = [], [], []
+    for result, rows in parts:
+        result.summary.renumber(rows)
+        summary.merge(result.summary)
+        scores.append(result.scores)
+        batch_positions.append(rows[result.positions])
+        fragments.extend(result.fragments)
+
+    order = (
+        np.lexsort((np.concatenate(batch_positions), -np.concatenate(scores))).tolist()
+        if fragments
+        else []
+    )
+
+    response = RiskAnalysisResponse(
+        total_analyzed=summary.count,
+        date_range=date_range,
+        as_of=as_of,
+        statistics=summary.statistics(),
+        model_statistics=summary.model_statistics(list(models)) if models else None,
+        learned_model=learned_model,
+        assessments=[],
+    )
+    if any(result.partial for result, _ in parts):
+        mark_partial(response, size)
+
+    envelope = response.model_dump_json().encode()
+    cut = envelope.rindex(_EMPTY_ASSESSMENTS) + len(_EMPTY_ASSESSMENTS) - 1
+    return b"".join(
+        [envelope[:cut], b",".join([fragments[i] for i in order]), envelope[cut:]]
+    )
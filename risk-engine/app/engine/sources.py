@@ -0,0 +1,203 @@
+"""
+NeoWs input files.
+
+Accepted layouts, optionally gzip-compressed (``.gz``):
+
+- ``.ndjson`` / ``.jsonl``: one NeoObject (e.g. a lookup response) per line;
+- ``.json``: a list of NeoObjects, an /analyze request body
+  ({"asteroids": [...]}), a NeoWs feed / browse response
+  ({"near_earth_objects": {date: [...]}} or {"near_earth_objects": [...]})
+  or a single lookup response.
+
+Files are streamed: JSON documents are scanned incrementally with
+``raw_decode``, so memory is bounded by the read block plus the largest
+single record, however large the file.
+"""
+
+import gzip
+import json
+from pathlib import Path
+from typing import IO, Any, Iterator
+
+_READ_SIZE = 1 << 20
+_WHITESPACE = " \t\n\r"
+_NUMBER_CHARS = "0123456789.eE+-"
+_DECODER = json.JSONDecoder()
+_LAYOUT_ERROR = (
+    "expected a list of NEOs, {asteroids: [...]}, {near_earth_objects: ...} or a NEO"
+)
+
+
+def _open(path: Path) -> IO[str]:
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8")
+    return path.open("r", encoding="utf-8")
+
+
+def _is_ndjson(path: Path) -> bool:
+    name = path.name[:-3] if path.suffix == ".gz" else path.name
+    return name.endswith((".ndjson", ".jsonl"))
+
+
+def neo_records(document: Any) -> list[dict]:
+    """NeoObject records from any of the JSON layouts above, already loaded."""
+    if isinstance(document, dict) and "asteroids" in document:
+        return document["asteroids"]
+    if isinstance(document, dict) and "near_earth_objects" in document:
+        feed = document["near_earth_objects"]
+        if isinstance(feed, dict):
+            return [o for day in feed.values() for o in day]
+        return feed
+    if isinstance(document, dict) and "neo_reference_id" in document:
+        return [document]
+    if isinstance(document, list):
+        return document
+    raise ValueError(_LAYOUT_ERROR)
+
+
+class _Scanner:
+    """Incremental JSON reader over a text stream."""
+
+    def __init__(self, fh: IO[str]):
+        self.fh = fh
+        self.buf = ""
+        self.pos = 0
+
+    def _fill(self) -> bool:
+        """Append the next block, dropping consumed text; False at end of input."""
+        block = self.fh.read(_READ_SIZE)
+        if not block:
+            return False
+        self.buf = self.buf[self.pos:] + block
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at end of input)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"malformed JSON: expected {char!r}, found {found[:1]!r}")
+        self.pos += 1
+
+    def value(self) -> tuple[Any, str]:
+        """Decode the next JSON value; returns it with its source text."""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number cut off by the end of the block ("15", "1.5e") may
+            # continue in the next one
+            tail = self.buf[end:end + 16]
+            if (
+                isinstance(value, (int, float))
+                and end + len(tail) == len(self.buf)
+                and not tail.strip(_NUMBER_CHARS)
+                and self._fill()
+            ):
+                continue
+            text = self.buf[self.pos:end]
+            self.pos = end
+            return value, text
+
+    def elements(self) -> Iterator[tuple[Any, str]]:
+        """Values of the array at the current position."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            sep = self.peek()
+            self.pos += 1
+            if sep == "]":
+                return
+            if sep != ",":
+                raise ValueError(f"malformed JSON: expected ',' or ']', found {sep!r}")
+
+    def members(self) -> Iterator[str]:
+        """Keys of the object at the current position; the caller consumes each value."""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key, _ = self.value()
+            self.expect(":")
+            yield key
+            sep = self.peek()
+            self.pos += 1
+            if sep == "}":
+                return
+            if sep != ",":
+                raise ValueError(f"malformed JSON: expected ',' or '}}', found {sep!r}")
+
+
+def _stream_json(fh: IO[str]) -> Iterator[tuple[Any, str]]:
+    """(record, text) pairs from a JSON document in any accepted layout."""
+    scan = _Scanner(fh)
+    start = scan.peek()
+    if start == "[":
+        yield from scan.elements()
+        return
+    if start != "{":
+        raise ValueError(_LAYOUT_ERROR)
+
+    found = False
+    rest: dict[str, Any] = {}
+    for key in scan.members():
+        if key in ("asteroids", "near_earth_objects") and scan.peek() == "[":
+            found = True
+            yield from scan.elements()
+        elif key == "near_earth_objects" and scan.peek() == "{":
+            found = True
+            for _date in scan.members():
+                yield from scan.elements()
+        else:
+            rest[key], _ = scan.value()
+    if not found:
+        if "neo_reference_id" not in rest:
+            raise ValueError(_LAYOUT_ERROR)
+        yield rest, json.dumps(rest)
+
+
+def iter_neo_records(path: str | Path) -> Iterator[dict]:
+    """Yield raw NeoObject records from a file."""
+    path = Path(path)
+    with _open(path) as fh:
+        if _is_ndjson(path):
+            for line in fh:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            for record, _ in _stream_json(fh):
+                yield record
+
+
+def iter_neo_texts(path: str | Path) -> Iterator[str]:
+    """
+    Yield each NeoObject record's JSON text, for consumers that parse
+    elsewhere (e.g. in worker processes).  NDJSON lines are not decoded.
+    """
+    path = Path(path)
+    with _open(path) as fh:
+        if _is_ndjson(path):
+            for line in fh:
+                line = line.strip()
+                if line:
+                    yield line
+        else:
+            for _, text in _stream_json(fh):
+                yield text
@@ -0,0 +1,298 @@
+"""
+Batch statistics that merge across parts of a batch.
+
+BatchSummary holds the counts, a histogram of scores in tenths and the
+extremes of a set of assessments; merging the summaries of disjoint
+parts gives the statistics of the whole batch, equal to what
+analysis._compute_statistics computes over all of it (mean, median and
+standard deviation are exact from the histogram).  Used by the offline
+scorer (app.bulk_score), whose parts are chunks of an archive, and by
+sharded /analyze (app.engine.shards), whose parts are shards, and by
+background jobs (app.services.jobs), whose parts are pages of stored
+results.
+
+``seq`` numbers the records of the whole batch; it breaks ties between
+extremes so that the winner does not depend on how the batch was split.
+"""
+
+import math
+from dataclasses import asdict, dataclass, field, fields
+from typing import Optional, Sequence
+
+import numpy as np
+
+from app.engine.scoring import RISK_LEVELS, ScoringModel
+from app.models import ModelStatistics, RiskAssessment, RiskStatistics
+
+_LEVELS = [lvl.value for lvl in RISK_LEVELS]
+_SCORE_BINS = 1001  # risk scores are 0-100 with 1 dp
+
+
+@dataclass
+class Extreme:
+    """Batch extreme; ties go to the higher risk score, then the earlier record."""
+
+    value: float
+    score: float
+    seq: int
+    asteroid_id: str
+    name: str
+    date: Optional[str] = None
+
+    def beats(self, other: Optional["Extreme"], largest: bool) -> bool:
+        if other is None:
+            return True
+        if self.value != other.value:
+            return self.value > other.value if largest else self.value < other.value
+        return (self.score, -self.seq) > (other.score, -other.seq)
+
+
+def _extreme(
+    columns: dict[str, np.ndarray],
+    seq: np.ndarray,
+    column: str,
+    largest: bool,
+    with_date: bool = False,
+) -> Extreme:
+    values = columns[column]
+    target = values.max() if largest else values.min()
+    tied = np.flatnonzero(values == target)
+    i = int(tied[np.lexsort((seq[tied], -columns["risk_score"][tied]))[0]])
+    return Extreme(
+        value=float(values[i]),
+        score=float(columns["risk_score"][i]),
+        seq=int(seq[i]),
+        asteroid_id=str(columns["asteroid_id"][i]),
+        name=str(columns["name"][i]),
+        date=str(columns["closest_approach_date"][i]) if with_date else None,
+    )
+
+
+def _level_counts(levels: np.ndarray) -> np.ndarray:
+    return np.array([np.count_nonzero(levels == lvl) for lvl in _LEVELS], dtype=np.int64)
+
+
+def _empty_model() -> dict:
+    return {"levels": np.zeros(len(RISK_LEVELS), np.int64), "tenths": 0, "max": 0.0, "changes": 0}
+
+
+@dataclass
+class BatchSummary:
+    """Running batch statistics, equal to analysis._compute_statistics over all parts."""
+
+    records: int = 0
+    invalid: int = 0
+    skipped: int = 0
+    count: int = 0
+    hazardous: int = 0
+    levels: np.ndarray = field(default_factory=lambda: np.zeros(len(RISK_LEVELS), np.int64))
+    score_hist: np.ndarray = field(default_factory=lambda: np.zeros(_SCORE_BINS, np.int64))
+    max_score: float = 0.0
+    # Per-part energy sums, added with fsum at the end so the total does
+    # not depend on the order in which parts finish
+    energy_mt: list[float] = field(default_factory=list)
+    closest: Optional[Extreme] = None
+    largest: Optional[Extreme] = None
+    fastest: Optional[Extreme] = None
+    highest_energy: Optional[Extreme] = None
+    models: dict[str, dict] = field(default_factory=dict)
+
+    @classmethod
+    def of_part(cls, columns: dict[str, np.ndarray], seq: np.ndarray) -> "BatchSummary":
+        """Summary of one part from its result columns (batch.result_columns)."""
+        s = cls()
+        scores = columns["risk_score"]
+        s.count = len(scores)
+        if not s.count:
+            return s
+        s.hazardous = int(np.count_nonzero(columns["hazardous"]))
+        s.levels = _level_counts(columns["risk_level"])
+        s.score_hist = np.bincount(np.rint(scores * 10).astype(np.int64), minlength=_SCORE_BINS)
+        s.max_score = float(np.max(scores))
+        s.energy_mt = [float(np.sum(columns["kinetic_energy_mt"]))]
+        s.closest = _extreme(columns, seq, "miss_distance_km", largest=False, with_date=True)
+        s.largest = _extreme(columns, seq, "estimated_diameter_km", largest=True)
+        s.fastest = _extreme(columns, seq, "velocity_km_h", largest=True)
+        s.highest_energy = _extreme(columns, seq, "kinetic_energy_mt", largest=True)
+        for key in columns:
+            if key.startswith("model_scores."):
+                name = key.split(".", 1)[1]
+                model_scores = columns[key]
+                model_levels = columns[f"model_risk_levels.{name}"]
+                s.models[name] = {
+                    "levels": _level_counts(model_levels),
+                    "tenths": int(np.sum(np.rint(model_scores * 10).astype(np.int64))),
+                    "max": float(np.max(model_scores)),
+                    "changes": int(np.count_nonzero(model_levels != columns["risk_level"])),
+                }
+        return s
+
+    @classmethod
+    def of_assessments(
+        cls, assessments: Sequence[RiskAssessment], seq: np.ndarray
+    ) -> "BatchSummary":
+        """Summary of one part from its assessments."""
+        columns = {
+            "asteroid_id": np.array([a.asteroid_id for a in assessments], dtype=str),
+            "name": np.array([a.name for a in assessments], dtype=str),
+            "risk_level": np.array([a.risk_level.value for a in assessments], dtype=str),
+            "risk_score": np.array([a.risk_score for a in assessments], dtype=float),
+            "hazardous": np.array([a.hazardous for a in assessments], dtype=bool),
+            "estimated_diameter_km": np.array(
+                [a.estimated_diameter_km for a in assessments], dtype=float
+            ),
+            "miss_distance_km": np.array([a.miss_distance_km for a in assessments], dtype=float),
+            "velocity_km_h": np.array([a.velocity_km_h for a in assessments], dtype=float),
+            "kinetic_energy_mt": np.array([a.kinetic_energy_mt for a in assessments], dtype=float),
+            "closest_approach_date": np.array(
+                [a.closest_approach_date for a in assessments], dtype=str
+            ),
+        }
+        for name in (assessments[0].model_scores or {}) if assessments else ():
+            columns[f"model_scores.{name}"] = np.array(
+                [a.model_scores[name] for a in assessments], dtype=float
+            )
+            columns[f"model_risk_levels.{name}"] = np.array(
+                [a.model_risk_levels[name].value for a in assessments], dtype=str
+            )
+        return cls.of_part(columns, seq)
+
+    @classmethod
+    def of_documents(cls, documents: Sequence[dict], seq: np.ndarray) -> "BatchSummary":
+        """Summary of one part from assessments stored as JSON documents (job results)."""
+        columns = {
+            "asteroid_id": np.array([d["asteroid_id"] for d in documents], dtype=str),
+            "name": np.array([d["name"] for d in documents], dtype=str),
+            "risk_level": np.array([d["risk_level"] for d in documents], dtype=str),
+            "risk_score": np.array([d["risk_score"] for d in documents], dtype=float),
+            "hazardous": np.array([d["hazardous"] for d in documents], dtype=bool),
+            "estimated_diameter_km": np.array(
+                [d["estimated_diameter_km"] for d in documents], dtype=float
+            ),
+            "miss_distance_km": np.array([d["miss_distance_km"] for d in documents], dtype=float),
+            "velocity_km_h": np.array([d["velocity_km_h"] for d in documents], dtype=float),
+            "kinetic_energy_mt": np.array([d["kinetic_energy_mt"] for d in documents], dtype=float),
+            "closest_approach_date": np.array(
+                [d["closest_approach_date"] for d in documents], dtype=str
+            ),
+        }
+        for name in documents[0].get("model_scores") or {} if documents else ():
+            columns[f"model_scores.{name}"] = np.array(
+                [d["model_scores"][name] for d in documents], dtype=float
+            )
+            columns[f"model_risk_levels.{name}"] = np.array(
+                [d["model_risk_levels"][name] for d in documents], dtype=str
+            )
+        return cls.of_part(columns, seq)
+
+    def to_dict(self) -> dict:
+        data = {
+            f.name: getattr(self, f.name)
+            for f in fields(self)
+            if f.name not in ("levels", "score_hist", "models")
+        }
+        for attr in ("closest", "largest", "fastest", "highest_energy"):
+            data[attr] = asdict(data[attr]) if data[attr] is not None else None
+        data["levels"] = self.levels.tolist()
+        data["score_hist"] = self.score_hist.tolist()
+        data["models"] = {
+            name: {**m, "levels": m["levels"].tolist()} for name, m in self.models.items()
+        }
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "BatchSummary":
+        s = cls(**{k: v for k, v in data.items() if k not in ("levels", "score_hist", "models")})
+        for attr in ("closest", "largest", "fastest", "highest_energy"):
+            if getattr(s, attr) is not None:
+                setattr(s, attr, Extreme(**getattr(s, attr)))
+        s.levels = np.array(data["levels"], dtype=np.int64)
+        s.score_hist = np.array(data["score_hist"], dtype=np.int64)
+        s.models = {
+            name: {**m, "levels": np.array(m["levels"], dtype=np.int64)}
+            for name, m in data["models"].items()
+        }
+        return s
+
+    def merge(self, other: "BatchSummary") -> None:
+        self.records += other.records
+        self.invalid += other.invalid
+        self.skipped += other.skipped
+        if other.count:
+            self.max_score = max(self.max_score, other.max_score) if self.count else other.max_score
+            self.count += other.count
+        self.hazardous += other.hazardous
+        self.levels = self.levels + other.levels
+        self.score_hist = self.score_hist + other.score_hist
+        self.energy_mt = self.energy_mt + other.energy_mt
+        for attr, largest in (
+            ("closest", False), ("largest", True), ("fastest", True), ("highest_energy", True)
+        ):
+            theirs = getattr(other, attr)
+            if theirs is not None and theirs.beats(getattr(self, attr), largest):
+                setattr(self, attr, theirs)
+        for name, m in other.models.items():
+            mine = self.models.setdefault(name, _empty_model())
+            mine["levels"] = mine["levels"] + m["levels"]
+            mine["tenths"] += m["tenths"]
+            mine["max"] = max(mine["max"], m["max"])
+            mine["changes"] += m["changes"]
+
+    def renumber(self, seq: np.ndarray) -> None:
+        """Map the extremes' ``seq`` through ``seq`` (part positions → batch positions)."""
+        for attr in ("closest", "largest", "fastest", "highest_energy"):
+            e = getattr(self, attr)
+            if e is not None:
+                e.seq = int(seq[e.seq])
+
+    def _moments(self) -> tuple[float, float]:
+        """Mean and population std of the scores, exact from the histogram of tenths."""
+        tenths = np.arange(_SCORE_BINS, dtype=object)
+        total = int(np.dot(tenths, self.score_hist))
+        squares = int(np.dot(tenths * tenths, self.score_hist))
+        n = self.count
+        return total / (10 * n), math.sqrt((n * squares - total * total) / (100 * n * n))
+
+    def _median(self) -> float:
+        cumulative = np.cumsum(self.score_hist)
+        lower = int(np.searchsorted(cumulative, (self.count - 1) // 2, side="right"))
+        upper = int(np.searchsorted(cumulative, self.count // 2, side="right"))
+        return (lower / 10 + upper / 10) / 2
+
+    def statistics(self) -> RiskStatistics:
+        def summary(e: Optional[Extreme], ndigits: int) -> Optional[dict]:
+            if e is None:
+                return None
+            out = {"asteroid_id": e.asteroid_id, "name": e.name, "value": round(e.value, ndigits)}
+            if e.date is not None:
+                out["date"] = e.date
+            return out
+
+        mean, std = self._moments() if self.count else (0.0, 0.0)
+        return RiskStatistics(
+            total_analyzed=self.count,
+            hazardous_count=self.hazardous,
+            by_risk_level=dict(zip(_LEVELS, self.levels.tolist())),
+            average_risk_score=round(mean, 2) if self.count else 0,
+            median_risk_score=round(self._median(), 2) if self.count else 0,
+            std_dev_risk_score=round(std, 2) if self.count else 0,
+            max_risk_score=round(self.max_score, 2) if self.count else 0,
+            total_kinetic_energy_mt=round(math.fsum(self.energy_mt), 6),
+            closest_approach=summary(self.closest, 2),
+            largest_asteroid=summary(self.largest, 6),
+            fastest_asteroid=summary(self.fastest, 2),
+            highest_energy=summary(self.highest_energy, 6),
+        )
+
+    def model_statistics(self, models: list[ScoringModel]) -> dict[str, ModelStatistics]:
+        stats = {}
+        for m in models:
+            agg = self.models.get(m.name, _empty_model())
+            stats[m.name] = ModelStatistics(
+                version=m.version,
+                by_risk_level=dict(zip(_LEVELS, agg["levels"].tolist())),
+                average_risk_score=round(agg["tenths"] / (10 * self.count), 2) if self.count else 0,
+                max_risk_score=round(agg["max"], 2),
+                level_changes=agg["changes"],
+            )
+        return stats
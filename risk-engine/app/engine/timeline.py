@@ -0,0 +1,216 @@
+"""
+Close-approach timeline: pre-binned aggregates of a batch or stored result.
+
+Objects are reduced to five columns (approach day, lunar miss distance,
+risk-level code, size code, kinetic energy) and counted with
+``bincount`` per day bin, distance band, risk level and size class,
+each with the energy summed per bin, plus ``histogram2d`` day × band and
+day × level count grids.  The result is a few short integer / float
+arrays instead of one record per object.
+
+Distance bands are given by their inner edges in lunar distances:
+edges (1, 5) make the bands [0, 1), [1, 5) and [5, ∞).  Size codes are
+those of labels.size_categories (tables at GET /labels).
+"""
+
+from dataclasses import dataclass, fields as dataclass_fields
+from datetime import date
+from typing import Any, Iterable, Optional, Sequence
+
+import numpy as np
+
+from app.models import RiskAssessment
+from app.engine.batch import BatchInputs, BatchOutputs, _approach_epochs, compute_batch
+from app.engine.cancellation import CHUNK_SIZE, CancelToken
+from app.engine.labels import SIZE_MASSIVE, size_categories
+from app.engine.scoring import RISK_LEVELS
+
+DISTANCE_EDGES_LD = (1.0, 5.0, 10.0, 20.0, 50.0, 100.0)
+MAX_DAY_BINS = 10_000
+
+_LEVEL_CODES = {level.value: code for code, level in enumerate(RISK_LEVELS)}
+
+
+def _days(dates: list[str]) -> np.ndarray:
+    # By close_approach_date, as shown in the assessments, for every source
+    return _approach_epochs([None] * len(dates), dates).astype("datetime64[D]")
+
+
+@dataclass
+class TimelineColumns:
+    """The per-object values the timeline is binned on."""
+
+    day: np.ndarray  # datetime64[D], NaT when the date did not parse
+    miss_distance_lunar: np.ndarray
+    risk_level_code: np.ndarray
+    size_code: np.ndarray
+    kinetic_energy_mt: np.ndarray
+
+    @classmethod
+    def from_batch(cls, inputs: BatchInputs, outputs: BatchOutputs) -> "TimelineColumns":
+        return cls(
+            day=_days(inputs.approach_dates),
+            miss_distance_lunar=inputs.miss_distance_lunar,
+            risk_level_code=outputs.risk_level_code,
+            size_code=size_categories(inputs.diameter_max_km),
+            kinetic_energy_mt=outputs.kinetic_energy_mt,
+        )
+
+    @classmethod
+    def from_assessments(cls, assessments: Iterable[RiskAssessment]) -> "TimelineColumns":
+        """Columns of stored assessments (result snapshots)."""
+        return cls._from_rows(
+            (
+                a.closest_approach_date,
+                a.miss_distance_lunar,
+                a.risk_level.value,
+                a.estimated_diameter_km,
+                a.kinetic_energy_mt,
+            )
+            for a in assessments
+        )
+
+    @classmethod
+    def from_documents(cls, documents: Iterable[dict[str, Any]]) -> "TimelineColumns":
+        """Columns of assessments stored as JSON documents (job results)."""
+        return cls._from_rows(
+            (
+                d["closest_approach_date"],
+                d["miss_distance_lunar"],
+                d["risk_level"],
+                d["estimated_diameter_km"],
+                d["kinetic_energy_mt"],
+            )
+            for d in documents
+        )
+
+    @classmethod
+    def _from_rows(cls, rows: Iterable[tuple]) -> "TimelineColumns":
+        rows = list(rows)
+        dates, lunar, levels, diameters, energies = (
+            zip(*rows) if rows else ((), (), (), (), ())
+        )
+        return cls(
+            day=_days(list(dates)),
+            miss_distance_lunar=np.array(lunar, dtype=float),
+            risk_level_code=np.array([_LEVEL_CODES[v] for v in levels], dtype=np.int64),
+            size_code=size_categories(np.array(diameters, dtype=float)),
+            kinetic_energy_mt=np.array(energies, dtype=float),
+        )
+
+    @classmethod
+    def concat(cls, parts: Sequence["TimelineColumns"]) -> "TimelineColumns":
+        return cls(**{
+            f.name: np.concatenate([getattr(p, f.name) for p in parts])
+            for f in dataclass_fields(cls)
+        })
+
+
+def _sums(index: np.ndarray, energy: np.ndarray, bins: int) -> dict:
+    return {
+        "counts": np.bincount(index, minlength=bins).tolist(),
+        "energy_mt": np.round(np.bincount(index, weights=energy, minlength=bins), 6).tolist(),
+    }
+
+
+def _grid(rows: np.ndarray, cols: np.ndarray, shape: tuple[int, int]) -> list[list[int]]:
+    counts, _, _ = np.histogram2d(rows, cols, bins=shape, range=((0, shape[0]), (0, shape[1])))
+    return counts.astype(np.int64).tolist()
+
+
+def timeline(
+    columns: TimelineColumns,
+    *,
+    bin_days: int = 1,
+    distance_edges_ld: Sequence[float] = DISTANCE_EDGES_LD,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+) -> dict:
+    """
+    Binned counts and energy sums of ``columns``.
+
+    Only approaches between ``start_date`` and ``end_date`` (inclusive)
+    are counted; the day bins run from ``start_date`` (default: the
+    earliest approach) in steps of ``bin_days``.  Objects without a
+    parseable approach date are left out.  Raises ValueError when the
+    range would need more than MAX_DAY_BINS day bins.
+    """
+    day = columns.day
+    keep = ~np.isnat(day)
+    if start_date is not None:
+        keep &= day >= np.datetime64(start_date, "D")
+    if end_date is not None:
+        keep &= day <= np.datetime64(end_date, "D")
+    day = day[keep]
+    lunar = columns.miss_distance_lunar[keep]
+    levels = columns.risk_level_code[keep].astype(np.int64)
+    sizes = columns.size_code[keep].astype(np.int64)
+    energy = columns.kinetic_energy_mt[keep]
+
+    first = np.datetime64(start_date, "D") if start_date is not None else (
+        day.min() if len(day) else None
+    )
+    last = np.datetime64(end_date, "D") if end_date is not None else (
+        day.max() if len(day) else None
+    )
+    if first is None or last is None or last < first:
+        n_days = 0
+    else:
+        n_days = int((last - first).astype(np.int64)) // bin_days + 1
+    if n_days > MAX_DAY_BINS:
+        raise ValueError(
+            f"Timeline would need {n_days} day bins (at most {MAX_DAY_BINS}); "
+            "increase bin_days or narrow the date range"
+        )
+    day_bin = (
+        (day - first).astype(np.int64) // bin_days if n_days else np.empty(0, np.int64)
+    )
+
+    edges = np.asarray(distance_edges_ld, dtype=float)
+    band = np.searchsorted(edges, lunar, side="right")
+    n_bands = len(edges) + 1
+    n_levels = len(RISK_LEVELS)
+
+    return {
+        "total": int(len(day)),
+        "total_energy_mt": round(float(energy.sum()), 6),
+        "days": {
+            "start": str(first) if n_days else None,
+            "end": str(last) if n_days else None,
+            "bin_days": bin_days,
+            **_sums(day_bin, energy, n_days),
+        },
+        "distance_bands": {"edges_ld": edges.tolist(), **_sums(band, energy, n_bands)},
+        "risk_levels": {
+            "levels": [level.value for level in RISK_LEVELS],
+            **_sums(levels, energy, n_levels),
+        },
+        "size_classes": {
+            "massive_code": SIZE_MASSIVE,
+            **_sums(sizes, energy, SIZE_MASSIVE + 1),
+        },
+        "day_by_distance_band": _grid(day_bin, band, (n_days, n_bands)) if n_days else [],
+        "day_by_risk_level": _grid(day_bin, levels, (n_days, n_levels)) if n_days else [],
+    }
+
+
+def batch_timeline(
+    inputs: BatchInputs,
+    as_of: Optional[np.ndarray] = None,
+    *,
+    cancel: Optional[CancelToken] = None,
+    **bins,
+) -> dict:
+    """
+    timeline of a batch, scored (scales and score only, no labels) on the
+    way.  With ``cancel`` objects are scored CHUNK_SIZE at a time and the
+    token is checked before each chunk.
+    """
+    step = CHUNK_SIZE if cancel is not None else max(len(inputs), 1)
+    parts = []
+    for start in range(0, max(len(inputs), 1), step):
+        if cancel is not None:
+            cancel.check()
+        chunk = inputs.take(np.arange(start, min(start + step, len(inputs))))
+        parts.append(TimelineColumns.from_batch(chunk, compute_batch(chunk, as_of)))
+    return timeline(TimelineColumns.concat(parts), **bins)
@@ -0,0 +1,215 @@
+"""
+Sentry virtual-impactor (VI) tables.
+
+A VI table is loaded once into typed arrays (impact date, probability,
+energy, Palermo, Torino) and summarised with array operations:
+per-year and cumulative probability curves, the earliest significant
+impact date and the top-N VIs by probability.
+
+Tables arrive either as the Node backend's list of records
+({date, impactProbability, impactEnergy, palermoScale, torinoScale}),
+raw CNEOS rows ({date, ip, energy, ps, ts}) or the compact columnar
+form (VirtualImpactorColumns).  Record tables come from the backend as
+free-form dicts: missing or unparseable values load as unknown, and rows
+without a usable impact date are dropped.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import numpy as np
+
+from app.models import (
+    SentryData,
+    VirtualImpactor,
+    VirtualImpactorSummary,
+)
+
+# VIs at or above this probability count as "significant"
+SIGNIFICANT_IP = 1e-6
+TOP_N = 5
+
+# Accepted record keys, in lookup order
+_KEYS = {
+    "ip": ("impactProbability", "impact_probability", "ip"),
+    "energy": ("impactEnergy", "impact_energy_mt", "energy"),
+    "ps": ("palermoScale", "palermo_scale", "ps"),
+    "ts": ("torinoScale", "torino_scale", "ts"),
+}
+
+
+@dataclass
+class VirtualImpactorTable:
+    """Typed arrays for one object's virtual impactors."""
+
+    date_text: np.ndarray  # original Sentry date strings, e.g. "2095-09-16.13"
+    date: np.ndarray  # datetime64[s], never NaT
+    impact_probability: np.ndarray  # NaN when unknown
+    impact_energy_mt: np.ndarray  # NaN when unknown
+    palermo_scale: np.ndarray  # NaN when unknown
+    torino_scale: np.ndarray  # int8, -1 when unknown
+
+    def __len__(self) -> int:
+        return len(self.impact_probability)
+
+
+def _float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _floats(values: list[Any]) -> np.ndarray:
+    """Floats, NaN for missing or unparseable values."""
+    try:
+        return np.array(
+            [np.nan if v is None or v == "" else v for v in values], dtype=float
+        )
+    except (TypeError, ValueError):
+        return np.array([_float(v) for v in values], dtype=float)
+
+
+def _dates(dates: np.ndarray) -> np.ndarray:
+    """Sentry 'YYYY-MM-DD.dd' (fractional day) → datetime64[s]; raises ValueError."""
+    day, _, frac = np.char.partition(dates, ".").T
+    days = day.astype("datetime64[D]")
+    fraction = np.char.add("0.", np.where(frac == "", "0", frac)).astype(float)
+    seconds = np.rint(fraction * 86_400).astype("timedelta64[s]")
+    return days.astype("datetime64[s]") + seconds
+
+
+def _parse_dates(dates: np.ndarray) -> np.ndarray:
+    """As _dates, with NaT for empty or unparseable dates."""
+    try:
+        return _dates(dates)
+    except ValueError:
+        parsed = np.full(len(dates), np.datetime64("NaT"), dtype="datetime64[s]")
+        for i, text in enumerate(dates.tolist()):
+            try:
+                parsed[i] = _dates(np.array([text]))[0]
+            except ValueError:
+                pass
+        return parsed
+
+
+def _build(
+    dates: list[str], ip: list, energy: list, ps: list, ts: list
+) -> VirtualImpactorTable:
+    date_text = np.asarray(dates, dtype=str)
+    date = _parse_dates(date_text)
+    dated = ~np.isnat(date)
+    torino = _floats(ts)
+    return VirtualImpactorTable(
+        date_text=date_text[dated],
+        date=date[dated],
+        impact_probability=_floats(ip)[dated],
+        impact_energy_mt=_floats(energy)[dated],
+        palermo_scale=_floats(ps)[dated],
+        torino_scale=np.where(np.isnan(torino), -1, torino).astype(np.int8)[dated],
+    )
+
+
+def _column(records: list[dict], field: str) -> list:
+    keys = _KEYS[field]
+    first = records[0]
+    key = next((k for k in keys if k in first), keys[0])
+    return [r.get(key) for r in records]
+
+
+def load_vi_table(sentry_data: SentryData) -> Optional[VirtualImpactorTable]:
+    """Load a Sentry object's VI table into arrays (None if absent/empty)."""
+    cols = sentry_data.virtual_impactor_columns
+    if cols is not None and cols.date:
+        n = len(cols.date)
+        return _build(
+            cols.date,
+            cols.impact_probability,
+            cols.impact_energy_mt or [None] * n,
+            cols.palermo_scale,
+            cols.torino_scale or [None] * n,
+        )
+
+    records = sentry_data.virtual_impactors
+    if not records:
+        return None
+    return _build(
+        [r.get("date") or "" for r in records],
+        _column(records, "ip"),
+        _column(records, "energy"),
+        _column(records, "ps"),
+        _column(records, "ts"),
+    )
+
+
+def _known(value: np.floating) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
+
+
+def _vi(table: VirtualImpactorTable, i: int) -> VirtualImpactor:
+    torino = int(table.torino_scale[i])
+    return VirtualImpactor(
+        date=str(table.date_text[i]),
+        impact_probability=_known(table.impact_probability[i]),
+        impact_energy_mt=_known(table.impact_energy_mt[i]),
+        palermo_scale=_known(table.palermo_scale[i]),
+        torino_scale=None if torino < 0 else torino,
+    )
+
+
+def summarize_vi_table(
+    table: VirtualImpactorTable,
+    *,
+    top_n: int = TOP_N,
+    significant_ip: float = SIGNIFICANT_IP,
+) -> VirtualImpactorSummary:
+    """
+    Probability curves, earliest significant date and top-N VIs of a
+    non-empty table.  Unknown probabilities count as 0.
+    """
+    ip = np.nan_to_num(table.impact_probability, nan=0.0)
+
+    # ── Per-year and cumulative probability ──────────────
+    years = table.date.astype("datetime64[Y]").astype(np.int64) + 1970
+    uniq_years, inverse = np.unique(years, return_inverse=True)
+    per_year = np.bincount(inverse, weights=ip, minlength=len(uniq_years))
+
+    # ── Earliest impact dates ────────────────────────────
+    earliest = int(np.argmin(table.date))
+    significant = np.nonzero(ip >= significant_ip)[0]
+    earliest_sig = (
+        int(significant[np.argmin(table.date[significant])]) if len(significant) else None
+    )
+
+    # ── Top-N by probability ─────────────────────────────
+    k = min(top_n, len(ip))
+    top_idx = np.argpartition(-ip, k - 1)[:k] if k else np.array([], dtype=np.int64)
+    top_idx = top_idx[np.argsort(-ip[top_idx], kind="stable")]
+
+    torino = table.torino_scale
+    palermo = table.palermo_scale
+    has_palermo = ~np.isnan(palermo)
+    return VirtualImpactorSummary(
+        count=len(table),
+        cumulative_probability=float(ip.sum()),
+        combined_probability=float(-np.expm1(np.log1p(-np.minimum(ip, 1.0)).sum())),
+        max_palermo=float(palermo[has_palermo].max()) if has_palermo.any() else None,
+        max_torino=int(torino.max()) if (torino >= 0).any() else None,
+        earliest_date=str(table.date_text[earliest]),
+        earliest_significant_date=(
+            str(table.date_text[earliest_sig]) if earliest_sig is not None else None
+        ),
+        significant_threshold=significant_ip,
+        years=uniq_years.tolist(),
+        probability_by_year=per_year.tolist(),
+        cumulative_probability_by_year=np.cumsum(per_year).tolist(),
+        top=[_vi(table, i) for i in top_idx.tolist()],
+    )
+
+
+def vi_summary(sentry_data: SentryData) -> Optional[VirtualImpactorSummary]:
+    """Load and summarise a Sentry object's VI table in one step."""
+    table = load_vi_table(sentry_data)
+    if table is None or len(table) == 0:  # also when no row had a usable date
+        return None
+    return summarize_vi_table(table)
@@ -0,0 +1,159 @@
+"""
+Logging pipeline: queue-backed handlers and sampled per-object logs.
+
+configure_logging puts a single QueueHandler on the root logger.  A
+log call on the event loop or in an engine thread only checks the
+level, builds the LogRecord and appends it to a bounded queue; a
+QueueListener thread formats the records and writes them to the real
+handlers.  When the queue is full, records are dropped and counted
+instead of blocking the caller.  The next record that gets through
+reports the count.
+
+Messages are formatted in the listener thread, so log calls should pass
+%-style arguments (``logger.info("Analyzed %d asteroids", n)``) rather
+than f-strings: nothing is formatted for records below the level, and
+formatting is not done by the caller at all.  Arguments should be values
+that are not mutated afterwards.
+
+Per-object logs (one record per assessed object) are further thinned by
+``per_object``: it lets through one call in every ``1 / log_sample_rate``.
+
+    if logger.isEnabledFor(logging.DEBUG) and per_object():
+        logger.debug("Orbital data for %s: MOID=%s AU", name, moid)
+
+Forked workers (app.serve) restart the listener with a fresh queue,
+since threads do not survive ``fork``.
+"""
+
+import atexit
+import itertools
+import logging
+import os
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+# uvicorn installs its own stream handlers; they are routed to the queue too
+_UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+
+class Sampler:
+    """Lets through one call in every ``round(1 / rate)``; rate 0 lets none through."""
+
+    def __init__(self, rate: float = 1.0):
+        self.set_rate(rate)
+
+    def set_rate(self, rate: float) -> None:
+        self.every = round(1 / rate) if rate > 0 else 0
+        self._calls = itertools.count()  # next() is atomic under the GIL
+
+    def __call__(self) -> bool:
+        return self.every > 0 and next(self._calls) % self.every == 0
+
+
+per_object = Sampler()
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """QueueHandler that never blocks: records are dropped when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Unlike QueueHandler.prepare, leave msg % args to the listener;
+        # only the traceback is rendered here, while its frames are current
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            if self.dropped:
+                dropped, self.dropped = self.dropped, 0
+                note = logging.makeLogRecord({
+                    "name": "risk-engine.logs",
+                    "levelno": logging.WARNING,
+                    "levelname": "WARNING",
+                    "msg": "%d log records dropped (log queue full)",
+                    "args": (dropped,),
+                })
+                try:
+                    self.queue.put_nowait(note)
+                except queue.Full:
+                    self.dropped += dropped
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _Pipeline:
+    handler: Optional[_DroppingQueueHandler] = None
+    listener: Optional[QueueListener] = None
+    targets: tuple[logging.Handler, ...] = ()
+    queue_size: int = 0
+
+
+_pipeline = _Pipeline()
+
+
+def _start_listener() -> None:
+    log_queue: queue.Queue = queue.Queue(_pipeline.queue_size)
+    _pipeline.handler.queue = log_queue
+    _pipeline.handler.dropped = 0
+    _pipeline.listener = QueueListener(log_queue, *_pipeline.targets, respect_handler_level=True)
+    _pipeline.listener.start()
+
+
+def configure_logging(
+    level: str = "info",
+    fmt: str = "%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
+    *,
+    sample_rate: float = 1.0,
+    queue_size: int = 10_000,
+) -> None:
+    """
+    Route the root logger (and uvicorn's loggers) through the queue.
+
+    Calling it again replaces the previous pipeline, after flushing it.
+    """
+    stop_logging()
+    per_object.set_rate(sample_rate)
+
+    stream = logging.StreamHandler(sys.stderr)
+    stream.setFormatter(logging.Formatter(fmt))
+    _pipeline.targets = (stream,)
+    _pipeline.queue_size = queue_size
+    _pipeline.handler = _DroppingQueueHandler(queue.Queue(queue_size))
+    _start_listener()
+
+    root = logging.getLogger()
+    for h in list(root.handlers):
+        root.removeHandler(h)
+    root.addHandler(_pipeline.handler)
+    root.setLevel(getattr(logging, level.upper()))
+    for name in _UVICORN_LOGGERS:
+        uv = logging.getLogger(name)
+        uv.handlers.clear()
+        uv.propagate = True
+
+
+def stop_logging() -> None:
+    """Write out the queued records and stop the listener thread."""
+    if _pipeline.listener is not None:
+        _pipeline.listener.stop()
+        _pipeline.listener = None
+
+
+def _after_fork_in_child() -> None:
+    # The parent's listener thread is gone and its queue lock may be held
+    if _pipeline.handler is not None:
+        _pipeline.listener = None
+        _start_listener()
+
+
+atexit.register(stop_logging)
+os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -5,30 +5,75 @@
 ═══════════════════════════════════════════════════════════════
 """
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.openapi.utils import get_openapi
+from fastapi.responses import JSONResponse, Response
 from contextlib import asynccontextmanager
+from starlette.concurrency import run_in_threadpool
+import asyncio
 import logging
 import time
 
 import socketio
 
-from app.routes import risk_router, health_router
-from app.services import sio
+from app.routes import risk_router, health_router, jobs_router
+from app.routes.risk import CLIENT_CLOSED_REQUEST, OPENAPI_BODY_MODELS
+from app.services import sio, learned_model, job_manager, load_monitor, watch_registry
 from app.config import settings
+from app.logs import configure_logging
+from app.tracing import TracingMiddleware, exporter
+from app.engine.cancellation import DEADLINE_EXCEEDED, Cancelled
+from app.services.admission import AdmissionRejected
+from app.services.sharding import shard_coordinator
+from app.services.warm_start import load_snapshot, save_snapshot, warm_up
 
 
-logging.basicConfig(
-    level=getattr(logging, settings.log_level.upper()),
-    format="%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
+configure_logging(
+    settings.log_level,
+    sample_rate=settings.log_sample_rate,
+    queue_size=settings.log_queue_size,
 )
 logger = logging.getLogger("risk-engine")
+exporter.configure(
+    settings.trace_export,
+    batch_size=settings.trace_batch_size,
+    flush_s=settings.trace_flush_s,
+    capacity=settings.trace_queue_size,
+)
+
+
+async def _warm_up() -> None:
+    """Warm-up run in the background; the worker is ready once it is done."""
+    try:
+        if settings.warm_up_objects > 0:
+            elapsed = await run_in_threadpool(warm_up, settings.warm_up_objects)
+            logger.info("Warm-up over %d objects in %.2fs", settings.warm_up_objects, elapsed)
+    except Exception:
+        logger.exception("Warm-up failed; serving without it")
+    load_monitor.set_warm()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("🔬 Cosmic Watch Risk Engine starting...")
+    load_monitor.start()
+    exporter.start()
+    learned_model.load(settings.learned_model_path)
+    await run_in_threadpool(load_snapshot, settings.cache_snapshot_path)
+    job_manager.start()
+    shard_coordinator.start()
+    watch_registry.start()
+    warming = asyncio.create_task(_warm_up())
     yield
+    warming.cancel()
+    await asyncio.gather(warming, return_exceptions=True)
+    await job_manager.stop()
+    await shard_coordinator.stop()
+    await watch_registry.stop()
+    await run_in_threadpool(save_snapshot, settings.cache_snapshot_path)
+    await load_monitor.stop()
+    await run_in_threadpool(exporter.stop)
     logger.info("Risk Engine shutting down")
 
 
@@ -45,9 +90,52 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if exporter.enabled:
+    app.add_middleware(TracingMiddleware)
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected(request: Request, exc: AdmissionRejected):
+    """Shed load with a fast 429/503 and a Retry-After hint."""
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"success": False, "message": exc.detail, "retry_after": exc.retry_after},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+@app.exception_handler(Cancelled)
+async def request_cancelled(request: Request, exc: Cancelled):
+    """Cancelled outside the routes' own handling, e.g. while queued for admission."""
+    if exc.reason == DEADLINE_EXCEEDED:
+        return JSONResponse(status_code=504, content={"detail": "Request deadline exceeded"})
+    return Response(status_code=CLIENT_CLOSED_REQUEST)
+
 
 app.include_router(health_router)
 app.include_router(risk_router, prefix="/api/v1")
+app.include_router(jobs_router, prefix="/api/v1")
+
+
+def custom_openapi() -> dict:
+    """Default schema plus the models of routes that decode their own body."""
+    if app.openapi_schema is None:
+        schema = get_openapi(
+            title=app.title,
+            version=app.version,
+            description=app.description,
+            routes=app.routes,
+        )
+        components = schema.setdefault("components", {}).setdefault("schemas", {})
+        for model in OPENAPI_BODY_MODELS:
+            definition = model.model_json_schema(ref_template="#/components/schemas/{model}")
+            for name, sub in definition.pop("$defs", {}).items():
+                components.setdefault(name, sub)
+            components[model.__name__] = definition
+        app.openapi_schema = schema
+    return app.openapi_schema
+
+
+app.openapi = custom_openapi
 
 # Wrap ASGI app with Socket.IO for real-time backend connection
 combined_asgi_app = socketio.ASGIApp(sio, app)
@@ -3,9 +3,16 @@ Pydantic models for request/response validation.
 Maps directly to NASA NeoWs API data structures.
 """
 
-from pydantic import BaseModel, Field
+from pydantic import (
+    BaseModel,
+    Field,
+    SerializerFunctionWrapHandler,
+    model_serializer,
+    model_validator,
+)
 from typing import Optional
 from enum import Enum
+from datetime import date, datetime
 
 
 # ── Enums ──────────────────────────────────────────────────────
@@ -16,6 +23,51 @@ class RiskLevel(str, Enum):
     CRITICAL = "CRITICAL"
 
 
+class LabelMode(str, Enum):
+    """How descriptive labels are returned: formatted text or codes only."""
+    TEXT = "text"
+    CODES = "codes"
+
+
+class TimeWindow(str, Enum):
+    """Palermo/Torino ΔT: fixed 50-year window, or time until the approach."""
+    FIXED = "fixed"
+    APPROACH = "approach"
+
+
+class ResultMode(str, Enum):
+    """Return the full result, only the diff against a previous handle, or only the statistics."""
+    FULL = "full"
+    DIFF = "diff"
+    SUMMARY = "summary"
+
+
+class SensitivityFactor(str, Enum):
+    """Uncertain inputs perturbed by /analyze/explain."""
+    DIAMETER = "diameter"  # min and max estimate together
+    VELOCITY = "velocity"
+    MISS_DISTANCE = "miss_distance"
+    MOID = "moid"
+    ORBIT_UNCERTAINTY = "orbit_uncertainty"
+
+
+class DeflectionDirection(str, Enum):
+    """Direction of a deflection impulse relative to the orbit."""
+    ALONG_TRACK = "along_track"
+    CROSS_TRACK = "cross_track"
+
+
+class DeflectionField(str, Enum):
+    """Per-scenario values returned in the deflection result cube."""
+    MISS_DISTANCE_KM = "miss_distance_km"
+    MOID_AU = "moid_au"
+    IMPACT_PROBABILITY = "impact_probability"
+    TORINO_SCALE = "torino_scale"
+    PALERMO_SCALE = "palermo_scale"
+    RISK_SCORE = "risk_score"
+    RISK_LEVEL = "risk_level"
+
+
 # ── NASA NEO Input Models ─────────────────────────────────────
 class RelativeVelocity(BaseModel):
     kilometers_per_second: str
@@ -101,6 +153,23 @@ class NeoObject(BaseModel):
 class RiskAnalysisRequest(BaseModel):
     asteroids: list[NeoObject]
     date_range: Optional[dict] = None  # { start, end }
+    labels: LabelMode = LabelMode.TEXT
+    previous_handle: Optional[str] = None  # result_handle of an earlier run
+    result_mode: ResultMode = ResultMode.FULL
+    # Per-object ΔT = close approach − as_of (implied when as_of is given);
+    # several as_of times evaluate the scales at each of them in one pass
+    time_window: TimeWindow = TimeWindow.FIXED
+    as_of: Optional[list[datetime]] = None
+    # Extra registry models scored alongside the default (GET /api/v1/scoring-models)
+    scoring_models: Optional[list[str]] = None
+    # Time budget from arrival (also X-Request-Timeout-Ms); on expiry the work
+    # stops, or with best_effort the objects assessed so far are returned
+    timeout_ms: Optional[int] = Field(default=None, gt=0)
+    best_effort: bool = False
+    # Quantiles, histograms and correlations (extended_statistics)
+    extended_statistics: bool = False
+    # Airburst / crater / blast-radius fields on each assessment
+    impact_effects: bool = False
 
 
 # ── Risk Analysis Response Models ─────────────────────────────
@@ -132,10 +201,78 @@ class RiskAssessment(BaseModel):
     torino_scale: int = Field(ge=0, le=10, description="Torino impact hazard scale (0-10)")
     palermo_scale: float = Field(description="Palermo technical impact hazard scale")
     impact_probability: float = Field(description="Estimated impact probability")
-    impact_energy_comparison: str = Field(description="Energy comparison to known events")
-    relative_size: str = Field(description="Size comparison to familiar objects")
+    impact_energy_comparison: Optional[str] = Field(
+        default=None, description="Energy comparison to known events"
+    )
+    relative_size: Optional[str] = Field(
+        default=None, description="Size comparison to familiar objects"
+    )
+    energy_comparison_code: Optional[int] = Field(
+        default=None, description="Known-event code (see /api/v1/labels), -1 = negligible"
+    )
+    energy_comparison_multiplier: Optional[float] = Field(
+        default=None, description="Energy as a multiple of the known event"
+    )
+    size_comparison_code: Optional[int] = Field(
+        default=None, description="Size class code (see /api/v1/labels)"
+    )
     approach_count: int = Field(description="Number of close approaches in window")
     score_breakdown: ScoreBreakdown
+    time_window_years: Optional[float] = Field(
+        default=None, description="Palermo/Torino ΔT in years (approach time windows only)"
+    )
+    palermo_by_as_of: Optional[list[float]] = Field(
+        default=None, description="Palermo scale at each requested as_of time"
+    )
+    torino_by_as_of: Optional[list[int]] = Field(
+        default=None, description="Torino scale at each requested as_of time"
+    )
+    model_scores: Optional[dict[str, float]] = Field(
+        default=None, description="Risk score under each requested scoring model"
+    )
+    model_risk_levels: Optional[dict[str, RiskLevel]] = Field(
+        default=None, description="Risk level under each requested scoring model"
+    )
+    learned_score: Optional[float] = Field(
+        default=None, description="Learned-model score (0-100) when a model is loaded"
+    )
+    # Impact effects if it hit (45° entry); None where not applicable
+    breakup_altitude_km: Optional[float] = Field(
+        default=None, description="Atmospheric breakup altitude (None: reaches the ground intact)"
+    )
+    airburst_altitude_km: Optional[float] = Field(
+        default=None, description="Airburst altitude (None: ground impact)"
+    )
+    impact_velocity_km_s: Optional[float] = Field(
+        default=None, description="Velocity at the ground (None: airburst)"
+    )
+    crater_diameter_km: Optional[float] = Field(
+        default=None, description="Final crater diameter (None: airburst)"
+    )
+    blast_radius_5psi_km: Optional[float] = Field(
+        default=None, description="Ground range of 5 psi overpressure (most buildings collapse)"
+    )
+    blast_radius_1psi_km: Optional[float] = Field(
+        default=None, description="Ground range of 1 psi overpressure (windows shatter)"
+    )
+    thermal_radius_km: Optional[float] = Field(
+        default=None, description="Ground range of second-degree burns"
+    )
+
+    @model_serializer(mode="wrap")
+    def _omit_nulls(self, handler: SerializerFunctionWrapHandler):
+        # Optional fields are left out when null (stage not run, or not
+        # applicable), so records only carry what was computed
+        data = handler(self)
+        for name in _OPTIONAL_ASSESSMENT_FIELDS:
+            if name in data and data[name] is None:
+                del data[name]
+        return data
+
+
+_OPTIONAL_ASSESSMENT_FIELDS = tuple(
+    name for name, f in RiskAssessment.model_fields.items() if not f.is_required()
+)
 
 
 class AsteroidSummary(BaseModel):
@@ -160,17 +297,117 @@ class RiskStatistics(BaseModel):
     total_kinetic_energy_mt: float = Field(description="Sum of all kinetic energies")
 
 
+class Histogram(BaseModel):
+    """Counts between consecutive edges; the end bins also count values beyond them."""
+    edges: list[float]
+    counts: list[int]
+
+
+class ExtendedStatistics(BaseModel):
+    """Batch distributions, returned with extended_statistics=true."""
+    score_quantiles: dict[str, float] = Field(description="p50 / p90 / p99 of risk_score")
+    energy_quantiles_mt: dict[str, float] = Field(
+        description="p50 / p90 / p99 of kinetic_energy_mt"
+    )
+    diameter_histogram_km: Histogram = Field(description="Half-decade bins, 1 m to 100 km")
+    velocity_histogram_km_s: Histogram = Field(description="5 km/s bins, 0 to 70 km/s")
+    score_distance_pearson: Optional[float] = Field(
+        default=None, description="Pearson r of risk_score vs miss distance"
+    )
+    score_distance_spearman: Optional[float] = Field(
+        default=None, description="Spearman rank correlation of risk_score vs miss distance"
+    )
+
+
+class ModelStatistics(BaseModel):
+    """Batch summary for one requested scoring model."""
+    version: str
+    by_risk_level: dict[str, int]
+    average_risk_score: float
+    max_risk_score: float
+    level_changes: int = Field(description="Objects whose risk level differs from the default model")
+
+
+class AssessmentChange(BaseModel):
+    asteroid_id: str
+    name: str
+    previous_score: float
+    risk_score: float
+    previous_level: RiskLevel
+    risk_level: RiskLevel
+
+
+class AnalysisDiff(BaseModel):
+    """Changes relative to the result identified by ``base_handle``."""
+    base_handle: str
+    added: list[RiskAssessment]
+    removed: list[str] = Field(description="Asteroid ids no longer present")
+    changed: list[AssessmentChange] = Field(description="Objects whose score or level changed")
+    unchanged_count: int
+    recomputed_count: int = Field(description="Objects that were new or had changed inputs")
+
+
 class RiskAnalysisResponse(BaseModel):
     success: bool = True
     message: str = "Risk analysis completed"
     engine: str = "python-scientific"
     total_analyzed: int
     date_range: Optional[dict] = None
-    statistics: RiskStatistics
+    as_of: Optional[list[str]] = None
+    result_handle: Optional[str] = None
+    statistics: Optional[RiskStatistics] = None
+    extended_statistics: Optional[ExtendedStatistics] = None
+    model_statistics: Optional[dict[str, ModelStatistics]] = None
+    learned_model: Optional[str] = None  # version of the model behind learned_score
+    partial: bool = False  # best-effort result cut short by its deadline
     assessments: list[RiskAssessment]
+    diff: Optional[AnalysisDiff] = None
 
 
 # ── Sentry-Enhanced Models ─────────────────────────────────────
+class VirtualImpactorColumns(BaseModel):
+    """Compact columnar VI table (one array per field)."""
+    date: list[str]  # Sentry "YYYY-MM-DD.dd"
+    impact_probability: list[float]
+    palermo_scale: list[float]
+    impact_energy_mt: Optional[list[Optional[float]]] = None
+    torino_scale: Optional[list[Optional[int]]] = None
+
+    @model_validator(mode="after")
+    def _check_lengths(self) -> "VirtualImpactorColumns":
+        n = len(self.date)
+        for name in ("impact_probability", "palermo_scale", "impact_energy_mt", "torino_scale"):
+            col = getattr(self, name)
+            if col is not None and len(col) != n:
+                raise ValueError(f"{name} has {len(col)} values, expected {n}")
+        return self
+
+
+class VirtualImpactor(BaseModel):
+    """One VI; values missing from the Sentry table are null."""
+    date: str
+    impact_probability: Optional[float] = None
+    impact_energy_mt: Optional[float] = None
+    palermo_scale: Optional[float] = None
+    torino_scale: Optional[int] = None
+
+
+class VirtualImpactorSummary(BaseModel):
+    """Array-computed summary of an object's virtual-impactor table."""
+    count: int
+    cumulative_probability: float = Field(description="Σ IP over all VIs (Sentry convention)")
+    combined_probability: float = Field(description="1 − Π(1 − IP), independent-event combination")
+    max_palermo: Optional[float] = None
+    max_torino: Optional[int] = None
+    earliest_date: str
+    earliest_significant_date: Optional[str] = None
+    significant_threshold: float
+    years: list[int]
+    probability_by_year: list[float]
+    cumulative_probability_by_year: list[float]
+    top: list[VirtualImpactor]
+
+
 class SentryData(BaseModel):
     """Real Sentry impact monitoring data from CNEOS."""
     designation: str
@@ -185,6 +422,7 @@ class SentryData(BaseModel):
     velocity_infinity: Optional[float] = None  # km/s
     total_virtual_impactors: int = 0
     virtual_impactors: Optional[list[dict]] = None
+    virtual_impactor_columns: Optional[VirtualImpactorColumns] = None
 
 
 class SentryEnhancedRequest(BaseModel):
@@ -203,4 +441,287 @@ class SentryEnhancedAssessment(RiskAssessment):
     real_torino_max: int = 0
     real_impact_energy_mt: Optional[float] = None
     total_virtual_impactors: int = 0
+    virtual_impactor_summary: Optional[VirtualImpactorSummary] = None
     data_source: str = "CNEOS Sentry + NASA NeoWs"
+
+
+# ── Batch Sentry-Enhanced Models ───────────────────────────────
+class SentryBatchRequest(BaseModel):
+    """
+    Many Sentry-enhanced assessments in one call.
+
+    Either ``items`` (explicit NEO + Sentry pairs), or ``asteroids`` plus a
+    ``sentry_table`` joined on designation.
+    """
+    items: Optional[list[SentryEnhancedRequest]] = None
+    asteroids: Optional[list[NeoObject]] = None
+    sentry_table: Optional[list[SentryData]] = None
+
+    @model_validator(mode="after")
+    def _check_shape(self) -> "SentryBatchRequest":
+        if self.items is None and (self.asteroids is None or self.sentry_table is None):
+            raise ValueError("Provide either items, or asteroids together with sentry_table")
+        if self.items is not None and (self.asteroids is not None or self.sentry_table is not None):
+            raise ValueError("items cannot be combined with asteroids/sentry_table")
+        return self
+
+
+class SentryBatchStatistics(BaseModel):
+    total_analyzed: int
+    by_risk_level: dict[str, int]
+    average_risk_score: float
+    max_risk_score: float
+    average_score_adjustment: float = Field(description="Mean change vs. the base (NeoWs-only) score")
+    expected_impacts: float = Field(description="Sum of real cumulative impact probabilities")
+    max_palermo_cumulative: float
+    total_virtual_impactors: int
+    highest_probability: Optional[AsteroidSummary] = None
+    highest_palermo: Optional[AsteroidSummary] = None
+
+
+class SentryBatchResponse(BaseModel):
+    success: bool = True
+    message: str = "Batch Sentry-enhanced analysis completed"
+    engine: str = "python-scientific-sentry"
+    total_analyzed: int
+    statistics: SentryBatchStatistics
+    assessments: list[SentryEnhancedAssessment]
+    unmatched: list[str] = Field(default_factory=list, description="Asteroids with no Sentry row")
+    skipped: list[str] = Field(default_factory=list, description="Asteroids without close-approach data")
+
+
+# ── Analysis Jobs ─────────────────────────────────────────────
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class JobSubmitRequest(BaseModel):
+    """A batch to analyse in the background: inline asteroids or a local file."""
+    asteroids: Optional[list[NeoObject]] = None
+    # File under JOBS_INPUT_DIR (JSON / NDJSON, optionally .gz; see engine/sources.py)
+    source_path: Optional[str] = None
+    date_range: Optional[dict] = None
+    labels: LabelMode = LabelMode.TEXT
+    time_window: TimeWindow = TimeWindow.FIXED
+    as_of: Optional[list[datetime]] = None
+    scoring_models: Optional[list[str]] = None
+    impact_effects: bool = False
+
+    @model_validator(mode="after")
+    def _check_source(self) -> "JobSubmitRequest":
+        if (self.asteroids is None) == (self.source_path is None):
+            raise ValueError("Provide exactly one of asteroids or source_path")
+        return self
+
+
+class JobProgress(BaseModel):
+    """Running totals over the objects assessed so far."""
+    assessed: int = 0
+    by_risk_level: dict[str, int] = Field(
+        default_factory=lambda: {"LOW": 0, "MEDIUM": 0, "HIGH": 0, "CRITICAL": 0}
+    )
+    average_risk_score: float = 0
+    max_risk_score: float = 0
+
+
+class JobInfo(BaseModel):
+    job_id: str
+    status: JobStatus
+    source: str = Field(description="'inline' or the input file path")
+    created_at: float
+    updated_at: float
+    total: Optional[int] = Field(default=None, description="Input objects (None until loaded)")
+    processed: int = 0
+    progress: JobProgress
+    statistics: Optional[RiskStatistics] = None  # once completed
+    model_statistics: Optional[dict[str, ModelStatistics]] = None
+    error: Optional[str] = None
+
+
+# ── Watch Registry (Socket.IO) ────────────────────────────────
+class WatchRequest(BaseModel):
+    """
+    Socket.IO ``watch``: asteroids to watch and the thresholds whose
+    crossing (either way) raises a ``risk_alert``.  Unset thresholds are
+    not checked; watching an asteroid again replaces its thresholds.
+    """
+    asteroid_ids: list[str] = Field(min_length=1)
+    risk_level: Optional[RiskLevel] = RiskLevel.HIGH
+    torino_scale: Optional[int] = Field(default=1, ge=0, le=10)
+    risk_score: Optional[float] = Field(default=None, ge=0, le=100)
+
+    @model_validator(mode="after")
+    def _check_thresholds(self) -> "WatchRequest":
+        if self.risk_level is None and self.torino_scale is None and self.risk_score is None:
+            raise ValueError("Set at least one of risk_level, torino_scale or risk_score")
+        return self
+
+
+class UnwatchRequest(BaseModel):
+    """Socket.IO ``unwatch``: the asteroids to stop watching (all when omitted)."""
+    asteroid_ids: Optional[list[str]] = None
+
+
+# ── Close-Approach Timeline ───────────────────────────────────
+class TimelineQuery(BaseModel):
+    """
+    Binning of the timeline endpoints (query parameters).
+    ``distance_edges_ld`` are the inner band edges in lunar distances,
+    e.g. 1 and 5 give the bands [0, 1), [1, 5) and [5, ∞); repeat the
+    parameter for each edge.
+    """
+    bin_days: int = Field(default=1, ge=1, le=366, description="Width of a day bin")
+    distance_edges_ld: list[float] = Field(
+        default=[1.0, 5.0, 10.0, 20.0, 50.0, 100.0], min_length=1, max_length=64
+    )
+    start_date: Optional[date] = Field(default=None, description="First approach day counted")
+    end_date: Optional[date] = Field(default=None, description="Last approach day counted")
+
+    @model_validator(mode="after")
+    def _check_bins(self) -> "TimelineQuery":
+        edges = self.distance_edges_ld
+        if edges[0] <= 0 or any(b <= a for a, b in zip(edges, edges[1:])):
+            raise ValueError("distance_edges_ld must be positive and strictly increasing")
+        if self.start_date and self.end_date and self.end_date < self.start_date:
+            raise ValueError("end_date is before start_date")
+        return self
+
+
+# ── Score Sensitivity (/analyze/explain) ──────────────────────
+class ExplainQuery(BaseModel):
+    """
+    Perturbation grid of /analyze/explain (query parameters).
+    Each factor is scaled by every multiplier (orbit uncertainty is
+    instead shifted by whole condition codes); repeat a parameter for
+    each value.
+    """
+    factors: list[SensitivityFactor] = Field(
+        default_factory=lambda: list(SensitivityFactor), min_length=1
+    )
+    multipliers: list[float] = Field(
+        default=[0.5, 0.75, 0.9, 1.1, 1.25, 1.5, 2.0], min_length=1, max_length=16
+    )
+
+    @model_validator(mode="after")
+    def _check_grid(self) -> "ExplainQuery":
+        if any(m <= 0 or m == 1 for m in self.multipliers):
+            raise ValueError("multipliers must be positive and not 1")
+        self.multipliers = sorted(set(self.multipliers))
+        self.factors = list(dict.fromkeys(self.factors))
+        return self
+
+
+class FactorSensitivity(BaseModel):
+    """How one object's score responds to one perturbed input."""
+    scores: list[float] = Field(description="Risk score at each step of the factor's grid")
+    torino_scales: list[int]
+    points_per_step: Optional[float] = Field(
+        default=None,
+        description="Score change per +1% (orbit uncertainty: per +1 code) around the "
+        "current value; None when the input is unknown",
+    )
+    raises_level_at: Optional[float] = Field(
+        default=None, description="Step nearest the current value that raises the risk level"
+    )
+    lowers_level_at: Optional[float] = Field(
+        default=None, description="Step nearest the current value that lowers the risk level"
+    )
+
+
+class ScoreExplanation(BaseModel):
+    asteroid_id: str
+    name: str
+    risk_score: float
+    risk_level: RiskLevel
+    torino_scale: int
+    score_breakdown: ScoreBreakdown
+    next_level: Optional[RiskLevel] = None
+    points_to_next_level: Optional[float] = Field(
+        default=None, description="Score increase that reaches the next level (None at CRITICAL)"
+    )
+    points_above_level: float = Field(
+        description="Score decrease that drops to the previous level (above 0 at LOW)"
+    )
+    factors: dict[str, FactorSensitivity]
+
+
+class ExplanationResponse(BaseModel):
+    success: bool = True
+    message: str = "Sensitivity analysis completed"
+    total_analyzed: int
+    as_of: Optional[list[str]] = None
+    steps: dict[str, list[float]] = Field(
+        description="Per factor: the multipliers (orbit uncertainty: code offsets) evaluated"
+    )
+    explanations: list[ScoreExplanation]
+
+
+# ── Deflection Scenarios (/analyze/deflection) ────────────────
+class DeflectionRequest(BaseModel):
+    """
+    Objects and a scenario grid: every combination of delta-v, lead time
+    (impulse applied this many days before the close approach) and
+    direction is evaluated for every object, up to 1 000 000 in all.
+    """
+    asteroids: list[NeoObject] = Field(min_length=1, max_length=10_000)
+    delta_v_mm_s: list[float] = Field(min_length=1, max_length=1000)
+    lead_time_days: list[float] = Field(min_length=1, max_length=1000)
+    directions: list[DeflectionDirection] = Field(
+        default=[DeflectionDirection.ALONG_TRACK], min_length=1
+    )
+    fields: list[DeflectionField] = Field(
+        default_factory=lambda: list(DeflectionField), min_length=1
+    )
+    time_window: TimeWindow = TimeWindow.FIXED
+    as_of: Optional[list[datetime]] = None
+
+    @model_validator(mode="after")
+    def _check_grid(self) -> "DeflectionRequest":
+        if min(self.delta_v_mm_s) < 0 or min(self.lead_time_days) < 0:
+            raise ValueError("delta_v_mm_s and lead_time_days must not be negative")
+        # Ascending axes, so the first qualifying delta-v is the smallest
+        self.delta_v_mm_s = sorted(set(self.delta_v_mm_s))
+        self.lead_time_days = sorted(set(self.lead_time_days))
+        self.directions = list(dict.fromkeys(self.directions))
+        self.fields = list(dict.fromkeys(self.fields))
+        return self
+
+
+class DeflectionBaseline(BaseModel):
+    """An object's values without deflection."""
+    asteroid_id: str
+    name: str
+    miss_distance_km: float
+    moid_au: Optional[float] = None
+    impact_probability: float
+    torino_scale: int
+    palermo_scale: float
+    risk_score: float
+    risk_level: RiskLevel
+
+
+class DeflectionResponse(BaseModel):
+    success: bool = True
+    message: str = "Deflection scenarios evaluated"
+    total_analyzed: int
+    total_scenarios: int
+    as_of: Optional[list[str]] = None
+    axes: dict[str, list] = Field(
+        description="Cube axes after the object axis: direction, lead_time_days, delta_v_mm_s"
+    )
+    baselines: list[DeflectionBaseline]
+    cube: dict[str, list] = Field(
+        description="Per requested field: values as [object][direction][lead time][delta-v]"
+    )
+    min_delta_v_torino_zero: list = Field(
+        description="[object][direction][lead time]: smallest delta-v of the grid that "
+        "brings the Torino scale to 0 (null if none)"
+    )
+    min_delta_v_level_drop: list = Field(
+        description="[object][direction][lead time]: smallest delta-v of the grid that "
+        "lowers the risk level (null if none)"
+    )
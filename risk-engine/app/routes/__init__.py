@@ -1,4 +1,5 @@
 from app.routes.health import router as health_router
 from app.routes.risk import router as risk_router
+from app.routes.jobs import router as jobs_router
 
-__all__ = ["health_router", "risk_router"]
+__all__ = ["health_router", "risk_router", "jobs_router"]
@@ -1,6 +1,9 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
 import time
 
+from app.services import admission, load_monitor
+
 router = APIRouter()
 
 
@@ -12,4 +15,32 @@ async def health_check():
         "engine": "python",
         "version": "1.0.0",
         "timestamp": time.time(),
+        "load": load_monitor.snapshot(),
+    }
+
+
+@router.get("/ready")
+async def readiness_check():
+    """
+    Readiness for new work: 503 while the worker is warming up or
+    saturated (event-loop lag, threadpool queue or admission queue past
+    their limits), with the reasons and the load figures.
+    """
+    load = load_monitor.snapshot()
+    return JSONResponse(
+        status_code=200 if load["ready"] else 503,
+        content={
+            "success": load["ready"],
+            "message": "Ready" if load["ready"] else "; ".join(load["not_ready_reasons"]),
+            "data": load,
+        },
+    )
+
+
+@router.get("/metrics/admission")
+async def admission_metrics():
+    """Admission-control queue depth, in-flight objects, wait times and rejections."""
+    return {
+        "success": True,
+        "data": admission.snapshot(),
     }
@@ -0,0 +1,136 @@
+"""
+Background analysis job routes.
+Submit a batch once, follow its progress over Socket.IO, page through the results.
+"""
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import Response
+from starlette.concurrency import run_in_threadpool
+from typing import Annotated, Optional
+import json
+import logging
+
+from app.models import JobStatus, JobSubmitRequest, TimelineQuery
+from app.engine.timeline import TimelineColumns, timeline
+from app.services import job_manager
+
+router = APIRouter(tags=["Analysis Jobs"])
+logger = logging.getLogger("risk-engine.routes")
+
+
+@router.post("/jobs", status_code=202)
+async def submit_job(request: JobSubmitRequest):
+    """
+    Queue a batch for background analysis.
+
+    Send the asteroids inline, or ``source_path``: a JSON / NDJSON file
+    (optionally gzipped) inside the engine's JOBS_INPUT_DIR.  Takes the
+    same date_range / labels / time_window / as_of / scoring_models
+    options as /analyze.
+
+    Progress is pushed to Socket.IO clients as ``job_progress`` events
+    (processed, total and running statistics), then ``job_completed``,
+    ``job_failed`` or ``job_cancelled``.
+    """
+    try:
+        job_id = await job_manager.submit(request)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+
+    source = request.source_path or f"{len(request.asteroids)} asteroids"
+    logger.info("Queued job %s (%s)", job_id, source)
+    return {
+        "success": True,
+        "message": "Analysis job queued",
+        "data": {"job_id": job_id, "status": JobStatus.QUEUED},
+    }
+
+
+@router.get("/jobs")
+async def list_jobs(
+    status: Optional[JobStatus] = Query(None),
+    limit: int = Query(50, ge=1, le=500),
+):
+    """Most recent jobs first, optionally filtered by status."""
+    return {
+        "success": True,
+        "data": await run_in_threadpool(job_manager.recent, status, limit),
+    }
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status, progress and (once completed) batch statistics of a job."""
+    info = await run_in_threadpool(job_manager.info, job_id)
+    if info is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return {"success": True, "data": info}
+
+
+@router.get("/jobs/{job_id}/results")
+async def get_job_results(
+    job_id: str,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(500, ge=1, le=5000),
+):
+    """
+    One page of a completed job's assessments, highest risk first.
+    409 while the job is still queued or running (or if it did not complete).
+    """
+    info = await run_in_threadpool(job_manager.info, job_id)
+    if info is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    if info.status != JobStatus.COMPLETED:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is {info.status.value}")
+
+    store = job_manager.store
+    total = await run_in_threadpool(store.result_count, job_id)
+    rows = await run_in_threadpool(store.results, job_id, (page - 1) * page_size, page_size)
+
+    # Assessments are stored as JSON; splice them in rather than re-validating
+    head = json.dumps({
+        "success": True,
+        "job_id": job_id,
+        "page": page,
+        "page_size": page_size,
+        "total_results": total,
+        "total_pages": -(-total // page_size),
+    })
+    body = f'{head[:-1]}, "assessments": [{",".join(rows)}]}}'
+    return Response(content=body, media_type="application/json")
+
+
+@router.get("/jobs/{job_id}/timeline")
+async def get_job_timeline(job_id: str, bins: Annotated[TimelineQuery, Query()]):
+    """
+    Close-approach timeline of a completed job's results (see
+    /analyze/timeline), optionally limited to start_date / end_date.
+    """
+    info = await run_in_threadpool(job_manager.info, job_id)
+    if info is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    if info.status != JobStatus.COMPLETED:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is {info.status.value}")
+
+    def compute() -> dict:
+        rows = job_manager.store.results(job_id)
+        return timeline(
+            TimelineColumns.from_documents(map(json.loads, rows)), **bins.model_dump()
+        )
+
+    try:
+        data = await run_in_threadpool(compute)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    return {"success": True, "job_id": job_id, "data": data}
+
+
+@router.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job; results stored so far are discarded."""
+    if not await job_manager.cancel(job_id):
+        info = await run_in_threadpool(job_manager.info, job_id)
+        if info is None:
+            raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is already {info.status.value}")
+    return {"success": True, "message": f"Job {job_id} cancelled"}
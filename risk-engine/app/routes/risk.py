@@ -3,19 +3,299 @@ Risk analysis API routes.
 Receives asteroid data from Node.js backend, runs scientific analysis.
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, Response
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+from contextlib import asynccontextmanager
+from dataclasses import asdict
+from typing import Annotated, Optional, Union
+import asyncio
+import json
 import time
 import logging
 
-from app.models import RiskAnalysisRequest, RiskAnalysisResponse, NeoObject, SentryEnhancedRequest
+import numpy as np
+
+from app.models import (
+    DeflectionRequest,
+    DeflectionResponse,
+    ExplainQuery,
+    ExplanationResponse,
+    RiskAnalysisRequest,
+    RiskAnalysisResponse,
+    NeoObject,
+    ResultMode,
+    SentryEnhancedRequest,
+    SentryBatchRequest,
+    SentryBatchResponse,
+    TimelineQuery,
+)
 from app.engine import RiskEngine
+from app.engine.analysis import approach_counts, format_as_of
+from app.engine.batch import BatchInputs, extract_inputs, resolve_as_of
+from app.engine.cancellation import DEADLINE_EXCEEDED, Cancelled, CancelToken
+from app.engine.ingest import decode_analyze_body, decode_analyze_request, scan_analyze_body
+from app.engine.labels import label_tables
+from app.engine.projection import FieldProjection, ResponseFormat, project_response
+from app.engine.deflection import scenario_count
+from app.engine.sensitivity import perturbations_per_object
+from app.engine.shards import SHARD_MEDIA_TYPE, ShardResult, shard_body
+from app.engine.timeline import TimelineColumns, batch_timeline, timeline
+from app.services import (
+    admission,
+    learned_model,
+    result_store,
+    scoring_registry,
+    watch_registry,
+)
+from app.services.socketio_service import send_risk_alerts
+from app.services.watch_registry import WatchObserver
+from app.services.admission import Lane
+from app.services.sharding import ShardRejected, shard_coordinator
+from app.tracing import span
 
 router = APIRouter(tags=["Risk Analysis"])
 logger = logging.getLogger("risk-engine.routes")
 
 
-@router.post("/analyze", response_model=RiskAnalysisResponse)
-async def analyze_risk(request: RiskAnalysisRequest):
+# Status for a request abandoned by its client (nginx convention; never seen by it)
+CLIENT_CLOSED_REQUEST = 499
+
+# Request models of routes that decode their own body; main.py adds them
+# to the OpenAPI components so the routes can reference them
+OPENAPI_BODY_MODELS = (RiskAnalysisRequest,)
+
+
+def _json_body(model: type) -> dict:
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {"$ref": f"#/components/schemas/{model.__name__}"}
+                }
+            },
+        }
+    }
+
+
+async def _decode_analyze_request(
+    http_request: Request,
+) -> tuple[RiskAnalysisRequest, BatchInputs, int]:
+    """
+    Decode an /analyze body on the lean path (app.engine.ingest), off the
+    event loop, failing with the same 422 errors as FastAPI's own body
+    validation.
+    """
+    body = await http_request.body()
+    if not body:
+        raise RequestValidationError(
+            [{"type": "missing", "loc": ("body",), "msg": "Field required", "input": None}]
+        )
+    try:
+        with span("decode", bytes=len(body)) as s:
+            request, inputs, size = await run_in_threadpool(decode_analyze_body, body)
+            s.set(objects=size, rows=len(inputs))
+        return request, inputs, size
+    except json.JSONDecodeError as exc:
+        raise RequestValidationError(
+            [
+                {
+                    "type": "json_invalid",
+                    "loc": ("body", exc.pos),
+                    "msg": "JSON decode error",
+                    "input": {},
+                    "ctx": {"error": exc.msg},
+                }
+            ],
+            body=exc.doc,
+        )
+    except ValidationError as exc:
+        raise _body_errors(exc)
+
+
+async def _decode_analyze_document(
+    document: dict,
+) -> tuple[RiskAnalysisRequest, BatchInputs, int]:
+    """_decode_analyze_request for a body already decoded from JSON."""
+    try:
+        return await run_in_threadpool(decode_analyze_request, document)
+    except ValidationError as exc:
+        raise _body_errors(exc)
+
+
+def _body_errors(exc: ValidationError) -> RequestValidationError:
+    return RequestValidationError(
+        [{**e, "loc": ("body", *e["loc"])} for e in exc.errors(include_url=False)]
+    )
+
+
+@asynccontextmanager
+async def _cancel_on_disconnect(http_request: Request, cancel: CancelToken):
+    """Cancel ``cancel`` if the client goes away while the block runs."""
+
+    async def watch() -> None:
+        while not await http_request.is_disconnected():
+            await asyncio.sleep(0.2)
+        cancel.cancel()
+
+    watcher = asyncio.create_task(watch())
+    try:
+        yield
+    finally:
+        watcher.cancel()
+
+
+async def _send_watch_alerts(watcher: Optional[WatchObserver]) -> None:
+    """Check the batch's watched objects and push any risk_alert events."""
+    if watcher is not None:
+        await run_in_threadpool(watcher.finish)
+        await send_risk_alerts()
+
+
+async def _analyze_sharded(
+    http_request: Request, x_request_timeout_ms: Optional[int], start: float
+) -> Union[Response, tuple[RiskAnalysisRequest, BatchInputs, int]]:
+    """
+    /analyze split across the shard peers (services.sharding).
+
+    Returns the response, or the decoded request for the unsharded path
+    when the batch is not split: too small, incremental, or invalid (the
+    unsharded decode then reports the errors).
+    """
+    body = await http_request.body()
+    try:
+        with span("decode", bytes=len(body)) as s:
+            options, records, text, spans = await run_in_threadpool(scan_analyze_body, body)
+            s.set(objects=len(records))
+    except ValueError:
+        return await _decode_analyze_request(http_request)
+
+    document = {**options, "asteroids": records}
+    try:
+        request = RiskAnalysisRequest.model_validate({**options, "asteroids": []})
+    except ValidationError:
+        return await _decode_analyze_document(document)
+    if (
+        len(records) < shard_coordinator.min_objects
+        or request.previous_handle
+        or request.result_mode != ResultMode.FULL
+        or request.extended_statistics
+    ):
+        return await _decode_analyze_document(document)
+
+    timeout_ms = request.timeout_ms or x_request_timeout_ms
+    cancel = CancelToken(timeout_ms / 1000 if timeout_ms else None)
+    try:
+        models = scoring_registry.resolve(request.scoring_models or [])
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    as_of = resolve_as_of(request.time_window, request.as_of)
+    learned = learned_model.model
+    # Peers evaluate at the same as_of times, resolved here
+    peer_options = {
+        "labels": request.labels.value,
+        "scoring_models": request.scoring_models,
+        "time_window": request.time_window.value,
+        "as_of": (
+            [f"{t}Z" for t in np.datetime_as_string(as_of, unit="ms")]
+            if as_of is not None
+            else None
+        ),
+        "best_effort": request.best_effort,
+        "impact_effects": request.impact_effects,
+    }
+    watcher = watch_registry.observer()
+
+    async def run_local(rows: np.ndarray) -> ShardResult:
+        shard = {**options, "asteroids": [records[i] for i in rows.tolist()]}
+        try:
+            _, inputs, size = await run_in_threadpool(decode_analyze_request, shard)
+        except ValidationError:
+            raise ShardRejected("invalid records in the local shard")
+        async with admission.slot(Lane.BATCH, size, timeout=cancel.remaining()):
+            with span("engine.shard", objects=size, rows=len(inputs)):
+                return await run_in_threadpool(
+                    RiskEngine.analyze_shard,
+                    inputs,
+                    size,
+                    request.labels,
+                    as_of=as_of,
+                    models=models,
+                    learned=learned,
+                    cancel=cancel,
+                    best_effort=request.best_effort,
+                    observe=watcher,
+                    effects=request.impact_effects,
+                )
+
+    shards = shard_coordinator.plan(
+        [r.get("neo_reference_id") if isinstance(r, dict) else None for r in records]
+    )
+    try:
+        async with _cancel_on_disconnect(http_request, cancel):
+            parts = await shard_coordinator.run(
+                shards,
+                lambda rows: shard_body(text, spans, rows, peer_options),
+                run_local,
+                models,
+                learned.version if learned is not None else None,
+                cancel,
+                best_effort=request.best_effort,
+            )
+    except ShardRejected:
+        return await _decode_analyze_document(document)
+    except Cancelled as exc:
+        await _send_watch_alerts(watcher)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        logger.info(
+            "Sharded analysis of %d asteroids stopped after %.1fms (%s)",
+            len(records), elapsed_ms, exc.reason,
+        )
+        if exc.reason == DEADLINE_EXCEEDED:
+            raise HTTPException(status_code=504, detail="Request deadline exceeded")
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+    await _send_watch_alerts(watcher)
+
+    with span("shard.merge", shards=len(parts)):
+        content = await run_in_threadpool(
+            RiskEngine.merge_shards,
+            parts,
+            len(records),
+            date_range=request.date_range,
+            as_of=format_as_of(as_of),
+            models=models,
+            learned_model=learned.version if learned is not None else None,
+        )
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    logger.info(
+        "Analyzed %d asteroids in %.1fms (%d shards)", len(records), elapsed_ms, len(parts)
+    )
+    return Response(content, media_type="application/json")
+
+
+@router.post(
+    "/analyze",
+    response_model=RiskAnalysisResponse,
+    openapi_extra=_json_body(RiskAnalysisRequest),
+)
+async def analyze_risk(
+    http_request: Request,
+    x_request_timeout_ms: Optional[int] = Header(
+        None, gt=0, description="Time budget in ms (body timeout_ms takes precedence)"
+    ),
+    format: ResponseFormat = Query(
+        ResponseFormat.RECORDS,
+        description="records (one object per assessment) or columnar (one array per field)",
+    ),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated projection, e.g. asteroid_id,risk_score,"
+        "score_breakdown.diameter_points,statistics.max_risk_score",
+    ),
+):
     """
     Full risk analysis on a batch of asteroids.
     Called by the Node.js backend with NASA NEO data.
@@ -25,19 +305,354 @@ async def analyze_risk(request: RiskAnalysisRequest):
     - Aggregate statistics (NumPy computed)
     - Torino/Palermo scale classifications
     - Kinetic energy estimates & comparisons
+    - A result_handle; send it back as previous_handle with the next
+      batch to recompute only new/changed objects (result_mode="diff"
+      returns just the added / removed / changed objects)
+    - extended_statistics=true adds score / energy quantiles, diameter and
+      velocity histograms and score-vs-distance correlations;
+      result_mode="summary" returns the statistics without the assessments
+    - impact_effects=true adds airburst / crater / blast-radius estimates
+      to each assessment
+    - With time_window="approach" / as_of, Palermo & Torino use each
+      object's time until close approach; several as_of times are
+      evaluated together (palermo_by_as_of / torino_by_as_of)
+    - scoring_models=[...] scores the batch under further registry models
+      in the same pass (model_scores / model_risk_levels, model_statistics)
+    - learned_score from the learned model, when one is loaded
+    - risk_alert events over Socket.IO for watched asteroids whose
+      recomputed values cross a threshold (see the ``watch`` event)
+
+    Admitted through the batch lane of the admission controller, weighted
+    by object count; shed with 429/503 + Retry-After under overload.
+
+    With a deadline (timeout_ms / X-Request-Timeout-Ms) work stops between
+    chunks once it passes (504), or with best_effort returns the objects
+    assessed so far with partial=true.  Work also stops if the client
+    disconnects.
+
+    The body is read straight into arrays, looking only at the NeoWs
+    fields the engine uses; the other fields of each object are not
+    validated.
+
+    In coordinator mode (SHARD_PEERS) large batches are split across the
+    peer instances by neo_reference_id and merged (services.sharding);
+    the response is the same, without a result_handle.
     """
     start = time.perf_counter()
+    if shard_coordinator.enabled and fields is None and format == ResponseFormat.RECORDS:
+        outcome = await _analyze_sharded(http_request, x_request_timeout_ms, start)
+        if isinstance(outcome, Response):
+            return outcome
+        request, inputs, size = outcome
+    else:
+        request, inputs, size = await _decode_analyze_request(http_request)
+    timeout_ms = request.timeout_ms or x_request_timeout_ms
+    cancel = CancelToken(timeout_ms / 1000 if timeout_ms else None)
 
-    result = RiskEngine.analyze_batch(
-        request.asteroids,
-        date_range=request.date_range,
-    )
+    try:
+        projection = FieldProjection.parse(fields) if fields is not None else None
+        models = scoring_registry.resolve(request.scoring_models or [])
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+
+    async with admission.slot(
+        Lane.BATCH, size, timeout=cancel.remaining()
+    ), _cancel_on_disconnect(http_request, cancel):
+        # Shared stores (app.serve) read and unpickle a file: off the loop
+        previous = (
+            await run_in_threadpool(result_store.get, request.previous_handle)
+            if request.previous_handle
+            else None
+        )
+        watcher = watch_registry.observer()
+        try:
+            with span("engine.analyze", objects=size, rows=len(inputs)):
+                result, snapshot = await run_in_threadpool(
+                    RiskEngine.analyze_inputs,
+                    inputs,
+                    size,
+                    date_range=request.date_range,
+                    labels=request.labels,
+                    projection=projection,
+                    previous=previous,
+                    previous_handle=request.previous_handle,
+                    result_mode=request.result_mode,
+                    as_of=resolve_as_of(request.time_window, request.as_of),
+                    models=models,
+                    learned=learned_model.model,
+                    cancel=cancel,
+                    best_effort=request.best_effort,
+                    observe=watcher,
+                    extended=request.extended_statistics,
+                    effects=request.impact_effects,
+                )
+        except Cancelled as exc:
+            await _send_watch_alerts(watcher)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            logger.info(
+                "Analysis of %d asteroids stopped after %.1fms (%s)",
+                size, elapsed_ms, exc.reason,
+            )
+            if exc.reason == DEADLINE_EXCEEDED:
+                raise HTTPException(status_code=504, detail="Request deadline exceeded")
+            return Response(status_code=CLIENT_CLOSED_REQUEST)
+        await _send_watch_alerts(watcher)
+        if snapshot is not None:
+            result.result_handle = await run_in_threadpool(result_store.put, snapshot)
+
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    logger.info("Analyzed %d asteroids in %.1fms", result.total_analyzed, elapsed_ms)
+
+    if projection is None and format == ResponseFormat.RECORDS:
+        return result
+
+    with span("project", format=format.value, assessments=result.total_analyzed):
+        return JSONResponse(
+            project_response(
+                result,
+                projection or FieldProjection.all_fields(effects=request.impact_effects),
+                format,
+            )
+        )
+
+
+@router.post("/analyze/shard", include_in_schema=False)
+async def analyze_risk_shard(
+    http_request: Request,
+    x_request_timeout_ms: Optional[int] = Header(None, gt=0),
+):
+    """
+    One shard of a coordinator's /analyze batch (services.sharding).
+
+    Takes an /analyze body (labels, time_window / as_of, scoring_models,
+    best_effort and impact_effects apply) and returns the shard's assessments, already
+    encoded and sorted, with its mergeable statistics
+    (engine.shards.ShardResult).
+    """
+    request, inputs, size = await _decode_analyze_request(http_request)
+    cancel = CancelToken(x_request_timeout_ms / 1000 if x_request_timeout_ms else None)
+    try:
+        models = scoring_registry.resolve(request.scoring_models or [])
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+
+    async with admission.slot(
+        Lane.BATCH, size, timeout=cancel.remaining()
+    ), _cancel_on_disconnect(http_request, cancel):
+        watcher = watch_registry.observer()
+        try:
+            with span("engine.shard", objects=size, rows=len(inputs)):
+                result = await run_in_threadpool(
+                    RiskEngine.analyze_shard,
+                    inputs,
+                    size,
+                    request.labels,
+                    as_of=resolve_as_of(request.time_window, request.as_of),
+                    models=models,
+                    learned=learned_model.model,
+                    cancel=cancel,
+                    best_effort=request.best_effort,
+                    observe=watcher,
+                    effects=request.impact_effects,
+                )
+        except Cancelled as exc:
+            await _send_watch_alerts(watcher)
+            if exc.reason == DEADLINE_EXCEEDED:
+                raise HTTPException(status_code=504, detail="Request deadline exceeded")
+            return Response(status_code=CLIENT_CLOSED_REQUEST)
+        await _send_watch_alerts(watcher)
+
+    with span("serialize.shard", assessments=len(result.fragments)):
+        content = await run_in_threadpool(result.encode)
+    return Response(content, media_type=SHARD_MEDIA_TYPE)
+
+
+@router.post("/analyze/timeline", openapi_extra=_json_body(RiskAnalysisRequest))
+async def analyze_timeline(
+    http_request: Request,
+    bins: Annotated[TimelineQuery, Query()],
+    x_request_timeout_ms: Optional[int] = Header(
+        None, gt=0, description="Time budget in ms (body timeout_ms takes precedence)"
+    ),
+):
+    """
+    Close-approach timeline of a batch, pre-binned.
+
+    Takes the /analyze body (time_window / as_of / timeout_ms apply;
+    labels, models and result options are ignored) and returns counts
+    and kinetic-energy sums per day bin, lunar-distance band, risk level
+    and size class, plus day × band and day × level count grids, instead
+    of one assessment per object.
+
+    Past the deadline the work stops between chunks (504); it also stops
+    if the client disconnects.
+    """
+    start = time.perf_counter()
+    request, inputs, size = await _decode_analyze_request(http_request)
+    timeout_ms = request.timeout_ms or x_request_timeout_ms
+    cancel = CancelToken(timeout_ms / 1000 if timeout_ms else None)
+
+    async with admission.slot(
+        Lane.BATCH, size, timeout=cancel.remaining()
+    ), _cancel_on_disconnect(http_request, cancel):
+        try:
+            with span("engine.timeline", rows=len(inputs)):
+                data = await run_in_threadpool(
+                    batch_timeline,
+                    inputs,
+                    resolve_as_of(request.time_window, request.as_of),
+                    cancel=cancel,
+                    **bins.model_dump(),
+                )
+        except ValueError as exc:
+            raise HTTPException(status_code=422, detail=str(exc))
+        except Cancelled as exc:
+            if exc.reason == DEADLINE_EXCEEDED:
+                raise HTTPException(status_code=504, detail="Request deadline exceeded")
+            return Response(status_code=CLIENT_CLOSED_REQUEST)
+
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    logger.info("Timeline of %d asteroids in %.1fms", size, elapsed_ms)
+    return {"success": True, "data": data}
+
+
+@router.get("/analyze/timeline/{result_handle}")
+async def result_timeline(result_handle: str, bins: Annotated[TimelineQuery, Query()]):
+    """
+    Timeline of a stored /analyze result (its result_handle), optionally
+    limited to a date range with start_date / end_date.
+    """
+    snapshot = await run_in_threadpool(result_store.get, result_handle)
+    if snapshot is None:
+        raise HTTPException(
+            status_code=404, detail=f"Result {result_handle} not found or expired"
+        )
+
+    def compute() -> dict:
+        columns = TimelineColumns.from_assessments(snapshot.by_fingerprint.values())
+        return timeline(columns, **bins.model_dump())
+
+    try:
+        data = await run_in_threadpool(compute)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    return {"success": True, "data": data}
+
+
+@router.post(
+    "/analyze/explain",
+    response_model=ExplanationResponse,
+    openapi_extra=_json_body(RiskAnalysisRequest),
+)
+async def analyze_explain(
+    http_request: Request,
+    grid: Annotated[ExplainQuery, Query()],
+    x_request_timeout_ms: Optional[int] = Header(
+        None, gt=0, description="Time budget in ms (body timeout_ms takes precedence)"
+    ),
+):
+    """
+    How sensitive each object's score is to its uncertain inputs.
+
+    Takes the /analyze body (time_window / as_of / timeout_ms apply).
+    Diameter, velocity, miss distance and MOID are scaled by each of
+    ``multipliers``, the orbit uncertainty code shifted by up to ±3, and
+    the whole objects × perturbations grid is scored in one pass per
+    chunk.  Per object and factor: the score and Torino scale at each
+    step, points per +1% (per +1 code), and the nearest steps that
+    raise or lower the risk level; plus the distance to the next level.
+
+    Admitted through the batch lane weighted by objects × perturbations.
+    """
+    start = time.perf_counter()
+    request, inputs, size = await _decode_analyze_request(http_request)
+    timeout_ms = request.timeout_ms or x_request_timeout_ms
+    cancel = CancelToken(timeout_ms / 1000 if timeout_ms else None)
+    weight = size * perturbations_per_object(grid.factors, grid.multipliers)
+
+    async with admission.slot(
+        Lane.BATCH, weight, timeout=cancel.remaining()
+    ), _cancel_on_disconnect(http_request, cancel):
+        try:
+            with span("engine.explain", rows=len(inputs), pipeline_rows=weight):
+                result = await run_in_threadpool(
+                    RiskEngine.explain_inputs,
+                    inputs,
+                    grid.factors,
+                    grid.multipliers,
+                    as_of=resolve_as_of(request.time_window, request.as_of),
+                    cancel=cancel,
+                )
+        except Cancelled as exc:
+            if exc.reason == DEADLINE_EXCEEDED:
+                raise HTTPException(status_code=504, detail="Request deadline exceeded")
+            return Response(status_code=CLIENT_CLOSED_REQUEST)
 
     elapsed_ms = (time.perf_counter() - start) * 1000
     logger.info(
-        f"Analyzed {result.total_analyzed} asteroids in {elapsed_ms:.1f}ms"
+        "Sensitivity of %d asteroids (%d pipeline rows) in %.1fms",
+        result.total_analyzed, weight, elapsed_ms,
     )
+    return result
 
+
+@router.post("/analyze/deflection", response_model=DeflectionResponse)
+async def analyze_deflection(
+    request: DeflectionRequest,
+    http_request: Request,
+    x_request_timeout_ms: Optional[int] = Header(
+        None, gt=0, description="Time budget in ms"
+    ),
+):
+    """
+    Deflection what-if: how a delta-v applied some lead time before the
+    close approach would change miss distance, MOID, impact probability,
+    Torino / Palermo and the risk score.
+
+    Every (delta-v, lead time, direction) combination is evaluated for
+    every object in one array computation per chunk (linearized
+    along-track model, see engine/deflection.py).  Returns a result cube
+    per requested field, the undeflected baselines and, per direction and
+    lead time, the smallest delta-v of the grid that brings Torino to 0
+    or lowers the risk level.
+    """
+    start = time.perf_counter()
+    cancel = CancelToken(x_request_timeout_ms / 1000 if x_request_timeout_ms else None)
+    try:
+        scenarios = scenario_count(
+            request.delta_v_mm_s, request.lead_time_days, request.directions,
+            len(request.asteroids),
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    with span("decode", objects=len(request.asteroids)):
+        inputs = extract_inputs(request.asteroids, approach_counts(request.asteroids))
+
+    async with admission.slot(
+        Lane.BATCH, len(inputs) * (scenarios + 1), timeout=cancel.remaining()
+    ), _cancel_on_disconnect(http_request, cancel):
+        try:
+            with span("engine.deflection", rows=len(inputs), scenarios=scenarios):
+                result = await run_in_threadpool(
+                    RiskEngine.deflection_scenarios,
+                    inputs,
+                    request.delta_v_mm_s,
+                    request.lead_time_days,
+                    request.directions,
+                    request.fields,
+                    as_of=resolve_as_of(request.time_window, request.as_of),
+                    cancel=cancel,
+                )
+        except Cancelled as exc:
+            if exc.reason == DEADLINE_EXCEEDED:
+                raise HTTPException(status_code=504, detail="Request deadline exceeded")
+            return Response(status_code=CLIENT_CLOSED_REQUEST)
+
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    logger.info(
+        "Deflection grid: %d asteroids × %d scenarios in %.1fms",
+        result.total_analyzed, scenarios, elapsed_ms,
+    )
     return result
 
 
@@ -47,7 +662,9 @@ async def analyze_single(asteroid: NeoObject):
     Risk analysis for a single asteroid.
     Used for real-time lookups.
     """
-    result = RiskEngine.assess_single(asteroid)
+    async with admission.slot(Lane.SINGLE, 1):
+        with span("engine.assess_single", objects=1):
+            result = RiskEngine.assess_single(asteroid)
     if not result:
         return {
             "success": False,
@@ -71,10 +688,15 @@ async def analyze_sentry_enhanced(request: SentryEnhancedRequest):
     """
     start = time.perf_counter()
 
-    result = RiskEngine.assess_with_sentry(
-        request.asteroid,
-        request.sentry_data,
-    )
+    try:
+        async with admission.slot(Lane.SENTRY, 1):
+            with span("engine.assess_with_sentry", objects=1):
+                result = RiskEngine.assess_with_sentry(
+                    request.asteroid,
+                    request.sentry_data,
+                )
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
 
     elapsed_ms = (time.perf_counter() - start) * 1000
 
@@ -85,7 +707,7 @@ async def analyze_sentry_enhanced(request: SentryEnhancedRequest):
         }
 
     logger.info(
-        f"Sentry-enhanced analysis for {request.sentry_data.designation} in {elapsed_ms:.1f}ms"
+        "Sentry-enhanced analysis for %s in %.1fms", request.sentry_data.designation, elapsed_ms
     )
 
     return {
@@ -94,3 +716,64 @@ async def analyze_sentry_enhanced(request: SentryEnhancedRequest):
         "engine": "python-scientific-sentry",
         "data": result,
     }
+
+
+@router.post("/analyze/sentry-enhanced/batch", response_model=SentryBatchResponse)
+async def analyze_sentry_enhanced_batch(request: SentryBatchRequest):
+    """
+    Sentry-enhanced analysis for many objects in one call.
+    Accepts explicit (asteroid, sentry_data) pairs, or asteroids plus a
+    Sentry table joined on designation.  Returns the enhanced assessments
+    with batch statistics.
+    """
+    start = time.perf_counter()
+
+    if request.items is not None:
+        pairs = [(item.asteroid, item.sentry_data) for item in request.items]
+        unmatched: list[str] = []
+    else:
+        pairs, unmatched = RiskEngine.join_sentry_table(
+            request.asteroids, request.sentry_table
+        )
+
+    try:
+        async with admission.slot(Lane.SENTRY, len(pairs)):
+            with span("engine.sentry_batch", objects=len(pairs), unmatched=len(unmatched)):
+                result = await run_in_threadpool(
+                    RiskEngine.assess_sentry_batch, pairs, unmatched
+                )
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    logger.info(
+        "Batch Sentry-enhanced analysis of %d objects in %.1fms",
+        result.total_analyzed, elapsed_ms,
+    )
+
+    return result
+
+
+@router.get("/labels")
+async def get_label_tables():
+    """
+    Code tables for the descriptive label fields.
+    Lets clients that request ``labels="codes"`` localise the text themselves.
+    """
+    return {
+        "success": True,
+        "data": label_tables(),
+    }
+
+
+@router.get("/scoring-models")
+async def get_scoring_models():
+    """
+    Scoring models available to ``scoring_models`` on /analyze.
+    Models are reloaded from the model directory without a restart;
+    ``version`` changes whenever a model's file does.
+    """
+    return {
+        "success": True,
+        "data": [asdict(m) for m in scoring_registry.models().values()],
+    }
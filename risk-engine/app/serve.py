@@ -0,0 +1,190 @@
+"""
+Run the risk engine, optionally as several worker processes.
+
+    python -m app.serve --workers auto
+
+With one worker this is plain ``uvicorn app.main:combined_asgi_app``.
+With more, the app is imported once in the parent (NumPy, astropy
+constants, label and scale tables, the learned-model mmap), the
+listening socket is bound, and workers are forked from that state, so
+read-only tables are shared copy-on-write rather than rebuilt per
+worker.  Each worker runs its own event loop on the shared socket; the
+kernel spreads connections between them.  Result handles resolve across
+workers through a tmpfs result cache (RESULT_CACHE_DIR, its files signed
+with a per-run RESULT_CACHE_KEY), watches through
+a SQLite registry next to it (WATCH_DB_PATH), and crashed workers are
+restarted.
+
+Load figures are not shared: each worker's LoadMonitor measures its own
+event loop, threadpool and admission queue.  ``/ready`` answers for
+whichever worker the kernel handed the connection to, and the ``load``
+in ``connected`` and ``pong_engine`` is that of the worker holding the
+Socket.IO connection.  ``engine_load`` is emitted by the worker whose
+readiness changed; with SOCKETIO_REDIS_URL it reaches clients on every
+worker.  Each snapshot carries the reporting worker's pid (``worker``).
+"""
+
+import argparse
+import logging
+import math
+import os
+import secrets
+import signal
+import socket
+import sys
+import tempfile
+from pathlib import Path
+
+logger = logging.getLogger("risk-engine.serve")
+
+
+def available_cpus() -> int:
+    """Cores this process may use: CPU affinity, capped by a cgroup v2 quota."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS
+        cpus = os.cpu_count() or 1
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def resolve_workers(value: str) -> int:
+    """'auto' → available_cpus(); otherwise a positive integer."""
+    if value == "auto":
+        return available_cpus()
+    workers = int(value)
+    if workers < 1:
+        raise ValueError("workers must be ≥ 1 or 'auto'")
+    return workers
+
+
+def _shared_dir() -> Path:
+    """Where the workers keep shared state: tmpfs when there is one."""
+    shm = Path("/dev/shm")
+    base = shm if shm.is_dir() else Path(tempfile.gettempdir())
+    return base / "cosmicwatch-risk-engine"
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(app, sock: socket.socket, log_level: str) -> None:
+    import uvicorn
+
+    for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+        signal.signal(sig, signal.SIG_DFL)
+    from app.logs import stop_logging
+
+    # log_config=None keeps uvicorn's loggers on the queue set up by app.logs
+    config = uvicorn.Config(app, log_level=log_level, log_config=None, lifespan="on")
+    try:
+        uvicorn.Server(config).run(sockets=[sock])
+    finally:
+        stop_logging()  # the worker leaves through os._exit, which skips atexit
+
+
+def _supervise(app, sock: socket.socket, workers: int, log_level: str) -> None:
+    children: set[int] = set()
+    stopping = False
+
+    def spawn() -> None:
+        pid = os.fork()
+        if pid == 0:
+            try:
+                _run_worker(app, sock, log_level)
+            finally:
+                os._exit(0)
+        children.add(pid)
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for _ in range(workers):
+        spawn()
+    logger.info("Started %d workers (pids %s)", workers, sorted(children))
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        children.discard(pid)
+        if not stopping:
+            logger.warning("Worker %d exited with status %d; restarting", pid, status)
+            spawn()
+    logger.info("All workers stopped")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the Cosmic Watch risk engine")
+    parser.add_argument("--host", default=os.environ.get("RISK_ENGINE_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("RISK_ENGINE_PORT", "8000")))
+    parser.add_argument(
+        "--workers",
+        default=os.environ.get("RISK_ENGINE_WORKERS", "1"),
+        help="worker processes, or 'auto' for one per available core",
+    )
+    parser.add_argument("--log-level", default=os.environ.get("LOG_LEVEL", "info"))
+    args = parser.parse_args(argv)
+
+    try:
+        workers = resolve_workers(args.workers)
+    except ValueError as exc:
+        parser.error(f"--workers: {exc}")
+
+    # Settings are read when app.config is first imported, so worker-mode
+    # defaults go into the environment before any app import
+    os.environ["RISK_ENGINE_WORKERS"] = str(workers)
+    if workers > 1:
+        os.environ.setdefault("RESULT_CACHE_DIR", str(_shared_dir() / "results"))
+        os.environ.setdefault("RESULT_CACHE_KEY", secrets.token_hex(32))
+        os.environ.setdefault("WATCH_DB_PATH", str(_shared_dir() / "watches.sqlite3"))
+        # One BLAS/OpenMP thread per worker; the workers already fill the cores
+        for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+            os.environ.setdefault(var, "1")
+
+    from app.main import combined_asgi_app
+
+    if workers == 1:
+        import uvicorn
+
+        uvicorn.run(
+            combined_asgi_app,
+            host=args.host,
+            port=args.port,
+            log_level=args.log_level,
+            log_config=None,
+        )
+        return 0
+
+    sock = _bind(args.host, args.port)
+    logger.info("Listening on %s:%d", args.host, args.port)
+    _supervise(combined_asgi_app, sock, workers, args.log_level)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,21 @@
 """Services layer — business logic and real-time communication."""
 
 from app.services.socketio_service import sio
+from app.services.result_store import result_store
+from app.services.scoring_registry import scoring_registry
+from app.services.learned_model import learned_model
+from app.services.admission import admission
+from app.services.load_monitor import load_monitor
+from app.services.watch_registry import watch_registry
+from app.services.jobs import job_manager
 
-__all__ = ["sio"]
+__all__ = [
+    "sio",
+    "result_store",
+    "scoring_registry",
+    "learned_model",
+    "admission",
+    "load_monitor",
+    "watch_registry",
+    "job_manager",
+]
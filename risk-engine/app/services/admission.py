@@ -0,0 +1,286 @@
+"""
+Admission control for the risk routes.
+
+Work is measured in objects, not requests: a 20 000-object /analyze
+weighs 20 000, a single lookup weighs 1.  At most
+``admission_max_objects`` objects are in flight; the rest wait in one of
+three priority lanes (single → sentry → batch), FIFO within a lane.
+A waiting request is admitted only when it fits, except that anything
+may run when nothing else is in flight.  That way an oversized batch
+still runs, alone.  The single lane has ``admission_single_reserve``
+objects of extra capacity, so lookups are not stuck behind full batches.
+
+Requests are turned away early instead of piling up:
+
+- 429 when the lane's queue (in objects) is full;
+- 503 when the estimated wait, from recent throughput, exceeds
+  ``admission_max_wait_s``, or when a queued request actually waits
+  that long.
+
+Both carry a Retry-After estimate.  A request whose own deadline runs
+out while it waits (or had already passed) gets the deadline error
+instead, Cancelled(DEADLINE_EXCEEDED), which the app maps to 504.
+Limits apply per worker process.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import AsyncIterator, Optional
+
+from app.config import settings
+from app.engine.cancellation import DEADLINE_EXCEEDED, Cancelled
+from app.tracing import span
+
+
+class Lane(IntEnum):
+    """Priority classes; lower value is served first."""
+
+    SINGLE = 0
+    SENTRY = 1
+    BATCH = 2
+
+
+class AdmissionRejected(Exception):
+    """Request shed by the admission controller (mapped to 429 / 503)."""
+
+    def __init__(self, status_code: int, retry_after: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.detail = detail
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 1)
+
+
+@dataclass
+class _Waiter:
+    weight: int
+    future: asyncio.Future
+    enqueued_at: float
+
+
+@dataclass
+class _LaneStats:
+    queue: deque = field(default_factory=deque)
+    queued_objects: int = 0
+    in_flight_objects: int = 0
+    admitted: int = 0
+    rejected_queue_full: int = 0
+    rejected_overloaded: int = 0
+    waits_ms: deque = field(default_factory=lambda: deque(maxlen=512))
+
+
+class AdmissionController:
+    """Object-weighted concurrency limit with priority lanes and load shedding."""
+
+    THROUGHPUT_WINDOW_S = 30.0
+
+    def __init__(
+        self,
+        max_objects: int,
+        queue_limits: dict[Lane, int],
+        max_wait_s: float,
+        single_reserve: int = 0,
+    ):
+        self.max_objects = max_objects
+        self.single_reserve = single_reserve
+        self.queue_limits = queue_limits
+        self.max_wait_s = max_wait_s
+        self.in_flight = 0
+        self._lanes = {lane: _LaneStats() for lane in Lane}
+        # (time, objects, seconds held) of recently released slots
+        self._completed: deque[tuple[float, int, float]] = deque()
+
+    # ── Throughput / wait estimates ──────────────────────
+    def _expire(self, now: float) -> None:
+        while self._completed and now - self._completed[0][0] > self.THROUGHPUT_WINDOW_S:
+            self._completed.popleft()
+
+    def _throughput(self, now: float) -> Optional[float]:
+        """Objects per second completed over the recent window (None if unknown)."""
+        self._expire(now)
+        if len(self._completed) < 2:
+            return None
+        span = now - self._completed[0][0]
+        done = sum(w for _, w, _ in self._completed)
+        return done / span if span > 0 else None
+
+    def per_object_ms(self) -> Optional[float]:
+        """Slot time per object over the recent window (None if nothing ran)."""
+        self._expire(time.monotonic())
+        objects = sum(w for _, w, _ in self._completed)
+        if not objects:
+            return None
+        return sum(held for _, _, held in self._completed) * 1000 / objects
+
+    @property
+    def queued_objects(self) -> int:
+        return sum(stats.queued_objects for stats in self._lanes.values())
+
+    def _estimated_wait(self, lane: Lane, weight: int, now: float) -> Optional[float]:
+        rate = self._throughput(now)
+        if rate is None:
+            return None
+        # Objects that must finish before this one can start
+        ahead = max(0, self.in_flight + weight - self.max_objects)
+        ahead += sum(self._lanes[l].queued_objects for l in Lane if l <= lane)
+        return ahead / rate
+
+    def _retry_after(self, lane: Lane, now: float) -> int:
+        wait = self._estimated_wait(lane, 0, now)
+        return max(1, math.ceil(wait)) if wait is not None else 1
+
+    # ── Queueing ─────────────────────────────────────────
+    def _fits(self, lane: Lane, weight: int) -> bool:
+        limit = self.max_objects + (self.single_reserve if lane == Lane.SINGLE else 0)
+        return self.in_flight == 0 or self.in_flight + weight <= limit
+
+    def _dispatch(self) -> None:
+        """Admit queue heads in priority order while they fit."""
+        for lane in Lane:
+            stats = self._lanes[lane]
+            while stats.queue:
+                waiter = stats.queue[0]
+                if waiter.future.done():  # timed out / cancelled
+                    stats.queue.popleft()
+                    continue
+                if not self._fits(lane, waiter.weight):
+                    return  # strict priority: nothing behind may overtake
+                stats.queue.popleft()
+                stats.queued_objects -= waiter.weight
+                self._grant(lane, waiter.weight)
+                waiter.future.set_result(None)
+
+    def _grant(self, lane: Lane, weight: int) -> None:
+        self.in_flight += weight
+        self._lanes[lane].in_flight_objects += weight
+        self._lanes[lane].admitted += 1
+
+    def _release(self, lane: Lane, weight: int, held_s: float = 0.0) -> None:
+        self.in_flight -= weight
+        self._lanes[lane].in_flight_objects -= weight
+        self._completed.append((time.monotonic(), weight, held_s))
+        self._dispatch()
+
+    def _reject(self, lane: Lane, status_code: int, detail: str, now: float) -> AdmissionRejected:
+        stats = self._lanes[lane]
+        if status_code == 429:
+            stats.rejected_queue_full += 1
+        else:
+            stats.rejected_overloaded += 1
+        return AdmissionRejected(status_code, self._retry_after(lane, now), detail)
+
+    @asynccontextmanager
+    async def slot(
+        self, lane: Lane, weight: int, *, timeout: Optional[float] = None
+    ) -> AsyncIterator[None]:
+        """
+        Hold ``weight`` objects of capacity for the duration of the block.
+
+        ``timeout`` (e.g. the time left before the request's deadline)
+        shortens the maximum queue wait.  Raises AdmissionRejected when
+        the request is shed, Cancelled when it must queue past ``timeout``.
+        """
+        weight = max(1, weight)
+        stats = self._lanes[lane]
+        now = time.monotonic()
+
+        queue_empty = not any(self._lanes[l].queue for l in Lane if l <= lane)
+        if queue_empty and self._fits(lane, weight):
+            self._grant(lane, weight)
+            stats.waits_ms.append(0.0)
+        else:
+            if timeout is not None and timeout <= 0:
+                raise Cancelled(DEADLINE_EXCEEDED)
+            if stats.queued_objects + weight > self.queue_limits[lane]:
+                raise self._reject(lane, 429, f"{lane.name.lower()} queue is full", now)
+            deadline_bound = timeout is not None and timeout < self.max_wait_s
+            max_wait = timeout if deadline_bound else self.max_wait_s
+            estimate = self._estimated_wait(lane, weight, now)
+            if estimate is not None and estimate > max_wait:
+                raise self._reject(
+                    lane, 503, f"Engine overloaded (estimated wait {estimate:.1f}s)", now
+                )
+
+            waiter = _Waiter(weight, asyncio.get_running_loop().create_future(), now)
+            stats.queue.append(waiter)
+            stats.queued_objects += weight
+            try:
+                with span("admission.wait", lane=lane.name.lower(), objects=weight):
+                    await asyncio.wait_for(asyncio.shield(waiter.future), max_wait)
+            except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+                if waiter.future.done() and not waiter.future.cancelled():
+                    self._release(lane, weight)  # granted just as we gave up
+                else:
+                    waiter.future.cancel()
+                    # Out of the deque now: a stale waiter would keep the
+                    # lane looking busy to the fast path in slot()
+                    stats.queue.remove(waiter)
+                    stats.queued_objects -= weight
+                    self._dispatch()
+                if isinstance(exc, asyncio.CancelledError):
+                    raise
+                if deadline_bound:
+                    raise Cancelled(DEADLINE_EXCEEDED) from None
+                raise self._reject(
+                    lane, 503, "Engine overloaded (queue wait exceeded)", time.monotonic()
+                ) from None
+            stats.waits_ms.append((time.monotonic() - now) * 1000)
+
+        granted_at = time.monotonic()
+        try:
+            yield
+        finally:
+            self._release(lane, weight, time.monotonic() - granted_at)
+
+    # ── Monitoring ───────────────────────────────────────
+    def snapshot(self) -> dict:
+        """Queue depth, in-flight load, wait times and rejections per lane."""
+        now = time.monotonic()
+        lanes = {}
+        for lane, stats in self._lanes.items():
+            waits = sorted(stats.waits_ms)
+            oldest = next((w for w in stats.queue if not w.future.done()), None)
+            lanes[lane.name.lower()] = {
+                "queued_requests": sum(1 for w in stats.queue if not w.future.done()),
+                "queued_objects": stats.queued_objects,
+                "queue_limit_objects": self.queue_limits[lane],
+                "in_flight_objects": stats.in_flight_objects,
+                "oldest_wait_ms": round((now - oldest.enqueued_at) * 1000, 1) if oldest else 0.0,
+                "wait_ms_p50": _percentile(waits, 0.5),
+                "wait_ms_p95": _percentile(waits, 0.95),
+                "admitted": stats.admitted,
+                "rejected_queue_full": stats.rejected_queue_full,
+                "rejected_overloaded": stats.rejected_overloaded,
+            }
+        rate = self._throughput(now)
+        per_object = self.per_object_ms()
+        return {
+            "max_objects": self.max_objects,
+            "in_flight_objects": self.in_flight,
+            "throughput_objects_per_s": round(rate, 1) if rate is not None else None,
+            "per_object_ms": round(per_object, 4) if per_object is not None else None,
+            "max_wait_s": self.max_wait_s,
+            "lanes": lanes,
+        }
+
+
+admission = AdmissionController(
+    max_objects=settings.admission_max_objects,
+    queue_limits={
+        Lane.SINGLE: settings.admission_queue_single,
+        Lane.SENTRY: settings.admission_queue_sentry,
+        Lane.BATCH: settings.admission_queue_batch,
+    },
+    max_wait_s=settings.admission_max_wait_s,
+    single_reserve=settings.admission_single_reserve,
+)
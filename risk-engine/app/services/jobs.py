@@ -0,0 +1,669 @@
+"""
+Background analysis jobs.
+
+A job is a batch submitted once and analysed in the background: inline
+asteroids, or a file under ``jobs_input_dir``.  Workers claim queued
+jobs from a local SQLite store and assess them in chunks of CHUNK_SIZE;
+each chunk's assessments and the job's progress are committed in one
+transaction, and ``job_progress`` is emitted over Socket.IO with running
+statistics.  Completed results are read back page by page, highest risk
+first.
+
+At most ``jobs_max_concurrent`` jobs run per worker process, and every
+chunk goes through the batch lane of the admission controller, so jobs
+yield to interactive requests.  Because progress is durable, a job
+interrupted by a restart resumes from its last committed chunk: running
+jobs are put back in the queue on shutdown, and a crashed worker's jobs
+once their heartbeat (``updated_at``) is older than
+``jobs_stale_after_s``.  A job waiting for admission keeps its heartbeat
+fresh, so it is not taken over while it waits.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import sqlite3
+import time
+import uuid
+import zlib
+from contextlib import closing, contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.engine.analysis import approach_counts, assess_inputs
+from app.engine.batch import extract_inputs, resolve_as_of
+from app.engine.cancellation import CHUNK_SIZE
+from app.engine.scoring import RISK_LEVELS
+from app.engine.sources import iter_neo_records
+from app.engine.summary import BatchSummary
+from app.models import (
+    JobInfo,
+    JobProgress,
+    JobStatus,
+    JobSubmitRequest,
+    LabelMode,
+    NeoObject,
+    RiskAssessment,
+    TimeWindow,
+)
+from app.services.admission import AdmissionRejected, Lane, admission
+from app.services.learned_model import learned_model
+from app.services.scoring_registry import scoring_registry
+from app.services.socketio_service import send_risk_alerts, sio
+from app.services.watch_registry import watch_registry
+
+logger = logging.getLogger("risk-engine.jobs")
+
+INLINE_SOURCE = "inline"
+
+# Result documents read per query when the final statistics are computed
+_STATISTICS_PAGE = 10_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id          TEXT PRIMARY KEY,
+    status      TEXT NOT NULL,
+    created_at  REAL NOT NULL,
+    updated_at  REAL NOT NULL,
+    owner       TEXT,
+    source      TEXT NOT NULL,
+    options     TEXT NOT NULL,
+    input       BLOB,
+    total       INTEGER,
+    processed   INTEGER NOT NULL DEFAULT 0,
+    statistics  TEXT,
+    error       TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (status, created_at);
+CREATE TABLE IF NOT EXISTS job_results (
+    job_id      TEXT NOT NULL,
+    seq         INTEGER NOT NULL,
+    risk_score  REAL NOT NULL,
+    risk_level  TEXT NOT NULL,
+    data        TEXT NOT NULL,
+    PRIMARY KEY (job_id, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS job_results_by_score ON job_results (job_id, risk_score DESC, seq);
+"""
+
+_FINISHED = (JobStatus.COMPLETED.value, JobStatus.FAILED.value, JobStatus.CANCELLED.value)
+
+
+class JobStore:
+    """
+    Job rows and their assessments in one SQLite file.
+
+    Each call opens its own connection, so the store can be used from
+    any thread and from other processes alike (WAL mode).  Calls may wait
+    up to 30s on another process's write lock, so async code runs them in
+    the threadpool.
+    Writes by a worker are conditional on it still owning the running
+    job, which is how cancellation and requeueing take effect.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        with closing(sqlite3.connect(self.path, timeout=30)) as conn:
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:  # one transaction, committed on success
+                yield conn
+
+    # ── Jobs ─────────────────────────────────────────────
+    def create(self, source: str, options: dict, input_blob: Optional[bytes]) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, created_at, updated_at, source, options, input)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, JobStatus.QUEUED.value, now, now, source, json.dumps(options), input_blob),
+            )
+        return job_id
+
+    def get(self, job_id: str) -> Optional[sqlite3.Row]:
+        with self._connect() as conn:
+            return conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+
+    def recent(self, status: Optional[str] = None, limit: int = 50) -> list[sqlite3.Row]:
+        query = "SELECT * FROM jobs"
+        params: tuple = ()
+        if status is not None:
+            query += " WHERE status = ?"
+            params = (status,)
+        with self._connect() as conn:
+            return conn.execute(f"{query} ORDER BY created_at DESC LIMIT ?", (*params, limit)).fetchall()
+
+    def claim(self, owner: str) -> Optional[sqlite3.Row]:
+        """Atomically take the oldest queued job (None if there is none)."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1",
+                (JobStatus.QUEUED.value,),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, owner = ?, updated_at = ? WHERE id = ?",
+                (JobStatus.RUNNING.value, owner, time.time(), row["id"]),
+            )
+            return conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+
+    def requeue(self, *, owner: Optional[str] = None, stale_after_s: Optional[float] = None) -> int:
+        """Return running jobs of ``owner``, or with a stale heartbeat, to the queue."""
+        query = "UPDATE jobs SET status = ?, owner = NULL WHERE status = ?"
+        params: list = [JobStatus.QUEUED.value, JobStatus.RUNNING.value]
+        if owner is not None:
+            query += " AND owner = ?"
+            params.append(owner)
+        if stale_after_s is not None:
+            query += " AND updated_at < ?"
+            params.append(time.time() - stale_after_s)
+        with self._connect() as conn:
+            return conn.execute(query, params).rowcount
+
+    def heartbeat(self, job_id: str, owner: str) -> bool:
+        """Refresh ``updated_at`` of our running job; False if it is no longer ours."""
+        with self._connect() as conn:
+            return conn.execute(
+                "UPDATE jobs SET updated_at = ? WHERE id = ? AND owner = ? AND status = ?",
+                (time.time(), job_id, owner, JobStatus.RUNNING.value),
+            ).rowcount == 1
+
+    def set_total(self, job_id: str, owner: str, total: int) -> bool:
+        with self._connect() as conn:
+            return conn.execute(
+                "UPDATE jobs SET total = ?, updated_at = ? WHERE id = ? AND owner = ? AND status = ?",
+                (total, time.time(), job_id, owner, JobStatus.RUNNING.value),
+            ).rowcount == 1
+
+    def append(
+        self,
+        job_id: str,
+        owner: str,
+        processed: int,
+        assessments: list[tuple[int, RiskAssessment]],
+    ) -> bool:
+        """
+        Store a chunk's assessments (by input position) and advance
+        ``processed``, atomically.  False if the job is no longer ours.
+        """
+        with self._connect() as conn:
+            updated = conn.execute(
+                "UPDATE jobs SET processed = ?, updated_at = ? WHERE id = ? AND owner = ? AND status = ?",
+                (processed, time.time(), job_id, owner, JobStatus.RUNNING.value),
+            ).rowcount
+            if not updated:
+                return False
+            conn.executemany(
+                "INSERT OR REPLACE INTO job_results (job_id, seq, risk_score, risk_level, data)"
+                " VALUES (?, ?, ?, ?, ?)",
+                [
+                    (job_id, seq, a.risk_score, a.risk_level.value, a.model_dump_json())
+                    for seq, a in assessments
+                ],
+            )
+            return True
+
+    def finish(
+        self,
+        job_id: str,
+        owner: str,
+        status: JobStatus,
+        *,
+        statistics: Optional[dict] = None,
+        error: Optional[str] = None,
+    ) -> bool:
+        with self._connect() as conn:
+            return conn.execute(
+                "UPDATE jobs SET status = ?, statistics = ?, error = ?, updated_at = ?, owner = NULL"
+                " WHERE id = ? AND owner = ? AND status = ?",
+                (
+                    status.value,
+                    json.dumps(statistics) if statistics is not None else None,
+                    error,
+                    time.time(),
+                    job_id,
+                    owner,
+                    JobStatus.RUNNING.value,
+                ),
+            ).rowcount == 1
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job; its stored results are dropped."""
+        with self._connect() as conn:
+            cancelled = conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ?, owner = NULL, input = NULL"
+                " WHERE id = ? AND status IN (?, ?)",
+                (
+                    JobStatus.CANCELLED.value,
+                    time.time(),
+                    job_id,
+                    JobStatus.QUEUED.value,
+                    JobStatus.RUNNING.value,
+                ),
+            ).rowcount == 1
+            if cancelled:
+                conn.execute("DELETE FROM job_results WHERE job_id = ?", (job_id,))
+            return cancelled
+
+    def purge(self, older_than_s: float) -> int:
+        """Delete finished jobs (and results) last updated more than ``older_than_s`` ago."""
+        cutoff = time.time() - older_than_s
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM job_results WHERE job_id IN"
+                " (SELECT id FROM jobs WHERE status IN (?, ?, ?) AND updated_at < ?)",
+                (*_FINISHED, cutoff),
+            )
+            return conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?, ?) AND updated_at < ?", (*_FINISHED, cutoff)
+            ).rowcount
+
+    # ── Results ──────────────────────────────────────────
+    def progress(self, job_id: str) -> "_Tally":
+        """Running totals recomputed from stored results (used on resume)."""
+        tally = _Tally()
+        with self._connect() as conn:
+            for row in conn.execute(
+                "SELECT risk_level, COUNT(*) AS n, SUM(risk_score) AS total, MAX(risk_score) AS top"
+                " FROM job_results WHERE job_id = ? GROUP BY risk_level",
+                (job_id,),
+            ):
+                tally.levels[row["risk_level"]] += row["n"]
+                tally.count += row["n"]
+                tally.score_sum += row["total"]
+                tally.score_max = max(tally.score_max, row["top"])
+        return tally
+
+    def result_count(self, job_id: str) -> int:
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM job_results WHERE job_id = ?", (job_id,)
+            ).fetchone()[0]
+
+    def documents(self, job_id: str, after: int, limit: int) -> list[tuple[int, str]]:
+        """(seq, JSON document) of the results after ``after``, in input order."""
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT seq, data FROM job_results WHERE job_id = ? AND seq > ?"
+                " ORDER BY seq LIMIT ?",
+                (job_id, after, limit),
+            ).fetchall()
+
+    def results(self, job_id: str, offset: int = 0, limit: int = -1) -> list[str]:
+        """Assessment JSON documents, highest risk first (ties in input order)."""
+        with self._connect() as conn:
+            return [
+                row[0]
+                for row in conn.execute(
+                    "SELECT data FROM job_results WHERE job_id = ?"
+                    " ORDER BY risk_score DESC, seq LIMIT ? OFFSET ?",
+                    (job_id, limit, offset),
+                )
+            ]
+
+
+@dataclass
+class _Tally:
+    count: int = 0
+    score_sum: float = 0.0
+    score_max: float = 0.0
+    levels: dict[str, int] = field(default_factory=lambda: {lvl.value: 0 for lvl in RISK_LEVELS})
+
+    def add(self, assessments: list[RiskAssessment]) -> None:
+        for a in assessments:
+            self.levels[a.risk_level.value] += 1
+            self.score_sum += a.risk_score
+            self.score_max = max(self.score_max, a.risk_score)
+        self.count += len(assessments)
+
+    def progress(self) -> JobProgress:
+        return JobProgress(
+            assessed=self.count,
+            by_risk_level=dict(self.levels),
+            average_risk_score=round(self.score_sum / self.count, 2) if self.count else 0,
+            max_risk_score=self.score_max,
+        )
+
+
+def job_info(row: sqlite3.Row, progress: Optional[JobProgress] = None) -> JobInfo:
+    """API view of a job row."""
+    stats = json.loads(row["statistics"]) if row["statistics"] else {}
+    return JobInfo(
+        job_id=row["id"],
+        status=row["status"],
+        source=row["source"],
+        created_at=row["created_at"],
+        updated_at=row["updated_at"],
+        total=row["total"],
+        processed=row["processed"],
+        progress=progress or JobProgress(**stats.get("progress", {})),
+        statistics=stats.get("statistics"),
+        model_statistics=stats.get("model_statistics"),
+        error=row["error"],
+    )
+
+
+def _resolve_source(path: str) -> Path:
+    """An input file inside ``jobs_input_dir``; ValueError otherwise."""
+    if not settings.jobs_input_dir:
+        raise ValueError("File sources are disabled (JOBS_INPUT_DIR is not set)")
+    root = Path(settings.jobs_input_dir).resolve()
+    candidate = (root / path).resolve()
+    if not candidate.is_relative_to(root):
+        raise ValueError("source_path must be inside JOBS_INPUT_DIR")
+    if not candidate.is_file():
+        raise ValueError(f"source_path {path} not found")
+    return candidate
+
+
+def _load_input(row: sqlite3.Row, heartbeat: Callable[[], None]) -> list[NeoObject]:
+    """The job's objects, validated CHUNK_SIZE at a time with ``heartbeat()`` between chunks."""
+    if row["source"] == INLINE_SOURCE:
+        records = iter(json.loads(zlib.decompress(row["input"])))
+    else:
+        records = iter_neo_records(row["source"])
+    asteroids: list[NeoObject] = []
+    while chunk := list(islice(records, CHUNK_SIZE)):
+        asteroids.extend(NeoObject(**r) for r in chunk)
+        heartbeat()
+    return asteroids
+
+
+def _assess_chunk(
+    chunk: list[NeoObject], counts: dict[str, int], labels: LabelMode, **options
+) -> list[Optional[RiskAssessment]]:
+    """Assess a chunk of a job's objects, with the approach counts of the whole job."""
+    return assess_inputs(extract_inputs(chunk, counts), len(chunk), labels, **options)
+
+
+class _JobLost(Exception):
+    """The job was cancelled or requeued while this worker waited to run it."""
+
+
+class _Heartbeat:
+    """
+    Refreshes a running job's heartbeat from worker threads during long
+    steps, at most every ``interval_s``; raises _JobLost once the job is
+    no longer ours.
+    """
+
+    def __init__(self, store: JobStore, job_id: str, owner: str, interval_s: float):
+        self.store = store
+        self.job_id = job_id
+        self.owner = owner
+        self.interval_s = interval_s
+        self.last = time.monotonic()
+
+    def __call__(self) -> None:
+        now = time.monotonic()
+        if now - self.last < self.interval_s:
+            return
+        if not self.store.heartbeat(self.job_id, self.owner):
+            raise _JobLost(self.job_id)
+        self.last = now
+
+
+class JobManager:
+    """Claims queued jobs and runs up to ``max_concurrent`` of them at once."""
+
+    def __init__(
+        self,
+        db_path: str,
+        max_concurrent: int,
+        poll_s: float,
+        stale_after_s: float,
+        retention_s: float,
+    ):
+        self.db_path = db_path
+        self.max_concurrent = max_concurrent
+        self.poll_s = poll_s
+        self.stale_after_s = stale_after_s
+        self.retention_s = retention_s
+        self.store: Optional[JobStore] = None
+        self.owner = ""
+        self._active: dict[str, asyncio.Task] = {}
+        self._progress: dict[str, JobProgress] = {}
+        self._wake: Optional[asyncio.Event] = None
+        self._loop_task: Optional[asyncio.Task] = None
+
+    # ── Lifecycle (main.lifespan) ────────────────────────
+    def start(self) -> None:
+        # Identity is taken here, after app.serve has forked the workers
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self.store = JobStore(self.db_path)
+        self._wake = asyncio.Event()
+        self._loop_task = asyncio.create_task(self._run())
+        logger.info("Job workers started (%d concurrent, store %s)", self.max_concurrent, self.db_path)
+
+    async def stop(self) -> None:
+        """Stop the workers; jobs in progress go back to the queue and resume later."""
+        tasks = [t for t in (self._loop_task, *self._active.values()) if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self.store is not None:
+            requeued = await run_in_threadpool(self.store.requeue, owner=self.owner)
+            if requeued:
+                logger.info("Requeued %d unfinished jobs", requeued)
+
+    # ── API ──────────────────────────────────────────────
+    async def submit(self, request: JobSubmitRequest) -> str:
+        """Queue a job; ValueError for unknown models or a bad source_path."""
+        job_id = await run_in_threadpool(self._create, request)
+        self._wake.set()
+        return job_id
+
+    def _create(self, request: JobSubmitRequest) -> str:
+        scoring_registry.resolve(request.scoring_models or [])
+        options = request.model_dump(mode="json", exclude={"asteroids", "source_path"})
+        if request.asteroids is not None:
+            source = INLINE_SOURCE
+            payload = json.dumps([a.model_dump(mode="json") for a in request.asteroids])
+            blob = zlib.compress(payload.encode(), 6)
+        else:
+            source, blob = str(_resolve_source(request.source_path)), None
+        return self.store.create(source, options, blob)
+
+    def info(self, job_id: str) -> Optional[JobInfo]:
+        row = self.store.get(job_id)
+        if row is None:
+            return None
+        return job_info(row, self._progress.get(job_id) or self._stored_progress(row))
+
+    def recent(self, status: Optional[JobStatus] = None, limit: int = 50) -> list[JobInfo]:
+        return [
+            job_info(row, self._progress.get(row["id"]) or self._stored_progress(row))
+            for row in self.store.recent(status.value if status else None, limit)
+        ]
+
+    async def cancel(self, job_id: str) -> bool:
+        if not await run_in_threadpool(self.store.cancel, job_id):
+            return False
+        task = self._active.get(job_id)
+        if task is None:  # queued, or running in another worker (which stops at its next chunk)
+            await sio.emit("job_cancelled", {"job_id": job_id})
+        return True
+
+    def _stored_progress(self, row: sqlite3.Row) -> Optional[JobProgress]:
+        if row["status"] in (JobStatus.RUNNING.value, JobStatus.QUEUED.value) and row["processed"]:
+            return self.store.progress(row["id"]).progress()
+        return None
+
+    # ── Workers ──────────────────────────────────────────
+    async def _run(self) -> None:
+        last_sweep = 0.0
+        while True:
+            try:
+                now = time.monotonic()
+                if now - last_sweep >= self.stale_after_s / 2:
+                    last_sweep = now
+                    stale = await run_in_threadpool(
+                        self.store.requeue, stale_after_s=self.stale_after_s
+                    )
+                    if stale:
+                        logger.warning("Requeued %d jobs with a stale heartbeat", stale)
+                    await run_in_threadpool(self.store.purge, self.retention_s)
+                while len(self._active) < self.max_concurrent:
+                    row = await run_in_threadpool(self.store.claim, self.owner)
+                    if row is None:
+                        break
+                    task = asyncio.create_task(self._process(row))
+                    self._active[row["id"]] = task
+                    task.add_done_callback(lambda _, job_id=row["id"]: self._finished(job_id))
+            except sqlite3.Error as exc:
+                logger.error("Job store error: %s", exc)
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_s)
+            except asyncio.TimeoutError:
+                pass
+
+    def _finished(self, job_id: str) -> None:
+        self._active.pop(job_id, None)
+        self._progress.pop(job_id, None)
+        self._wake.set()  # a slot is free
+
+    async def _process(self, row: sqlite3.Row) -> None:
+        job_id = row["id"]
+        options = json.loads(row["options"])
+        try:
+            models = scoring_registry.resolve(options["scoring_models"] or [])
+            as_of = resolve_as_of(
+                TimeWindow(options["time_window"]),
+                [datetime.fromisoformat(t) for t in options["as_of"]] if options["as_of"] else None,
+            )
+            labels = LabelMode(options["labels"])
+            learned = learned_model.model
+            watcher = watch_registry.observer()
+
+            heartbeat = _Heartbeat(self.store, job_id, self.owner, self.stale_after_s / 4)
+            asteroids = await run_in_threadpool(_load_input, row, heartbeat)
+            if not await run_in_threadpool(self.store.set_total, job_id, self.owner, len(asteroids)):
+                return
+            counts = approach_counts(asteroids)
+            tally = await run_in_threadpool(self.store.progress, job_id) if row["processed"] else _Tally()
+            self._progress[job_id] = tally.progress()
+            if row["processed"]:
+                logger.info("Job %s resuming at %d/%d", job_id, row["processed"], len(asteroids))
+
+            for start in range(row["processed"], len(asteroids), CHUNK_SIZE):
+                chunk = asteroids[start:start + CHUNK_SIZE]
+                results = await self._admitted(
+                    job_id, len(chunk), _assess_chunk, chunk, counts, labels,
+                    as_of=as_of, models=models, learned=learned, observe=watcher,
+                    effects=options.get("impact_effects", False),
+                )
+                fresh = [(start + i, a) for i, a in enumerate(results) if a is not None]
+                if not await run_in_threadpool(
+                    self.store.append, job_id, self.owner, start + len(chunk), fresh
+                ):
+                    await self._lost(job_id)
+                    return
+                tally.add([a for _, a in fresh])
+                self._progress[job_id] = tally.progress()
+                await sio.emit("job_progress", {
+                    "job_id": job_id,
+                    "processed": start + len(chunk),
+                    "total": len(asteroids),
+                    "progress": self._progress[job_id].model_dump(),
+                })
+
+            statistics = await run_in_threadpool(self._statistics, job_id, models, tally, heartbeat)
+            if not await run_in_threadpool(
+                self.store.finish, job_id, self.owner, JobStatus.COMPLETED, statistics=statistics
+            ):
+                await self._lost(job_id)
+                return
+            logger.info("Job %s completed (%d objects)", job_id, len(asteroids))
+            await sio.emit("job_completed", {"job_id": job_id, **statistics})
+            if watcher is not None:
+                await run_in_threadpool(watcher.finish)
+                await send_risk_alerts()
+        except asyncio.CancelledError:
+            raise  # shutdown: stop() requeues the job
+        except _JobLost:
+            await self._lost(job_id)
+        except Exception as exc:
+            logger.exception("Job %s failed", job_id)
+            error = f"{type(exc).__name__}: {exc}"[:2000]
+            if await run_in_threadpool(
+                self.store.finish, job_id, self.owner, JobStatus.FAILED, error=error
+            ):
+                await sio.emit("job_failed", {"job_id": job_id, "error": error})
+
+    async def _admitted(self, job_id: str, weight: int, fn, *args, **kwargs):
+        """
+        Run ``fn`` in a thread under a batch-lane admission slot, waiting
+        out rejections.  The job's heartbeat is refreshed between tries,
+        at least every quarter of ``stale_after_s``; raises _JobLost once
+        the job is no longer ours.
+        """
+        while True:
+            try:
+                async with admission.slot(Lane.BATCH, weight):
+                    return await run_in_threadpool(fn, *args, **kwargs)
+            except AdmissionRejected as exc:
+                if not await run_in_threadpool(self.store.heartbeat, job_id, self.owner):
+                    raise _JobLost(job_id)
+                await asyncio.sleep(min(exc.retry_after, self.stale_after_s / 4))
+
+    async def _lost(self, job_id: str) -> None:
+        """The job was cancelled or requeued under us; stop working on it."""
+        row = await run_in_threadpool(self.store.get, job_id)
+        if row is not None and row["status"] == JobStatus.CANCELLED.value:
+            logger.info("Job %s cancelled", job_id)
+            await sio.emit("job_cancelled", {"job_id": job_id})
+        else:
+            logger.warning("Job %s was taken over; stopping here", job_id)
+
+    def _statistics(
+        self, job_id: str, models, tally: _Tally, heartbeat: Callable[[], None]
+    ) -> dict:
+        """
+        Final statistics, merged page by page from the stored result
+        documents (engine.summary), without rebuilding assessment models.
+        """
+        summary = BatchSummary()
+        after = -1
+        while rows := self.store.documents(job_id, after, _STATISTICS_PAGE):
+            seq = np.array([s for s, _ in rows], dtype=np.int64)
+            summary.merge(BatchSummary.of_documents([json.loads(d) for _, d in rows], seq))
+            after = rows[-1][0]
+            heartbeat()
+        return {
+            "statistics": summary.statistics().model_dump(mode="json"),
+            "model_statistics": (
+                {name: s.model_dump() for name, s in summary.model_statistics(models).items()}
+                if models
+                else None
+            ),
+            "progress": tally.progress().model_dump(),
+        }
+
+
+job_manager = JobManager(
+    db_path=settings.jobs_db_path,
+    max_concurrent=settings.jobs_max_concurrent,
+    poll_s=settings.jobs_poll_s,
+    stale_after_s=settings.jobs_stale_after_s,
+    retention_s=settings.jobs_retention_s,
+)
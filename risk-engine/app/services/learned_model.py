@@ -0,0 +1,36 @@
+"""The learned risk model served by this process, loaded once at startup."""
+
+import logging
+from pathlib import Path
+from typing import Optional
+
+from app.engine.learned import LearnedModel, load_learned_model
+
+logger = logging.getLogger("risk-engine.learned-model")
+
+
+class LearnedModelSlot:
+    """Holds the model loaded in main.lifespan (None when disabled or missing)."""
+
+    def __init__(self) -> None:
+        self.model: Optional[LearnedModel] = None
+
+    def load(self, path: Optional[str]) -> Optional[LearnedModel]:
+        """Load ``path`` memory-mapped; a missing or bad file leaves the slot empty."""
+        self.model = None
+        if not path:
+            logger.info("Learned risk model disabled (LEARNED_MODEL_PATH not set)")
+            return None
+        if not Path(path).is_file():
+            logger.warning("Learned risk model %s not found; learned_score disabled", path)
+            return None
+        try:
+            self.model = load_learned_model(path)
+        except (OSError, ValueError, KeyError) as exc:
+            logger.error("Learned risk model %s not loaded: %s", path, exc)
+            return None
+        logger.info("Learned risk model loaded from %s (version %s)", path, self.model.version)
+        return self.model
+
+
+learned_model = LearnedModelSlot()
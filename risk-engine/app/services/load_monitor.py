@@ -0,0 +1,156 @@
+"""
+Load monitor: how busy this worker is, for /ready, /health and Socket.IO.
+
+A background task sleeps ``load_sample_interval_s`` at a time and
+records how late it wakes up: the event-loop lag, which grows when
+something blocks the loop or too many coroutines compete for it.
+Alongside it are reported the threadpool (threads busy, calls waiting
+for a thread), the admission controller's in-flight and queued objects,
+and the recent slot time per object.
+
+The worker is *saturated* when the smoothed loop lag, the threadpool
+queue or the queued objects pass their ``ready_max_*`` limits; /ready
+then answers 503 so the backend sends work elsewhere.  Until startup
+has finished (``set_warm``) the worker is not ready either.  Readiness
+changes are passed to ``on_change`` (socketio_service broadcasts them
+as ``engine_load`` events).
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+from anyio.to_thread import current_default_thread_limiter
+
+from app.config import settings
+from app.services.admission import AdmissionController, admission
+
+logger = logging.getLogger("risk-engine.load")
+
+
+class LoadMonitor:
+    """Samples event-loop lag and summarises the worker's load."""
+
+    WINDOW_S = 30.0
+    SMOOTHING = 0.2  # weight of the newest lag sample
+
+    def __init__(
+        self,
+        controller: AdmissionController,
+        sample_interval_s: float,
+        max_loop_lag_ms: float,
+        max_executor_queue: int,
+        max_queued_objects: int,
+    ):
+        self.controller = controller
+        self.sample_interval_s = sample_interval_s
+        self.max_loop_lag_ms = max_loop_lag_ms
+        self.max_executor_queue = max_executor_queue
+        self.max_queued_objects = max_queued_objects
+        self.warm = False
+        self.lag_ms = 0.0  # exponentially smoothed
+        self._lags: deque[float] = deque(
+            maxlen=max(1, round(self.WINDOW_S / sample_interval_s))
+        )
+        self.on_change: Optional[Callable[[dict], Awaitable[None]]] = None
+        self._task: Optional[asyncio.Task] = None
+        self._was_ready: Optional[bool] = None
+
+    # ── Lifecycle (main.lifespan) ────────────────────────
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self.warm = False
+
+    def set_warm(self) -> None:
+        """Mark startup (model loading, warm-up) as finished."""
+        self.warm = True
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.sample_interval_s)
+            lag_ms = max(0.0, loop.time() - started - self.sample_interval_s) * 1000
+            self._lags.append(lag_ms)
+            self.lag_ms += self.SMOOTHING * (lag_ms - self.lag_ms)
+
+            snapshot = self.snapshot()
+            ready = snapshot["ready"]
+            if ready != self._was_ready:
+                if self._was_ready is not None:
+                    if ready:
+                        logger.info("Worker is ready")
+                    else:
+                        logger.info(
+                            "Worker not ready: %s", ", ".join(snapshot["not_ready_reasons"])
+                        )
+                    if self.on_change is not None:
+                        try:
+                            await self.on_change(snapshot)
+                        except Exception:
+                            # e.g. the Socket.IO message queue is down; keep sampling
+                            logger.exception("Load change callback failed")
+                self._was_ready = ready
+
+    # ── Figures ──────────────────────────────────────────
+    @staticmethod
+    def _executor() -> dict:
+        stats = current_default_thread_limiter().statistics()
+        return {
+            "busy_threads": stats.borrowed_tokens,
+            "max_threads": int(stats.total_tokens),
+            "queued_calls": stats.tasks_waiting,
+        }
+
+    def _saturation(self, executor: dict) -> list[str]:
+        """Which saturation limits are exceeded (empty when none)."""
+        reasons = []
+        if self.lag_ms > self.max_loop_lag_ms:
+            reasons.append(f"event-loop lag {self.lag_ms:.0f}ms")
+        if executor["queued_calls"] > self.max_executor_queue:
+            reasons.append(f"{executor['queued_calls']} calls waiting for a thread")
+        if self.controller.queued_objects > self.max_queued_objects:
+            reasons.append(f"{self.controller.queued_objects} objects queued")
+        return reasons
+
+    def snapshot(self) -> dict:
+        """Current load figures; ``ready`` is what /ready reports."""
+        executor = self._executor()
+        saturation = self._saturation(executor)
+        reasons = ([] if self.warm else ["warming up"]) + saturation
+        controller = self.controller
+        per_object = controller.per_object_ms()
+        return {
+            "worker": os.getpid(),
+            "ready": not reasons,
+            "warm": self.warm,
+            "saturated": bool(saturation),
+            "not_ready_reasons": reasons,
+            "loop_lag_ms": round(self.lag_ms, 2),
+            "loop_lag_ms_max": round(max(self._lags, default=0.0), 2),
+            "executor": executor,
+            "in_flight_objects": controller.in_flight,
+            "queued_objects": controller.queued_objects,
+            "load_factor": round(
+                (controller.in_flight + controller.queued_objects) / controller.max_objects, 3
+            ),
+            "per_object_ms": round(per_object, 4) if per_object is not None else None,
+            "timestamp": time.time(),
+        }
+
+
+load_monitor = LoadMonitor(
+    admission,
+    sample_interval_s=settings.load_sample_interval_s,
+    max_loop_lag_ms=settings.ready_max_loop_lag_ms,
+    max_executor_queue=settings.ready_max_executor_queue,
+    max_queued_objects=settings.ready_max_queued_objects,
+)
@@ -0,0 +1,168 @@
+"""
+Store of recent batch results, addressed by opaque handles.
+
+A single process keeps snapshots in memory (ResultStore).  In
+multi-worker mode (app.serve) each snapshot is written once to a shared
+directory on tmpfs (SharedResultStore), so a handle issued by one worker
+resolves in every other worker.
+"""
+
+import hashlib
+import hmac
+import os
+import pickle
+import secrets
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from app.config import settings
+from app.engine.incremental import ResultSnapshot
+
+
+class ResultStore:
+    """Bounded LRU of result snapshots with a time-to-live."""
+
+    def __init__(self, max_entries: int, ttl_s: float):
+        self._entries: "OrderedDict[str, tuple[float, ResultSnapshot]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+
+    def get(self, handle: str) -> Optional[ResultSnapshot]:
+        with self._lock:
+            entry = self._entries.get(handle)
+            if entry is None:
+                return None
+            created_at, snapshot = entry
+            if time.time() - created_at > self.ttl_s:
+                del self._entries[handle]
+                return None
+            self._entries.move_to_end(handle)
+            return snapshot
+
+    def put(self, snapshot: ResultSnapshot) -> str:
+        """Store a snapshot and return its new opaque handle."""
+        handle = uuid.uuid4().hex
+        with self._lock:
+            self._entries[handle] = (time.time(), snapshot)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return handle
+
+    def entries(self) -> list[tuple[str, float, ResultSnapshot]]:
+        """(handle, created_at, snapshot), oldest first (for warm_start)."""
+        with self._lock:
+            return [(h, t, s) for h, (t, s) in self._entries.items()]
+
+    def restore(self, entries: list[tuple[str, float, ResultSnapshot]]) -> int:
+        """Add saved entries under their old handles, dropping expired ones; returns how many."""
+        now = time.time()
+        with self._lock:
+            for handle, created_at, snapshot in entries:
+                if now - created_at <= self.ttl_s:
+                    self._entries[handle] = (created_at, snapshot)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return len(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_DIGEST_SIZE = hashlib.sha256().digest_size
+
+
+class SharedResultStore:
+    """
+    ResultStore over files in a directory shared by all workers.
+
+    Snapshots are pickled to ``<handle>.pkl``, written to a temporary
+    name and renamed so readers never see partial files.  File mtimes
+    serve as the LRU clock (touched on every hit) and the TTL.
+
+    Each file starts with an HMAC-SHA256 of the handle and the pickle,
+    keyed with ``key``; a file whose digest does not match is never
+    unpickled, so write access to the directory alone does not let
+    anyone run code in a worker.  Workers share the key through
+    RESULT_CACHE_KEY (app.serve); without one, each process draws its
+    own and sees only the files it wrote.
+    """
+
+    def __init__(self, directory: str, max_entries: int, ttl_s: float, key: Optional[str] = None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._key = key.encode() if key else secrets.token_bytes(32)
+
+    def _digest(self, handle: str, payload: bytes) -> bytes:
+        mac = hmac.new(self._key, handle.encode(), hashlib.sha256)
+        mac.update(payload)
+        return mac.digest()
+
+    def _path(self, handle: str) -> Optional[Path]:
+        # Handles are uuid hex; anything else cannot name a stored file
+        if len(handle) != 32 or not all(c in "0123456789abcdef" for c in handle):
+            return None
+        return self.directory / f"{handle}.pkl"
+
+    def get(self, handle: str) -> Optional[ResultSnapshot]:
+        path = self._path(handle)
+        if path is None:
+            return None
+        try:
+            if time.time() - path.stat().st_mtime > self.ttl_s:
+                path.unlink(missing_ok=True)
+                return None
+            data = path.read_bytes()
+            digest, payload = data[:_DIGEST_SIZE], data[_DIGEST_SIZE:]
+            if not hmac.compare_digest(digest, self._digest(handle, payload)):
+                return None
+            snapshot = pickle.loads(payload)
+            os.utime(path)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        return snapshot
+
+    def put(self, snapshot: ResultSnapshot) -> str:
+        """Store a snapshot and return its new opaque handle."""
+        handle = uuid.uuid4().hex
+        path = self._path(handle)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        payload = pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.write_bytes(self._digest(handle, payload) + payload)
+        os.replace(tmp, path)
+        self._evict()
+        return handle
+
+    def _evict(self) -> None:
+        entries = []
+        for path in self.directory.glob("*.pkl"):
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except OSError:
+                continue  # removed by another worker
+        entries.sort(reverse=True)
+        now = time.time()
+        for i, (mtime, path) in enumerate(entries):
+            if i >= self.max_entries or now - mtime > self.ttl_s:
+                path.unlink(missing_ok=True)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.directory.glob("*.pkl"))
+
+
+result_store: ResultStore | SharedResultStore = (
+    SharedResultStore(
+        settings.result_cache_dir,
+        settings.result_cache_size,
+        settings.result_cache_ttl_s,
+        settings.result_cache_key,
+    )
+    if settings.result_cache_dir
+    else ResultStore(settings.result_cache_size, settings.result_cache_ttl_s)
+)
@@ -0,0 +1,112 @@
+"""
+Registry of named scoring models.
+
+The built-in ``default`` model is always present.  Further models are
+JSON files in ``settings.scoring_models_dir`` (one model per file, named
+by its ``name`` field or the file stem) holding any ScoringModel fields
+to override.  The directory is re-scanned at most every
+``scoring_models_reload_s`` seconds, so edited, added or removed files
+take effect without a restart.  A file that fails to load is logged and
+its previous version, if any, stays in service.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from app.config import settings
+from app.engine.scoring import DEFAULT_MODEL, ScoringModel
+
+logger = logging.getLogger("risk-engine.scoring-models")
+
+
+class ScoringModelRegistry:
+    """Thread-safe, hot-reloading map of model name → ScoringModel."""
+
+    def __init__(self, directory: Optional[str], reload_interval_s: float):
+        self.directory = Path(directory) if directory else None
+        self.reload_interval_s = reload_interval_s
+        self._lock = threading.Lock()
+        self._models: dict[str, ScoringModel] = {DEFAULT_MODEL.name: DEFAULT_MODEL}
+        self._files: dict[Path, tuple[int, int, Optional[str]]] = {}  # path → (mtime_ns, size, model name)
+        self._checked_at = float("-inf")
+
+    def get(self, name: str) -> ScoringModel:
+        """Look up a model by name (KeyError if unknown)."""
+        return self.models()[name]
+
+    def resolve(self, names: list[str]) -> list[ScoringModel]:
+        """Models for the given names, in order.  Raises ValueError on unknown names."""
+        models = self.models()
+        unknown = [n for n in names if n not in models]
+        if unknown:
+            raise ValueError(f"Unknown scoring model(s): {', '.join(unknown)}")
+        return [models[n] for n in dict.fromkeys(names)]
+
+    def models(self) -> dict[str, ScoringModel]:
+        """Current models, re-scanning the directory if the interval has passed."""
+        with self._lock:
+            if time.monotonic() - self._checked_at >= self.reload_interval_s:
+                self._reload()
+            return dict(self._models)
+
+    def _reload(self) -> None:
+        self._checked_at = time.monotonic()
+        if self.directory is None or not self.directory.is_dir():
+            return
+
+        seen = set()
+        for path in sorted(self.directory.glob("*.json")):
+            seen.add(path)
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            known = self._files.get(path)
+            if known is not None and known[:2] == (stat.st_mtime_ns, stat.st_size):
+                continue
+            name = self._load(path, known[2] if known else None)
+            self._files[path] = (stat.st_mtime_ns, stat.st_size, name)
+
+        for path in set(self._files) - seen:
+            name = self._files.pop(path)[2]
+            if name is not None:
+                self._models.pop(name, None)
+                logger.info("Scoring model '%s' removed (%s)", name, path.name)
+
+    def _load(self, path: Path, previous_name: Optional[str]) -> Optional[str]:
+        """Load one file; returns the model name now served from it."""
+        try:
+            raw = path.read_bytes()
+            config = json.loads(raw)
+            if not isinstance(config, dict):
+                raise ValueError("expected a JSON object")
+            name = str(config.setdefault("name", path.stem))
+            if name == DEFAULT_MODEL.name:
+                raise ValueError(f"'{name}' is reserved for the built-in model")
+            owner = next(
+                (p for p, (_, _, n) in self._files.items() if n == name and p != path),
+                None,
+            )
+            if owner is not None:
+                raise ValueError(f"model '{name}' is already defined in {owner.name}")
+            version = hashlib.blake2b(raw, digest_size=6).hexdigest()
+            model = ScoringModel.from_config(config, version=version)
+        except (OSError, ValueError, TypeError) as exc:
+            logger.error("Scoring model file %s not loaded: %s", path.name, exc)
+            return previous_name
+
+        if previous_name is not None and previous_name != name:
+            self._models.pop(previous_name, None)
+        self._models[name] = model
+        logger.info("Scoring model '%s' loaded (version %s)", name, version)
+        return name
+
+
+scoring_registry = ScoringModelRegistry(
+    settings.scoring_models_dir, settings.scoring_models_reload_s
+)
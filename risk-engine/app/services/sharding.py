@@ -0,0 +1,268 @@
+"""
+Sharded /analyze: this instance as coordinator over peer engine instances.
+
+With ``shard_peers`` set, an /analyze batch of at least
+``shard_min_objects`` objects (full records response, no field
+projection, previous_handle or extended statistics) is split into one
+shard per peer plus one run here (app.engine.shards).  Peer shards are POSTed to the peers'
+/api/v1/analyze/shard over a pooled HTTP client; the local shard runs
+meanwhile through this worker's admission controller and threadpool.
+
+A peer that cannot be reached, times out, answers 5xx or sheds the shard
+(429 / 503) is skipped for ``shard_peer_cooldown_s`` and its shard is
+sent to the next available peer, up to ``shard_attempts`` tries in all;
+after that the shard runs here.  So does a shard whose peer scored it
+under other scoring-model or learned-model versions.  A shard rejected
+as invalid (422) is not retried: the whole batch is decoded here, which
+reports the errors with their positions in the batch.
+
+Peers get most of the time left before the request's deadline.  With
+best_effort a peer answers with the assessments it completed by then;
+a shard whose peer does not answer in time at all is left out and the
+response is marked partial.  A peer that times out because the request's
+own deadline passed is not skipped afterwards.
+
+Asteroids on this instance's watch list stay in the local shard, so
+their risk_alert events are raised here as without sharding.  Sharded
+responses carry no result_handle: the assessments are not all held here.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional, Sequence
+
+import httpx
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.engine.cancellation import DEADLINE_EXCEEDED, Cancelled, CancelToken
+from app.engine.scoring import ScoringModel
+from app.engine.shards import ShardResult, shard_of
+from app.engine.summary import BatchSummary
+from app.services.watch_registry import watch_registry
+from app.tracing import span, traceparent
+
+logger = logging.getLogger("risk-engine.sharding")
+
+SHARD_PATH = "/api/v1/analyze/shard"
+
+# Peers get this share of the time left, so a partial (best_effort)
+# result still arrives before the coordinator's own deadline
+_PEER_DEADLINE_SHARE = 0.9
+
+
+class ShardRejected(Exception):
+    """A shard was rejected as invalid; the batch is decoded locally instead."""
+
+
+@dataclass
+class Shard:
+    rows: np.ndarray  # batch positions of the shard's records
+    peer: Optional[str]  # None ⇒ this instance
+
+
+class ShardCoordinator:
+    """Splits /analyze batches across the peers and this instance."""
+
+    def __init__(
+        self,
+        peers: Optional[str],
+        min_objects: int,
+        attempts: int,
+        cooldown_s: float,
+        timeout_s: float,
+    ):
+        self.peers = [p.strip().rstrip("/") for p in (peers or "").split(",") if p.strip()]
+        self.min_objects = min_objects
+        self.attempts = max(1, attempts)
+        self.cooldown_s = cooldown_s
+        self.timeout_s = timeout_s
+        self._down_until: dict[str, float] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.peers)
+
+    # ── Lifecycle (main.lifespan) ────────────────────────
+    def start(self) -> None:
+        if not self.enabled:
+            return
+        connections = 4 * len(self.peers)
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout_s,
+            limits=httpx.Limits(
+                max_connections=connections, max_keepalive_connections=connections
+            ),
+        )
+        logger.info(
+            "Sharding /analyze batches of ≥ %d objects over %d peers",
+            self.min_objects, len(self.peers),
+        )
+
+    async def stop(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    # ── Planning ─────────────────────────────────────────
+    def plan(self, ids: Sequence[Any]) -> list[Shard]:
+        """
+        One shard per peer and one local, by neo_reference_id; watched
+        asteroids stay local.  Empty shards are left out.
+        """
+        assignment = shard_of(ids, len(self.peers) + 1)
+        assignment[watch_registry.watched_rows(list(map(str, ids)))] = 0
+        shards = []
+        for k, peer in enumerate([None, *self.peers]):
+            rows = np.flatnonzero(assignment == k)
+            if len(rows):
+                shards.append(Shard(rows, peer))
+        return shards
+
+    # ── Execution ────────────────────────────────────────
+    async def run(
+        self,
+        shards: list[Shard],
+        body: Callable[[np.ndarray], bytes],
+        run_local: Callable[[np.ndarray], Awaitable[ShardResult]],
+        models: Sequence[ScoringModel],
+        learned_model: Optional[str],
+        cancel: CancelToken,
+        best_effort: bool = False,
+    ) -> list[tuple[ShardResult, np.ndarray]]:
+        """
+        Run every shard: ``body(rows)`` is the /analyze body of a peer
+        shard, ``run_local(rows)`` assesses a shard here.  Returns each
+        shard's result with its rows.  Raises Cancelled once ``cancel``
+        fires (with ``best_effort``, only when the client disconnects:
+        past the deadline the shards return what they completed),
+        ShardRejected for an invalid shard.
+        """
+        expected = ([(m.name, m.version) for m in models], learned_model)
+
+        async def run_shard(shard: Shard) -> tuple[ShardResult, np.ndarray]:
+            if shard.peer is not None:
+                content = await run_in_threadpool(body, shard.rows)
+                result = await self._run_remote(shard, content, expected, cancel, best_effort)
+                if result is not None:
+                    return result, shard.rows
+            return await run_local(shard.rows), shard.rows
+
+        tasks = [asyncio.create_task(run_shard(s)) for s in shards]
+        try:
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, timeout=0.2, return_when=asyncio.FIRST_EXCEPTION
+                )
+                for task in done:
+                    task.result()  # raises the first failure
+                reason = cancel.reason
+                if reason is not None and not (best_effort and reason == DEADLINE_EXCEEDED):
+                    raise Cancelled(reason)
+            return [task.result() for task in tasks]
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _candidates(self, first: str) -> list[str]:
+        """``first``, then the other peers in order, skipping peers marked down."""
+        now = time.monotonic()
+        start = self.peers.index(first)
+        ordered = self.peers[start:] + self.peers[:start]
+        return [p for p in ordered if self._down_until.get(p, 0.0) <= now][: self.attempts]
+
+    def _mark_down(self, peer: str, reason: str) -> None:
+        self._down_until[peer] = time.monotonic() + self.cooldown_s
+        logger.warning(
+            "Shard peer %s failed (%s); skipped for %.0fs", peer, reason, self.cooldown_s
+        )
+
+    async def _run_remote(
+        self,
+        shard: Shard,
+        content: bytes,
+        expected: tuple[list[tuple[str, str]], Optional[str]],
+        cancel: CancelToken,
+        best_effort: bool,
+    ) -> Optional[ShardResult]:
+        """The shard's result from a peer, or None when it is to run here."""
+
+        def past_deadline() -> ShardResult:
+            if not best_effort:
+                raise Cancelled(DEADLINE_EXCEEDED)
+            logger.warning("Shard of %d objects left out (deadline passed)", len(shard.rows))
+            return _missing(len(shard.rows), expected)
+
+        for attempt, peer in enumerate(self._candidates(shard.peer)):
+            headers = {"Content-Type": "application/json"}
+            timeout = self.timeout_s
+            remaining = cancel.remaining()
+            if remaining is not None:
+                if remaining <= 0:
+                    return past_deadline()
+                peer_ms = int(remaining * _PEER_DEADLINE_SHARE * 1000)
+                headers["X-Request-Timeout-Ms"] = str(max(1, peer_ms))
+                timeout = min(timeout, remaining)
+            with span("shard.peer", peer=peer, objects=len(shard.rows), attempt=attempt + 1) as s:
+                context = traceparent()
+                if context is not None:
+                    headers["traceparent"] = context
+                try:
+                    response = await self._client.post(
+                        peer + SHARD_PATH, content=content, headers=headers, timeout=timeout
+                    )
+                except httpx.HTTPError as exc:
+                    s.set(error=type(exc).__name__)
+                    if isinstance(exc, httpx.TimeoutException) and cancel.reason == DEADLINE_EXCEEDED:
+                        return past_deadline()  # the request's deadline, not the peer
+                    self._mark_down(peer, type(exc).__name__)
+                    continue
+                s.set(status=response.status_code, bytes=len(response.content))
+
+            if response.status_code == 422:
+                raise ShardRejected(response.text)
+            if response.status_code == 504:
+                return past_deadline()
+            if response.status_code != 200:
+                self._mark_down(peer, f"HTTP {response.status_code}")
+                continue
+            try:
+                result = ShardResult.decode(response.content)
+            except (ValueError, KeyError, TypeError) as exc:
+                self._mark_down(peer, f"bad shard result: {exc}")
+                continue
+            if (result.models, result.learned_model) != expected:
+                self._mark_down(peer, "different scoring or learned model versions")
+                continue
+            return result
+        return None
+
+
+def _missing(size: int, expected: tuple[list[tuple[str, str]], Optional[str]]) -> ShardResult:
+    """Empty, partial result for a shard left out."""
+    models, learned_model = expected
+    return ShardResult(
+        requested=size,
+        partial=True,
+        models=models,
+        learned_model=learned_model,
+        positions=np.empty(0, dtype=np.int64),
+        scores=np.empty(0, dtype=float),
+        summary=BatchSummary(),
+        fragments=[],
+    )
+
+
+shard_coordinator = ShardCoordinator(
+    peers=settings.shard_peers,
+    min_objects=settings.shard_min_objects,
+    attempts=settings.shard_attempts,
+    cooldown_s=settings.shard_peer_cooldown_s,
+    timeout_s=settings.shard_timeout_s,
+)
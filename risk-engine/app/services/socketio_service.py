@@ -4,10 +4,34 @@ import logging
 import time
 
 import socketio
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.models import UnwatchRequest, WatchRequest
+from app.services.load_monitor import load_monitor
+from app.services.watch_registry import watch_registry
 
 logger = logging.getLogger("risk-engine")
 
-sio = socketio.AsyncServer(async_mode="asgi", cors_allowed_origins="*")
+# With several workers each connection must stay on the worker that accepted
+# it: long-polling would spread one session's requests across processes, so
+# only the websocket transport is offered.  Emits to clients held by other
+# workers go through the Redis manager when one is configured.  Watches
+# are shared through SharedWatchRegistry: risk alerts are queued for the
+# worker holding the watching connection, which sends them itself.
+_multi_worker = settings.risk_engine_workers != "1"
+
+sio = socketio.AsyncServer(
+    async_mode="asgi",
+    cors_allowed_origins="*",
+    transports=["websocket"] if _multi_worker else None,
+    client_manager=(
+        socketio.AsyncRedisManager(settings.socketio_redis_url)
+        if settings.socketio_redis_url
+        else None
+    ),
+)
 
 
 @sio.event
@@ -20,6 +44,7 @@ async def connect(sid: str, environ: dict):
             "engine": "python",
             "version": "1.0.0",
             "timestamp": time.time(),
+            "load": load_monitor.snapshot(),
         },
         to=sid,
     )
@@ -27,11 +52,64 @@ async def connect(sid: str, environ: dict):
 
 @sio.event
 async def disconnect(sid: str):
-    """Handle backend disconnection."""
+    """Handle backend disconnection; its watches go with it."""
     logger.info("Backend disconnected (sid=%s)", sid)
+    await run_in_threadpool(watch_registry.unwatch, sid)
 
 
 @sio.event
 async def ping_engine(sid: str, data: dict):
-    """Respond to ping with a pong."""
-    await sio.emit("pong_engine", {"timestamp": time.time()}, to=sid)
+    """Respond to ping with a pong carrying the current load figures."""
+    await sio.emit(
+        "pong_engine", {"timestamp": time.time(), "load": load_monitor.snapshot()}, to=sid
+    )
+
+
+async def _broadcast_load(snapshot: dict) -> None:
+    """Tell every backend connection when this worker's readiness changes."""
+    await sio.emit("engine_load", snapshot)
+
+
+load_monitor.on_change = _broadcast_load
+
+
+# ── Watch registry ─────────────────────────────────────────────
+@sio.event
+async def watch(sid: str, data: dict):
+    """
+    Watch asteroids (WatchRequest); ``risk_alert`` events follow when a
+    later analysis crosses a threshold.  Acknowledged with the number
+    of watches this connection holds.
+    """
+    try:
+        request = WatchRequest.model_validate(data)
+    except ValidationError as exc:
+        return {"success": False, "message": str(exc)}
+    watching = await run_in_threadpool(watch_registry.watch, sid, request)
+    return {"success": True, "watching": watching}
+
+
+@sio.event
+async def unwatch(sid: str, data: dict = None):
+    """Stop watching the given asteroids (UnwatchRequest), or all of them."""
+    try:
+        request = UnwatchRequest.model_validate(data or {})
+    except ValidationError as exc:
+        return {"success": False, "message": str(exc)}
+    removed = await run_in_threadpool(watch_registry.unwatch, sid, request.asteroid_ids)
+    return {"success": True, "removed": removed}
+
+
+@sio.event
+async def list_watches(sid: str, data: dict = None):
+    """This connection's watches and thresholds."""
+    return {"success": True, "data": await run_in_threadpool(watch_registry.watches, sid)}
+
+
+async def send_risk_alerts() -> None:
+    """Send the alerts queued by the watch registry, one event per connection."""
+    for sid, alerts in (await run_in_threadpool(watch_registry.drain)).items():
+        await sio.emit("risk_alert", {"alerts": alerts, "timestamp": time.time()}, to=sid)
+
+
+watch_registry.deliver = send_risk_alerts
@@ -0,0 +1,265 @@
+"""
+Warm start: the result cache across restarts, and a warm-up run.
+
+On graceful shutdown (main.lifespan) the in-process result cache is
+pickled to ``cache_snapshot_path`` together with the engine version (a
+digest of the engine and model sources plus the NumPy and Pydantic
+versions) and the settings the cached results depend on.  At startup a
+snapshot with the same version and settings is loaded back, so result
+handles issued before a restart keep working; any other snapshot is
+stale and is deleted.  With ``result_cache_dir`` (app.serve) the cache
+already lives in files shared by the workers and nothing is saved.
+
+The label, scale and effect tables are module constants rebuilt at
+import in milliseconds.  What makes the first large batches slow is the
+first pass through each path: memoized label strings, Pydantic
+validators and serializers, NumPy loops, lazily imported modules, the
+threadpool.  ``warm_up`` sends a synthetic batch through the engine
+path of every batch endpoint; main.lifespan runs it before
+load_monitor.set_warm(), so /ready answers 503 until it is done.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pydantic
+
+from app.config import settings
+from app.models import (
+    DeflectionDirection,
+    LabelMode,
+    NeoObject,
+    ResultMode,
+    SentryData,
+)
+from app.engine import RiskEngine
+from app.engine.batch import resolve_as_of
+from app.engine.constants import AU_KM, LUNAR_DISTANCE_KM
+from app.engine.ingest import decode_analyze_body
+from app.engine.projection import FieldProjection, ResponseFormat, project_response
+from app.engine.timeline import TimelineColumns, batch_timeline, timeline
+from app.services.learned_model import learned_model
+from app.services.result_store import ResultStore, result_store
+from app.services.scoring_registry import scoring_registry
+
+logger = logging.getLogger("risk-engine.warm-start")
+
+SNAPSHOT_FORMAT = 1
+
+# Settings the cached results depend on
+_CONFIG_KEYS = {"result_cache_size", "result_cache_ttl_s", "scoring_models_dir", "learned_model_path"}
+
+_APP_DIR = Path(__file__).resolve().parent.parent
+
+
+def engine_version() -> str:
+    """Digest of the engine and model sources and the libraries results depend on."""
+    digest = hashlib.sha256()
+    for path in sorted([*(_APP_DIR / "engine").glob("*.py"), _APP_DIR / "models.py"]):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    digest.update(f"numpy {np.__version__} pydantic {pydantic.VERSION}".encode())
+    return digest.hexdigest()[:16]
+
+
+def _tag() -> dict:
+    return {
+        "format": SNAPSHOT_FORMAT,
+        "version": engine_version(),
+        "config": settings.model_dump(include=_CONFIG_KEYS),
+    }
+
+
+# ── Cache Snapshot ───────────────────────────────────────────
+def save_snapshot(path: Optional[str], store=result_store) -> int:
+    """
+    Write the in-process result cache to ``path``; returns the entries saved.
+
+    Written to a temporary name and renamed, so a crash mid-write leaves
+    the previous snapshot (or none) in place.
+    """
+    if not path or not isinstance(store, ResultStore):
+        return 0
+    entries = store.entries()
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    try:
+        tmp.write_bytes(
+            pickle.dumps({**_tag(), "results": entries}, protocol=pickle.HIGHEST_PROTOCOL)
+        )
+        os.replace(tmp, target)
+    except OSError as exc:
+        tmp.unlink(missing_ok=True)
+        logger.error("Cache snapshot not written to %s: %s", path, exc)
+        return 0
+    logger.info("Cache snapshot written to %s (%d results)", path, len(entries))
+    return len(entries)
+
+
+def load_snapshot(path: Optional[str], store=result_store) -> int:
+    """
+    Restore a snapshot written by save_snapshot; returns the results restored.
+
+    A snapshot from another engine version or configuration, or one that
+    cannot be read, is deleted and the cache starts empty.
+    """
+    if not path or not isinstance(store, ResultStore) or not Path(path).is_file():
+        return 0
+    try:
+        saved = pickle.loads(Path(path).read_bytes())
+    except Exception as exc:  # unpickling can fail in many ways on a stale file
+        logger.warning("Cache snapshot %s unreadable (%s); discarded", path, exc)
+        Path(path).unlink(missing_ok=True)
+        return 0
+
+    tag = _tag()
+    stale = [key for key in tag if saved.get(key) != tag[key]]
+    if stale:
+        logger.info("Cache snapshot %s is stale (%s changed); discarded", path, ", ".join(stale))
+        Path(path).unlink(missing_ok=True)
+        return 0
+    restored = store.restore(saved["results"])
+    logger.info("Cache snapshot %s loaded (%d results)", path, restored)
+    return restored
+
+
+# ── Warm-up ──────────────────────────────────────────────────
+def synthetic_batch(n: int, seed: int = 0) -> list[dict]:
+    """
+    ``n`` NeoWs objects spread over the ranges the engine branches on:
+    sizes from metres (airbursts) to kilometres (craters, the massive size
+    class), near and distant approaches in the past and future, with and
+    without orbital data, and a few without close approaches.
+    """
+    rng = np.random.default_rng(seed)
+    d_min = 10 ** rng.uniform(-3.5, 1.0, n)
+    d_max = d_min * rng.uniform(1.0, 2.3, n)
+    km = 10 ** rng.uniform(3.5, 8.0, n)
+    v = rng.uniform(2.0, 40.0, n)
+    moid = 10 ** rng.uniform(-6.0, -0.5, n)
+    days = rng.integers(-3650, 36500, n)
+    today = datetime.now(timezone.utc).date()
+
+    records = []
+    for i in range(n):
+        day = today + timedelta(days=int(days[i]))
+        epoch = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+        record = {
+            "id": str(9_000_000 + i),
+            "neo_reference_id": str(9_000_000 + i),
+            "name": f"(WARM {i})",
+            "designation": f"WARM {i}",
+            "absolute_magnitude_h": 22.0,
+            "is_potentially_hazardous_asteroid": bool(i % 5 == 0),
+            "estimated_diameter": {
+                "kilometers": {
+                    "estimated_diameter_min": float(d_min[i]),
+                    "estimated_diameter_max": float(d_max[i]),
+                },
+                "meters": {
+                    "estimated_diameter_min": float(d_min[i]) * 1000,
+                    "estimated_diameter_max": float(d_max[i]) * 1000,
+                },
+            },
+            "close_approach_data": [] if i % 97 == 96 else [
+                {
+                    "close_approach_date": day.isoformat(),
+                    "epoch_date_close_approach": int(epoch.timestamp() * 1000),
+                    "relative_velocity": {
+                        "kilometers_per_second": str(v[i]),
+                        "kilometers_per_hour": str(v[i] * 3600),
+                        "miles_per_hour": str(v[i] * 2236.936),
+                    },
+                    "miss_distance": {
+                        "astronomical": str(km[i] / AU_KM),
+                        "lunar": str(km[i] / LUNAR_DISTANCE_KM),
+                        "kilometers": str(km[i]),
+                        "miles": str(km[i] * 0.621371),
+                    },
+                    "orbiting_body": "Earth",
+                }
+            ],
+        }
+        if i % 3:
+            record["orbital_data"] = {
+                "minimum_orbit_intersection": str(moid[i]),
+                "orbit_uncertainty": str(i % 10),
+            }
+        records.append(record)
+    return records
+
+
+def warm_up(objects: int) -> float:
+    """
+    Run a synthetic batch of ``objects`` through the engine path of every
+    batch endpoint; returns the seconds taken.  Nothing is stored.
+    """
+    start = time.perf_counter()
+    records = synthetic_batch(objects)
+    now = datetime.now(timezone.utc)
+    body = {
+        "asteroids": records,
+        "time_window": "approach",
+        "as_of": [now.isoformat(), (now + timedelta(days=365)).isoformat()],
+    }
+
+    # /analyze: lean decode, every stage, records and columnar, then a diff
+    request, inputs, size = decode_analyze_body(json.dumps(body).encode())
+    as_of = resolve_as_of(request.time_window, request.as_of)
+    models = [m for name, m in scoring_registry.models().items() if name != "default"]
+    result, snapshot = RiskEngine.analyze_inputs(
+        inputs, size, as_of=as_of, models=models, learned=learned_model.model, effects=True
+    )
+    result.model_dump_json()
+    RiskEngine.analyze_inputs(
+        inputs,
+        size,
+        labels=LabelMode.CODES,
+        projection=FieldProjection.parse("asteroid_id,risk_score,statistics"),
+        previous=snapshot,
+        previous_handle="warm-up",
+        result_mode=ResultMode.DIFF,
+        as_of=as_of,
+        models=models,
+    )
+    project_response(result, FieldProjection(), ResponseFormat.COLUMNAR)
+
+    # Timelines of a batch and of a stored result
+    batch_timeline(inputs, as_of, bin_days=7)
+    timeline(TimelineColumns.from_assessments(result.assessments), bin_days=7)
+
+    # /analyze/explain and /analyze/deflection on a slice
+    sample = inputs.take(np.arange(min(len(inputs), 200)))
+    RiskEngine.explain_inputs(sample, as_of=as_of).model_dump_json()
+    RiskEngine.deflection_scenarios(
+        sample, (0.1, 1.0, 10.0), (30.0, 365.0), tuple(DeflectionDirection)
+    ).model_dump_json()
+
+    # NeoObject paths: jobs, /analyze/single, Sentry-enhanced
+    neos = [NeoObject.model_validate(r) for r in records[:200]]
+    RiskEngine.analyze_batch(neos)
+    RiskEngine.assess_single(neos[0])
+    table = [
+        SentryData(
+            designation=f"WARM {i}",
+            cumulative_impact_probability=1e-6,
+            palermo_cumulative=-3.0,
+            palermo_max=-3.5,
+            torino_max=0,
+        )
+        for i in range(0, len(neos), 2)
+    ]
+    pairs, unmatched = RiskEngine.join_sentry_table(neos, table)
+    RiskEngine.assess_sentry_batch(pairs, unmatched).model_dump_json()
+    RiskEngine.assess_with_sentry(*pairs[0])
+
+    return time.perf_counter() - start
@@ -0,0 +1,584 @@
+"""
+Watch registry: engine-side alerts for watched asteroids.
+
+Backend connections register asteroid ids with thresholds (risk level,
+Torino scale, risk score) over Socket.IO.  While a batch is assessed, a
+WatchObserver picks the watched rows out of each chunk with a binary
+search against the sorted id index, so unwatched objects cost one
+``searchsorted``.  Objects reused from an earlier result are not
+assessed again and are not looked at.  When the batch is done the
+watched objects are compared with the values they had in the previous
+batch.  Each threshold crossed, upwards or back down, becomes an alert
+for the connection that set it.  The first time a watched object is
+seen counts as coming from below.
+
+Alerts are queued here and sent by socketio_service.send_risk_alerts as
+one ``risk_alert`` event per connection.  A single process keeps all of
+this in memory (WatchRegistry).  In multi-worker mode (app.serve) the
+watches, last seen values and queued alerts are rows in a SQLite file
+on tmpfs (SharedWatchRegistry), so a batch on any worker checks every
+connection's watches, and its alerts reach the worker holding that
+connection.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import closing, contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, Callable, Iterator, Optional
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.models import WatchRequest
+from app.engine.batch import BatchInputs, BatchOutputs
+from app.engine.scoring import RISK_LEVELS
+
+_LEVEL_CODES = {level: code for code, level in enumerate(RISK_LEVELS)}
+# Checked values, in the column order used throughout (level as its code);
+# an unset threshold is -1 (level, Torino) or NaN (score)
+_METRICS = ("risk_level", "torino_scale", "risk_score")
+
+logger = logging.getLogger("risk-engine")
+
+
+@dataclass
+class _Index:
+    """Immutable view of the watches, rebuilt whenever they change."""
+
+    ids: np.ndarray  # sorted unique watched ids
+    entry_pos: np.ndarray  # per watch: position of its id in ``ids``
+    entry_sid: list[str]
+    thresholds: np.ndarray  # (watches, 3) in _METRICS order
+
+
+class WatchRegistry:
+    """Watched asteroid ids, their thresholds and last seen values."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (sid, asteroid id) → (level code, torino, score) thresholds
+        self._watches: dict[tuple[str, str], tuple[int, int, float]] = {}
+        # asteroid id → (level code, torino, score) last seen
+        self._previous: dict[str, tuple[int, int, float]] = {}
+        self._index: Optional[_Index] = None
+        self._pending: dict[str, list[dict]] = {}
+        # Sends drained alerts (socketio_service.send_risk_alerts)
+        self.deliver: Optional[Callable[[], Awaitable[None]]] = None
+
+    def start(self) -> None:
+        """Nothing runs in the background for a single process."""
+
+    async def stop(self) -> None:
+        pass
+
+    # ── Registration (Socket.IO handlers) ────────────────
+    def watch(self, sid: str, request: WatchRequest) -> int:
+        """Add or update ``sid``'s watches; returns how many it now has."""
+        thresholds = _thresholds(request)
+        with self._lock:
+            for aid in request.asteroid_ids:
+                self._watches[(sid, aid)] = thresholds
+            self._rebuild()
+            return sum(1 for s, _ in self._watches if s == sid)
+
+    def unwatch(self, sid: str, asteroid_ids: Optional[list[str]] = None) -> int:
+        """Drop ``sid``'s watches on ``asteroid_ids`` (all when None); returns how many."""
+        with self._lock:
+            keys = [
+                key for key in self._watches
+                if key[0] == sid and (asteroid_ids is None or key[1] in asteroid_ids)
+            ]
+            for key in keys:
+                del self._watches[key]
+            if keys:
+                self._rebuild()
+            if asteroid_ids is None:
+                self._pending.pop(sid, None)
+            return len(keys)
+
+    def watches(self, sid: str) -> list[dict]:
+        """``sid``'s watches with their thresholds."""
+        with self._lock:
+            return [
+                _describe(aid, *thresholds)
+                for (s, aid), thresholds in self._watches.items()
+                if s == sid
+            ]
+
+    def _rebuild(self) -> None:
+        """Recompute the index from ``_watches`` (lock held)."""
+        self._index = _build_index(self._watches)
+        if self._index is None:
+            self._previous.clear()
+            return
+        watched = set(self._index.ids.tolist())
+        self._previous = {a: v for a, v in self._previous.items() if a in watched}
+
+    # ── Batch checks ─────────────────────────────────────
+    def observer(self) -> Optional["WatchObserver"]:
+        """A collector for one batch, or None when nothing is watched."""
+        return WatchObserver(self) if self._index is not None else None
+
+    def watched_rows(self, ids: list[str]) -> np.ndarray:
+        """Positions of the watched ids in ``ids`` (a plain list)."""
+        if self._index is None:
+            return np.empty(0, dtype=np.int64)
+        return self._watched_rows(np.array(ids, dtype=str))
+
+    def _watched_rows(self, ids: np.ndarray) -> np.ndarray:
+        """Positions of the watched ids in ``ids``."""
+        index = self._index
+        if index is None or not len(ids):
+            return np.empty(0, dtype=np.int64)
+        pos = np.searchsorted(index.ids, ids)
+        pos[pos == len(index.ids)] = 0
+        return np.flatnonzero(index.ids[pos] == ids)
+
+    def _evaluate(self, ids: np.ndarray, names: list[str], values: np.ndarray) -> None:
+        """
+        Queue alerts for the watched objects of a finished batch.
+
+        ``values`` is (n, 3): level code, Torino and score per row.  With
+        several rows per id (several approaches) the highest score counts.
+        """
+        with self._lock:
+            index = self._index
+            if index is None or not len(ids):
+                return
+            ids, names, values = _latest(ids, names, values)
+
+            # Ids may have been unwatched while the batch ran
+            pos = np.searchsorted(index.ids, ids)
+            pos[pos == len(index.ids)] = 0
+            keep = index.ids[pos] == ids
+            ids, values, pos = ids[keep], values[keep], pos[keep]
+            names = [n for n, k in zip(names, keep.tolist()) if k]
+
+            previous = np.array(
+                [self._previous.get(a, (np.nan,) * 3) for a in ids.tolist()], dtype=float
+            ).reshape(-1, 3)
+            entries = np.flatnonzero(np.isin(index.entry_pos, pos))
+            row = np.searchsorted(pos, index.entry_pos[entries])
+
+            for e, alert in _crossings(
+                ids, names, values, previous, row, index.thresholds[entries]
+            ):
+                self._pending.setdefault(index.entry_sid[entries[e]], []).append(alert)
+
+            for a, v in zip(ids.tolist(), values.tolist()):
+                self._previous[a] = tuple(v)
+
+    def drain(self) -> dict[str, list[dict]]:
+        """Alerts queued since the last call, by connection."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            return pending
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS watches (
+    sid           TEXT NOT NULL,
+    asteroid_id   TEXT NOT NULL,
+    owner         TEXT NOT NULL,
+    risk_level    INTEGER NOT NULL,
+    torino_scale  INTEGER NOT NULL,
+    risk_score    REAL,
+    PRIMARY KEY (sid, asteroid_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS watches_by_asteroid ON watches (asteroid_id);
+CREATE TABLE IF NOT EXISTS previous (
+    asteroid_id   TEXT PRIMARY KEY,
+    risk_level    REAL,
+    torino_scale  REAL,
+    risk_score    REAL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS alerts (
+    id          INTEGER PRIMARY KEY,
+    owner       TEXT NOT NULL,
+    sid         TEXT NOT NULL,
+    created_at  REAL NOT NULL,
+    alert       TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS alerts_by_owner ON alerts (owner, id);
+CREATE TABLE IF NOT EXISTS meta (
+    key    TEXT PRIMARY KEY,
+    value  INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta VALUES ('version', 0);
+"""
+_PRUNE_PREVIOUS = "DELETE FROM previous WHERE asteroid_id NOT IN (SELECT asteroid_id FROM watches)"
+_BUMP_VERSION = "UPDATE meta SET value = value + 1 WHERE key = 'version'"
+# Alerts for a connection whose worker never collects them
+_ALERT_TTL_S = 300.0
+_HOST = socket.gethostname()
+
+
+class SharedWatchRegistry(WatchRegistry):
+    """
+    WatchRegistry over a SQLite file shared by all workers.
+
+    Every watch row names the worker holding its connection (``owner``);
+    alerts are queued for that worker, which sends them right after its
+    own batches and polls every ``poll_s`` for ones queued by others.
+    Each worker keeps the in-memory index that picks watched rows out of
+    chunks, reloaded on its own changes and, for other workers' changes,
+    on the poll.  Like JobStore, calls open their own connection and may
+    wait on another process's write lock, so async code runs them in the
+    threadpool.
+    """
+
+    def __init__(self, path: str, poll_s: float):
+        super().__init__()
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.poll_s = poll_s
+        self._version = -1
+        self._task: Optional[asyncio.Task] = None
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @property
+    def owner(self) -> str:
+        """This worker; read per call, as workers are forked after import."""
+        return f"{_HOST}:{os.getpid()}"
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        with closing(sqlite3.connect(self.path, timeout=30)) as conn:
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:  # one transaction, committed on success
+                yield conn
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._poll())
+
+    async def stop(self) -> None:
+        """Stop polling and drop this worker's watches: its connections close with it."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await run_in_threadpool(self._release, self.owner)
+
+    async def _poll(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_s)
+            try:
+                await run_in_threadpool(self._reap)
+                await run_in_threadpool(self.refresh)
+                if self.deliver is not None:
+                    await self.deliver()
+            except Exception:
+                logger.exception("Watch registry poll failed")
+
+    # ── Registration (Socket.IO handlers) ────────────────
+    def watch(self, sid: str, request: WatchRequest) -> int:
+        thresholds = _thresholds(request)
+        owner = self.owner
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO watches VALUES (?, ?, ?, ?, ?, ?)",
+                [(sid, aid, owner, *thresholds) for aid in request.asteroid_ids],
+            )
+            conn.execute(_BUMP_VERSION)
+            count = conn.execute("SELECT COUNT(*) FROM watches WHERE sid = ?", (sid,)).fetchone()[0]
+        self.refresh()
+        return count
+
+    def unwatch(self, sid: str, asteroid_ids: Optional[list[str]] = None) -> int:
+        with self._connect() as conn:
+            if asteroid_ids is None:
+                removed = conn.execute("DELETE FROM watches WHERE sid = ?", (sid,)).rowcount
+                conn.execute("DELETE FROM alerts WHERE sid = ?", (sid,))
+            else:
+                removed = conn.execute(
+                    "DELETE FROM watches WHERE sid = ?"
+                    " AND asteroid_id IN (SELECT value FROM json_each(?))",
+                    (sid, json.dumps(asteroid_ids)),
+                ).rowcount
+            if removed:
+                conn.execute(_PRUNE_PREVIOUS)
+                conn.execute(_BUMP_VERSION)
+        if removed:
+            self.refresh()
+        return removed
+
+    def watches(self, sid: str) -> list[dict]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT asteroid_id, risk_level, torino_scale, risk_score FROM watches"
+                " WHERE sid = ? ORDER BY asteroid_id",
+                (sid,),
+            ).fetchall()
+        return [
+            _describe(aid, level, torino, np.nan if score is None else score)
+            for aid, level, torino, score in rows
+        ]
+
+    def refresh(self) -> None:
+        """Reload the index if any worker changed the watches since the last load."""
+        with self._connect() as conn:
+            version = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+            if version == self._version:
+                return
+            rows = conn.execute(
+                "SELECT sid, asteroid_id, risk_level, torino_scale, risk_score FROM watches"
+            ).fetchall()
+        index = _build_index({
+            (sid, aid): (level, torino, np.nan if score is None else score)
+            for sid, aid, level, torino, score in rows
+        })
+        with self._lock:
+            if version > self._version:  # a concurrent refresh may have loaded a newer one
+                self._index, self._version = index, version
+
+    def _reap(self) -> None:
+        """Drop what workers on this host left behind when they died, and stale alerts."""
+        with self._connect() as conn:
+            owners = [
+                owner for (owner,) in conn.execute(
+                    "SELECT DISTINCT owner FROM watches UNION SELECT DISTINCT owner FROM alerts"
+                )
+            ]
+            conn.execute("DELETE FROM alerts WHERE created_at < ?", (time.time() - _ALERT_TTL_S,))
+        for owner in owners:
+            if not _alive(owner):
+                self._release(owner)
+
+    def _release(self, owner: str) -> None:
+        with self._connect() as conn:
+            removed = conn.execute("DELETE FROM watches WHERE owner = ?", (owner,)).rowcount
+            conn.execute("DELETE FROM alerts WHERE owner = ?", (owner,))
+            if removed:
+                conn.execute(_PRUNE_PREVIOUS)
+                conn.execute(_BUMP_VERSION)
+
+    # ── Batch checks ─────────────────────────────────────
+    def _evaluate(self, ids: np.ndarray, names: list[str], values: np.ndarray) -> None:
+        """
+        Queue alerts for the watched objects of a finished batch.
+
+        The watches are read again rather than taken from the index, which
+        may lag other workers' changes by up to ``poll_s``.  Last seen
+        values are read and written in the same transaction, so batches
+        finishing together on different workers each see the other's.
+        """
+        if not len(ids):
+            return
+        ids, names, values = _latest(ids, names, values)
+        keys = json.dumps(ids.tolist())
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            watches = conn.execute(
+                "SELECT asteroid_id, owner, sid, risk_level, torino_scale, risk_score FROM watches"
+                " WHERE asteroid_id IN (SELECT value FROM json_each(?))",
+                (keys,),
+            ).fetchall()
+            if not watches:
+                return
+            last_seen = {
+                row[0]: row[1:] for row in conn.execute(
+                    "SELECT asteroid_id, risk_level, torino_scale, risk_score FROM previous"
+                    " WHERE asteroid_id IN (SELECT value FROM json_each(?))",
+                    (keys,),
+                )
+            }
+
+            keep = np.isin(ids, np.array([w[0] for w in watches], dtype=ids.dtype))
+            ids, values = ids[keep], values[keep]
+            names = [n for n, k in zip(names, keep.tolist()) if k]
+            previous = np.array(
+                [last_seen.get(a, (np.nan,) * 3) for a in ids.tolist()], dtype=float
+            ).reshape(-1, 3)
+            row = np.searchsorted(ids, np.array([w[0] for w in watches], dtype=ids.dtype))
+            thresholds = np.array([w[3:] for w in watches], dtype=float).reshape(-1, 3)
+
+            conn.executemany(
+                "INSERT INTO alerts (owner, sid, created_at, alert) VALUES (?, ?, ?, ?)",
+                [
+                    (watches[e][1], watches[e][2], now, json.dumps(alert))
+                    for e, alert in _crossings(ids, names, values, previous, row, thresholds)
+                ],
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO previous VALUES (?, ?, ?, ?)",
+                [(a, *v) for a, v in zip(ids.tolist(), values.tolist())],
+            )
+
+    def drain(self) -> dict[str, list[dict]]:
+        """Alerts queued for this worker's connections since the last call."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                "SELECT id, sid, alert FROM alerts WHERE owner = ? ORDER BY id", (self.owner,)
+            ).fetchall()
+            if rows:
+                conn.execute(
+                    "DELETE FROM alerts WHERE owner = ? AND id <= ?", (self.owner, rows[-1][0])
+                )
+        pending: dict[str, list[dict]] = {}
+        for _, sid, alert in rows:
+            pending.setdefault(sid, []).append(json.loads(alert))
+        return pending
+
+
+def _alive(owner: str) -> bool:
+    """False for a worker process on this host that no longer exists."""
+    host, _, pid = owner.rpartition(":")
+    if host != _HOST:
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, ValueError):
+        pass
+    return True
+
+
+def _thresholds(request: WatchRequest) -> tuple[int, int, float]:
+    """(level code, torino, score), with -1 / NaN for unset thresholds."""
+    return (
+        _LEVEL_CODES[request.risk_level] if request.risk_level is not None else -1,
+        request.torino_scale if request.torino_scale is not None else -1,
+        request.risk_score if request.risk_score is not None else float("nan"),
+    )
+
+
+def _describe(asteroid_id: str, level: int, torino: int, score: float) -> dict:
+    return {
+        "asteroid_id": asteroid_id,
+        "risk_level": RISK_LEVELS[level].value if level >= 0 else None,
+        "torino_scale": torino if torino >= 0 else None,
+        "risk_score": None if np.isnan(score) else score,
+    }
+
+
+def _build_index(watches: dict[tuple[str, str], tuple[int, int, float]]) -> Optional[_Index]:
+    if not watches:
+        return None
+    keys = list(watches)
+    entry_ids = np.array([aid for _, aid in keys])
+    ids, entry_pos = np.unique(entry_ids, return_inverse=True)
+    return _Index(
+        ids=ids,
+        entry_pos=entry_pos,
+        entry_sid=[sid for sid, _ in keys],
+        thresholds=np.array(list(watches.values()), dtype=float).reshape(-1, 3),
+    )
+
+
+def _latest(
+    ids: np.ndarray, names: list[str], values: np.ndarray
+) -> tuple[np.ndarray, list[str], np.ndarray]:
+    """One row per id, the highest score's, sorted by id."""
+    order = np.lexsort((values[:, 2], ids))
+    ids, values = ids[order], values[order]
+    last = np.r_[ids[1:] != ids[:-1], True]
+    return ids[last], [names[i] for i in order[last].tolist()], values[last]
+
+
+def _crossings(
+    ids: np.ndarray,
+    names: list[str],
+    values: np.ndarray,
+    previous: np.ndarray,
+    row: np.ndarray,
+    thresholds: np.ndarray,
+) -> list[tuple[int, dict]]:
+    """
+    (watch, alert) for each threshold crossed since ``previous``.
+
+    Watch ``e`` is on ``ids[row[e]]`` with ``thresholds[e]``.
+    """
+    crossings = []
+    for m, metric in enumerate(_METRICS):
+        threshold = thresholds[:, m]
+        active = threshold >= 0  # False for -1 and NaN
+        now = values[row, m] >= threshold
+        before = previous[row, m] >= threshold  # False when not seen yet
+        crossed = active & (now != before)
+        for e, r in zip(np.flatnonzero(crossed).tolist(), row[crossed].tolist()):
+            crossings.append(
+                (e, _alert(ids[r], names[r], metric, previous[r, m], values[r, m], threshold[e]))
+            )
+    return crossings
+
+
+def _metric_value(metric: str, value: float):
+    if np.isnan(value):
+        return None
+    if metric == "risk_level":
+        return RISK_LEVELS[int(value)].value
+    if metric == "torino_scale":
+        return int(value)
+    return float(value)
+
+
+def _alert(
+    asteroid_id: str, name: str, metric: str, previous: float, value: float, threshold: float
+) -> dict:
+    return {
+        "asteroid_id": str(asteroid_id),
+        "name": name,
+        "metric": metric,
+        "previous": _metric_value(metric, previous),
+        "value": _metric_value(metric, value),
+        "threshold": _metric_value(metric, threshold),
+        "direction": "up" if value >= threshold else "down",
+    }
+
+
+class WatchObserver:
+    """
+    Collects the watched rows of one batch while it is assessed.
+
+    Called with each chunk's inputs and outputs (from worker threads);
+    ``finish`` then checks the thresholds once for the whole batch.
+    """
+
+    def __init__(self, registry: WatchRegistry):
+        self.registry = registry
+        self._ids: list[np.ndarray] = []
+        self._names: list[str] = []
+        self._values: list[np.ndarray] = []
+
+    def __call__(self, inputs: BatchInputs, outputs: BatchOutputs) -> None:
+        ids = np.array(inputs.asteroid_ids)
+        rows = self.registry._watched_rows(ids)
+        if not rows.size:
+            return
+        self._ids.append(ids[rows])
+        self._names.extend(inputs.names[i] for i in rows.tolist())
+        self._values.append(
+            np.column_stack([
+                outputs.risk_level_code[rows],
+                outputs.torino_scale[rows],
+                outputs.risk_score[rows],
+            ]).astype(float)
+        )
+
+    def finish(self) -> None:
+        if self._ids:
+            self.registry._evaluate(
+                np.concatenate(self._ids), self._names, np.concatenate(self._values)
+            )
+        self._ids, self._names, self._values = [], [], []
+
+
+watch_registry: WatchRegistry = (
+    SharedWatchRegistry(settings.watch_db_path, settings.watch_poll_s)
+    if settings.watch_db_path
+    else WatchRegistry()
+)
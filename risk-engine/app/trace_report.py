@@ -0,0 +1,103 @@
+"""
+Print the spans of traces exported to a file (TRACE_EXPORT).
+
+    python -m app.trace_report data/spans.jsonl            # slowest traces
+    python -m app.trace_report data/spans.jsonl --trace 4bf92f3577b34da6a3ce929d0e0e4736
+
+Reads the OTLP JSON lines written by app.tracing (or by an OpenTelemetry
+Collector's file exporter) and shows, per trace, the span tree with
+each span's start offset, duration and attributes.  ``--trace`` also
+accepts a correlation id, as sent in X-Correlation-ID.
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+
+def _value(typed: dict):
+    kind, value = next(iter(typed.items()))
+    return int(value) if kind == "intValue" else value
+
+
+def read_spans(path: Path) -> dict[str, list[dict]]:
+    """Spans by trace id, each with ``attributes`` as a plain dict."""
+    traces: dict[str, list[dict]] = defaultdict(list)
+    with open(path) as lines:
+        for line in lines:
+            if not line.strip():
+                continue
+            for resource in json.loads(line).get("resourceSpans", []):
+                for scope in resource.get("scopeSpans", []):
+                    for s in scope.get("spans", []):
+                        s["attributes"] = {a["key"]: _value(a["value"]) for a in s.get("attributes", [])}
+                        traces[s["traceId"]].append(s)
+    return traces
+
+
+def _trace_id(value: str) -> str:
+    candidate = value.strip().lower().replace("-", "")
+    if len(candidate) == 32 and all(c in "0123456789abcdef" for c in candidate):
+        return candidate
+    return hashlib.blake2b(value.encode(), digest_size=16).hexdigest()
+
+
+def print_trace(spans: list[dict], out=sys.stdout) -> None:
+    children: dict[str, list[dict]] = defaultdict(list)
+    ids = {s["spanId"] for s in spans}
+    roots = []
+    for s in spans:
+        if s.get("parentSpanId") in ids:
+            children[s["parentSpanId"]].append(s)
+        else:
+            roots.append(s)
+    origin = min(int(s["startTimeUnixNano"]) for s in spans)
+
+    def show(s: dict, depth: int) -> None:
+        start = (int(s["startTimeUnixNano"]) - origin) / 1e6
+        duration = (int(s["endTimeUnixNano"]) - int(s["startTimeUnixNano"])) / 1e6
+        attrs = " ".join(f"{k}={v}" for k, v in s["attributes"].items())
+        error = f" ERROR {s['status'].get('message', '')}" if s.get("status", {}).get("code") == 2 else ""
+        out.write(f"{start:9.1f}ms {duration:9.1f}ms  {'  ' * depth}{s['name']}  {attrs}{error}\n")
+        for child in sorted(children[s["spanId"]], key=lambda c: int(c["startTimeUnixNano"])):
+            show(child, depth + 1)
+
+    for root in sorted(roots, key=lambda r: int(r["startTimeUnixNano"])):
+        show(root, 0)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("file", type=Path, help="OTLP JSON lines file")
+    parser.add_argument("--trace", help="trace id or correlation id to show")
+    parser.add_argument("--top", type=int, default=5, help="how many of the slowest traces to show")
+    args = parser.parse_args(argv)
+
+    traces = read_spans(args.file)
+    if args.trace:
+        trace_id = _trace_id(args.trace)
+        if trace_id not in traces:
+            print(f"Trace {args.trace} not found in {args.file}", file=sys.stderr)
+            return 1
+        selected = [trace_id]
+    else:
+        def duration(trace_id: str) -> int:
+            spans = traces[trace_id]
+            return max(int(s["endTimeUnixNano"]) for s in spans) - min(
+                int(s["startTimeUnixNano"]) for s in spans
+            )
+
+        selected = sorted(traces, key=duration, reverse=True)[: args.top]
+
+    for trace_id in selected:
+        print(f"trace {trace_id}")
+        print_trace(traces[trace_id])
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
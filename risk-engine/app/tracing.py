@@ -0,0 +1,392 @@
+"""
+Request tracing: spans per request stage, exported in batches as OTLP JSON.
+
+With ``trace_export`` set, TracingMiddleware opens a server span for
+every HTTP request and the routes, admission controller and engine add
+child spans for their stages (body decode, admission wait, fingerprints,
+compute / build per chunk, statistics, serialization), with object
+counts as attributes.  Without it the middleware is not installed and
+``span`` costs one context-variable lookup.
+
+The trace id comes from the caller so spans join the caller's trace:
+
+  • ``traceparent`` (W3C Trace Context), when present and valid;
+  • otherwise ``X-Correlation-ID`` / ``X-Request-ID``: a UUID or 32-hex id
+    is used as the trace id as is, any other string is hashed to one, and
+    the id is kept as the ``correlation.id`` attribute;
+  • otherwise a random trace id.
+
+Responses carry ``X-Trace-Id`` (and the correlation id, echoed back).
+
+Finished spans are appended to an in-memory buffer; an exporter thread
+writes them out every ``trace_flush_s`` or ``trace_batch_size`` spans,
+as an OTLP ExportTraceServiceRequest in JSON:
+
+  • a file path: one request per line (the format of the OpenTelemetry
+    Collector's file exporter, which its otlpjsonfile receiver reads);
+  • an ``http(s)://`` URL: POSTed to an OTLP/HTTP endpoint, e.g.
+    ``http://localhost:4318/v1/traces``.
+
+A full buffer drops spans rather than block a request, and export
+errors drop the batch; both are counted and logged.
+
+    with span("engine.summarize", assessments=len(assessments)) as s:
+        ...
+        s.set(partial=True)
+
+``python -m app.trace_report`` prints the spans of a trace file.
+"""
+
+import collections
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+logger = logging.getLogger("risk-engine.tracing")
+
+SERVICE_NAME = "risk-engine"
+
+# OTLP span kinds and status codes
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+STATUS_ERROR = 2
+
+CORRELATION_HEADERS = (b"x-correlation-id", b"x-request-id")
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_HEX_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+class Span:
+    """One timed operation; attributes are plain str / int / float / bool values."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "kind", "start_ns", "end_ns",
+                 "attributes", "error", "children_end")
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str],
+        kind: int = KIND_INTERNAL,
+        attributes: Optional[dict[str, Any]] = None,
+        start_ns: Optional[int] = None,
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.kind = kind
+        self.start_ns = start_ns if start_ns is not None else time.time_ns()
+        self.end_ns = 0
+        self.attributes = attributes or {}
+        self.error: Optional[str] = None
+        self.children_end = 0  # when the latest child span ended
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def end(self, end_ns: Optional[int] = None) -> None:
+        self.end_ns = end_ns if end_ns is not None else time.time_ns()
+        exporter.submit(self)
+
+
+class _NoSpan:
+    """Stands in for a span outside a traced request."""
+
+    __slots__ = ()
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+
+NO_SPAN = _NoSpan()
+
+# The innermost open span of the current request (copied into threadpool calls)
+_current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """Child span of the current one; a no-op outside a traced request."""
+    parent = _current.get()
+    if parent is None:
+        yield NO_SPAN
+        return
+    current = Span(name, parent.trace_id, parent.span_id, attributes=attributes)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as exc:
+        current.error = type(exc).__name__
+        raise
+    finally:
+        _current.reset(token)
+        current.end()
+        parent.children_end = max(parent.children_end, current.end_ns)
+
+
+def traceparent() -> Optional[str]:
+    """W3C ``traceparent`` of the current span, for outgoing requests."""
+    current = _current.get()
+    if current is None:
+        return None
+    return f"00-{current.trace_id}-{current.span_id}-01"
+
+
+# ── Incoming Trace Context ───────────────────────────────────
+def trace_context(headers: dict[bytes, bytes]) -> tuple[str, Optional[str], Optional[str], bool]:
+    """
+    (trace id, parent span id, correlation id, sampled) from request headers.
+    """
+    correlation = next(
+        (headers[h].decode("latin-1") for h in CORRELATION_HEADERS if h in headers), None
+    )
+    match = _TRACEPARENT.match(headers.get(b"traceparent", b"").decode("latin-1").strip())
+    if match and match[1] != "0" * 32 and match[2] != "0" * 16:
+        return match[1], match[2], correlation, bool(int(match[3], 16) & 1)
+    if correlation:
+        candidate = correlation.strip().lower().replace("-", "")
+        if _HEX_ID.match(candidate) and candidate != "0" * 32:
+            return candidate, None, correlation, True
+        hashed = hashlib.blake2b(correlation.encode(), digest_size=16).hexdigest()
+        return hashed, None, correlation, True
+    return f"{random.getrandbits(128):032x}", None, None, True
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware: a server span per HTTP request, parent of the
+    spans recorded while it is handled.
+
+    Two spans are derived from the response messages: ``serialize``, from
+    the end of the last stage span to the response headers (FastAPI's
+    response validation and JSON encoding), and ``send``, from there to
+    the last body chunk.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope["headers"])
+        trace_id, parent_id, correlation, sampled = trace_context(headers)
+        if not sampled:
+            return await self.app(scope, receive, send)
+
+        root = Span(
+            f"{scope['method']} {scope['path']}",
+            trace_id,
+            parent_id,
+            KIND_SERVER,
+            {"http.method": scope["method"], "url.path": scope["path"]},
+        )
+        if correlation:
+            root.attributes["correlation.id"] = correlation
+        request_bytes = headers.get(b"content-length")
+        if request_bytes is not None and request_bytes.isdigit():
+            root.attributes["http.request.body.size"] = int(request_bytes)
+        extra = [(b"x-trace-id", trace_id.encode())]
+        if correlation:
+            extra.append((b"x-correlation-id", correlation.encode("latin-1")))
+
+        sending: Optional[Span] = None
+        response_bytes = 0
+
+        async def traced_send(message) -> None:
+            nonlocal sending, response_bytes
+            if message["type"] == "http.response.start":
+                now = time.time_ns()
+                if root.children_end:
+                    Span("serialize", trace_id, root.span_id, start_ns=root.children_end).end(now)
+                root.attributes["http.status_code"] = message["status"]
+                if message["status"] >= 500:
+                    root.error = str(message["status"])
+                message["headers"] = [*message.get("headers", ()), *extra]
+                sending = Span("send", trace_id, root.span_id, start_ns=now)
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+                if not message.get("more_body", False) and sending is not None:
+                    sending.set(**{"http.response.body.size": response_bytes})
+                    sending.end()
+                    sending = None
+            await send(message)
+
+        token = _current.set(root)
+        try:
+            await self.app(scope, receive, traced_send)
+        except BaseException as exc:
+            root.error = type(exc).__name__
+            raise
+        finally:
+            _current.reset(token)
+            if sending is not None:
+                sending.end()
+            params = scope.get("path_params")
+            if params:
+                path = scope["path"]
+                for key, value in params.items():
+                    path = path.replace(str(value), "{" + key + "}", 1)
+                root.name = f"{scope['method']} {path}"
+            root.attributes["http.route"] = root.name.split(" ", 1)[1]
+            root.end()
+
+
+# ── Batched Export ───────────────────────────────────────────
+def _attribute(key: str, value: Any) -> dict:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}  # int64 is a string in OTLP JSON
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+def _encode_span(s: Span) -> dict:
+    encoded = {
+        "traceId": s.trace_id,
+        "spanId": s.span_id,
+        "name": s.name,
+        "kind": s.kind,
+        "startTimeUnixNano": str(s.start_ns),
+        "endTimeUnixNano": str(s.end_ns),
+        "attributes": [_attribute(k, v) for k, v in s.attributes.items()],
+    }
+    if s.parent_id:
+        encoded["parentSpanId"] = s.parent_id
+    if s.error:
+        encoded["status"] = {"code": STATUS_ERROR, "message": s.error}
+    return encoded
+
+
+def encode_spans(spans: list[Span]) -> bytes:
+    """An OTLP/JSON ExportTraceServiceRequest holding ``spans``."""
+    resource = [_attribute("service.name", SERVICE_NAME), _attribute("process.pid", os.getpid())]
+    return json.dumps(
+        {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": resource},
+                    "scopeSpans": [
+                        {"scope": {"name": __name__}, "spans": [_encode_span(s) for s in spans]}
+                    ],
+                }
+            ]
+        },
+        separators=(",", ":"),
+    ).encode()
+
+
+class SpanExporter:
+    """Buffers finished spans and writes them out in batches from a thread."""
+
+    def __init__(self):
+        self.target: Optional[str] = None
+        self.batch_size = 512
+        self.flush_s = 2.0
+        self.capacity = 20_000
+        self.dropped = 0
+        self.failed = 0
+        self._buffer: collections.deque[Span] = collections.deque()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self._client = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.target is not None
+
+    def configure(
+        self,
+        target: Optional[str],
+        *,
+        batch_size: int = 512,
+        flush_s: float = 2.0,
+        capacity: int = 20_000,
+    ) -> None:
+        self.target = target or None
+        self.batch_size = batch_size
+        self.flush_s = flush_s
+        self.capacity = capacity
+
+    def start(self) -> None:
+        """Start the export thread (in each worker process, after the fork)."""
+        if not self.enabled or self._thread is not None:
+            return
+        if self.target.startswith(("http://", "https://")):
+            import httpx
+
+            self._client = httpx.Client(timeout=5.0)
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._thread.start()
+        logger.info("Exporting spans to %s", self.target)
+
+    def stop(self) -> None:
+        """Export what is buffered and stop the thread."""
+        if self._thread is None:
+            return
+        self._stopping = True
+        self._wake.set()
+        self._thread.join()
+        self._thread = None
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    def submit(self, s: Span) -> None:
+        if len(self._buffer) >= self.capacity:
+            self.dropped += 1
+            return
+        self._buffer.append(s)  # deque.append is atomic under the GIL
+        if len(self._buffer) >= self.batch_size:
+            self._wake.set()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_s)
+            self._wake.clear()
+            stopping = self._stopping
+            while self._buffer:
+                batch = []
+                while self._buffer and len(batch) < self.batch_size:
+                    batch.append(self._buffer.popleft())
+                self._export(batch)
+            if self.dropped:
+                dropped, self.dropped = self.dropped, 0
+                logger.warning("%d spans dropped (span buffer full)", dropped)
+            if stopping:
+                return
+
+    def _export(self, batch: list[Span]) -> None:
+        try:
+            payload = encode_spans(batch)
+            if self._client is not None:
+                self._client.post(
+                    self.target, content=payload, headers={"Content-Type": "application/json"}
+                ).raise_for_status()
+            else:
+                with open(self.target, "ab") as out:
+                    out.write(payload + b"\n")
+        except Exception as exc:  # an unreachable collector must not stop the exporter
+            self.failed += len(batch)
+            logger.warning("Span export to %s failed (%s); %d spans lost", self.target, exc, len(batch))
+
+
+exporter = SpanExporter()
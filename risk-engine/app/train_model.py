@@ -0,0 +1,136 @@
+"""
+Train the learned risk model offline.
+
+    python -m app.train_model --neos history/*.json --sentry sentry.json \
+        --out models/learned_risk.joblib
+
+``--neos`` files hold historical NeoWs objects in any layout accepted by
+app.engine.sources (JSON list, /analyze body, NeoWs feed/browse, NDJSON,
+optionally gzipped).  Each object is one sample, featurised by the same
+batch pipeline that serves /analyze.
+
+Labels are Sentry outcomes: an object is positive when it matches a row
+of the ``--sentry`` table (list of SentryData, or {"sentry_table": [...]})
+with cumulative impact probability ≥ ``--min-ip``.  Without a Sentry
+table the NeoWs ``is_sentry_object`` flag is used.
+
+The holdout split groups approaches of the same asteroid so no object
+is scored on data it was trained on; the final model is refit on
+everything and written uncompressed so it can be memory-mapped.
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+from sklearn.ensemble import HistGradientBoostingClassifier
+from sklearn.metrics import average_precision_score, roc_auc_score
+from sklearn.model_selection import GroupShuffleSplit
+
+from app.models import NeoObject, SentryData
+from app.engine.analysis import approach_counts
+from app.engine.batch import compute_batch, extract_inputs
+from app.engine.learned import FEATURE_NAMES, LearnedModel, feature_matrix, save_learned_model
+from app.engine.sentry import join_sentry_table
+from app.engine.sources import iter_neo_records
+
+logger = logging.getLogger("risk-engine.train")
+
+
+def _load_neos(paths: list[str]) -> list[NeoObject]:
+    return [NeoObject(**r) for path in paths for r in iter_neo_records(path)]
+
+
+def _load_sentry(path: str) -> list[SentryData]:
+    data = json.loads(Path(path).read_text())
+    if isinstance(data, dict):
+        data = data.get("sentry_table", data.get("data", []))
+    return [SentryData(**r) for r in data]
+
+
+def _labels(
+    neos: list[NeoObject], sentry: list[SentryData] | None, min_ip: float
+) -> np.ndarray:
+    if sentry is None:
+        return np.array([bool(n.is_sentry_object) for n in neos])
+    pairs, _ = join_sentry_table(neos, sentry)
+    positive = {
+        id(ast) for ast, row in pairs if row.cumulative_impact_probability >= min_ip
+    }
+    return np.array([id(n) in positive for n in neos])
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--neos", nargs="+", required=True, help="historical NeoWs JSON files")
+    parser.add_argument("--sentry", help="Sentry table JSON (labels); default: is_sentry_object")
+    parser.add_argument("--min-ip", type=float, default=0.0, help="minimum Sentry IP for a positive label")
+    parser.add_argument("--out", default="models/learned_risk.joblib")
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--max-iter", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)-8s | %(message)s")
+    start = time.perf_counter()
+
+    neos = _load_neos(args.neos)
+    sentry = _load_sentry(args.sentry) if args.sentry else None
+
+    inputs = extract_inputs(neos, approach_counts(neos))
+    outputs = compute_batch(inputs)
+    X = feature_matrix(inputs, outputs)
+    y = _labels([neos[i] for i in inputs.source_index.tolist()], sentry, args.min_ip)
+    groups = np.array(inputs.asteroid_ids)
+    logger.info("%d samples, %d positive, %d asteroids", len(y), int(y.sum()), len(set(groups)))
+
+    if y.all() or not y.any():
+        logger.error("Training data needs both positive and negative samples")
+        return 1
+
+    def estimator() -> HistGradientBoostingClassifier:
+        return HistGradientBoostingClassifier(
+            max_iter=args.max_iter, class_weight="balanced", random_state=args.seed
+        )
+
+    # ── Holdout evaluation (grouped by asteroid) ─────────
+    metrics: dict[str, float] = {}
+    split = GroupShuffleSplit(n_splits=1, test_size=args.test_size, random_state=args.seed)
+    train, test = next(split.split(X, y, groups))
+    if y[test].any() and not y[test].all():
+        clf = estimator().fit(X[train], y[train])
+        proba = clf.predict_proba(X[test])[:, 1]
+        metrics = {
+            "roc_auc": round(float(roc_auc_score(y[test], proba)), 4),
+            "average_precision": round(float(average_precision_score(y[test], proba)), 4),
+        }
+        logger.info("Holdout (%d samples): %s", len(test), metrics)
+    else:
+        logger.warning("Holdout has a single class; skipping evaluation")
+
+    # ── Final fit on everything ──────────────────────────
+    model = LearnedModel(
+        estimator=estimator().fit(X, y),
+        feature_names=FEATURE_NAMES,
+        metadata={
+            "trained_at": datetime.now(timezone.utc).isoformat(),
+            "samples": int(len(y)),
+            "positives": int(y.sum()),
+            "label": f"sentry_ip>={args.min_ip}" if sentry is not None else "is_sentry_object",
+            "metrics": metrics,
+        },
+    )
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    save_learned_model(model, out)
+    logger.info("Saved %s in %.1fs", out, time.perf_counter() - start)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""
+Risk engine tests; run from risk-engine/ with ``python -m pytest``.
+
+Async tests use anyio's pytest plugin (``@pytest.mark.anyio``) on asyncio.
+``neo_batch(n, seed)`` builds reproducible NeoWs objects (plain dicts).
+"""
+
+import random
+
+import pytest
+
+
+def _neo(i: int, rng: random.Random) -> dict:
+    km = rng.uniform(1e4, 7e7)
+    v = rng.uniform(2, 40)
+    d_min = 10 ** rng.uniform(-3.5, 0.8)
+    d_max = d_min * rng.uniform(1, 2.3)
+    neo = {
+        "id": str(2000000 + i),
+        "neo_reference_id": str(2000000 + i),
+        "name": f"({i}) Test",
+        "absolute_magnitude_h": rng.uniform(15, 30),
+        "is_potentially_hazardous_asteroid": rng.random() < 0.2,
+        "estimated_diameter": {
+            "kilometers": {"estimated_diameter_min": d_min, "estimated_diameter_max": d_max},
+            "meters": {
+                "estimated_diameter_min": d_min * 1000,
+                "estimated_diameter_max": d_max * 1000,
+            },
+        },
+        "close_approach_data": [{
+            "close_approach_date": f"20{rng.randint(27, 45)}-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}",
+            "relative_velocity": {
+                "kilometers_per_second": str(v),
+                "kilometers_per_hour": str(v * 3600),
+                "miles_per_hour": str(v * 2236.94),
+            },
+            "miss_distance": {
+                "astronomical": str(km / 1.496e8),
+                "lunar": str(km / 384400),
+                "kilometers": str(km),
+                "miles": str(km * 0.621371),
+            },
+            "orbiting_body": "Earth",
+        }],
+    }
+    if rng.random() < 0.7:
+        neo["orbital_data"] = {
+            "minimum_orbit_intersection": str(10 ** rng.uniform(-6, -0.5)),
+            "orbit_uncertainty": str(rng.randint(0, 9)),
+            "epoch_osculation": "2461000.5",
+        }
+    return neo
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def neo_batch():
+    def build(n: int, seed: int = 1) -> list[dict]:
+        rng = random.Random(seed)
+        return [_neo(i, rng) for i in range(n)]
+
+    return build
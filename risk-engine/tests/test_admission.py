@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from app.engine.cancellation import DEADLINE_EXCEEDED, Cancelled
+from app.services.admission import AdmissionController, AdmissionRejected, Lane
+
+pytestmark = pytest.mark.anyio
+
+
+def controller(**overrides) -> AdmissionController:
+    options = dict(
+        max_objects=10,
+        queue_limits={lane: 100 for lane in Lane},
+        max_wait_s=5.0,
+    )
+    options.update(overrides)
+    return AdmissionController(**options)
+
+
+async def test_passed_deadline_is_a_deadline_error():
+    admission = controller()
+    async with admission.slot(Lane.BATCH, 10):
+        with pytest.raises(Cancelled) as caught:
+            async with admission.slot(Lane.BATCH, 5, timeout=0.0):
+                pass
+    assert caught.value.reason == DEADLINE_EXCEEDED
+
+
+async def test_deadline_expiring_in_the_queue_is_a_deadline_error():
+    admission = controller()
+    async with admission.slot(Lane.BATCH, 10):
+        with pytest.raises(Cancelled) as caught:
+            async with admission.slot(Lane.BATCH, 5, timeout=0.05):
+                pass
+    assert caught.value.reason == DEADLINE_EXCEEDED
+
+
+async def test_queue_wait_limit_is_still_shed_as_overload():
+    admission = controller(max_wait_s=0.05)
+    async with admission.slot(Lane.BATCH, 10):
+        with pytest.raises(AdmissionRejected) as caught:
+            async with admission.slot(Lane.BATCH, 5):
+                pass
+    assert caught.value.status_code == 503
+
+
+async def test_abandoned_waiters_leave_the_queue():
+    admission = controller()
+    hold = asyncio.Event()
+
+    async def holder():
+        async with admission.slot(Lane.BATCH, 10):
+            await hold.wait()
+
+    async def waiter():
+        async with admission.slot(Lane.BATCH, 5):
+            pass
+
+    holding = asyncio.create_task(holder())
+    await asyncio.sleep(0)
+    first = asyncio.create_task(waiter())
+    second = asyncio.create_task(waiter())
+    await asyncio.sleep(0.01)
+
+    # Not at the head of the queue, so _dispatch would never reach it
+    second.cancel()
+    await asyncio.gather(second, return_exceptions=True)
+    queue = admission._lanes[Lane.BATCH].queue
+    assert len(queue) == 1 and not queue[0].future.done()
+
+    first.cancel()
+    await asyncio.gather(first, return_exceptions=True)
+    assert not queue
+    assert admission.snapshot()["lanes"]["batch"]["queued_objects"] == 0
+
+    hold.set()
+    await holding
@@ -0,0 +1,82 @@
+import json
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app import bulk_score
+from app.main import app
+
+RECORDS = 230
+CHUNK = "50"
+
+
+@pytest.fixture
+def dump(tmp_path, neo_batch):
+    records = neo_batch(RECORDS)
+    records[7] = {"id": "broken"}  # not a NeoWs object: counted as invalid
+    path = tmp_path / "dump.json"
+    path.write_text(json.dumps(records))
+    return path
+
+
+def score(dump, out, *options) -> int:
+    return bulk_score.main([str(dump), "--out", str(out), "--workers", "2", "--chunk-size", CHUNK, *options])
+
+
+def test_columns_cover_every_valid_record(dump, tmp_path):
+    out = tmp_path / "scores.npz"
+    assert score(dump, out) == 0
+    assert not out.with_name("scores.npz.parts").exists()
+
+    with np.load(out) as columns:
+        ids = columns["asteroid_id"].tolist()
+        assert len(ids) == RECORDS - 1 == len(set(ids))
+        assert columns["risk_score"].shape == (RECORDS - 1,)
+    stats = json.loads(out.with_name("scores.npz.stats.json").read_text())
+    assert (stats["records"], stats["assessed"], stats["invalid"]) == (RECORDS, RECORDS - 1, 1)
+
+
+def test_resume_skips_finished_parts(dump, tmp_path):
+    out = tmp_path / "scores.npz"
+    assert score(dump, out, "--keep-parts") == 0
+    with np.load(out) as columns:
+        first = {name: columns[name] for name in columns.files}
+
+    # Lose the output and one part, as an interrupted run would
+    out.unlink()
+    parts = out.with_name("scores.npz.parts")
+    (parts / "part-000002.npz").unlink()
+    (parts / "part-000002.json").unlink()
+    assert score(dump, out, "--resume") == 0
+
+    stats = json.loads(out.with_name("scores.npz.stats.json").read_text())
+    assert stats["scored_this_run"] == 50
+    with np.load(out) as columns:
+        for name, values in first.items():
+            np.testing.assert_array_equal(columns[name], values)
+
+
+def test_existing_parts_need_resume(dump, tmp_path):
+    out = tmp_path / "scores.npz"
+    assert score(dump, out, "--keep-parts") == 0
+    with pytest.raises(SystemExit):
+        score(dump, out)
+
+
+@pytest.mark.parametrize("options, body", [
+    ((), {}),
+    (("--as-of", "2030-01-01T00:00:00"), {"time_window": "approach", "as_of": ["2030-01-01T00:00:00"]}),
+])
+def test_statistics_match_analyze(dump, tmp_path, options, body):
+    out = tmp_path / "scores.npz"
+    assert score(dump, out, *options) == 0
+    stats = json.loads(out.with_name("scores.npz.stats.json").read_text())["statistics"]
+
+    valid = [r for r in json.loads(dump.read_text()) if r.get("id") != "broken"]
+    with TestClient(app) as client:
+        response = client.post("/api/v1/analyze", json={"asteroids": valid, **body})
+    expected = response.json()["statistics"]
+    assert stats.keys() == expected.keys()
+    for name, value in expected.items():
+        assert stats[name] == (pytest.approx(value, rel=1e-9) if isinstance(value, float) else value), name
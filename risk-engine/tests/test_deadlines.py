@@ -0,0 +1,79 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.engine.analysis import approach_counts
+from app.engine.batch import extract_inputs
+from app.engine.cancellation import (
+    CHUNK_SIZE,
+    CLIENT_DISCONNECTED,
+    DEADLINE_EXCEEDED,
+    Cancelled,
+    CancelToken,
+)
+from app.engine.incremental import analyze_inputs
+from app.main import app
+from app.models import NeoObject
+
+SIZE = 2 * CHUNK_SIZE + 100
+
+
+@pytest.fixture
+def batch(neo_batch):
+    asteroids = [NeoObject.model_validate(r) for r in neo_batch(SIZE)]
+    return extract_inputs(asteroids, approach_counts(asteroids))
+
+
+class StopAfterFirstChunk:
+    """Observer that ends the token's time (or cancels it) once a chunk is done."""
+
+    def __init__(self, token: CancelToken, reason: str = DEADLINE_EXCEEDED):
+        self.token = token
+        self.reason = reason
+
+    def __call__(self, inputs, outputs) -> None:
+        if self.reason == DEADLINE_EXCEEDED:
+            self.token.deadline = time.monotonic()
+        else:
+            self.token.cancel(self.reason)
+
+
+def test_best_effort_returns_the_chunks_done_by_the_deadline(batch):
+    token = CancelToken(timeout_s=60)
+    response, snapshot = analyze_inputs(
+        batch, SIZE, cancel=token, best_effort=True, observe=StopAfterFirstChunk(token)
+    )
+    assert response.partial
+    assert response.total_analyzed == CHUNK_SIZE
+    assert response.statistics.total_analyzed == CHUNK_SIZE
+    assert response.message == f"Deadline reached; partial result ({CHUNK_SIZE} of {SIZE} objects)"
+    assert snapshot is None  # a partial result is no base for diffs
+
+
+def test_deadline_without_best_effort_raises(batch):
+    token = CancelToken(timeout_s=60)
+    with pytest.raises(Cancelled) as exc:
+        analyze_inputs(batch, SIZE, cancel=token, observe=StopAfterFirstChunk(token))
+    assert exc.value.reason == DEADLINE_EXCEEDED
+
+
+def test_disconnect_is_not_turned_into_a_partial_result(batch):
+    token = CancelToken()
+    with pytest.raises(Cancelled) as exc:
+        analyze_inputs(
+            batch, SIZE, cancel=token, best_effort=True,
+            observe=StopAfterFirstChunk(token, CLIENT_DISCONNECTED),
+        )
+    assert exc.value.reason == CLIENT_DISCONNECTED
+
+
+def test_request_deadline_over_http(neo_batch):
+    # The first chunk alone takes longer than the 1 ms budget
+    body = {"asteroids": neo_batch(CHUNK_SIZE + 1)}
+    with TestClient(app) as client:
+        expired = client.post("/api/v1/analyze", json=body, headers={"X-Request-Timeout-Ms": "1"})
+        partial = client.post("/api/v1/analyze", json={**body, "timeout_ms": 1, "best_effort": True})
+    assert expired.status_code == 504
+    assert partial.status_code == 200
+    assert partial.json()["partial"] and partial.json()["result_handle"] is None
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.engine.analysis import approach_counts
+from app.engine.batch import compute_batch, extract_inputs
+from app.engine.constants import AU_KM, LUNAR_DISTANCE_KM
+from app.engine.deflection import MAX_CELLS, MAX_SCENARIOS, deflection_scenarios, displacement_km
+from app.main import app
+from app.models import DeflectionDirection, NeoObject
+
+DIRECTIONS = [DeflectionDirection.ALONG_TRACK, DeflectionDirection.CROSS_TRACK]
+DELTA_V = [0.1, 1.0, 10.0, 100.0]
+LEAD = [0.0, 30.0, 365.0, 100_000.0]
+AS_OF = np.array(["2026-10-19"], dtype="datetime64[ms]")
+
+
+@pytest.fixture
+def inputs(neo_batch):
+    asteroids = [NeoObject.model_validate(r) for r in neo_batch(40)]
+    return extract_inputs(asteroids, approach_counts(asteroids))
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+def test_cells_match_rescoring_the_deflected_object(inputs):
+    response = deflection_scenarios(inputs, DELTA_V, LEAD, DIRECTIONS, as_of=AS_OF)
+    shifts = displacement_km(DELTA_V, LEAD, DIRECTIONS)
+    baseline = compute_batch(inputs, AS_OF)
+    days_left = (inputs.approach_epoch - AS_OF[0]).astype(float) / 86_400_000
+
+    for row, base in enumerate(response.baselines):
+        assert base.risk_score == baseline.risk_score[row]
+        for d in range(len(DIRECTIONS)):
+            for t in range(len(LEAD)):
+                if LEAD[t] > days_left[row]:  # deflected after the approach
+                    assert response.cube["risk_score"][row][d][t] == [None] * len(DELTA_V)
+                    continue
+                for v in (0, len(DELTA_V) - 1):
+                    single = inputs.take(np.array([row]))
+                    single.miss_distance_km = np.hypot(single.miss_distance_km, shifts[d, t, v])
+                    single.miss_distance_lunar = single.miss_distance_km / LUNAR_DISTANCE_KM
+                    single.moid_au = np.hypot(single.moid_au, shifts[d, t, v] / AU_KM)
+                    expected = compute_batch(single, AS_OF)
+                    assert response.cube["risk_score"][row][d][t][v] == expected.risk_score[0]
+                    assert response.cube["torino_scale"][row][d][t][v] == expected.torino_scale[0]
+
+
+def test_unreachable_lead_times_and_summaries(inputs):
+    response = deflection_scenarios(inputs, DELTA_V, LEAD, DIRECTIONS, as_of=AS_OF)
+    for row in range(len(inputs)):
+        for d in range(len(DIRECTIONS)):
+            # No time to act changes nothing; 100 000 days before any approach is before as_of
+            assert response.cube["risk_score"][row][d][0] == [response.baselines[row].risk_score] * 4
+            assert response.cube["risk_score"][row][d][-1] == [None] * 4
+            assert response.min_delta_v_torino_zero[row][d][-1] is None
+            for t, smallest in enumerate(response.min_delta_v_torino_zero[row][d]):
+                torino = response.cube["torino_scale"][row][d][t]
+                zero = [dv for dv, value in zip(DELTA_V, torino) if value == 0]
+                assert smallest == (zero[0] if zero else None)
+
+
+def test_grid_limits_are_422(client, neo_batch):
+    asteroids = neo_batch(2)
+    too_fine = client.post("/api/v1/analyze/deflection", json={
+        "asteroids": asteroids,
+        "delta_v_mm_s": list(range(200)),
+        "lead_time_days": list(range(MAX_SCENARIOS // 200 + 1)),
+    })
+    assert too_fine.status_code == 422
+
+    # A full grid per object, on more objects than MAX_CELLS allows
+    too_many = client.post("/api/v1/analyze/deflection", json={
+        "asteroids": neo_batch(MAX_CELLS // MAX_SCENARIOS + 1),
+        "delta_v_mm_s": list(range(100)),
+        "lead_time_days": list(range(MAX_SCENARIOS // 100)),
+    })
+    assert too_many.status_code == 422
+
+    negative = client.post("/api/v1/analyze/deflection", json={
+        "asteroids": asteroids, "delta_v_mm_s": [-1], "lead_time_days": [1],
+    })
+    assert negative.status_code == 422
@@ -0,0 +1,49 @@
+import math
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.engine.effects import EFFECT_FIELDS, impact_effects_array
+from app.main import app
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+def test_small_stony_bodies_burst_and_large_ones_crater():
+    effects = impact_effects_array(np.array([0.02, 0.05, 1.0, 10.0]), np.array([19.0, 12.8, 20.0, 20.0]))
+
+    # Chelyabinsk-sized: breaks up and bursts high, no crater
+    assert 15 < effects.airburst_altitude_km[0] < effects.breakup_altitude_km[0] < 80
+    assert math.isnan(effects.crater_diameter_km[0])
+    assert math.isnan(effects.impact_velocity_km_s[0])
+    # Kilometre-sized: reaches the ground and leaves a complex crater
+    for i in (2, 3):
+        assert math.isnan(effects.airburst_altitude_km[i])
+        assert effects.crater_diameter_km[i] > 3.2
+        assert effects.impact_velocity_km_s[i] > 15
+    assert effects.crater_diameter_km[3] > effects.crater_diameter_km[2]
+    # 1 psi reaches farther than 5 psi, and radii grow with size
+    assert (effects.blast_radius_1psi_km >= effects.blast_radius_5psi_km).all()
+    assert effects.blast_radius_1psi_km[3] > effects.blast_radius_1psi_km[2] > effects.blast_radius_5psi_km[2]
+    assert effects.thermal_radius_km[3] > effects.thermal_radius_km[2] > 0
+
+
+def test_impact_effects_are_opt_in(client, neo_batch):
+    body = {"asteroids": neo_batch(20)}
+    default = client.post("/api/v1/analyze", json=body).json()["assessments"]
+    assert not any(f in a for a in default for f in EFFECT_FIELDS)
+
+    with_effects = client.post("/api/v1/analyze", json={**body, "impact_effects": True}).json()
+    for a in with_effects["assessments"]:
+        assert "blast_radius_1psi_km" in a and "thermal_radius_km" in a
+        assert ("crater_diameter_km" in a) != ("airburst_altitude_km" in a)
+
+    projected = client.post(
+        "/api/v1/analyze", params={"fields": "asteroid_id,crater_diameter_km"}, json=body
+    ).json()["assessments"]
+    assert all(set(a) == {"asteroid_id", "crater_diameter_km"} for a in projected)
@@ -0,0 +1,79 @@
+import pytest
+
+from app.engine.analysis import approach_counts
+from app.engine.batch import extract_inputs
+from app.engine.incremental import analyze_inputs
+from app.models import NeoObject, ResultMode
+from app.services.result_store import SharedResultStore
+
+
+def analyze(records, **options):
+    asteroids = [NeoObject.model_validate(r) for r in records]
+    inputs = extract_inputs(asteroids, approach_counts(asteroids))
+    return analyze_inputs(inputs, len(asteroids), **options)
+
+
+def test_unchanged_input_reuses_every_assessment(neo_batch):
+    records = neo_batch(300)
+    first, snapshot = analyze(records)
+    second, _ = analyze(records, previous=snapshot, previous_handle="base")
+
+    assert second.assessments == first.assessments
+    assert {id(a) for a in second.assessments} == {id(a) for a in snapshot.by_fingerprint.values()}
+    assert second.statistics == first.statistics
+
+
+def test_diff_recomputes_only_changed_objects(neo_batch):
+    records = neo_batch(300)
+    _, snapshot = analyze(records)
+
+    moved = records[5]["close_approach_data"][0]["miss_distance"]
+    moved.update(kilometers="1000", lunar=str(1000 / 384400), astronomical=str(1000 / 1.496e8))
+    response, _ = analyze(
+        records[:-1], previous=snapshot, previous_handle="base", result_mode=ResultMode.DIFF
+    )
+
+    diff = response.diff
+    assert diff.base_handle == "base"
+    assert diff.recomputed_count == 1
+    assert [c.asteroid_id for c in diff.changed] == [records[5]["id"]]
+    assert diff.changed[0].risk_score > diff.changed[0].previous_score
+    assert diff.removed == [records[-1]["id"]]
+    assert diff.added == []
+    assert diff.unchanged_count == 298
+    assert response.assessments == []
+
+
+def test_other_settings_do_not_reuse(neo_batch):
+    records = neo_batch(50)
+    _, snapshot = analyze(records)
+    response, _ = analyze(
+        records, previous=snapshot, previous_handle="base",
+        result_mode=ResultMode.DIFF, effects=True,
+    )
+    assert response.diff.recomputed_count == 50
+
+
+@pytest.fixture
+def snapshot(neo_batch):
+    return analyze(neo_batch(20))[1]
+
+
+def test_shared_store_resolves_handles_across_instances(tmp_path, snapshot):
+    writer = SharedResultStore(str(tmp_path), 4, 60.0, key="shared")
+    reader = SharedResultStore(str(tmp_path), 4, 60.0, key="shared")
+    handle = writer.put(snapshot)
+    assert reader.get(handle) == snapshot
+    assert reader.get("not-a-handle") is None
+
+
+def test_shared_store_does_not_unpickle_unsigned_files(tmp_path, snapshot):
+    store = SharedResultStore(str(tmp_path), 4, 60.0, key="shared")
+    handle = store.put(snapshot)
+    assert SharedResultStore(str(tmp_path), 4, 60.0, key="other").get(handle) is None
+
+    path = tmp_path / f"{handle}.pkl"
+    data = bytearray(path.read_bytes())
+    data[-1] ^= 1
+    path.write_bytes(bytes(data))
+    assert store.get(handle) is None
@@ -0,0 +1,79 @@
+import json
+from dataclasses import fields
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.engine import RiskEngine
+from app.engine.analysis import approach_counts
+from app.engine.batch import extract_inputs
+from app.engine.incremental import analyze_inputs
+from app.engine.ingest import decode_analyze_body, extract_records, scan_analyze_body
+from app.main import app
+from app.models import NeoObject
+
+
+def validated(records):
+    asteroids = [NeoObject.model_validate(r) for r in records]
+    return extract_inputs(asteroids, approach_counts(asteroids))
+
+
+def assert_same_inputs(lean, full):
+    for f in fields(full):
+        a, b = getattr(lean, f.name), getattr(full, f.name)
+        if isinstance(b, np.ndarray):
+            np.testing.assert_array_equal(a, b, err_msg=f.name)
+            assert a.dtype == b.dtype, f.name
+        else:
+            assert a == b, f.name
+
+
+@pytest.fixture
+def records(neo_batch):
+    records = neo_batch(200)
+    records[3]["close_approach_data"] = []  # no row
+    records[4]["close_approach_data"].append(dict(records[4]["close_approach_data"][0]))
+    records[9] = {**records[5], "name": "(5) Again"}  # same asteroid twice
+    return records
+
+
+def test_lean_path_matches_model_validation(records):
+    lean = extract_records(records)
+    assert lean is not None
+    assert_same_inputs(lean, validated(records))
+
+
+def test_coercible_fields_fall_back_to_validation(records):
+    records[0]["estimated_diameter"]["kilometers"]["estimated_diameter_max"] = "0.5"
+    records[1]["is_potentially_hazardous_asteroid"] = "true"
+    assert extract_records(records) is None
+
+    request, inputs, size = decode_analyze_body(json.dumps({"asteroids": records}).encode())
+    assert size == len(records) and request.asteroids == []
+    assert inputs.diameter_max_km[0] == 0.5
+    assert_same_inputs(inputs, validated(records))
+
+
+def test_object_and_lean_paths_give_the_same_response(records):
+    request, inputs, size = decode_analyze_body(json.dumps({"asteroids": records}).encode())
+    lean, _ = analyze_inputs(inputs, size)
+    full = RiskEngine.analyze_batch([NeoObject.model_validate(r) for r in records])
+    assert lean == full
+
+
+def test_record_spans_locate_each_asteroid(records):
+    body = json.dumps({"time_window": "approach", "asteroids": records}, indent=1).encode()
+    options, parsed, text, spans = scan_analyze_body(body)
+    assert options == {"time_window": "approach"}
+    assert parsed == records
+    assert [json.loads(text[start:end]) for start, end in spans] == records
+
+
+@pytest.mark.parametrize("body", [b'{"asteroids": [{"id": 1}]}', b'{"asteroids": [', b"[]"])
+def test_invalid_bodies_are_rejected(body):
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/v1/analyze", content=body, headers={"Content-Type": "application/json"}
+        )
+    assert response.status_code == 422
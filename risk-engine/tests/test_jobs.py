@@ -0,0 +1,114 @@
+import asyncio
+import json
+import zlib
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.engine.analysis import approach_counts, summarize_batch
+from app.engine.cancellation import CHUNK_SIZE
+from app.models import JobStatus, NeoObject
+from app.services import jobs
+from app.services.admission import AdmissionRejected
+from app.services.jobs import INLINE_SOURCE, JobManager, JobStore
+from app.services.scoring_registry import scoring_registry
+
+pytestmark = pytest.mark.anyio
+
+STALE_AFTER_S = 0.4
+
+
+@pytest.fixture
+def manager(tmp_path) -> JobManager:
+    manager = JobManager(
+        db_path=str(tmp_path / "jobs.sqlite3"),
+        max_concurrent=1,
+        poll_s=1.0,
+        stale_after_s=STALE_AFTER_S,
+        retention_s=3600.0,
+    )
+    # Set up as start() would, without the claiming loop
+    manager.store = JobStore(manager.db_path)
+    manager.owner = "worker-a"
+    return manager
+
+
+@pytest.fixture
+def overloaded(monkeypatch):
+    """Admission that sheds every request until the fixture is undone."""
+
+    @asynccontextmanager
+    async def rejecting(lane, weight, *, timeout=None):
+        raise AdmissionRejected(503, 1, "Engine overloaded")
+        yield
+
+    monkeypatch.setattr(jobs.admission, "slot", rejecting)
+    return monkeypatch
+
+
+def claimed_job(manager: JobManager) -> str:
+    job_id = manager.store.create(INLINE_SOURCE, {}, None)
+    assert manager.store.claim(manager.owner)["id"] == job_id
+    return job_id
+
+
+async def test_job_waiting_for_admission_is_not_taken_over(manager, overloaded):
+    job_id = claimed_job(manager)
+    waiting = asyncio.create_task(manager._admitted(job_id, 1, lambda: "assessed"))
+
+    # Another worker's stale-job sweeps while this one waits out rejections
+    other_worker = JobStore(manager.db_path)
+    for _ in range(4):
+        await asyncio.sleep(STALE_AFTER_S / 2)
+        assert other_worker.requeue(stale_after_s=STALE_AFTER_S) == 0
+
+    row = other_worker.get(job_id)
+    assert row["status"] == JobStatus.RUNNING.value and row["owner"] == manager.owner
+
+    overloaded.undo()
+    assert await asyncio.wait_for(waiting, 1.0) == "assessed"
+
+
+async def test_job_cancelled_while_waiting_for_admission_stops(manager, overloaded):
+    job_id = claimed_job(manager)
+    waiting = asyncio.create_task(manager._admitted(job_id, 1, lambda: "assessed"))
+    await asyncio.sleep(0.05)
+
+    assert manager.store.cancel(job_id)
+    with pytest.raises(jobs._JobLost):
+        await asyncio.wait_for(waiting, 1.0)
+
+
+async def test_input_parse_keeps_the_heartbeat_fresh(manager, neo_batch):
+    records = neo_batch(2 * CHUNK_SIZE + 10)
+    job_id = manager.store.create(INLINE_SOURCE, {}, zlib.compress(json.dumps(records).encode()))
+    row = manager.store.claim(manager.owner)
+    beats = []
+
+    asteroids = jobs._load_input(row, lambda: beats.append(len(beats)))
+    assert [a.neo_reference_id for a in asteroids] == [r["neo_reference_id"] for r in records]
+    assert len(beats) == 3  # once per chunk
+
+    heartbeat = jobs._Heartbeat(manager.store, job_id, manager.owner, interval_s=0.0)
+    assert manager.store.cancel(job_id)
+    with pytest.raises(jobs._JobLost):
+        jobs._load_input(row, heartbeat)
+
+
+def test_statistics_from_stored_results_match_analysis(manager, neo_batch, monkeypatch):
+    monkeypatch.setattr(jobs, "_STATISTICS_PAGE", 64)  # merged over several pages
+    models = [m for name, m in scoring_registry.models().items() if name != "default"]
+    asteroids = [NeoObject(**r) for r in neo_batch(300, seed=5)]
+    results = jobs._assess_chunk(asteroids, approach_counts(asteroids), None, models=models)
+    job_id = claimed_job(manager)
+    stored = [(i, a) for i, a in enumerate(results) if a is not None]
+    assert manager.store.append(job_id, manager.owner, len(asteroids), stored)
+
+    tally = jobs._Tally()
+    stats = manager._statistics(job_id, models, tally, lambda: None)
+
+    expected = summarize_batch([a for _, a in stored], models=models)
+    assert stats["statistics"] == expected.statistics.model_dump(mode="json")
+    assert stats["model_statistics"] == {
+        name: s.model_dump() for name, s in expected.model_statistics.items()
+    }
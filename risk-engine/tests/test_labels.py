@@ -0,0 +1,75 @@
+import math
+
+import numpy as np
+import pytest
+
+from app.engine.constants import KNOWN_EVENTS, SIZE_COMPARISONS
+from app.engine.labels import (
+    energy_categories,
+    energy_labels,
+    energy_text,
+    size_categories,
+    size_labels,
+    size_text,
+)
+
+
+def _old_energy(energy_mt):
+    """The energy comparison as it was before the label stage."""
+    if energy_mt <= 0:
+        return "negligible"
+    closest_name, closest_ratio, closest_mult = "", float("inf"), 1.0
+    for name, event_mt in KNOWN_EVENTS.items():
+        ratio = energy_mt / event_mt
+        log_diff = abs(math.log10(max(ratio, 1e-30)))
+        if log_diff < closest_ratio:
+            closest_name, closest_ratio, closest_mult = name, log_diff, ratio
+    if closest_mult < 0.01:
+        return f"~{closest_mult:.4f}× {closest_name}"
+    if closest_mult < 1:
+        return f"~{closest_mult:.2f}× {closest_name}"
+    if closest_mult < 100:
+        return f"~{closest_mult:.1f}× {closest_name}"
+    return f"~{closest_mult:.0f}× {closest_name}"
+
+
+def _old_size(diameter_km):
+    """The size comparison as it was before the label stage."""
+    for threshold, description in SIZE_COMPARISONS:
+        if diameter_km <= threshold:
+            return f"~size of {description} ({diameter_km*1000:.1f}m)"
+    return f"~{diameter_km:.1f} km across (massive)"
+
+
+@pytest.fixture
+def energies():
+    rng = np.random.default_rng(11)
+    known = np.array(list(KNOWN_EVENTS.values()), dtype=float)
+    return np.concatenate([[0.0, -1.0], known, 10.0 ** rng.uniform(-9, 8, 5000)])
+
+
+@pytest.fixture
+def diameters():
+    rng = np.random.default_rng(12)
+    thresholds = np.array([t for t, _ in SIZE_COMPARISONS], dtype=float)
+    return np.concatenate([thresholds, 10.0 ** rng.uniform(-4, 1.5, 5000)])
+
+
+def test_energy_labels_match_scalar_and_old_comparison(energies):
+    batch = energy_labels(*energy_categories(energies))
+    scalar = [energy_text(e) for e in energies.tolist()]
+    assert batch == scalar
+    assert scalar == [_old_energy(e) for e in energies.tolist()]
+
+
+def test_size_labels_match_scalar_and_old_comparison(diameters):
+    batch = size_labels(size_categories(diameters), diameters)
+    scalar = [size_text(d) for d in diameters.tolist()]
+    assert batch == scalar
+    assert scalar == [_old_size(d) for d in diameters.tolist()]
+
+
+def test_empty_batch_has_no_labels():
+    empty = np.array([], dtype=float)
+    assert energy_labels(*energy_categories(empty)) == []
+    assert size_labels(size_categories(empty), empty) == []
@@ -0,0 +1,65 @@
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import HistGradientBoostingClassifier
+
+from app.engine.analysis import approach_counts
+from app.engine.batch import compute_batch, extract_inputs
+from app.engine.incremental import analyze_inputs
+from app.engine.learned import (
+    FEATURE_NAMES,
+    LearnedModel,
+    feature_matrix,
+    load_learned_model,
+    save_learned_model,
+)
+from app.models import NeoObject
+
+
+def unpack(records):
+    asteroids = [NeoObject.model_validate(r) for r in records]
+    return extract_inputs(asteroids, approach_counts(asteroids)), len(asteroids)
+
+
+@pytest.fixture
+def model_path(tmp_path, neo_batch):
+    inputs, _ = unpack(neo_batch(400, seed=5))
+    features = feature_matrix(inputs, compute_batch(inputs))
+    labels = features[:, FEATURE_NAMES.index("log10_kinetic_energy_mt")] > 0
+    estimator = HistGradientBoostingClassifier(max_iter=20, random_state=0).fit(features, labels)
+    path = tmp_path / "learned.joblib"
+    save_learned_model(LearnedModel(estimator, metadata={"rows": 400}), path)
+    return path
+
+
+def test_batch_scores_match_row_by_row_inference(model_path, neo_batch):
+    model = load_learned_model(model_path)
+    assert model.version and model.metadata == {"rows": 400}
+
+    inputs, size = unpack(neo_batch(200))
+    response, _ = analyze_inputs(inputs, size, learned=model)
+    assert response.learned_model == model.version
+
+    features = feature_matrix(inputs, compute_batch(inputs))
+    expected = {
+        inputs.asteroid_ids[i]: model.predict_scores(features[i:i + 1])[0]
+        for i in range(len(inputs))
+    }
+    assert {a.asteroid_id: a.learned_score for a in response.assessments} == expected
+    assert all(0 <= score <= 100 for score in expected.values())
+
+
+def test_model_trained_on_other_features_is_rejected(model_path):
+    payload = joblib.load(model_path)
+    payload["feature_names"] = list(FEATURE_NAMES[:-1])
+    joblib.dump(payload, model_path)
+    with pytest.raises(ValueError, match="trained on features"):
+        load_learned_model(model_path)
+
+
+def test_no_model_means_no_learned_score(neo_batch):
+    inputs, size = unpack(neo_batch(20))
+    response, _ = analyze_inputs(inputs, size)
+    assert response.learned_model is None
+    assert all(a.learned_score is None for a in response.assessments)
+    assert np.isnan(feature_matrix(inputs, compute_batch(inputs))).any()  # unknown MOIDs
@@ -0,0 +1,38 @@
+import asyncio
+
+import pytest
+
+from app.services.admission import AdmissionController, Lane
+from app.services.load_monitor import LoadMonitor
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_failing_change_callback_does_not_stop_sampling():
+    monitor = LoadMonitor(
+        AdmissionController(max_objects=10, queue_limits={l: 10 for l in Lane}, max_wait_s=1.0),
+        sample_interval_s=0.01,
+        max_loop_lag_ms=1000.0,
+        max_executor_queue=10,
+        max_queued_objects=10,
+    )
+    calls = 0
+
+    async def broken_emit(snapshot: dict) -> None:
+        nonlocal calls
+        calls += 1
+        raise ConnectionError("message queue unavailable")
+
+    monitor.on_change = broken_emit
+    monitor.start()
+    try:
+        await asyncio.sleep(0.05)
+        monitor.set_warm()  # not ready → ready: a change to report
+        await asyncio.sleep(0.05)
+        assert calls == 1
+        assert not monitor._task.done()
+        samples = len(monitor._lags)
+        await asyncio.sleep(0.05)
+        assert len(monitor._lags) > samples
+    finally:
+        await monitor.stop()
@@ -0,0 +1,74 @@
+import logging
+import queue
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+from app import logs
+from app.logs import Sampler, _DroppingQueueHandler
+
+APP_DIR = Path(__file__).resolve().parent.parent / "app"
+
+
+def record(msg: str, *args, exc_info=None) -> logging.LogRecord:
+    return logging.LogRecord("test", logging.INFO, __file__, 1, msg, args, exc_info)
+
+
+@pytest.mark.parametrize("rate, passed", [(1.0, 12), (0.25, 3), (0.0, 0)])
+def test_sampler_lets_through_one_call_in_every_n(rate, passed):
+    sample = Sampler(rate)
+    assert sum(sample() for _ in range(12)) == passed
+
+
+def test_full_queue_drops_records_and_reports_them_later():
+    handler = _DroppingQueueHandler(queue.Queue(2))
+    for i in range(5):
+        handler.emit(record("event %d", i))
+    assert handler.dropped == 3
+
+    first, second = handler.queue.get_nowait(), handler.queue.get_nowait()
+    assert (first.getMessage(), second.getMessage()) == ("event 0", "event 1")
+    handler.emit(record("event %d", 5))
+    note = handler.queue.get_nowait()
+    assert note.getMessage() == "3 log records dropped (log queue full)"
+    assert note.levelno == logging.WARNING
+    assert handler.queue.get_nowait().getMessage() == "event 5"
+    assert handler.dropped == 0
+
+
+def test_formatting_is_left_to_the_listener():
+    handler = _DroppingQueueHandler(queue.Queue(4))
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        handler.emit(record("failed for %s", "2000433", exc_info=sys.exc_info()))
+    queued = handler.queue.get_nowait()
+    assert (queued.msg, queued.args) == ("failed for %s", ("2000433",))
+    assert queued.exc_info is None and "ValueError: boom" in queued.exc_text
+
+
+def test_pipeline_writes_through_the_listener(capsys):
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    try:
+        logs.configure_logging("info", "%(levelname)s %(message)s", queue_size=100)
+        logging.getLogger("risk-engine.test").info("Analyzed %d asteroids", 42)
+        logging.getLogger("risk-engine.test").debug("not shown")
+        logs.stop_logging()
+    finally:
+        root.handlers[:] = handlers
+        root.setLevel(level)
+    assert capsys.readouterr().err.splitlines() == ["INFO Analyzed 42 asteroids"]
+
+
+def test_log_calls_use_percent_style_arguments():
+    f_string_call = re.compile(r"\blog(?:ger)?\.(?:debug|info|warning|error|exception|critical)\(\s*f[\"']")
+    offenders = [
+        f"{path.relative_to(APP_DIR)}:{n}"
+        for path in APP_DIR.rglob("*.py")
+        for n, line in enumerate(path.read_text().splitlines(), 1)
+        if f_string_call.search(line)
+    ]
+    assert offenders == []
@@ -0,0 +1,69 @@
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.engine.batch import resolve_as_of
+from app.engine.scales import (
+    DEFAULT_WINDOW_YEARS,
+    compute_palermo_scale,
+    compute_palermo_scale_array,
+    compute_torino_scale,
+    compute_torino_scale_array,
+    window_years,
+)
+from app.main import app
+from app.models import TimeWindow
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+def test_window_years_per_reference_time():
+    epochs = np.array(["2035-01-01", "2020-01-01", "NaT"], dtype="datetime64[ms]")
+    as_of = np.array(["2025-01-01", "2030-01-01"], dtype="datetime64[ms]")
+    years = window_years(epochs, as_of)
+
+    assert years.shape == (2, 3)
+    assert years[:, 0] == pytest.approx([10.0, 5.0], abs=0.01)
+    assert (years[:, 1] < 0).all()
+    assert (years[:, 2] == DEFAULT_WINDOW_YEARS).all()
+
+
+def test_array_scales_match_scalar_over_windows():
+    rng = np.random.default_rng(3)
+    pi = 10.0 ** rng.uniform(-9, 0, 2000)
+    e_mt = 10.0 ** rng.uniform(-4, 5, 2000)
+    years = np.concatenate([rng.uniform(-5, 120, 1996), [0.0, -1.0, 0.0, -1.0]])
+    pi[-2:] = 0.995  # certain collisions, but the approach is past
+
+    palermo = compute_palermo_scale_array(pi, e_mt, years)
+    torino = compute_torino_scale_array(pi, e_mt, time_years=years)
+    for i in range(len(pi)):
+        assert palermo[i] == compute_palermo_scale(pi[i], e_mt[i], years[i])
+        assert torino[i] == compute_torino_scale(pi[i], e_mt[i], time_years=years[i])
+    assert (palermo[years <= 0] == -10.0).all()
+    assert (torino[years <= 0] == 0).all()
+
+
+def test_approach_window_defaults_to_start_of_utc_day():
+    [reference] = resolve_as_of(TimeWindow.APPROACH).tolist()
+    assert reference == datetime.combine(datetime.now(timezone.utc).date(), datetime.min.time())
+    assert resolve_as_of(TimeWindow.FIXED) is None
+
+
+def test_several_as_of_times_score_each_window(client, neo_batch):
+    asteroids = neo_batch(30)
+    as_of = ["2026-01-01T00:00:00Z", "2099-01-01T00:00:00Z"]
+    body = client.post("/api/v1/analyze", json={"asteroids": asteroids, "as_of": as_of}).json()
+
+    assert body["as_of"] == as_of
+    for a in body["assessments"]:
+        assert a["palermo_scale"] == a["palermo_by_as_of"][0]
+        assert a["torino_scale"] == a["torino_by_as_of"][0]
+        # Every approach in the batch is before 2099
+        assert a["palermo_by_as_of"][1] == -10.0 and a["torino_by_as_of"][1] == 0
@@ -0,0 +1,109 @@
+import math
+
+import numpy as np
+import pytest
+
+from app.engine.constants import LUNAR_DISTANCE_KM
+from app.engine.scoring import (
+    RISK_LEVELS,
+    SCORE_FACTORS,
+    compute_score_breakdown,
+    compute_score_matrix,
+    get_risk_level,
+    risk_level_codes,
+    total_scores,
+)
+from app.models import RiskLevel
+
+
+def _old_breakdown(haz, diameter_km, miss_km, velocity_km_s, energy_mt, ou, moid):
+    """The scoring thresholds as they were before scoring models existed."""
+    ld = miss_km / LUNAR_DISTANCE_KM
+    for limit, pts in ((0.5, 25.0), (1, 22.0), (3, 18.0), (5, 15.0), (10, 12.0), (20, 8.0), (50, 4.0)):
+        if ld <= limit:
+            dist = pts
+            break
+    else:
+        dist = min(max(4 * math.exp(-0.02 * (ld - 50)), 0), 4)
+    if moid is not None and moid < 0.05:
+        dist = min(25.0, dist + (0.05 - moid) / 0.05 * 3)
+    if ou is not None:
+        orbit = min(max(ou / 9 * 10, 0), 10)
+    else:
+        orbit = 10.0 if ld < 1 else 7.0 if ld < 5 else 4.0 if ld < 20 else 1.0
+    ke = min(max((math.log10(energy_mt) + 6) / 11 * 15, 0), 15) if energy_mt > 0 else 0.0
+    points = (
+        15.0 if haz else 0.0,
+        min(max((math.log10(max(diameter_km, 0.0001)) + 3) / 4 * 20, 0), 20),
+        dist,
+        min(max(velocity_km_s / 72.0 * 15, 0), 15),
+        ke,
+        orbit,
+    )
+    return [round(p, 2) for p in points]
+
+
+def _old_level(score):
+    if score >= 75:
+        return RiskLevel.CRITICAL
+    if score >= 50:
+        return RiskLevel.HIGH
+    if score >= 25:
+        return RiskLevel.MEDIUM
+    return RiskLevel.LOW
+
+
+@pytest.fixture
+def objects():
+    rng = np.random.default_rng(7)
+    n = 3000
+    # Lunar distances on and around every band edge, plus a spread
+    edges = np.array([0.5, 1, 3, 5, 10, 20, 50], dtype=float)
+    ld = np.concatenate([edges, np.nextafter(edges, np.inf), rng.uniform(0, 120, n - 14)])
+    ou = rng.integers(0, 10, n).astype(float)
+    ou[rng.random(n) < 0.3] = np.nan
+    moid = rng.uniform(0, 0.1, n)
+    moid[rng.random(n) < 0.3] = np.nan
+    energy = 10.0 ** rng.uniform(-8, 6, n)
+    energy[:5] = 0.0
+    return (
+        rng.random(n) < 0.2,
+        10.0 ** rng.uniform(-4, 1.5, n),
+        ld * LUNAR_DISTANCE_KM,
+        rng.uniform(0, 80, n),
+        energy,
+        ou,
+        moid,
+    )
+
+
+def _scalar_args(objects, i):
+    haz, diameter, miss, velocity, energy, ou, moid = (column[i] for column in objects)
+    return (
+        bool(haz), float(diameter), float(miss), float(velocity), float(energy),
+        None if np.isnan(ou) else int(ou),
+        None if np.isnan(moid) else float(moid),
+    )
+
+
+def test_scalar_breakdown_matches_batch_and_old_thresholds(objects):
+    matrix = compute_score_matrix(*objects)
+    for i in range(len(matrix)):
+        haz, diameter, miss, velocity, energy, ou, moid = _scalar_args(objects, i)
+        breakdown = compute_score_breakdown(
+            haz, diameter, miss, velocity, energy, orbit_uncertainty=ou, moid_au=moid
+        )
+        scalar = [getattr(breakdown, f) for f in SCORE_FACTORS]
+        assert scalar == matrix[i].tolist()
+        assert scalar == _old_breakdown(haz, diameter, miss, velocity, energy, ou, moid)
+
+
+def test_scalar_risk_level_matches_batch_and_old_cutoffs(objects):
+    scores = np.concatenate([
+        total_scores(compute_score_matrix(*objects)),
+        [0.0, 24.9, 25.0, 49.9, 50.0, 74.9, 75.0, 100.0],
+    ])
+    batch = [RISK_LEVELS[c] for c in risk_level_codes(scores).tolist()]
+    scalar = [get_risk_level(s) for s in scores.tolist()]
+    assert scalar == batch
+    assert scalar == [_old_level(s) for s in scores.tolist()]
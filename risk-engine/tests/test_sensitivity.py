@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from app.engine.analysis import approach_counts
+from app.engine.batch import compute_batch, extract_inputs
+from app.engine.incremental import analyze_inputs
+from app.engine.scoring import DEFAULT_MODEL, RISK_LEVELS
+from app.engine.sensitivity import explain_inputs
+from app.models import NeoObject, SensitivityFactor
+
+MULTIPLIERS = (0.5, 0.9, 1.1, 3.0)
+
+
+@pytest.fixture
+def inputs(neo_batch):
+    asteroids = [NeoObject.model_validate(r) for r in neo_batch(60)]
+    return extract_inputs(asteroids, approach_counts(asteroids))
+
+
+def rescored(inputs, row, columns, change):
+    """Risk score of one object with ``columns`` changed, scored on its own."""
+    single = inputs.take(np.array([row]))
+    for name in columns:
+        setattr(single, name, change(getattr(single, name)))
+    return float(compute_batch(single).risk_score[0])
+
+
+def test_perturbed_scores_match_rescoring_each_object(inputs):
+    response = explain_inputs(inputs, multipliers=MULTIPLIERS)
+    analysis, _ = analyze_inputs(inputs, len(inputs))
+    scores = {a.asteroid_id: a.risk_score for a in analysis.assessments}
+
+    assert response.steps[SensitivityFactor.ORBIT_UNCERTAINTY.value] == [-3.0, -2.0, -1.0, 1.0, 2.0, 3.0]
+    for row, explanation in enumerate(response.explanations):
+        assert explanation.risk_score == scores[explanation.asteroid_id]
+        velocity = explanation.factors[SensitivityFactor.VELOCITY.value]
+        assert velocity.scores == [
+            rescored(inputs, row, ("velocity_km_s", "velocity_km_h"), lambda c, m=m: c * m)
+            for m in MULTIPLIERS
+        ]
+        orbit = explanation.factors[SensitivityFactor.ORBIT_UNCERTAINTY.value]
+        assert orbit.scores[-1] == rescored(
+            inputs, row, ("orbit_uncertainty",), lambda c: np.clip(c + 3, 0, 9)
+        )
+
+
+def test_unknown_inputs_have_no_slope_and_level_changes_are_real(inputs):
+    response = explain_inputs(inputs, multipliers=MULTIPLIERS)
+    for row, explanation in enumerate(response.explanations):
+        moid = explanation.factors[SensitivityFactor.MOID.value]
+        if np.isnan(inputs.moid_au[row]):
+            assert moid.points_per_step is None
+            assert moid.scores == [explanation.risk_score] * len(MULTIPLIERS)
+
+        diameter = explanation.factors[SensitivityFactor.DIAMETER.value]
+        base = RISK_LEVELS.index(explanation.risk_level)
+        levels = [DEFAULT_MODEL.level_code(s) for s in diameter.scores]
+        raised = [m for m, level in zip(MULTIPLIERS, levels) if level > base]
+        if raised:
+            assert diameter.raises_level_at == min(raised, key=lambda m: abs(np.log(m)))
+        else:
+            assert diameter.raises_level_at is None
+
+
+def test_factor_subset(inputs):
+    response = explain_inputs(inputs, factors=[SensitivityFactor.DIAMETER], multipliers=(2.0,))
+    assert response.steps == {SensitivityFactor.DIAMETER.value: [2.0]}
+    assert all(list(e.factors) == [SensitivityFactor.DIAMETER.value] for e in response.explanations)
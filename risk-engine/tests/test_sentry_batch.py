@@ -0,0 +1,72 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+def _sentry(designation: str, i: int) -> dict:
+    return {
+        "designation": designation,
+        "cumulative_impact_probability": 10.0 ** -(3 + i % 5),
+        "palermo_cumulative": -1.5 - i % 4,
+        "palermo_max": -2.0 - i % 4,
+        "torino_max": i % 3,
+        "total_virtual_impactors": 1,
+        "virtual_impactors": [{"date": f"20{40 + i}-03-01", "ip": "1e-6", "ps": "-3.2", "ts": "0"}],
+    }
+
+
+def _close(value):
+    """Expected value allowing last-bit float differences of the vectorized path."""
+    if isinstance(value, float):
+        return pytest.approx(value, rel=1e-12)
+    if isinstance(value, dict):
+        return {k: _close(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_close(v) for v in value]
+    return value
+
+
+def test_batch_matches_single_object_analysis(client, neo_batch):
+    items = [
+        {"asteroid": neo, "sentry_data": _sentry(neo["name"], i)}
+        for i, neo in enumerate(neo_batch(12))
+    ]
+    response = client.post("/api/v1/analyze/sentry-enhanced/batch", json={"items": items})
+    assert response.status_code == 200
+    batch = response.json()
+    assert batch["total_analyzed"] == 12
+
+    by_id = {a["asteroid_id"]: a for a in batch["assessments"]}
+    for item in items:
+        single = client.post("/api/v1/analyze/sentry-enhanced", json=item).json()["data"]
+        assert by_id[single["asteroid_id"]] == _close(single)
+    assert batch["statistics"]["max_risk_score"] == max(a["risk_score"] for a in by_id.values())
+
+
+def test_sentry_table_is_joined_on_designation(client, neo_batch):
+    asteroids = neo_batch(4)
+    table = [_sentry(f" {asteroids[0]['name'].lower()} ", 0), _sentry(asteroids[2]["name"], 2)]
+    response = client.post("/api/v1/analyze/sentry-enhanced/batch", json={
+        "asteroids": asteroids, "sentry_table": table,
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert {a["asteroid_id"] for a in body["assessments"]} == {asteroids[0]["id"], asteroids[2]["id"]}
+    assert body["unmatched"] == [asteroids[1]["id"], asteroids[3]["id"]]
+
+
+def test_items_and_table_together_are_rejected(client, neo_batch):
+    neo = neo_batch(1)[0]
+    response = client.post("/api/v1/analyze/sentry-enhanced/batch", json={
+        "items": [{"asteroid": neo, "sentry_data": _sentry(neo["name"], 0)}],
+        "asteroids": [neo],
+        "sentry_table": [],
+    })
+    assert response.status_code == 422
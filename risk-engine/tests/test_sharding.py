@@ -0,0 +1,86 @@
+import json
+
+import httpx
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.engine.incremental import analyze_inputs
+from app.engine.ingest import decode_analyze_request
+from app.engine.shards import ShardResult, analyze_shard, merge_shards, shard_of
+from app.main import app
+from app.routes import risk
+from app.services.sharding import ShardCoordinator
+
+
+def decoded(records):
+    _, inputs, size = decode_analyze_request({"asteroids": records})
+    return inputs, size
+
+
+def test_merged_shards_equal_the_unsharded_response(neo_batch):
+    records = neo_batch(300)
+    records[10] = {**records[3], "name": "(3) Again"}  # same asteroid, same shard
+    whole, _ = analyze_inputs(*decoded(records))
+
+    assignment = shard_of([r["neo_reference_id"] for r in records], 3)
+    assert len(set(assignment.tolist())) == 3 and assignment[10] == assignment[3]
+    parts = []
+    for k in range(3):
+        rows = np.flatnonzero(assignment == k)
+        result = analyze_shard(*decoded([records[i] for i in rows.tolist()]))
+        parts.append((ShardResult.decode(result.encode()), rows))
+
+    merged = json.loads(merge_shards(parts, len(records)))
+    assert merged == json.loads(whole.model_dump_json())
+
+
+class Peers(httpx.AsyncBaseTransport):
+    """Peer instances served by this app in-process; hosts in ``down`` answer 503."""
+
+    def __init__(self, down=()):
+        self.asgi = httpx.ASGITransport(app=app)
+        self.down = set(down)
+        self.calls: list[str] = []
+
+    async def handle_async_request(self, request):
+        self.calls.append(request.url.host)
+        if request.url.host in self.down:
+            return httpx.Response(503)
+        return await self.asgi.handle_async_request(request)
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+def coordinator(monkeypatch, peers: Peers) -> ShardCoordinator:
+    sharded = ShardCoordinator("http://peer-a,http://peer-b", 50, 2, 60.0, 30.0)
+    sharded._client = httpx.AsyncClient(transport=peers)
+    monkeypatch.setattr(risk, "shard_coordinator", sharded)
+    return sharded
+
+
+@pytest.mark.parametrize("down", [(), ("peer-a",)])
+def test_sharded_analyze_matches_one_instance(client, neo_batch, monkeypatch, down):
+    body = {"asteroids": neo_batch(200), "time_window": "approach"}
+    single = client.post("/api/v1/analyze", json=body).json()
+
+    peers = Peers(down)
+    sharded_coordinator = coordinator(monkeypatch, peers)
+    sharded = client.post("/api/v1/analyze", json=body).json()
+
+    assert sharded["result_handle"] is None
+    assert sharded == {**single, "result_handle": None}
+    assert peers.calls.count("peer-b") == 1 + len(down)  # peer-a's shard went to peer-b
+    assert ("http://peer-a" in sharded_coordinator._down_until) == bool(down)
+
+
+def test_small_batches_are_not_sharded(client, neo_batch, monkeypatch):
+    peers = Peers()
+    coordinator(monkeypatch, peers)
+    response = client.post("/api/v1/analyze", json={"asteroids": neo_batch(20)})
+    assert response.json()["result_handle"] is not None
+    assert peers.calls == []
@@ -0,0 +1,69 @@
+from collections import Counter
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.engine.analysis import approach_counts
+from app.engine.batch import extract_inputs
+from app.engine.cancellation import CHUNK_SIZE, CancelToken
+from app.engine.timeline import batch_timeline
+from app.main import app
+from app.models import NeoObject
+
+
+def counts_only(data: dict) -> dict:
+    """The timeline without its energy sums."""
+    return {
+        k: counts_only(v) if isinstance(v, dict) else v
+        for k, v in data.items() if "energy" not in k
+    }
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+def test_timeline_counts_match_the_assessments(client, neo_batch):
+    body = {"asteroids": neo_batch(300)}
+    analysis = client.post("/api/v1/analyze", json=body).json()
+    params = {"bin_days": 30, "distance_edges_ld": [10, 100]}
+    data = client.post("/api/v1/analyze/timeline", params=params, json=body).json()["data"]
+
+    assessments = analysis["assessments"]
+    assert data["total"] == len(assessments)
+    levels = Counter(a["risk_level"] for a in assessments)
+    assert dict(zip(data["risk_levels"]["levels"], data["risk_levels"]["counts"])) == {
+        level: levels[level] for level in data["risk_levels"]["levels"]
+    }
+    bands = np.searchsorted([10, 100], [a["miss_distance_lunar"] for a in assessments], side="right")
+    assert data["distance_bands"]["counts"] == np.bincount(bands, minlength=3).tolist()
+    assert data["days"]["start"] == min(a["closest_approach_date"] for a in assessments)
+    assert sum(map(sum, data["day_by_risk_level"])) == len(assessments)
+
+    # The same timeline from the stored result, whose energies are rounded
+    stored = client.get(
+        f"/api/v1/analyze/timeline/{analysis['result_handle']}", params=params
+    ).json()["data"]
+    assert counts_only(stored) == counts_only(data)
+    assert stored["total_energy_mt"] == pytest.approx(data["total_energy_mt"], rel=1e-6)
+
+
+def test_chunked_timeline_matches_one_pass(neo_batch):
+    asteroids = [NeoObject.model_validate(r) for r in neo_batch(CHUNK_SIZE + 500)]
+    inputs = extract_inputs(asteroids, approach_counts(asteroids))
+    assert batch_timeline(inputs, cancel=CancelToken(60), bin_days=7) == batch_timeline(inputs, bin_days=7)
+
+
+def test_timeline_limits(client, neo_batch):
+    body = {"asteroids": neo_batch(CHUNK_SIZE + 1)}
+    expired = client.post("/api/v1/analyze/timeline", json={**body, "timeout_ms": 1})
+    assert expired.status_code == 504
+
+    too_many_bins = client.post(
+        "/api/v1/analyze/timeline", params={"start_date": "1900-01-01"}, json=body
+    )
+    assert too_many_bins.status_code == 422
+    assert client.get("/api/v1/analyze/timeline/" + "0" * 32).status_code == 404
@@ -0,0 +1,74 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.tracing import TracingMiddleware, exporter, trace_context
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ({b"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01".encode()}, (TRACE_ID, PARENT_ID, None, True)),
+    ({b"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-00".encode()}, (TRACE_ID, PARENT_ID, None, False)),
+    (
+        {b"x-correlation-id": b"4BF92F35-77B3-4DA6-A3CE-929D0E0E4736"},
+        (TRACE_ID, None, "4BF92F35-77B3-4DA6-A3CE-929D0E0E4736", True),
+    ),
+])
+def test_trace_id_from_the_caller(headers, expected):
+    assert trace_context(headers) == expected
+
+
+def test_other_correlation_ids_are_hashed_and_invalid_traceparents_ignored():
+    headers = {b"traceparent": b"00-" + b"0" * 32 + b"-" + PARENT_ID.encode() + b"-01", b"x-request-id": b"req-7"}
+    trace_id, parent_id, correlation, sampled = trace_context(headers)
+    assert len(trace_id) == 32 and parent_id is None and correlation == "req-7" and sampled
+    assert trace_context({b"x-request-id": b"req-7"})[0] == trace_id
+    assert trace_context({})[0] != trace_context({})[0]
+
+
+@pytest.fixture
+def spans_file(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    exporter.configure(str(path), batch_size=512, flush_s=60.0)
+    yield path
+    exporter.configure(None)
+
+
+def test_request_spans_join_the_callers_trace(spans_file, neo_batch):
+    with TestClient(TracingMiddleware(app)) as client:
+        response = client.post(
+            "/api/v1/analyze",
+            json={"asteroids": neo_batch(10)},
+            headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01", "X-Correlation-ID": "job-1"},
+        )
+    assert response.status_code == 200
+    assert response.headers["x-trace-id"] == TRACE_ID
+    assert response.headers["x-correlation-id"] == "job-1"
+
+    spans = [
+        s
+        for line in spans_file.read_text().splitlines()
+        for rs in json.loads(line)["resourceSpans"]
+        for scope in rs["scopeSpans"]
+        for s in scope["spans"]
+    ]
+    assert {s["traceId"] for s in spans} == {TRACE_ID}
+    [root] = [s for s in spans if s["name"] == "POST /api/v1/analyze"]
+    assert root["parentSpanId"] == PARENT_ID
+    attributes = {a["key"]: a["value"] for a in root["attributes"]}
+    assert attributes["correlation.id"] == {"stringValue": "job-1"}
+    assert attributes["http.status_code"] == {"intValue": "200"}
+
+    by_id = {s["spanId"]: s for s in spans}
+    names = {s["name"] for s in spans}
+    assert {"engine.fingerprint", "engine.summarize", "serialize", "send"} <= names
+    for s in spans:
+        if s is not root:
+            # Every span hangs off the request's root span
+            parent = s["parentSpanId"]
+            while parent != root["spanId"]:
+                parent = by_id[parent]["parentSpanId"]
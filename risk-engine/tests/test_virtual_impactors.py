@@ -0,0 +1,53 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import SentryData
+from app.engine.virtual_impactors import vi_summary
+
+SENTRY = {
+    "designation": "2004856",
+    "cumulative_impact_probability": 1e-6,
+    "palermo_cumulative": -3.0,
+    "palermo_max": -3.5,
+    "torino_max": 0,
+}
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+def test_empty_fields_are_null_and_undated_rows_dropped():
+    summary = vi_summary(SentryData(**SENTRY, virtual_impactors=[
+        {"date": "2047-02-14", "ip": "1e-7", "energy": "", "ps": "", "ts": ""},
+        {"foo": 1},
+        {"date": "not a date", "ip": "1e-3"},
+        {"date": "2051-08-01.50", "ip": "2e-6", "energy": "0.5", "ps": "-4.1", "ts": "0"},
+    ]))
+    assert summary.count == 2
+    assert summary.years == [2047, 2051]
+    assert summary.earliest_date == "2047-02-14"
+    assert summary.max_palermo == -4.1
+    likeliest, other = summary.top
+    assert likeliest.palermo_scale == -4.1
+    assert other.date == "2047-02-14"
+    assert (other.impact_energy_mt, other.palermo_scale, other.torino_scale) == (None, None, None)
+
+
+def test_no_dated_rows_means_no_summary():
+    assert vi_summary(SentryData(**SENTRY, virtual_impactors=[{"foo": 1}])) is None
+
+
+@pytest.mark.parametrize("row", [
+    {"date": "2047-02-14", "ip": "1e-7", "energy": "", "ps": "", "ts": ""},
+    {"foo": 1},
+])
+def test_sentry_enhanced_accepts_incomplete_rows(client, neo_batch, row):
+    response = client.post("/api/v1/analyze/sentry-enhanced", json={
+        "asteroid": neo_batch(1)[0],
+        "sentry_data": {**SENTRY, "total_virtual_impactors": 1, "virtual_impactors": [row]},
+    })
+    assert response.status_code == 200
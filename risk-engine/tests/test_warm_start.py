@@ -0,0 +1,57 @@
+import pickle
+
+import pytest
+
+from app.engine.analysis import approach_counts
+from app.engine.batch import extract_inputs
+from app.engine.incremental import analyze_inputs
+from app.models import NeoObject
+from app.services import warm_start
+from app.services.result_store import ResultStore
+
+
+@pytest.fixture
+def store(neo_batch):
+    store = ResultStore(max_entries=4, ttl_s=3600.0)
+    for seed in (1, 2):
+        asteroids = [NeoObject.model_validate(r) for r in neo_batch(20, seed)]
+        _, snapshot = analyze_inputs(
+            extract_inputs(asteroids, approach_counts(asteroids)), len(asteroids)
+        )
+        store.put(snapshot)
+    return store
+
+
+def test_snapshot_round_trip_keeps_handles(tmp_path, store):
+    path = str(tmp_path / "cache.pkl")
+    assert warm_start.save_snapshot(path, store) == 2
+
+    restored = ResultStore(max_entries=4, ttl_s=3600.0)
+    assert warm_start.load_snapshot(path, restored) == 2
+    for handle, _, snapshot in store.entries():
+        assert restored.get(handle) == snapshot
+
+
+def test_stale_or_unreadable_snapshot_is_discarded(tmp_path, store, monkeypatch):
+    path = tmp_path / "cache.pkl"
+    warm_start.save_snapshot(str(path), store)
+    monkeypatch.setattr(warm_start, "engine_version", lambda: "other")
+    assert warm_start.load_snapshot(str(path), ResultStore(4, 3600.0)) == 0
+    assert not path.exists()
+
+    path.write_bytes(b"not a pickle")
+    assert warm_start.load_snapshot(str(path), ResultStore(4, 3600.0)) == 0
+    assert not path.exists()
+
+
+def test_expired_results_are_not_restored(tmp_path, store):
+    path = tmp_path / "cache.pkl"
+    warm_start.save_snapshot(str(path), store)
+    saved = pickle.loads(path.read_bytes())
+    saved["results"][0] = (saved["results"][0][0], 0.0, saved["results"][0][2])
+    path.write_bytes(pickle.dumps(saved))
+    assert warm_start.load_snapshot(str(path), ResultStore(4, 3600.0)) == 1
+
+
+def test_warm_up_runs_every_batch_path():
+    assert warm_start.warm_up(50) > 0
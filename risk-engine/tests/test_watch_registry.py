@@ -0,0 +1,86 @@
+import multiprocessing
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.models import WatchRequest
+from app.services.watch_registry import SharedWatchRegistry
+
+WATCHED = "2004856"
+
+
+def _batch(score: float) -> tuple[SimpleNamespace, SimpleNamespace]:
+    """One chunk's inputs and outputs as a WatchObserver reads them."""
+    inputs = SimpleNamespace(asteroid_ids=["2000433", WATCHED], names=["(433) Eros", "(4856) Test"])
+    outputs = SimpleNamespace(
+        risk_level_code=np.array([0, 2]),
+        torino_scale=np.array([0, 1]),
+        risk_score=np.array([1.0, score]),
+    )
+    return inputs, outputs
+
+
+def _run_batch(registry: SharedWatchRegistry, score: float) -> None:
+    registry.refresh()
+    observer = registry.observer()
+    assert observer is not None
+    observer(*_batch(score))
+    observer.finish()
+
+
+def _in_other_worker(target, *args) -> None:
+    process = multiprocessing.get_context("fork").Process(target=target, args=args)
+    process.start()
+    process.join(10)
+    assert process.exitcode == 0
+
+
+def _other_worker_batch(path: str, score: float) -> None:
+    registry = SharedWatchRegistry(path, poll_s=0.1)
+    _run_batch(registry, score)
+    assert registry.drain() == {}  # the watch is not held by this worker
+
+
+def _other_worker_watch(path: str) -> None:
+    SharedWatchRegistry(path, poll_s=0.1).watch("sid-gone", WatchRequest(asteroid_ids=[WATCHED]))
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "watches.sqlite3")
+
+
+def test_batch_on_another_worker_alerts_the_watching_worker(path):
+    registry = SharedWatchRegistry(path, poll_s=0.1)
+    registry.watch("sid-1", WatchRequest(
+        asteroid_ids=[WATCHED], risk_level=None, torino_scale=None, risk_score=40.0
+    ))
+
+    _in_other_worker(_other_worker_batch, path, 55.0)
+
+    [alert] = registry.drain()["sid-1"]
+    assert alert["asteroid_id"] == WATCHED
+    assert alert["metric"] == "risk_score"
+    assert alert["direction"] == "up"
+    assert registry.drain() == {}
+
+    # The other worker's values are the baseline here: same score, no alert
+    _run_batch(registry, 55.0)
+    assert registry.drain() == {}
+    _run_batch(registry, 30.0)
+    [alert] = registry.drain()["sid-1"]
+    assert (alert["previous"], alert["value"], alert["direction"]) == (55.0, 30.0, "down")
+
+
+def test_watches_of_an_exited_worker_are_dropped(path):
+    registry = SharedWatchRegistry(path, poll_s=0.1)
+    _in_other_worker(_other_worker_watch, path)
+
+    registry.refresh()
+    assert registry.observer() is not None
+
+    registry._reap()
+    registry.refresh()
+    assert registry.observer() is None
+    assert registry.watches("sid-gone") == []